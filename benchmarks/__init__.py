@@ -0,0 +1,13 @@
+"""
+Benchmarks de desempenho do pipeline de extração.
+
+Gera um corpus sintético (PDFs vetoriais, híbridos e só-imagem, além de XMLs
+de NF-e, NFS-e e NFCom) sem depender de arquivos reais ou de rede, mede a
+latência de cada estágio (leitura, roteamento, extratores, correlação e
+pareamento) e compara o resultado com uma baseline gravada.
+
+Uso:
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run --compare benchmarks/baseline.json
+"""
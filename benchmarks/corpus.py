@@ -0,0 +1,387 @@
+"""
+Corpus sintético para os benchmarks.
+
+Os PDFs são escritos diretamente (objetos, xref e trailer montados à mão),
+sem reportlab ou outra dependência de escrita: fonte Helvetica padrão para o
+texto vetorial e uma imagem em tons de cinza (Pillow + FlateDecode) para o
+conteúdo "escaneado".
+
+Variantes de cada modelo de documento:
+    - vector: todo o texto é vetorial (caminho rápido do NativePdfStrategy)
+    - hybrid: cabeçalho vetorial e corpo em imagem (dispara o complemento OCR)
+    - image: página inteira em imagem (só OCR recupera o texto)
+
+O manifesto (`manifest.json`) registra, para cada arquivo, o extrator e o
+tipo de documento esperados; `benchmarks.run` usa o manifesto para detectar
+regressões de roteamento junto com as de tempo.
+"""
+
+import json
+import zlib
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+PDF_KINDS = ("vector", "hybrid", "image")
+
+# A4 em pontos
+_PAGE_WIDTH = 595
+_PAGE_HEIGHT = 842
+_MARGIN = 40
+_FONT_SIZE = 9
+_LEADING = 12
+# Resolução da imagem do conteúdo escaneado
+_IMAGE_DPI = 150
+# Linhas vetoriais mantidas no topo da variante híbrida
+_HYBRID_HEADER_LINES = 3
+
+
+@dataclass(frozen=True)
+class CorpusFile:
+    """
+    Arquivo do corpus.
+
+    Attributes:
+        name: Nome do arquivo (relativo à pasta do corpus).
+        template: Modelo de documento (boleto, nfse, danfe, nfe_xml, ...).
+        kind: Variante (vector, hybrid, image ou xml).
+        expected_extractor: Classe que o roteador deve escolher (PDFs) ou
+            None quando o texto só existe via OCR.
+        expected_doc_type: Tipo esperado do documento extraído.
+    """
+
+    name: str
+    template: str
+    kind: str
+    expected_extractor: Optional[str]
+    expected_doc_type: str
+
+
+# ---------------------------------------------------------------------------
+# Modelos de documento
+# ---------------------------------------------------------------------------
+
+_BOLETO_LINES = [
+    "BANCO BRADESCO S.A.                      237-2",
+    "23793.38128 60000.000003 00000.000400 1 84340000012345",
+    "Local de Pagamento: PAGAVEL EM QUALQUER BANCO ATE O VENCIMENTO",
+    "Beneficiario: FORNECEDOR EXEMPLO SERVICOS LTDA",
+    "CNPJ do Beneficiario: 12.345.678/0001-90",
+    "Agencia/Codigo do Beneficiario: 1234/56789-0",
+    "Data do Documento: 01/03/2025    Numero do Documento: 4521",
+    "Nosso Numero: 109/00001234-5     Especie: DM    Aceite: N",
+    "Vencimento: 15/03/2025",
+    "Valor do Documento: R$ 123,45",
+    "(-) Desconto / Abatimento        (+) Mora / Multa",
+    "(=) Valor Cobrado",
+    "Pagador: CSC GESTAO INTEGRADA S.A. - CNPJ 38.323.227/0001-40",
+    "Instrucoes: Apos o vencimento cobrar multa de 2% e juros de 1% ao mes.",
+    "Autenticacao Mecanica - Ficha de Compensacao",
+]
+
+_NFSE_LINES = [
+    "PREFEITURA MUNICIPAL DE BELO HORIZONTE",
+    "SECRETARIA MUNICIPAL DE FAZENDA",
+    "NOTA FISCAL DE SERVICOS ELETRONICA - NFS-e",
+    "Numero da NFS-e: 4521           Data e Hora de Emissao: 01/03/2025 10:15:00",
+    "Codigo de Verificacao: A1B2C3D4",
+    "PRESTADOR DE SERVICOS",
+    "Razao Social: FORNECEDOR EXEMPLO SERVICOS LTDA",
+    "CNPJ: 12.345.678/0001-90     Inscricao Municipal: 0123456",
+    "Endereco: RUA DAS FLORES, 100 - CENTRO - BELO HORIZONTE/MG",
+    "TOMADOR DE SERVICOS",
+    "Razao Social: CSC GESTAO INTEGRADA S.A.",
+    "CNPJ: 38.323.227/0001-40",
+    "DISCRIMINACAO DOS SERVICOS",
+    "Prestacao de servicos de manutencao de sistemas referente a 02/2025.",
+    "Vencimento: 15/03/2025",
+    "VALOR TOTAL DA NOTA = R$ 123,45",
+    "Valor dos Servicos: R$ 123,45   Base de Calculo: R$ 123,45",
+    "Aliquota: 2,00%   Valor do ISS: R$ 2,47",
+]
+
+_DANFE_LINES = [
+    "DANFE",
+    "DOCUMENTO AUXILIAR DA NOTA FISCAL ELETRONICA",
+    "0 - ENTRADA  1 - SAIDA   1",
+    "N. 000.004.521   SERIE 1   FOLHA 1/1",
+    "CHAVE DE ACESSO",
+    "35250312345678000190550010000045211000004521",
+    "Consulta de autenticidade no portal nacional da NF-e www.nfe.fazenda.gov.br",
+    "NATUREZA DA OPERACAO: VENDA DE MERCADORIA",
+    "PROTOCOLO DE AUTORIZACAO DE USO: 135250000000001 01/03/2025 10:15:00",
+    "EMITENTE: FORNECEDOR EXEMPLO COMERCIO LTDA",
+    "CNPJ: 12.345.678/0001-90   INSCRICAO ESTADUAL: 123.456.789.110",
+    "DESTINATARIO / REMETENTE",
+    "NOME / RAZAO SOCIAL: CSC GESTAO INTEGRADA S.A.   CNPJ: 38.323.227/0001-40",
+    "DATA DA EMISSAO: 01/03/2025",
+    "FATURA / DUPLICATA: 001  VENC. 15/03/2025  VALOR R$ 123,45",
+    "CALCULO DO IMPOSTO",
+    "BASE DE CALCULO DO ICMS 123,45   VALOR DO ICMS 22,22",
+    "VALOR TOTAL DOS PRODUTOS 123,45",
+    "VALOR TOTAL DA NOTA 123,45",
+]
+
+# template → (linhas, extrator esperado, tipo esperado)
+PDF_TEMPLATES: Dict[str, tuple] = {
+    "boleto": (_BOLETO_LINES, "BoletoExtractor", "BOLETO"),
+    "nfse": (_NFSE_LINES, "NfseGenericExtractor", "NFSE"),
+    "danfe": (_DANFE_LINES, "DanfeExtractor", "DANFE"),
+}
+
+_CHAVE_NFE = "35250312345678000190550010000045211000004521"
+_CHAVE_NFCOM = "35250312345678000190620010000045211000004521"
+
+_NFE_XML = f"""<?xml version="1.0" encoding="UTF-8"?>
+<nfeProc xmlns="http://www.portalfiscal.inf.br/nfe" versao="4.00">
+  <NFe>
+    <infNFe Id="NFe{_CHAVE_NFE}" versao="4.00">
+      <ide>
+        <cUF>35</cUF><mod>55</mod><serie>1</serie><nNF>4521</nNF>
+        <dhEmi>2025-03-01T10:15:00-03:00</dhEmi>
+      </ide>
+      <emit>
+        <CNPJ>12345678000190</CNPJ>
+        <xNome>FORNECEDOR EXEMPLO COMERCIO LTDA</xNome>
+      </emit>
+      <dest>
+        <CNPJ>38323227000140</CNPJ>
+        <xNome>CSC GESTAO INTEGRADA S.A.</xNome>
+      </dest>
+      <total><ICMSTot><vNF>123.45</vNF></ICMSTot></total>
+      <cobr>
+        <fat><nFat>4521</nFat><vOrig>123.45</vOrig><vLiq>123.45</vLiq></fat>
+        <dup><nDup>001</nDup><dVenc>2025-03-15</dVenc><vDup>123.45</vDup></dup>
+      </cobr>
+    </infNFe>
+  </NFe>
+</nfeProc>
+"""
+
+_NFSE_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<CompNfse xmlns="http://www.abrasf.org.br/nfse.xsd">
+  <Nfse>
+    <InfNfse>
+      <Numero>4521</Numero>
+      <CodigoVerificacao>A1B2C3D4</CodigoVerificacao>
+      <DataEmissao>2025-03-01T10:15:00</DataEmissao>
+      <PrestadorServico>
+        <IdentificacaoPrestador><Cnpj>12345678000190</Cnpj></IdentificacaoPrestador>
+        <RazaoSocial>FORNECEDOR EXEMPLO SERVICOS LTDA</RazaoSocial>
+      </PrestadorServico>
+      <Servico>
+        <Valores><ValorServicos>123.45</ValorServicos></Valores>
+        <Discriminacao>Manutencao de sistemas 02/2025</Discriminacao>
+      </Servico>
+    </InfNfse>
+  </Nfse>
+</CompNfse>
+"""
+
+_NFCOM_XML = f"""<?xml version="1.0" encoding="UTF-8"?>
+<nfcomProc xmlns="http://www.portalfiscal.inf.br/nfcom" versao="1.00">
+  <NFCom>
+    <infNFCom Id="NFCom{_CHAVE_NFCOM}" versao="1.00">
+      <ide>
+        <cUF>35</cUF><mod>62</mod><serie>1</serie><nNF>4521</nNF>
+        <dhEmi>2025-03-01T10:15:00-03:00</dhEmi>
+      </ide>
+      <emit>
+        <CNPJ>12345678000190</CNPJ>
+        <xNome>OPERADORA EXEMPLO TELECOM S.A.</xNome>
+      </emit>
+      <total><vNF>123.45</vNF></total>
+      <gFat><CompetFat>202503</CompetFat><dVencFat>2025-03-15</dVencFat></gFat>
+    </infNFCom>
+  </NFCom>
+</nfcomProc>
+"""
+
+# template → (conteúdo, tipo esperado)
+XML_TEMPLATES: Dict[str, tuple] = {
+    "nfe_xml": (_NFE_XML, "NFE"),
+    "nfse_xml": (_NFSE_XML, "NFSE"),
+    "nfcom_xml": (_NFCOM_XML, "NFCOM"),
+}
+
+
+def template_text(template: str) -> str:
+    """Texto de referência de um modelo PDF (o que a leitura vetorial devolve)."""
+    return "\n".join(PDF_TEMPLATES[template][0])
+
+
+# ---------------------------------------------------------------------------
+# Escrita de PDF
+# ---------------------------------------------------------------------------
+
+
+def _escape_pdf_text(line: str) -> bytes:
+    """Codifica uma linha para string literal PDF (WinAnsi ≈ latin-1)."""
+    raw = line.encode("latin-1", errors="replace")
+    return raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+def _text_stream(lines: Sequence[str], top: float) -> bytes:
+    """Operadores de texto para `lines` a partir da coordenada `top`."""
+    if not lines:
+        return b""
+    parts = [
+        b"BT",
+        b"/F1 %d Tf" % _FONT_SIZE,
+        b"%d TL" % _LEADING,
+        b"%d %d Td" % (_MARGIN, int(top)),
+    ]
+    for line in lines:
+        parts.append(b"(" + _escape_pdf_text(line) + b") Tj T*")
+    parts.append(b"ET")
+    return b"\n".join(parts)
+
+
+def _render_image(lines: Sequence[str], width_pt: float, height_pt: float):
+    """Renderiza as linhas em um bitmap cinza (simula um documento escaneado)."""
+    from PIL import Image, ImageDraw, ImageFont
+
+    scale = _IMAGE_DPI / 72.0
+    size = (max(1, int(width_pt * scale)), max(1, int(height_pt * scale)))
+    image = Image.new("L", size, 255)
+    draw = ImageDraw.Draw(image)
+    font_px = int(_FONT_SIZE * scale * 1.2)
+    try:
+        font = ImageFont.load_default(size=font_px)
+    except TypeError:  # Pillow < 10.1 não aceita size
+        font = ImageFont.load_default()
+
+    y = int(4 * scale)
+    for line in lines:
+        draw.text((int(4 * scale), y), line, fill=0, font=font)
+        y += int(_LEADING * scale * 1.2)
+    return image
+
+
+def build_pdf(
+    vector_lines: Sequence[str],
+    image_lines: Sequence[str] = (),
+) -> bytes:
+    """
+    Monta um PDF de uma página.
+
+    Args:
+        vector_lines: Linhas escritas como texto (Helvetica) a partir do topo.
+        image_lines: Linhas renderizadas em imagem abaixo do texto vetorial.
+
+    Returns:
+        Conteúdo do arquivo PDF.
+    """
+    top = _PAGE_HEIGHT - _MARGIN - _FONT_SIZE
+    content = [_text_stream(vector_lines, top)]
+
+    image_obj: Optional[bytes] = None
+    if image_lines:
+        image_top = top - len(vector_lines) * _LEADING - _LEADING
+        image_height = max(_LEADING, image_top - _MARGIN)
+        image_width = _PAGE_WIDTH - 2 * _MARGIN
+        image = _render_image(image_lines, image_width, image_height)
+        data = zlib.compress(image.tobytes())
+        image_obj = (
+            b"<< /Type /XObject /Subtype /Image /Width %d /Height %d "
+            b"/ColorSpace /DeviceGray /BitsPerComponent 8 /Filter /FlateDecode "
+            b"/Length %d >>\nstream\n" % (image.width, image.height, len(data))
+            + data
+            + b"\nendstream"
+        )
+        content.append(
+            b"q %d 0 0 %d %d %d cm /Im1 Do Q"
+            % (image_width, image_height, _MARGIN, int(image_top - image_height))
+        )
+
+    stream = b"\n".join(part for part in content if part)
+    resources = b"/Font << /F1 5 0 R >>"
+    if image_obj is not None:
+        resources += b" /XObject << /Im1 6 0 R >>"
+
+    objects: List[bytes] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] "
+        b"/Resources << %s >> /Contents 4 0 R >>" % (_PAGE_WIDTH, _PAGE_HEIGHT, resources),
+        b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica "
+        b"/Encoding /WinAnsiEncoding >>",
+    ]
+    if image_obj is not None:
+        objects.append(image_obj)
+
+    out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+
+    xref_at = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += (
+        b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+        % (len(objects) + 1, xref_at)
+    )
+    return bytes(out)
+
+
+def build_template_pdf(template: str, kind: str) -> bytes:
+    """PDF de um modelo na variante `kind` (vector, hybrid ou image)."""
+    lines = PDF_TEMPLATES[template][0]
+    if kind == "vector":
+        return build_pdf(lines)
+    if kind == "hybrid":
+        return build_pdf(lines[:_HYBRID_HEADER_LINES], lines[_HYBRID_HEADER_LINES:])
+    if kind == "image":
+        return build_pdf((), lines)
+    raise ValueError(f"Variante de PDF desconhecida: {kind}")
+
+
+# ---------------------------------------------------------------------------
+# Corpus
+# ---------------------------------------------------------------------------
+
+
+def build_corpus(target: Union[str, Path]) -> List[CorpusFile]:
+    """
+    Grava o corpus completo em `target` (idempotente) e o manifesto.
+
+    Returns:
+        Arquivos gerados, na ordem do manifesto.
+    """
+    target = Path(target)
+    target.mkdir(parents=True, exist_ok=True)
+    files: List[CorpusFile] = []
+
+    for template, (_, extractor, doc_type) in PDF_TEMPLATES.items():
+        for kind in PDF_KINDS:
+            name = f"{template}_{kind}.pdf"
+            (target / name).write_bytes(build_template_pdf(template, kind))
+            files.append(CorpusFile(
+                name=name,
+                template=template,
+                kind=kind,
+                # Híbrido/imagem só são roteados corretamente com OCR disponível
+                expected_extractor=extractor if kind == "vector" else None,
+                expected_doc_type=doc_type,
+            ))
+
+    for template, (content, doc_type) in XML_TEMPLATES.items():
+        name = f"{template}.xml"
+        (target / name).write_text(content, encoding="utf-8")
+        files.append(CorpusFile(
+            name=name,
+            template=template,
+            kind="xml",
+            expected_extractor=None,
+            expected_doc_type=doc_type,
+        ))
+
+    manifest = [asdict(f) for f in files]
+    (target / "manifest.json").write_text(
+        json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8"
+    )
+    return files
@@ -0,0 +1,526 @@
+"""
+Executor dos benchmarks do pipeline de extração.
+
+Mede, sobre o corpus sintético de `benchmarks.corpus`, a latência de cada
+estágio:
+
+    read.<variante>       SmartExtractionStrategy.extract (vector/hybrid/image)
+    route                 ExtractorRouter.route sobre o texto lido
+    extract.<Extrator>    extract() do extrator escolhido
+    process.<modelo>      BaseInvoiceProcessor.process (leitura + extração)
+    xml.<TIPO>            XmlExtractor.extract (NF-e, NFS-e, NFCom)
+    correlate             CorrelationService.correlate sobre um lote sintético
+    pair                  DocumentPairingService.pair_documents no mesmo lote
+
+Para cada estágio o relatório traz n, p50/p95/média (ms) e vazão (itens/s);
+no nível do relatório, o pico de memória residente (RSS) do processo.
+
+Lote de XML: `--xml-bulk N` gera N XMLs (NF-e, NFS-e e NFCom alternados) e
+mede `extract_xml_directory` sequencial e com `--xml-workers` processos.
+O tempo total depende da máquina e não entra na comparação com a baseline.
+
+Modelos em memória: `--model-memory N` constrói N documentos de cada modelo
+(`core.models`) com valores realistas (empresas, fornecedores e bancos
+repetidos, snippet de texto de 500 caracteres) e mede o tamanho por
+documento (tracemalloc) e o custo de `to_dict`/`to_sheets_row`/
+`to_anexos_row`. Depende só do interpretador, não da máquina.
+
+Modo de comparação: `--compare baseline.json` falha (código de saída 1) se
+algum estágio ficou mais lento que a baseline além da tolerância, se o pico
+de RSS cresceu além da tolerância ou se algum documento do manifesto foi
+roteado para outro extrator. A baseline depende da máquina, então não é
+versionada: gere-a com `--save-baseline` no mesmo ambiente da comparação.
+
+Uso:
+    python -m benchmarks.run --iterations 20 --output bench.json
+    python -m benchmarks.run --save-baseline data/benchmarks/baseline.json
+    python -m benchmarks.run --compare data/benchmarks/baseline.json --tolerance 0.25
+    python -m benchmarks.run --iterations 1 --xml-bulk 10000 --xml-workers 4
+    python -m benchmarks.run --iterations 1 --model-memory 20000
+"""
+
+import argparse
+import copy
+import json
+import logging
+import platform
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+# Permite `python benchmarks/run.py` além de `python -m benchmarks.run`
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(_PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(_PROJECT_ROOT))
+
+import core  # noqa: E402,F401  (core antes de strategies: evita import circular)
+from benchmarks.corpus import CorpusFile, build_corpus  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ITERATIONS = 10
+# Aumento relativo tolerado em p50/p95 e no pico de RSS
+DEFAULT_TOLERANCE = 0.25
+# Diferenças absolutas menores que isso são ruído de medição (ms)
+DEFAULT_MIN_DELTA_MS = 2.0
+# Idem para o pico de RSS (MB)
+DEFAULT_MIN_DELTA_RSS_MB = 32.0
+
+# Métricas de latência comparadas com a baseline
+_COMPARED_METRICS = ("p50_ms", "p95_ms")
+
+
+# ---------------------------------------------------------------------------
+# Estatísticas
+# ---------------------------------------------------------------------------
+
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    """Percentil com interpolação linear (0 para amostra vazia)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    pos = (len(ordered) - 1) * pct / 100.0
+    lower = int(pos)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (pos - lower)
+
+
+def summarize(samples: Sequence[float], errors: int = 0) -> Dict[str, float]:
+    """Resumo de um estágio a partir das durações (s) de cada chamada."""
+    total = sum(samples)
+    return {
+        "n": len(samples),
+        "errors": errors,
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 95) * 1000, 3),
+        "mean_ms": round(total / len(samples) * 1000, 3) if samples else 0.0,
+        "throughput_per_s": round(len(samples) / total, 2) if total > 0 else 0.0,
+    }
+
+
+def peak_rss_mb() -> float:
+    """Pico de memória residente do processo (MB)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KB; macOS, bytes
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 1)
+
+
+def ocr_available() -> bool:
+    """Se o binário do Tesseract está acessível (variantes hybrid/image)."""
+    try:
+        import pytesseract
+        from config import settings
+
+        pytesseract.pytesseract.tesseract_cmd = settings.TESSERACT_CMD
+        pytesseract.get_tesseract_version()
+        return True
+    except Exception:
+        return False
+
+
+class StageTimer:
+    """Acumula durações por estágio."""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+
+    def measure(self, stage: str, func: Callable[..., Any], *args: Any) -> Any:
+        """Executa `func(*args)` cronometrando; exceções contam como erro do estágio."""
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        except Exception as e:
+            self.errors[stage] = self.errors.get(stage, 0) + 1
+            logger.debug(f"[bench] {stage} falhou: {e}")
+            return None
+        finally:
+            self.samples.setdefault(stage, []).append(time.perf_counter() - start)
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        return {
+            stage: summarize(samples, self.errors.get(stage, 0))
+            for stage, samples in sorted(self.samples.items())
+        }
+
+
+# ---------------------------------------------------------------------------
+# Execução
+# ---------------------------------------------------------------------------
+
+
+def _call_extractor(extractor: Any, text: str, context: Dict[str, Any]) -> Any:
+    """Mesmo contrato do BaseInvoiceProcessor (extratores com e sem contexto)."""
+    try:
+        return extractor.extract(text, context)
+    except TypeError:
+        return extractor.extract(text)
+
+
+def run_benchmarks(
+    corpus_dir: Path,
+    iterations: int = DEFAULT_ITERATIONS,
+) -> Dict[str, Any]:
+    """
+    Executa todos os estágios sobre o corpus e devolve o relatório.
+
+    Args:
+        corpus_dir: Pasta onde o corpus é (re)gerado.
+        iterations: Repetições de cada medição.
+    """
+    from core.batch_result import BatchResult
+    from core.correlation_service import CorrelationService
+    from core.document_pairing import DocumentPairingService
+    from core.extractor_router import get_router
+    from core.processor import BaseInvoiceProcessor
+    from extractors.xml_extractor import XmlExtractor
+    from strategies.fallback import SmartExtractionStrategy
+
+    files: List[CorpusFile] = build_corpus(corpus_dir)
+    timer = StageTimer()
+    # Sem cache de texto: cada iteração mede a leitura de verdade
+    reader = SmartExtractionStrategy(text_cache=None)
+    processor = BaseInvoiceProcessor(reader=reader)
+    router = get_router()
+    routing: Dict[str, Dict[str, Any]] = {}
+    batch = BatchResult(batch_id="bench_batch", source_folder=str(corpus_dir))
+
+    for corpus_file in files:
+        path = str(corpus_dir / corpus_file.name)
+
+        if corpus_file.kind == "xml":
+            result = None
+            for _ in range(iterations):
+                result = timer.measure(
+                    f"xml.{corpus_file.expected_doc_type}", XmlExtractor().extract, path
+                )
+            ok = bool(result and result.success and result.doc_type == corpus_file.expected_doc_type)
+            routing[corpus_file.name] = {
+                "expected": corpus_file.expected_doc_type,
+                "actual": result.doc_type if result else None,
+                "ok": ok,
+            }
+            if result is not None and result.document is not None:
+                batch.add_document(result.document)
+            continue
+
+        text = None
+        for _ in range(iterations):
+            text = timer.measure(f"read.{corpus_file.kind}", reader.extract, path)
+        if not text:
+            routing[corpus_file.name] = {
+                "expected": corpus_file.expected_extractor,
+                "actual": None,
+                "ok": corpus_file.expected_extractor is None,
+            }
+            continue
+
+        extractor_cls = None
+        for _ in range(iterations):
+            extractor_cls = timer.measure("route", router.route, text)
+        actual = extractor_cls.__name__ if extractor_cls else None
+        routing[corpus_file.name] = {
+            "expected": corpus_file.expected_extractor,
+            "actual": actual,
+            "ok": corpus_file.expected_extractor in (None, actual),
+        }
+        if extractor_cls is None:
+            continue
+
+        context = {"arquivo_origem": corpus_file.name, "file_path": path}
+        for _ in range(iterations):
+            timer.measure(
+                f"extract.{actual}", _call_extractor, extractor_cls(), text, context
+            )
+
+        if corpus_file.kind == "vector":
+            doc = None
+            for _ in range(iterations):
+                doc = timer.measure(f"process.{corpus_file.template}", processor.process, path)
+            if doc is not None:
+                batch.add_document(doc)
+
+    correlation = CorrelationService()
+    pairing = DocumentPairingService()
+    for _ in range(iterations):
+        # correlate() altera os documentos: cada iteração parte de uma cópia
+        fresh = copy.deepcopy(batch)
+        timer.measure("correlate", correlation.correlate, fresh)
+        timer.measure("pair", pairing.pair_documents, fresh)
+
+    return {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "iterations": iterations,
+            "corpus_files": len(files),
+            "batch_documents": len(batch.documents),
+            "ocr_available": ocr_available(),
+        },
+        "stages": timer.report(),
+        "peak_rss_mb": peak_rss_mb(),
+        "routing": routing,
+    }
+
+
+def run_xml_bulk(target_dir: Path, count: int, workers: int) -> Dict[str, Any]:
+    """
+    Mede a extração de uma pasta com `count` XMLs.
+
+    Args:
+        target_dir: Pasta onde os XMLs são gerados.
+        count: Quantidade de arquivos.
+        workers: Processos do modo paralelo.
+    """
+    from benchmarks.corpus import XML_TEMPLATES
+    from extractors.xml_extractor import extract_xml_directory
+
+    target_dir.mkdir(parents=True, exist_ok=True)
+    templates = list(XML_TEMPLATES.values())
+    for i in range(count):
+        content, _ = templates[i % len(templates)]
+        (target_dir / f"doc_{i:06d}.xml").write_text(content, encoding="utf-8")
+
+    report: Dict[str, Any] = {"files": count, "workers": workers}
+    for mode, n_workers in (("sequential", 1), ("pool", workers)):
+        started = time.perf_counter()
+        results = extract_xml_directory(target_dir, workers=n_workers)
+        elapsed = time.perf_counter() - started
+        report[mode] = {
+            "seconds": round(elapsed, 3),
+            "per_s": round(count / elapsed, 1) if elapsed > 0 else 0.0,
+            "errors": sum(1 for r in results.values() if not r.success),
+        }
+    return report
+
+
+def _model_documents(model: type, count: int) -> List[Any]:
+    """
+    Documentos sintéticos de um modelo, como os da ingestão.
+
+    Os valores são montados em tempo de execução (como os lidos de PDFs e
+    CSVs): strings iguais de documentos diferentes são objetos distintos, a
+    menos que o modelo as compartilhe.
+    """
+    from core.models import BoletoData, EmailAvisoData, OtherDocumentData, texto_snippet
+
+    def text(*parts: Any) -> str:
+        return "".join(str(part) for part in parts)
+
+    docs = []
+    for i in range(count):
+        raw_text = text("PREFEITURA MUNICIPAL  \n NOTA FISCAL ", i, " \n") + "Serviço prestado " * 400
+        common = dict(
+            arquivo_origem=text("documento_", i, ".pdf"),
+            texto_bruto=texto_snippet(raw_text),
+            data_processamento=text("2025-01-", 10 + i % 20),
+            empresa=text("EMPRESA ", i % 5),
+            setor=text("SETOR ", i % 3),
+            batch_id=text("email_20250110_", i),
+            source_email_subject=text("Fatura ", i),
+            source_email_sender=text("fornecedor", i % 50, "@example.com"),
+            status_conciliacao=text("O", "K"),
+            vencimento=text("2025-02-", 10 + i % 18),
+            fornecedor_nome=text("FORNECEDOR ", i % 50, " LTDA"),
+        )
+        if model is BoletoData:
+            doc = model(**common, valor_documento=100.0 + i, banco_nome=text("BANCO ", i % 10),
+                        linha_digitavel=text("34191.79001 01043.510047 ", i))
+        elif model is EmailAvisoData:
+            doc = model(**common, link_nfe=text("https://nfe.example.com/", i),
+                        email_subject_full=text("Fatura ", i))
+        elif model is OtherDocumentData:
+            doc = model(**common, valor_total=100.0 + i, numero_documento=str(i))
+        else:
+            doc = model(**common, valor_total=100.0 + i, numero_nota=str(i))
+        docs.append(doc)
+    return docs
+
+
+def run_model_memory(count: int) -> Dict[str, Any]:
+    """
+    Tamanho por documento de cada modelo e custo das conversões para exportação.
+
+    O tamanho é o que fica vivo após construir a lista (tracemalloc),
+    dividido pelo número de documentos.
+
+    Args:
+        count: Documentos por modelo.
+    """
+    import tracemalloc
+
+    from core.models import BoletoData, DanfeData, EmailAvisoData, InvoiceData, OtherDocumentData
+
+    report: Dict[str, Any] = {"documents": count, "models": {}}
+    for model in (InvoiceData, DanfeData, BoletoData, OtherDocumentData, EmailAvisoData):
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        docs = _model_documents(model, count)
+        size = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+
+        row_method = "to_sem_anexos_row" if model is EmailAvisoData else "to_anexos_row"
+        started = time.perf_counter()
+        for doc in docs:
+            doc.to_dict()
+            doc.to_sheets_row()
+            getattr(doc, row_method)()
+        elapsed = time.perf_counter() - started
+
+        report["models"][model.__name__] = {
+            "bytes_per_document": round(size / count),
+            "export_us_per_document": round(elapsed / count * 1e6, 2),
+        }
+    return report
+
+
+# ---------------------------------------------------------------------------
+# Comparação com baseline
+# ---------------------------------------------------------------------------
+
+
+def compare_reports(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float = DEFAULT_TOLERANCE,
+    min_delta_ms: float = DEFAULT_MIN_DELTA_MS,
+    min_delta_rss_mb: float = DEFAULT_MIN_DELTA_RSS_MB,
+) -> List[str]:
+    """
+    Regressões do relatório atual em relação à baseline.
+
+    Uma métrica regride quando passa de `baseline * (1 + tolerance)` E a
+    diferença absoluta supera o mínimo (evita falhas por ruído em estágios
+    de microssegundos). Estágios ausentes em um dos lados (ex: OCR
+    indisponível) são ignorados.
+
+    Returns:
+        Descrições das regressões (lista vazia = sem regressão).
+    """
+    regressions: List[str] = []
+    current_stages = current.get("stages", {})
+
+    for stage, base in sorted(baseline.get("stages", {}).items()):
+        now = current_stages.get(stage)
+        if now is None:
+            continue
+        for metric in _COMPARED_METRICS:
+            before, after = float(base.get(metric, 0)), float(now.get(metric, 0))
+            if after > before * (1 + tolerance) and after - before > min_delta_ms:
+                regressions.append(
+                    f"{stage} {metric}: {before:.2f}ms → {after:.2f}ms "
+                    f"(+{(after / before - 1) * 100 if before else float('inf'):.0f}%)"
+                )
+        if now.get("errors", 0) > base.get("errors", 0):
+            regressions.append(
+                f"{stage} erros: {base.get('errors', 0)} → {now.get('errors', 0)}"
+            )
+
+    before_rss = float(baseline.get("peak_rss_mb", 0))
+    after_rss = float(current.get("peak_rss_mb", 0))
+    if after_rss > before_rss * (1 + tolerance) and after_rss - before_rss > min_delta_rss_mb:
+        regressions.append(f"peak_rss_mb: {before_rss:.1f} → {after_rss:.1f}")
+
+    for name, route in sorted(current.get("routing", {}).items()):
+        if not route.get("ok", True):
+            regressions.append(
+                f"roteamento {name}: esperado {route.get('expected')}, obtido {route.get('actual')}"
+            )
+
+    return regressions
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    print(f"{'estágio':<32} {'n':>5} {'p50 ms':>10} {'p95 ms':>10} {'itens/s':>10}")
+    for stage, stats in report["stages"].items():
+        erros = f"  ({stats['errors']} erro(s))" if stats["errors"] else ""
+        print(
+            f"{stage:<32} {stats['n']:>5} {stats['p50_ms']:>10.2f} "
+            f"{stats['p95_ms']:>10.2f} {stats['throughput_per_s']:>10.1f}{erros}"
+        )
+    print(f"Pico de RSS: {report['peak_rss_mb']:.1f} MB")
+    if report.get("xml_bulk"):
+        bulk = report["xml_bulk"]
+        print(f"\nLote de {bulk['files']} XMLs:")
+        for mode in ("sequential", "pool"):
+            stats = bulk[mode]
+            label = f"{mode} ({bulk['workers']} workers)" if mode == "pool" else mode
+            print(f"   {label:<24} {stats['seconds']:>8.2f}s {stats['per_s']:>10.1f} itens/s"
+                  + (f"  ({stats['errors']} erro(s))" if stats["errors"] else ""))
+    if report.get("model_memory"):
+        memory = report["model_memory"]
+        print(f"\nModelos ({memory['documents']} documentos de cada):")
+        print(f"{'modelo':<32} {'bytes/doc':>10} {'export µs':>10}")
+        for name, stats in memory["models"].items():
+            print(f"{name:<32} {stats['bytes_per_document']:>10} {stats['export_us_per_document']:>10.2f}")
+    if not report["meta"]["ocr_available"]:
+        print("⚠️ Tesseract indisponível: variantes hybrid/image medem só a tentativa de OCR")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks do pipeline de extração")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS,
+                        help=f"Repetições por medição (padrão: {DEFAULT_ITERATIONS})")
+    parser.add_argument("--corpus-dir", type=Path, default=None,
+                        help="Pasta do corpus sintético (padrão: diretório temporário)")
+    parser.add_argument("--output", type=Path, default=None,
+                        help="Grava o relatório JSON neste arquivo")
+    parser.add_argument("--save-baseline", type=Path, default=None,
+                        help="Grava o relatório como baseline")
+    parser.add_argument("--compare", type=Path, default=None,
+                        help="Baseline para comparação (sai com 1 se houver regressão)")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help=f"Aumento relativo tolerado (padrão: {DEFAULT_TOLERANCE})")
+    parser.add_argument("--min-delta-ms", type=float, default=DEFAULT_MIN_DELTA_MS,
+                        help=f"Diferença mínima em ms para regressão (padrão: {DEFAULT_MIN_DELTA_MS})")
+    parser.add_argument("--xml-bulk", type=int, default=0,
+                        help="Mede a extração de uma pasta com N XMLs (0 = não mede)")
+    parser.add_argument("--xml-workers", type=int, default=4,
+                        help="Processos do modo paralelo de --xml-bulk (padrão: 4)")
+    parser.add_argument("--model-memory", type=int, default=0,
+                        help="Mede memória e exportação de N documentos por modelo (0 = não mede)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+
+    with tempfile.TemporaryDirectory(prefix="bench_corpus_") as tmp:
+        report = run_benchmarks(args.corpus_dir or Path(tmp), args.iterations)
+        if args.xml_bulk > 0:
+            report["xml_bulk"] = run_xml_bulk(
+                Path(tmp) / "xml_bulk", args.xml_bulk, args.xml_workers
+            )
+        if args.model_memory > 0:
+            report["model_memory"] = run_model_memory(args.model_memory)
+
+    _print_report(report)
+    payload = json.dumps(report, ensure_ascii=False, indent=2)
+    for target in (args.output, args.save_baseline):
+        if target is not None:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text(payload, encoding="utf-8")
+            print(f"📄 Relatório gravado em {target}")
+
+    if args.compare is None:
+        return 0
+
+    baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+    regressions = compare_reports(
+        report, baseline, tolerance=args.tolerance, min_delta_ms=args.min_delta_ms
+    )
+    if regressions:
+        print(f"❌ {len(regressions)} regressão(ões) em relação a {args.compare}:")
+        for item in regressions:
+            print(f"   - {item}")
+        return 1
+    print(f"✅ Sem regressões em relação a {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
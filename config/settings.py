@@ -56,6 +56,41 @@ OCR_LANG = "por"
 # Alguns PDFs possuem camada de texto parcial e campos importantes como imagem.
 # Quando habilitado, o leitor pode complementar o texto nativo com OCR.
 HYBRID_OCR_COMPLEMENT = os.getenv("HYBRID_OCR_COMPLEMENT", "1") == "1"
+# "regions": OCR só nas imagens embutidas (recortes), com o texto reconhecido
+# inserido na posição da página; "page": OCR da página inteira (comportamento antigo).
+# PDFs sem imagens utilizáveis caem no modo "page" automaticamente.
+HYBRID_OCR_MODE = os.getenv("HYBRID_OCR_MODE", "regions")
+# Área mínima (pontos², 1pt = 1/72") de uma imagem para valer o OCR
+# (ignora logotipos e ícones pequenos). 4000pt² ≈ 2,2cm x 2,2cm
+HYBRID_OCR_MIN_REGION_AREA = float(os.getenv("HYBRID_OCR_MIN_REGION_AREA", "4000"))
+
+# --- OCR multipágina com ajuste automático de DPI ---
+# Páginas rasterizadas por documento (DANFEs escaneados podem ter várias)
+OCR_MAX_PAGES = int(os.getenv("OCR_MAX_PAGES", "3"))
+# Páginas processadas em paralelo (cada uma em um processo tesseract próprio,
+# com OMP_THREAD_LIMIT=1 para não competirem por núcleos). 1 = sequencial.
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", "2"))
+# O pytesseract não aceita `env` por chamada: o limite é definido uma única vez
+# aqui, na carga da configuração (respeita valor já exportado no ambiente).
+if OCR_WORKERS > 1:
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+# Primeira passada em DPI baixo; só refaz em DPI alto se o resultado for fraco
+OCR_DPI_LOW = int(os.getenv("OCR_DPI_LOW", "200"))
+OCR_DPI_HIGH = int(os.getenv("OCR_DPI_HIGH", "300"))
+# Critérios de "resultado fraco": confiança média (0-100) ou poucos caracteres úteis
+OCR_MIN_CONFIDENCE = float(os.getenv("OCR_MIN_CONFIDENCE", "70"))
+OCR_MIN_CHARS_PER_PAGE = int(os.getenv("OCR_MIN_CHARS_PER_PAGE", "150"))
+
+# --- Orçamento de páginas na leitura nativa (PDFs longos) ---
+# PDFs com mais de FIRST + LAST páginas são lidos primeiro só nas primeiras e
+# últimas páginas; o restante é lido sob demanda, quando o extrator escolhido
+# não declara PAGE_SCOPE ou não encontrou seus REQUIRED_FIELDS.
+# Opcional (desligado por padrão): com o orçamento, a detecção da EMPRESA, o
+# texto_snippet e o roteamento veem só as páginas lidas — um CNPJ nosso numa
+# página ignorada deixa de preencher `empresa`.
+PDF_PAGE_BUDGET_ENABLED = os.getenv("PDF_PAGE_BUDGET_ENABLED", "0") == "1"
+PDF_PAGE_BUDGET_FIRST = int(os.getenv("PDF_PAGE_BUDGET_FIRST", "2"))
+PDF_PAGE_BUDGET_LAST = int(os.getenv("PDF_PAGE_BUDGET_LAST", "1"))
 
 # --- Parâmetros de Diretórios (Legado/Compatibilidade) ---
 ARQUIVO_SAIDA = "carga_notas_fiscais.csv"
@@ -66,6 +101,25 @@ EMAIL_USER = os.getenv("EMAIL_USER", "")
 EMAIL_PASS = os.getenv("EMAIL_PASS", "")
 EMAIL_FOLDER = os.getenv("EMAIL_FOLDER", "INBOX")
 
+# Ingestão IMAP em streaming: BODYSTRUCTURE em lote e download só das partes
+# PDF/XML/corpo, gravadas direto na pasta do lote. 0 = volta ao RFC822 completo
+IMAP_STREAMING = os.getenv("IMAP_STREAMING", "1") == "1"
+# UIDs por comando FETCH de estrutura/cabeçalhos
+IMAP_FETCH_BATCH_SIZE = int(os.getenv("IMAP_FETCH_BATCH_SIZE", "200"))
+# Tamanho de cada bloco parcial (BODY.PEEK[parte]<offset.tamanho>) ao baixar anexos
+IMAP_PART_CHUNK_BYTES = int(os.getenv("IMAP_PART_CHUNK_BYTES", str(1024 * 1024)))
+# Conexões IMAP simultâneas no download (cada uma com uma faixa de UIDs).
+# O download alimenta uma fila limitada e acontece junto do processamento dos lotes
+# 1 = uma conexão, anexos baixados sob demanda
+IMAP_POOL_SIZE = int(os.getenv("IMAP_POOL_SIZE", "4"))
+# E-mails já baixados aguardando a criação do lote (limita o disco em staging)
+IMAP_QUEUE_SIZE = int(os.getenv("IMAP_QUEUE_SIZE", "8"))
+# Reconexões por comando quando a conexão IMAP cai no meio do download
+IMAP_RECONNECT_ATTEMPTS = int(os.getenv("IMAP_RECONNECT_ATTEMPTS", "3"))
+# Sincronização incremental: guarda UIDVALIDITY e último UID por pasta em
+# temp_email/_sync_state.json e busca só "UID n:*" (também via --incremental)
+IMAP_INCREMENTAL_SYNC = os.getenv("IMAP_INCREMENTAL_SYNC", "0") == "1"
+
 # Validação básica para não rodar sem config
 if not all([EMAIL_HOST, EMAIL_USER, EMAIL_PASS]):
     print("⚠️ AVISO: Credenciais de e-mail não configuradas totalmente no .env")
@@ -152,3 +206,90 @@ BATCH_TIMEOUT_SECONDS = int(os.getenv("BATCH_TIMEOUT_SECONDS", "300"))  # 5 min
 # Timeout individual por arquivo (importante para OCRs lentos)
 # Se um arquivo travar, ele é pulado e o lote continua
 FILE_TIMEOUT_SECONDS = int(os.getenv("FILE_TIMEOUT_SECONDS", "90"))  # 1.5 min
+
+# Processos paralelos para reprocessamento de lotes (--workers)
+# 1 = sequencial (comportamento original)
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "1"))
+
+# Timeouts de arquivo/lote rodam em processos worker que são encerrados
+# ao estourar o prazo (OCR travado não segue consumindo CPU).
+# 0 = volta ao timeout em thread (não interrompe a tarefa)
+SUPERVISED_WORKERS = os.getenv("SUPERVISED_WORKERS", "1") == "1"
+
+# Tarefas por worker antes de reciclá-lo (limita crescimento de memória)
+WORKER_MAX_TASKS = int(os.getenv("WORKER_MAX_TASKS", "50"))
+
+# Processos paralelos em extract_xml_directory (extração de pastas de XML)
+# 1 = sequencial
+XML_WORKERS = int(os.getenv("XML_WORKERS", "1"))
+
+# --- Pipeline da ingestão (download → extração → correlação → gravação) ---
+# Lotes extraídos em paralelo enquanto o download continua (cada um em seu
+# worker supervisionado)
+PIPELINE_EXTRACT_WORKERS = int(os.getenv("PIPELINE_EXTRACT_WORKERS", "2"))
+# Threads de correlação entre documentos do lote
+PIPELINE_CORRELATE_WORKERS = int(os.getenv("PIPELINE_CORRELATE_WORKERS", "1"))
+# Lotes aguardando entre dois estágios (backpressure sobre o download)
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "4"))
+
+# --- Cache de texto extraído (reprocessamento sem repetir OCR) ---
+# Chave: SHA-256 do arquivo + configuração de leitura (OCR_*, HYBRID_OCR_COMPLEMENT)
+# Desligado por padrão: o uso como biblioteca (`BaseInvoiceProcessor()` em
+# scripts e testes) não grava em disco. O `run_ingestion.py` liga o cache,
+# exceto com TEXT_CACHE_ENABLED=0 ou `--no-text-cache`.
+TEXT_CACHE_ENABLED = os.getenv("TEXT_CACHE_ENABLED", "0") == "1"
+TEXT_CACHE_PATH = Path(
+    os.getenv("TEXT_CACHE_PATH", str(BASE_DIR / "data" / "cache" / "text_cache.sqlite"))
+)
+# Tamanho máximo do cache (despejo LRU acima disso)
+TEXT_CACHE_MAX_MB = int(os.getenv("TEXT_CACHE_MAX_MB", "512"))
+
+# --- Senhas de PDFs protegidos (strategies/pdf_password.py) ---
+# Guarda a senha vencedora por SHA-256 do arquivo e os acertos por remetente
+# (domínio/CNPJ), usados para ordenar os candidatos. Com PDF_PASSWORD_STORE_ENABLED=0
+# o histórico fica só em memória durante a execução.
+PDF_PASSWORD_STORE_ENABLED = os.getenv("PDF_PASSWORD_STORE_ENABLED", "1") == "1"
+PDF_PASSWORD_STORE_PATH = Path(
+    os.getenv(
+        "PDF_PASSWORD_STORE_PATH", str(BASE_DIR / "data" / "cache" / "pdf_passwords.sqlite")
+    )
+)
+
+# --- Índice de duplicatas entre lotes (core/duplicate_index.py) ---
+# Anexos idênticos a um já processado em outro lote e notas repetidas (chave
+# de acesso, linha digitável, CNPJ+nota+valor) são marcados na correlação; a
+# extração e o pareamento do lote não mudam. Desative com
+# DUPLICATE_INDEX_ENABLED=0 ou `run_ingestion.py --no-duplicate-index`
+DUPLICATE_INDEX_ENABLED = os.getenv("DUPLICATE_INDEX_ENABLED", "1") == "1"
+DUPLICATE_INDEX_PATH = Path(
+    os.getenv(
+        "DUPLICATE_INDEX_PATH", str(BASE_DIR / "data" / "cache" / "duplicate_index.sqlite")
+    )
+)
+
+# --- Spans de tempo por estágio (core/tracing.py) ---
+# Leitura nativa/tabelas/OCR, roteamento, extratores e correlação de cada
+# lote ficam em `BatchResult.spans`. Desative com TRACING_ENABLED=0
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "1") == "1"
+# Pasta dos traces da ingestão (trace_<sessão>.jsonl e, com --export-metrics,
+# trace_<sessão>.json no formato Chrome trace-event)
+TRACE_DIR = Path(os.getenv("TRACE_DIR", str(LOG_DIR / "traces")))
+
+# --- Datasets Parquet (core/exporters.py: ParquetDatasetWriter) ---
+# Além dos CSVs, grava documentos, lotes e avisos em datasets Parquet tipados
+# particionados por tipo de documento e data de processamento, lidos pelos
+# scripts de análise com `read_parquet_dataset`. Requer pyarrow.
+# Ative com EXPORT_PARQUET=1 ou `run_ingestion.py --parquet`
+EXPORT_PARQUET = os.getenv("EXPORT_PARQUET", "0") == "1"
+DIR_DATASETS = Path(os.getenv("DIR_DATASETS", str(DIR_SAIDA / "datasets")))
+
+# --- Sincronização com o Google Sheets (core/sheets_sync.py) ---
+# A exportação lê a coluna ID da aba uma vez, compara cada linha com o hash
+# gravado na última sincronização e envia só inserções e alterações, em poucas
+# chamadas em lote. Requisições por minuto do agendador (token bucket); a cota
+# da API é de 60 req/min por usuário, 300 por projeto
+SHEETS_REQUESTS_PER_MINUTE = int(os.getenv("SHEETS_REQUESTS_PER_MINUTE", "60"))
+# Hash da última versão enviada de cada linha (retomada e detecção de alterações)
+SHEETS_SYNC_STATE_PATH = Path(
+    os.getenv("SHEETS_SYNC_STATE_PATH", str(BASE_DIR / "data" / "cache" / "sheets_sync.sqlite"))
+)
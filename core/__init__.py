@@ -20,6 +20,7 @@ from .batch_processor import BatchProcessor, process_email_batch, process_legacy
 from .batch_result import BatchResult, CorrelationResult
 from .correlation_service import CorrelationService, correlate_batch
 from .diagnostics import ExtractionDiagnostics
+from .extractor_router import ExtractorRouter, get_router
 from .extractors import BaseExtractor, find_linha_digitavel, register_extractor
 from .interfaces import EmailIngestorStrategy, TextExtractionStrategy
 from .metadata import EmailMetadata
@@ -46,6 +47,8 @@ __all__ = [
     "BaseExtractor",
     "register_extractor",
     "find_linha_digitavel",
+    "ExtractorRouter",
+    "get_router",
     "XmlExtractor",
     "extract_xml",
     # Processors
@@ -28,15 +28,18 @@ Princípios SOLID aplicados:
 """
 
 import logging
+from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Set, Tuple, Union
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Union
 
 from core.batch_result import BatchResult
 from core.correlation_service import CorrelationService
+from core.duplicate_index import KIND_FILE, DuplicateIndex, document_keys
 from core.empresa_matcher import find_empresa_no_texto
 from core.metadata import EmailMetadata
 from core.models import DanfeData, DocumentData, InvoiceData, OtherDocumentData
 from core.processor import BaseInvoiceProcessor
+from core.tracing import collect_spans, span
 from extractors.xml_extractor import XmlExtractor
 
 logger = logging.getLogger(__name__)
@@ -59,6 +62,9 @@ class BatchProcessor:
     Attributes:
         processor: Processador individual de documentos
         correlation_service: Serviço de correlação entre documentos
+        duplicate_index: Índice de documentos de outros lotes (opcional);
+            anexos idênticos a um já processado são extraídos normalmente
+            (o pareamento do lote depende deles) e marcados como duplicatas
 
     Usage:
         batch_processor = BatchProcessor()
@@ -146,6 +152,7 @@ class BatchProcessor:
         self,
         processor: Optional[BaseInvoiceProcessor] = None,
         correlation_service: Optional[CorrelationService] = None,
+        duplicate_index: Optional[DuplicateIndex] = None,
     ):
         """
         Inicializa o processador de lotes.
@@ -153,9 +160,16 @@ class BatchProcessor:
         Args:
             processor: Processador de documentos individuais (DIP)
             correlation_service: Serviço de correlação (DIP)
+            duplicate_index: Índice de duplicatas entre lotes (ex:
+                `get_duplicate_index()`); None desativa a verificação
         """
         self.processor = processor or BaseInvoiceProcessor()
-        self.correlation_service = correlation_service or CorrelationService()
+        self.duplicate_index = duplicate_index
+        self.correlation_service = correlation_service or CorrelationService(
+            duplicate_index=duplicate_index
+        )
+        # Workers supervisionados (criados sob demanda, ver `_call_supervised`)
+        self._executors: Dict[str, Any] = {}
 
     def process_batch(
         self, folder_path: Union[str, Path], apply_correlation: bool = True
@@ -174,10 +188,23 @@ class BatchProcessor:
             apply_correlation: Se True, aplica correlação entre documentos
 
         Returns:
-            BatchResult com todos os documentos processados
+            BatchResult com todos os documentos processados e os spans de
+            tempo por estágio (`BatchResult.spans`, ver core/tracing.py)
         """
         folder_path = Path(folder_path)
 
+        with collect_spans() as trace:
+            with span("batch.process", batch_id=folder_path.name) as batch_span:
+                result = self._process_batch(folder_path, apply_correlation)
+                batch_span.set(
+                    documents=result.total_documents, errors=result.total_errors
+                )
+
+        result.spans = trace.to_dicts()
+        return result
+
+    def _process_batch(self, folder_path: Path, apply_correlation: bool) -> BatchResult:
+        """Corpo de `process_batch` (executado dentro da coleta de spans)."""
         # Gera batch_id a partir do nome da pasta
         batch_id = folder_path.name
 
@@ -198,6 +225,13 @@ class BatchProcessor:
         # 2. Lista arquivos processáveis (separados por tipo)
         xml_files, pdf_files = self._list_files_by_type(folder_path)
 
+        # 2.1 Anexos idênticos a um de outro lote são sinalizados (mas ainda
+        # extraídos: boleto e NF do mesmo e-mail precisam um do outro)
+        file_hashes: Dict[Path, str] = {}
+        if self.duplicate_index is not None:
+            with span("batch.duplicate_index"):
+                self._flag_known_files(xml_files + pdf_files, result, file_hashes)
+
         if not xml_files and not pdf_files:
             return result
 
@@ -207,7 +241,8 @@ class BatchProcessor:
 
         for file_path in xml_files:
             try:
-                doc = self._process_xml(file_path)
+                with span("file.xml", file=file_path.name):
+                    doc = self._process_xml(file_path)
                 if doc:
                     xml_docs.append(doc)
                     # Verifica se XML está completo
@@ -223,7 +258,8 @@ class BatchProcessor:
 
         for file_path in pdf_files:
             try:
-                doc = self._process_single_file(file_path)
+                with span("file.pdf", file=file_path.name):
+                    doc = self._process_single_file(file_path)
                 if doc:
                     pdf_docs.append(doc)
             except Exception as e:
@@ -243,7 +279,8 @@ class BatchProcessor:
             for doc in final_docs
         )
         if metadata and not has_valid_pdf_doc:
-            email_body_doc = self._extract_from_email_body(metadata, batch_id)
+            with span("batch.email_body"):
+                email_body_doc = self._extract_from_email_body(metadata, batch_id)
             if email_body_doc:
                 result.add_document(email_body_doc)
                 logger.info(
@@ -255,8 +292,54 @@ class BatchProcessor:
             correlation_result = self.correlation_service.correlate(result, metadata)
             result.correlation_result = correlation_result
 
+        # 8. Registra arquivos e documentos para os próximos lotes
+        if self.duplicate_index is not None:
+            self._register_in_index(result, file_hashes)
+
         return result
 
+    def _flag_known_files(
+        self, files: List[Path], result: BatchResult, file_hashes: Dict[Path, str]
+    ) -> None:
+        """
+        Marca em `result.duplicate_files` os arquivos já processados em outro lote.
+
+        Os arquivos continuam na extração; os hashes dos inéditos são guardados
+        em `file_hashes` para o registro ao fim do lote.
+        """
+        from strategies.text_cache import file_sha256
+
+        for file_path in files:
+            digest = file_sha256(file_path)
+            if digest is None:
+                continue
+
+            match = self.duplicate_index.find(
+                KIND_FILE, digest, exclude_batch=result.batch_id
+            )
+            if match is None:
+                file_hashes[file_path] = digest
+                continue
+
+            logger.info(
+                f"♻️ {file_path.name} já processado no lote {match.batch_id} "
+                f"({match.file_name})"
+            )
+            result.add_duplicate_file(str(file_path), match.batch_id, match.file_name)
+
+    def _register_in_index(self, result: BatchResult, file_hashes: Dict[Path, str]) -> None:
+        """Registra o hash dos anexos e as chaves dos documentos extraídos."""
+        for file_path, digest in file_hashes.items():
+            self.duplicate_index.register(
+                [(KIND_FILE, digest)], result.batch_id, file_path.name
+            )
+        for doc in result.documents:
+            keys = document_keys(doc)
+            if keys:
+                self.duplicate_index.register(
+                    keys, result.batch_id, getattr(doc, "arquivo_origem", None)
+                )
+
     def _has_nota_with_valor(self, docs: List[DocumentData]) -> bool:
         """
         Verifica se há alguma nota fiscal com valor > 0 na lista.
@@ -678,33 +761,34 @@ class BatchProcessor:
         root_folder: Union[str, Path],
         apply_correlation: bool = True,
         timeout_seconds: Optional[int] = None,
+        workers: Optional[int] = None,
     ) -> List[BatchResult]:
         """
         Processa múltiplas pastas (lotes) de uma vez com timeout por lote.
 
+        Com `workers > 1`, os lotes são distribuídos em um pool de processos
+        (ver `iter_batches_parallel`). A lista retornada mantém a mesma ordem
+        (e o mesmo conteúdo) da execução sequencial.
+
         Args:
             root_folder: Pasta raiz contendo subpastas de lotes
             apply_correlation: Se True, aplica correlação entre documentos
             timeout_seconds: Timeout por batch em segundos (default: 300 = 5 min)
+            workers: Número de processos paralelos (default: settings.BATCH_WORKERS)
 
         Returns:
             Lista de BatchResult, um para cada lote
         """
-        import json
-        import logging
         import time
-        from concurrent.futures import ThreadPoolExecutor
-        from concurrent.futures import TimeoutError as FuturesTimeoutError
-        from datetime import datetime
 
-        logger = logging.getLogger(__name__)
         from config import settings
 
         timeout = timeout_seconds or settings.BATCH_TIMEOUT_SECONDS
+        workers = int(workers or getattr(settings, "BATCH_WORKERS", 1))
 
         root_folder = Path(root_folder)
-        results = []
-        timeouts = []  # Lista de batches que deram timeout
+        results: List[BatchResult] = []
+        timeouts: List[Dict[str, Any]] = []  # Lista de batches que deram timeout
 
         if not root_folder.exists():
             return results
@@ -717,82 +801,43 @@ class BatchProcessor:
         ]
         total_batches = len(batch_folders)
 
+        parallel = workers > 1 and total_batches > 1
         logger.info(
-            f"⏳ Iniciando processamento de {total_batches} lotes (timeout: {timeout}s)..."
+            f"⏳ Iniciando processamento de {total_batches} lotes (timeout: {timeout}s"
+            + (f", workers: {workers})..." if parallel else ")...")
         )
         overall_start = time.time()
 
-        # Processa cada subpasta como um lote com timeout
-        for idx, item in enumerate(batch_folders, 1):
-            batch_start = time.time()
-            batch_result = None
-
-            try:
-                # Executa com timeout usando ThreadPoolExecutor
-                with ThreadPoolExecutor(max_workers=1) as executor:
-                    future = executor.submit(
-                        self.process_batch, item, apply_correlation
-                    )
-                    batch_result = future.result(timeout=timeout)
-                    batch_result.processing_time = time.time() - batch_start
-                    batch_result.status = "OK"
-
-            except FuturesTimeoutError:
-                # Timeout! Cria resultado vazio com status TIMEOUT
-                batch_elapsed = time.time() - batch_start
-                logger.error(
-                    f"⏱️ [{idx}/{total_batches}] TIMEOUT: {item.name} excedeu {timeout}s!"
-                )
+        if parallel:
+            # Resultados chegam em ordem de conclusão; reordena no final
+            ordem = {str(item): i for i, item in enumerate(batch_folders)}
+            batch_iter = self.iter_batches_parallel(
+                batch_folders, apply_correlation, timeout, workers
+            )
+        else:
+            batch_iter = (
+                self._process_batch_with_timeout(item, apply_correlation, timeout)
+                for item in batch_folders
+            )
 
-                batch_result = BatchResult(
-                    batch_id=item.name,
-                    source_folder=str(item),
-                    status="TIMEOUT",
-                    processing_time=batch_elapsed,
-                    timeout_error=f"Processamento excedeu {timeout}s",
-                )
-                batch_result.add_error(str(item), f"TIMEOUT após {batch_elapsed:.1f}s")
+        for idx, batch_result in enumerate(batch_iter, 1):
+            results.append(batch_result)
+            self._log_batch_progress(idx, total_batches, batch_result, timeout)
 
+            if batch_result.status == "TIMEOUT":
                 # Registra para log de timeouts
                 timeouts.append(
                     {
-                        "batch_id": item.name,
-                        "folder": str(item),
+                        "batch_id": batch_result.batch_id,
+                        "folder": batch_result.source_folder,
                         "timeout_seconds": timeout,
                         "timestamp": datetime.now().isoformat(),
                     }
                 )
 
-            except Exception as e:
-                # Erro genérico
-                batch_elapsed = time.time() - batch_start
-                logger.error(f"❌ [{idx}/{total_batches}] ERRO: {item.name}: {e}")
-
-                batch_result = BatchResult(
-                    batch_id=item.name,
-                    source_folder=str(item),
-                    status="ERROR",
-                    processing_time=batch_elapsed,
-                    timeout_error=str(e),
-                )
-                batch_result.add_error(str(item), str(e))
-
-            results.append(batch_result)
-            batch_elapsed = batch_result.processing_time
-
-            # Log de progresso
-            if batch_result.status == "TIMEOUT":
-                pass  # Já logou acima
-            elif batch_result.status == "ERROR":
-                pass  # Já logou acima
-            elif batch_elapsed > 5:
-                logger.warning(
-                    f"🐢 [{idx}/{total_batches}] {item.name}: {batch_elapsed:.1f}s (LENTO!)"
-                )
-            else:
-                logger.debug(
-                    f"✅ [{idx}/{total_batches}] {item.name}: {batch_elapsed:.1f}s"
-                )
+        if parallel:
+            results.sort(key=lambda r: ordem.get(r.source_folder or "", 0))
+            timeouts.sort(key=lambda t: ordem.get(t["folder"] or "", 0))
 
         overall_elapsed = time.time() - overall_start
         logger.info(
@@ -801,28 +846,223 @@ class BatchProcessor:
 
         # Salva log de timeouts para reprocessamento posterior
         if timeouts:
-            timeout_log_path = root_folder / "_timeouts.json"
+            self._save_timeouts_log(root_folder, timeouts)
+
+        return results
+
+    def iter_batches_parallel(
+        self,
+        batch_folders: List[Path],
+        apply_correlation: bool = True,
+        timeout_seconds: Optional[int] = None,
+        workers: int = 2,
+    ) -> Iterator[BatchResult]:
+        """
+        Processa lotes em vários workers supervisionados, entregando em ordem de conclusão.
+
+        Cada um dos `workers` slots tem seu próprio `SupervisedProcessExecutor`
+        (processo com esta instância como alvo, como no modo sequencial). O
+        timeout de cada lote é contado a partir do momento em que ele começa
+        a rodar; ao estourar, o processo do slot é encerrado (OCR travado não
+        segue ocupando o slot nem segura a saída do interpretador) e o lote
+        seguinte sobe em um worker novo.
+
+        Lotes que excedem o timeout são entregues com status TIMEOUT; exceções
+        no worker viram status ERROR (mesma semântica do modo sequencial).
+
+        Args:
+            batch_folders: Pastas de lote a processar
+            apply_correlation: Se True, aplica correlação entre documentos
+            timeout_seconds: Timeout por lote (default: settings.BATCH_TIMEOUT_SECONDS)
+            workers: Número de processos paralelos
+
+        Yields:
+            BatchResult de cada lote, na ordem em que terminam
+        """
+        import queue
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+
+        from config import settings
+        from core.supervised_executor import SupervisedProcessExecutor
+
+        timeout = timeout_seconds or settings.BATCH_TIMEOUT_SECONDS
+        executors = [
+            SupervisedProcessExecutor(target=self, name=f"batch-{i + 1}")
+            for i in range(workers)
+        ]
+        livres: "queue.Queue[SupervisedProcessExecutor]" = queue.Queue()
+        for executor in executors:
+            livres.put(executor)
+
+        def run(item: Path) -> BatchResult:
+            # Cada thread ocupa um slot (worker) durante o lote
+            executor = livres.get()
             try:
-                # Carrega timeouts anteriores (se existir)
-                existing_timeouts = []
-                if timeout_log_path.exists():
-                    existing_timeouts = json.loads(
-                        timeout_log_path.read_text(encoding="utf-8")
-                    )
+                return self._process_batch_with_timeout(
+                    item, apply_correlation, timeout, executor=executor
+                )
+            finally:
+                livres.put(executor)
+
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch")
+        futures = [pool.submit(run, item) for item in batch_folders]
+        try:
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            # Consumidor parou antes do fim: descarta lotes não iniciados e
+            # mata os que estão rodando (sem esperar o timeout deles)
+            em_andamento = [f for f in futures if not f.cancel() and not f.done()]
+            if em_andamento:
+                for executor in executors:
+                    executor.terminate()
+            pool.shutdown(wait=True)
+            for executor in executors:
+                executor.shutdown()
+
+    def _call_supervised(
+        self, name: str, target: Any, method: str, *args: Any, timeout: float
+    ) -> Any:
+        """
+        Executa `target.method(*args)` com timeout que realmente interrompe a tarefa.
 
-                # Adiciona novos timeouts
-                all_timeouts = existing_timeouts + timeouts
-                timeout_log_path.write_text(
-                    json.dumps(all_timeouts, indent=2, ensure_ascii=False),
-                    encoding="utf-8",
+        Com `settings.SUPERVISED_WORKERS` ativo, a tarefa roda em um processo
+        worker persistente (um por `name`) que é encerrado ao estourar o prazo.
+        Caso contrário, roda em thread sem bloquear o chamador após o timeout.
+
+        Raises:
+            concurrent.futures.TimeoutError: Se o prazo for excedido.
+        """
+        from config import settings
+        from core.supervised_executor import SupervisedProcessExecutor, run_with_timeout
+
+        if not getattr(settings, "SUPERVISED_WORKERS", True):
+            return run_with_timeout(getattr(target, method), *args, timeout=timeout)
+
+        executor = self._executors.get(name)
+        if executor is None:
+            executor = SupervisedProcessExecutor(target=target, name=name)
+            self._executors[name] = executor
+        return executor.call(method, *args, timeout=timeout)
+
+    def shutdown_workers(self) -> None:
+        """Encerra os processos worker supervisionados deste processador."""
+        for executor in self._executors.values():
+            executor.shutdown()
+        self._executors.clear()
+
+    def _process_batch_with_timeout(
+        self,
+        item: Path,
+        apply_correlation: bool,
+        timeout: int,
+        executor: Optional[Any] = None,
+    ) -> BatchResult:
+        """
+        Processa um lote em worker supervisionado, convertendo falhas em TIMEOUT/ERROR.
+
+        Args:
+            executor: SupervisedProcessExecutor a usar (slot do modo paralelo);
+                None usa o worker "batch" desta instância (`_call_supervised`).
+        """
+        import time
+        from concurrent.futures import TimeoutError as FuturesTimeoutError
+
+        batch_start = time.time()
+
+        try:
+            # Worker é encerrado no timeout (OCR travado não segue consumindo CPU)
+            if executor is not None:
+                batch_result = executor.call(
+                    "process_batch", item, apply_correlation, timeout=timeout
                 )
-                logger.warning(
-                    f"⚠️ {len(timeouts)} timeout(s) registrado(s) em {timeout_log_path}"
+            else:
+                batch_result = self._call_supervised(
+                    "batch", self, "process_batch", item, apply_correlation, timeout=timeout
                 )
-            except Exception as e:
-                logger.error(f"Erro ao salvar log de timeouts: {e}")
+            batch_result.processing_time = time.time() - batch_start
+            batch_result.status = "OK"
+            return batch_result
 
-        return results
+        except FuturesTimeoutError:
+            # Timeout! Cria resultado vazio com status TIMEOUT
+            return self._timeout_result(item, time.time() - batch_start, timeout)
+
+        except Exception as e:
+            # Erro genérico
+            return self._error_result(item, time.time() - batch_start, e)
+
+    def _timeout_result(self, item: Path, elapsed: float, timeout: int) -> BatchResult:
+        """Cria BatchResult vazio com status TIMEOUT."""
+        batch_result = BatchResult(
+            batch_id=item.name,
+            source_folder=str(item),
+            status="TIMEOUT",
+            processing_time=elapsed,
+            timeout_error=f"Processamento excedeu {timeout}s",
+        )
+        batch_result.add_error(str(item), f"TIMEOUT após {elapsed:.1f}s")
+        return batch_result
+
+    def _error_result(self, item: Path, elapsed: float, error: Exception) -> BatchResult:
+        """Cria BatchResult vazio com status ERROR."""
+        batch_result = BatchResult(
+            batch_id=item.name,
+            source_folder=str(item),
+            status="ERROR",
+            processing_time=elapsed,
+            timeout_error=str(error),
+        )
+        batch_result.add_error(str(item), str(error))
+        return batch_result
+
+    def _log_batch_progress(
+        self, idx: int, total: int, batch_result: BatchResult, timeout: int
+    ) -> None:
+        """Loga o resultado de um lote processado."""
+        batch_elapsed = batch_result.processing_time
+
+        if batch_result.status == "TIMEOUT":
+            logger.error(
+                f"⏱️ [{idx}/{total}] TIMEOUT: {batch_result.batch_id} excedeu {timeout}s!"
+            )
+        elif batch_result.status == "ERROR":
+            logger.error(
+                f"❌ [{idx}/{total}] ERRO: {batch_result.batch_id}: {batch_result.timeout_error}"
+            )
+        elif batch_elapsed > 5:
+            logger.warning(
+                f"🐢 [{idx}/{total}] {batch_result.batch_id}: {batch_elapsed:.1f}s (LENTO!)"
+            )
+        else:
+            logger.debug(
+                f"✅ [{idx}/{total}] {batch_result.batch_id}: {batch_elapsed:.1f}s"
+            )
+
+    def _save_timeouts_log(self, root_folder: Path, timeouts: List[Dict[str, Any]]) -> None:
+        """Acrescenta os timeouts ao _timeouts.json da pasta raiz."""
+        import json
+
+        timeout_log_path = root_folder / "_timeouts.json"
+        try:
+            # Carrega timeouts anteriores (se existir)
+            existing_timeouts = []
+            if timeout_log_path.exists():
+                existing_timeouts = json.loads(
+                    timeout_log_path.read_text(encoding="utf-8")
+                )
+
+            # Adiciona novos timeouts
+            all_timeouts = existing_timeouts + timeouts
+            timeout_log_path.write_text(
+                json.dumps(all_timeouts, indent=2, ensure_ascii=False),
+                encoding="utf-8",
+            )
+            logger.warning(
+                f"⚠️ {len(timeouts)} timeout(s) registrado(s) em {timeout_log_path}"
+            )
+        except Exception as e:
+            logger.error(f"Erro ao salvar log de timeouts: {e}")
 
     def process_legacy_files(
         self, folder_path: Union[str, Path], recursive: bool = True
@@ -871,52 +1111,28 @@ class BatchProcessor:
         """
         Processa um único arquivo com timeout granular.
 
-        Usa ThreadPoolExecutor para garantir que arquivos lentos (ex: OCR travado)
-        não bloqueiem o lote inteiro por mais tempo que o permitido.
+        O processamento roda em um worker supervisionado: se o arquivo exceder
+        o prazo (ex: OCR travado), o worker é encerrado e o lote continua.
         """
         import time
-        from concurrent.futures import ThreadPoolExecutor
         from concurrent.futures import TimeoutError as FuturesTimeoutError
 
         from config import settings
 
-        try:
-            # Função wrapper para executar no thread
-            def _extract():
-                return self.processor.process(str(file_path))
-
-            start_time = time.time()
-
-            # Executa processamento com timeout
-            with ThreadPoolExecutor(max_workers=1) as executor:
-                future = executor.submit(_extract)
-                try:
-                    doc = future.result(timeout=settings.FILE_TIMEOUT_SECONDS)
-                    return doc
-                except FuturesTimeoutError:
-                    elapsed = time.time() - start_time
-                    logger.error(
-                        f"⏱️ TIMEOUT ARQUIVO: {file_path.name} excedeu {settings.FILE_TIMEOUT_SECONDS}s (elapsed: {elapsed:.1f}s)"
-                    )
-                    # Retorna None para indicar que falhou, mas não quebra o lote
-                    return None
-                except Exception as e:
-                    # Relança exceções normais para serem capturadas pelo caller
-                    raise e
-
-        except Exception as e:
-            # Re-raise para ser capturado e adicionado aos erros do lote
-            raise e
+        timeout = settings.FILE_TIMEOUT_SECONDS
+        start_time = time.time()
 
-        # Processa PDF
-        if file_path.suffix.lower() == ".pdf":
-            return self.processor.process(str(file_path))
-
-        # Processa XML (NF-e / NFS-e)
-        if file_path.suffix.lower() == ".xml":
-            return self._process_xml(file_path)
-
-        return None
+        try:
+            return self._call_supervised(
+                "file", self.processor, "process", str(file_path), timeout=timeout
+            )
+        except FuturesTimeoutError:
+            elapsed = time.time() - start_time
+            logger.error(
+                f"⏱️ TIMEOUT ARQUIVO: {file_path.name} excedeu {timeout}s (elapsed: {elapsed:.1f}s)"
+            )
+            # Retorna None para indicar que falhou, mas não quebra o lote
+            return None
 
     def _process_xml(self, file_path: Path) -> Optional[DocumentData]:
         """
@@ -53,6 +53,9 @@ class BatchResult:
         errors: Lista de erros ocorridos durante processamento
         metadata_path: Caminho do metadata.json (se existir)
         source_folder: Pasta de origem do lote
+        duplicate_files: Anexos idênticos a um arquivo de outro lote
+            (extraídos normalmente; ver core/duplicate_index.py)
+        spans: Tempo por estágio do processamento (ver core/tracing.py)
     """
 
     batch_id: str
@@ -74,6 +77,12 @@ class BatchResult:
     processing_time: float = 0.0
     timeout_error: Optional[str] = None
 
+    # Anexos já vistos em outro lote: {"file", "batch_id", "original_file"}
+    duplicate_files: List[Dict[str, Any]] = field(default_factory=list)
+
+    # Spans de tempo por estágio (leitura, roteamento, extratores, correlação)
+    spans: List[Dict[str, Any]] = field(default_factory=list)
+
     def add_document(self, doc: DocumentData) -> None:
         """Adiciona um documento ao lote."""
         self.documents.append(doc)
@@ -82,6 +91,14 @@ class BatchResult:
         """Registra um erro de processamento."""
         self.errors.append({"file": file_path, "error": error_msg})
 
+    def add_duplicate_file(
+        self, file_path: str, batch_id: str, original_file: Optional[str] = None
+    ) -> None:
+        """Registra um anexo idêntico a um já processado em outro lote."""
+        self.duplicate_files.append(
+            {"file": file_path, "batch_id": batch_id, "original_file": original_file}
+        )
+
     @property
     def danfes(self) -> List[DanfeData]:
         """Retorna apenas DANFEs do lote."""
@@ -457,6 +474,8 @@ class BatchResult:
             "documents": [doc.to_dict() for doc in self.documents],
             "errors": self.errors,
             "metadata_path": self.metadata_path,
+            "duplicate_files": self.duplicate_files,
+            "spans": self.spans,
         }
 
     @classmethod
@@ -482,6 +501,8 @@ class BatchResult:
             processing_time=data.get("processing_time", 0.0),
             metadata_path=data.get("metadata_path"),
             errors=data.get("errors", []),
+            duplicate_files=data.get("duplicate_files", []),
+            spans=data.get("spans", []),
         )
 
         # Reconstrói documentos a partir dos dicts
@@ -604,6 +625,8 @@ class CorrelationResult:
     vencimento_alerta: Optional[str] = (
         None  # Data de alerta quando vencimento não encontrado
     )
+    # Lotes anteriores com o mesmo documento (ver core/duplicate_index.py)
+    duplicado_de: List[str] = field(default_factory=list)
 
     def is_ok(self) -> bool:
         """Verifica se a conciliação está OK (CONCILIADO)."""
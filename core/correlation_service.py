@@ -11,6 +11,7 @@ Regras de Negócio Implementadas:
 4. Sem Boleto: status = "CONFERIR" (conferir valor - sem boleto para comparação)
 5. Sem Vencimento: Alerta + data de processamento como vencimento de alerta
 5. Detecção de Duplicatas: Identifica encaminhamentos duplicados de e-mail
+   (no lote e, com `DuplicateIndex`, em lotes anteriores)
 
 Princípios SOLID aplicados:
 - SRP: Classe focada apenas em correlação/enriquecimento
@@ -21,7 +22,9 @@ import re
 from typing import Dict, List, Optional
 
 from core.batch_result import BatchResult, CorrelationResult
+from core.duplicate_index import DuplicateIndex, document_keys
 from core.metadata import EmailMetadata
+from core.tracing import span, traced
 from core.models import (
     BoletoData,
     DanfeData,
@@ -43,6 +46,11 @@ class CorrelationService:
     Usage:
         service = CorrelationService()
         result = service.correlate(batch_result, metadata)
+
+    Args:
+        duplicate_index: Índice de documentos de lotes anteriores (opcional).
+            Quando informado, notas/boletos já vistos em outro lote recebem
+            aviso de duplicata e `duplicado_de` no resultado.
     """
 
     # Tolerância para comparação de valores (em reais)
@@ -109,6 +117,10 @@ class CorrelationService:
         re.compile(r'\bcobran[çc]a\s+indevida\b', re.IGNORECASE),
     ]
 
+    def __init__(self, duplicate_index: Optional[DuplicateIndex] = None):
+        self.duplicate_index = duplicate_index
+
+    @traced("correlation.correlate")
     def correlate(
         self,
         batch: BatchResult,
@@ -134,12 +146,15 @@ class CorrelationService:
         self._apply_data_inheritance(batch, result, metadata)
 
         # 3. Detecta documentos duplicados (encaminhamentos duplicados)
-        duplicatas = self._detect_duplicate_documents(batch)
+        with span("correlation.duplicates"):
+            duplicatas = self._detect_duplicate_documents(batch)
+        result.duplicado_de = duplicatas['outros_lotes']
 
         # 4. Validação cruzada de valores (compara com boleto)
         # Passa o subject do batch para detectar documentos administrativos
         email_subject = batch.email_subject or ""
-        self._validate_cross_values(batch, result, duplicatas, email_subject)
+        with span("correlation.cross_values"):
+            self._validate_cross_values(batch, result, duplicatas, email_subject)
 
         # 5. Verifica se lote ficou sem vencimento após toda herança
         vencimento_final = batch.get_primeiro_vencimento()
@@ -358,11 +373,13 @@ class CorrelationService:
 
         Returns:
             Dicionário com tipo de duplicata e lista de identificadores duplicados
-            Ex: {'numero_nota': ['12345'], 'fornecedor_valor': ['EMPRESA X/1500.00']}
+            Ex: {'numero_nota': ['12345'], 'fornecedor_valor': ['EMPRESA X/1500.00'],
+                 'outros_lotes': ['email_123']}
         """
         duplicatas: Dict[str, List[str]] = {
             'numero_nota': [],
-            'fornecedor_valor': []
+            'fornecedor_valor': [],
+            'outros_lotes': self._detect_cross_batch_duplicates(batch),
         }
 
         # Detecta duplicatas por número de nota
@@ -394,6 +411,26 @@ class CorrelationService:
 
         return duplicatas
 
+    def _detect_cross_batch_duplicates(self, batch: BatchResult) -> List[str]:
+        """
+        Lotes anteriores que já continham documentos deste lote.
+
+        Considera anexos idênticos a um de outro lote (`duplicate_files`) e
+        documentos cujas chaves (chave de acesso, linha digitável, CNPJ+nota+
+        valor) já constam no `DuplicateIndex`.
+        """
+        lotes = [d["batch_id"] for d in batch.duplicate_files if d.get("batch_id")]
+
+        if self.duplicate_index is not None:
+            for doc in batch.documents:
+                match = self.duplicate_index.find_any(
+                    document_keys(doc), exclude_batch=batch.batch_id
+                )
+                if match is not None:
+                    lotes.append(match.batch_id)
+
+        return list(dict.fromkeys(lotes))
+
     def _check_admin_subject(self, subject: str) -> Optional[str]:
         """
         Verifica se o assunto corresponde a um padrão de documento administrativo.
@@ -479,11 +516,14 @@ class CorrelationService:
         result.diferenca = round(valor_compra - valor_boleto, 2)
 
         # Monta aviso de duplicatas se houver
-        aviso_duplicata = ""
+        avisos_duplicata: List[str] = []
         if duplicatas.get('numero_nota'):
-            aviso_duplicata = f" [ENCAMINHAMENTO DUPLICADO - notas: {', '.join(duplicatas['numero_nota'])}]"
+            avisos_duplicata.append(f"ENCAMINHAMENTO DUPLICADO - notas: {', '.join(duplicatas['numero_nota'])}")
         elif duplicatas.get('fornecedor_valor'):
-            aviso_duplicata = " [ENCAMINHAMENTO DUPLICADO - mesmos valores detectados]"
+            avisos_duplicata.append("ENCAMINHAMENTO DUPLICADO - mesmos valores detectados")
+        if duplicatas.get('outros_lotes'):
+            avisos_duplicata.append(f"JÁ PROCESSADO EM OUTRO LOTE - {', '.join(duplicatas['outros_lotes'])}")
+        aviso_duplicata = "".join(f" [{aviso}]" for aviso in avisos_duplicata)
 
         has_boleto = batch.has_boleto and valor_boleto > 0
         has_compra = valor_compra > 0
@@ -493,8 +533,8 @@ class CorrelationService:
             # Tem AMBOS com valor - compara valores
             if abs(result.diferenca) <= self.TOLERANCIA_VALOR:
                 result.status = "CONCILIADO"
-                if aviso_duplicata:
-                    result.divergencia = aviso_duplicata.strip(" []")
+                if avisos_duplicata:
+                    result.divergencia = " | ".join(avisos_duplicata)
             else:
                 result.status = "DIVERGENTE"
                 result.divergencia = (
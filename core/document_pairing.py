@@ -33,6 +33,7 @@ import re
 from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
 
+from core.tracing import traced
 from extractors.utils import normalize_entity_name
 
 if TYPE_CHECKING:
@@ -193,6 +194,7 @@ class DocumentPairingService:
         "recebimento",  # Recibos de entrega
     ]
 
+    @traced("pairing.pair_documents")
     def pair_documents(self, batch: "BatchResult") -> List[DocumentPair]:
         """
         Analisa o lote e retorna lista de pares NF↔Boleto.
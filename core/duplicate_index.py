@@ -0,0 +1,303 @@
+"""
+Índice persistente de documentos já processados (duplicatas entre lotes).
+
+`CorrelationService._detect_duplicate_documents` só enxerga o lote atual: a
+mesma nota encaminhada em vários e-mails, ou reenviada pelo fornecedor, era
+extraída (com OCR) e exportada de novo para a planilha PAF.
+
+O `DuplicateIndex` guarda, para cada documento já visto, as chaves:
+    - file_sha256: conteúdo exato do anexo
+    - chave_acesso: chave de 44 dígitos da NF-e
+    - linha_digitavel: linha digitável do boleto (apenas dígitos)
+    - cnpj_nota_valor: (CNPJ, número da nota, valor)
+
+Uso:
+    - `BatchProcessor` consulta o hash de cada anexo: anexos idênticos a um
+      de outro lote são marcados em `BatchResult.duplicate_files`, mas ainda
+      extraídos (o pareamento boleto/NF do lote depende deles; o cache de
+      texto evita repetir o OCR).
+    - `CorrelationService` consulta as demais chaves dos documentos extraídos
+      e marca o lote como possível duplicata (arquivo diferente, mesmo
+      documento).
+
+Cada chave guarda apenas a primeira ocorrência (lote e arquivo). O mesmo
+lote nunca é duplicata de si mesmo, então reprocessar uma pasta não a
+descarta.
+
+Armazenamento em SQLite (WAL, seguro para vários processos) com chave
+primária (kind, key) em tabela WITHOUT ROWID: cada consulta é uma busca
+pontual na árvore B, com custo praticamente constante mesmo com centenas
+de milhares de documentos.
+
+Example:
+    >>> from core.duplicate_index import get_duplicate_index
+    >>> index = get_duplicate_index()
+    >>> index.find("chave_acesso", "3525...", exclude_batch="email_123")
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+KIND_FILE = "file_sha256"
+KIND_CHAVE_ACESSO = "chave_acesso"
+KIND_LINHA_DIGITAVEL = "linha_digitavel"
+KIND_CNPJ_NOTA_VALOR = "cnpj_nota_valor"
+
+_NON_DIGITS_RE = re.compile(r"\D")
+
+# Campos de CNPJ/número/valor por tipo de documento (primeiro preenchido vence)
+_CNPJ_FIELDS = ("cnpj_emitente", "cnpj_prestador", "cnpj_beneficiario", "cnpj_fornecedor")
+_NUMERO_FIELDS = ("numero_nota", "numero_documento")
+_VALOR_FIELDS = ("valor_total", "valor_documento")
+
+
+@dataclass(frozen=True)
+class DuplicateMatch:
+    """
+    Ocorrência anterior de uma chave.
+
+    Attributes:
+        kind: Tipo da chave (file_sha256, chave_acesso, ...).
+        key: Valor normalizado da chave.
+        batch_id: Lote em que a chave foi vista primeiro.
+        file_name: Arquivo de origem nesse lote.
+    """
+
+    kind: str
+    key: str
+    batch_id: str
+    file_name: Optional[str] = None
+
+    def describe(self) -> str:
+        """Descrição curta para avisos (ex: 'linha_digitavel no lote email_123')."""
+        return f"{self.kind} no lote {self.batch_id}"
+
+
+def _digits(value: Any) -> str:
+    return _NON_DIGITS_RE.sub("", str(value or ""))
+
+
+def _first_attr(doc: Any, fields: Tuple[str, ...]) -> Any:
+    for name in fields:
+        value = getattr(doc, name, None)
+        if value:
+            return value
+    return None
+
+
+def document_keys(doc: Any) -> List[Tuple[str, str]]:
+    """
+    Chaves de conteúdo de um documento extraído (sem o hash do arquivo).
+
+    Chaves incompletas são omitidas: (CNPJ, nota, valor) só entra com os três
+    campos preenchidos e valor positivo.
+    """
+    keys: List[Tuple[str, str]] = []
+
+    chave = _digits(getattr(doc, "chave_acesso", None))
+    if len(chave) == 44:
+        keys.append((KIND_CHAVE_ACESSO, chave))
+
+    linha = _digits(getattr(doc, "linha_digitavel", None))
+    if len(linha) >= 44:
+        keys.append((KIND_LINHA_DIGITAVEL, linha))
+
+    cnpj = _digits(_first_attr(doc, _CNPJ_FIELDS))
+    numero = str(_first_attr(doc, _NUMERO_FIELDS) or "").strip().lstrip("0")
+    valor = _first_attr(doc, _VALOR_FIELDS)
+    try:
+        valor = round(float(valor or 0), 2)
+    except (TypeError, ValueError):
+        valor = 0.0
+    if len(cnpj) == 14 and numero and valor > 0:
+        keys.append((KIND_CNPJ_NOTA_VALOR, f"{cnpj}|{numero}|{valor:.2f}"))
+
+    return keys
+
+
+class DuplicateIndex:
+    """
+    Índice SQLite de chaves de documentos já processados.
+
+    Falhas do banco (bloqueado, disco cheio, arquivo corrompido) nunca
+    interrompem o processamento: são logadas em debug e tratadas como
+    "não encontrado".
+
+    Args:
+        path: Caminho do arquivo SQLite.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Conexão
+    # ------------------------------------------------------------------
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Conexões SQLite não viajam entre processos."""
+        state = self.__dict__.copy()
+        state["_conn"] = None
+        state["_lock"] = None
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is not None and self._pid != os.getpid():
+            # Conexão herdada via fork: não pode ser reutilizada no filho
+            self._conn = None
+            self._pid = os.getpid()
+
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS document_keys (
+                    kind TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    batch_id TEXT NOT NULL,
+                    file_name TEXT,
+                    first_seen REAL NOT NULL,
+                    PRIMARY KEY (kind, key)
+                ) WITHOUT ROWID
+                """
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        """Fecha a conexão (reaberta sob demanda)."""
+        if self._conn is not None and self._pid == os.getpid():
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+        self._conn = None
+
+    # ------------------------------------------------------------------
+    # Operações
+    # ------------------------------------------------------------------
+
+    def find(
+        self, kind: str, key: str, exclude_batch: Optional[str] = None
+    ) -> Optional[DuplicateMatch]:
+        """
+        Primeira ocorrência da chave em outro lote.
+
+        Args:
+            kind: Tipo da chave.
+            key: Valor normalizado.
+            exclude_batch: Lote atual (não conta como duplicata de si mesmo).
+        """
+        try:
+            with self._lock:
+                row = self._connection().execute(
+                    "SELECT batch_id, file_name FROM document_keys "
+                    "WHERE kind = ? AND key = ?",
+                    (kind, key),
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.debug(f"[DuplicateIndex] Falha na leitura: {e}")
+            return None
+
+        if row is None or row[0] == exclude_batch:
+            return None
+        return DuplicateMatch(kind=kind, key=key, batch_id=row[0], file_name=row[1])
+
+    def find_any(
+        self, keys: Iterable[Tuple[str, str]], exclude_batch: Optional[str] = None
+    ) -> Optional[DuplicateMatch]:
+        """Primeira chave (na ordem dada) já vista em outro lote."""
+        for kind, key in keys:
+            match = self.find(kind, key, exclude_batch)
+            if match is not None:
+                return match
+        return None
+
+    def register(
+        self,
+        keys: Iterable[Tuple[str, str]],
+        batch_id: str,
+        file_name: Optional[str] = None,
+    ) -> None:
+        """Registra as chaves do documento (mantém a primeira ocorrência)."""
+        agora = time.time()
+        rows = [(kind, key, batch_id, file_name, agora) for kind, key in keys]
+        if not rows:
+            return
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.executemany(
+                    "INSERT OR IGNORE INTO document_keys "
+                    "(kind, key, batch_id, file_name, first_seen) VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.debug(f"[DuplicateIndex] Falha na escrita: {e}")
+
+    def forget_batch(self, batch_id: str) -> None:
+        """Remove as chaves registradas por um lote (ex: lote descartado)."""
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM document_keys WHERE batch_id = ?", (batch_id,))
+            conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """Quantidade de chaves por tipo."""
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT kind, COUNT(*) FROM document_keys GROUP BY kind"
+            ).fetchall()
+        return {kind: count for kind, count in rows}
+
+    def clear(self) -> None:
+        """Remove todas as chaves."""
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM document_keys")
+            conn.commit()
+
+
+_default_index: Optional[DuplicateIndex] = None
+
+
+def get_duplicate_index() -> Optional[DuplicateIndex]:
+    """
+    Retorna o índice padrão configurado em `settings`.
+
+    Returns:
+        None se `settings.DUPLICATE_INDEX_ENABLED` estiver desligado
+        (ex: `run_ingestion.py --no-duplicate-index`).
+    """
+    global _default_index
+    from config import settings
+
+    if not getattr(settings, "DUPLICATE_INDEX_ENABLED", True):
+        return None
+
+    path = Path(getattr(settings, "DUPLICATE_INDEX_PATH"))
+    if _default_index is None or _default_index.path != path:
+        _default_index = DuplicateIndex(path)
+    return _default_index
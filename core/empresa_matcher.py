@@ -10,6 +10,11 @@ está mencionada em um documento (PDF/XML), utilizando múltiplas estratégias:
    quando CNPJ não é encontrado.
 3. **Match por Domínio**: Último recurso, verifica domínios de email no texto.
 
+O cadastro é carregado uma única vez por processo em um `EmpresaIndex`
+imutável (`get_empresa_index`): conjunto de CNPJs, índice por raiz de CNPJ
+(8 dígitos), códigos indexados por palavra e uma trie de códigos para
+domínios. O custo por documento não cresce com o tamanho do cadastro.
+
 Funções principais:
     - find_empresa_no_texto: Detecta empresa do cadastro no documento
     - is_cnpj_nosso: Verifica se um CNPJ pertence ao cadastro
@@ -26,8 +31,10 @@ Example:
 from __future__ import annotations
 
 import re
+import threading
 from dataclasses import dataclass
-from typing import Dict, Iterable, Optional, Tuple
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, Optional, Set, Tuple
 
 
 # Match CNPJ even when PDF extraction inserts spaces between separators.
@@ -127,15 +134,11 @@ def empresa_codigo_from_razao(razao_social: str) -> str:
     return m.group(1) if m else cleaned[:20].upper()
 
 
-def _load_empresas_cadastro() -> Dict[str, Dict[str, str]]:
-    """Carrega o cadastro de empresas normalizado por CNPJ.
+def _read_empresas_cadastro() -> Dict[str, Dict[str, str]]:
+    """Lê config.empresas.EMPRESAS_CADASTRO normalizando as chaves para dígitos.
 
     Realiza import local de config.empresas para evitar carga
     em caminhos que não usam a feature de detecção de empresa.
-
-    Returns:
-        Dicionário onde chave é CNPJ (14 dígitos) e valor é payload
-        com 'razao_social' e outros dados da empresa.
     """
     # Import local para não forçar carga em caminhos que não usam a feature
     try:
@@ -153,6 +156,288 @@ def _load_empresas_cadastro() -> Dict[str, Dict[str, str]]:
         return {}
 
 
+# Tokens genéricos que não identificam empresa no match por nome (is_nome_nosso).
+# IMPORTANTe: evitar falsos positivos com tokens genéricos (ex: SERVICOS, CONSULTORIA).
+_NOME_STOPWORDS = frozenset({
+    "SERVICO",
+    "SERVICOS",
+    "CONSULTORIA",
+    "GESTAO",
+    "INTEGRADA",
+    "COMERCIO",
+    "INDUSTRIA",
+    "TECNOLOGIA",
+    "SOLUCOES",
+    "SISTEMA",
+    "SISTEMAS",
+    "EMPRESA",
+    "EMPRESAS",
+    "ADMINISTRACAO",
+    "ADMINISTRADORA",
+    "PARTICIPACOES",
+    "GRUPO",
+    "HOLDING",
+    "COMPANHIA",
+    "CIA",
+    "LTDA",
+    "SA",
+    "S/A",
+    # Nomes geográficos genéricos (evitar falsos positivos como "AUTO POSTO PORTAL DE MINAS")
+    "MINAS",
+    "GERAIS",
+    "PAULO",
+    "JANEIRO",
+    "BAHIA",
+    "GOIAS",
+    "BRASIL",
+    "NACIONAL",
+    "REGIONAL",
+    "FEDERAL",
+    "ESTADUAL",
+    "NORTE",
+    "SUL",
+    "LESTE",
+    "OESTE",
+    "CENTRO",
+    "CENTRAL",
+    "PORTAL",
+    "DIGITAL",
+    "TELECOM",
+})
+
+_WORD_RE = re.compile(r"\w+")
+_DOMAIN_TOKEN_RE = re.compile(r"[A-Z0-9]+")
+
+# Contexto do CNPJ (pagador/tomador/destinatário geralmente são "nós")
+_PAGADOR_CTX_RE = re.compile(r"\b(DADOS\s+DO\s+PAGADOR|PAGADOR|SACADO)\b")
+_TOMADOR_CTX_RE = re.compile(r"\b(TOMADOR|DESTINAT[ÁA]RIO|CLIENTE|CONTRATANTE)\b")
+_CNPJ_CTX_RE = re.compile(r"\bCNPJ\b")
+
+
+class _CodeMatcher:
+    """Busca de vários códigos como palavra inteira (`\\bCODIGO\\b`) em uma passada.
+
+    Códigos formados só por caracteres de palavra casam com `\\b...\\b`
+    exatamente quando são um token `\\w+` completo do texto: basta tokenizar
+    uma vez e consultar um conjunto. Códigos atípicos (com espaço, barra...)
+    vão para uma única alternância compilada.
+    """
+
+    def __init__(self, codes: Iterable[str]):
+        word_codes: Set[str] = set()
+        other_codes: Set[str] = set()
+        for code in codes:
+            if not code:
+                continue
+            if _WORD_RE.fullmatch(code):
+                word_codes.add(code)
+            else:
+                other_codes.add(code)
+        self._word_codes: FrozenSet[str] = frozenset(word_codes)
+        self._other: List[Tuple[str, "re.Pattern[str]"]] = [
+            (code, re.compile(rf"\b{re.escape(code)}\b")) for code in sorted(other_codes)
+        ]
+        self._other_re = (
+            re.compile("|".join(rf"\b{re.escape(c)}\b" for c, _ in self._other))
+            if self._other
+            else None
+        )
+
+    def found(self, text: str) -> Set[str]:
+        """Códigos presentes no texto como palavra inteira."""
+        result = {token for token in _WORD_RE.findall(text) if token in self._word_codes}
+        if self._other_re is not None and self._other_re.search(text):
+            result.update(code for code, pattern in self._other if pattern.search(text))
+        return result
+
+    def any(self, text: str) -> bool:
+        """Se algum código aparece no texto como palavra inteira."""
+        if self._word_codes and any(
+            token in self._word_codes for token in _WORD_RE.findall(text)
+        ):
+            return True
+        return bool(self._other_re is not None and self._other_re.search(text))
+
+
+class _PrefixTrie:
+    """Trie de códigos para descobrir quais são prefixo de um domínio."""
+
+    _END = ""
+
+    def __init__(self, words: Iterable[str]):
+        self._root: Dict[str, Any] = {}
+        for word in words:
+            node = self._root
+            for char in word:
+                node = node.setdefault(char, {})
+            node[self._END] = word
+
+    def prefixes_of(self, text: str) -> List[str]:
+        """Palavras da trie que são prefixo de `text` (O(len(text)))."""
+        result: List[str] = []
+        node = self._root
+        for char in text:
+            node = node.get(char)
+            if node is None:
+                break
+            if self._END in node:
+                result.append(node[self._END])
+        return result
+
+
+class EmpresaIndex:
+    """Índice imutável do cadastro de empresas.
+
+    Construído uma única vez por processo (`get_empresa_index`). Substitui as
+    varreduras do cadastro por documento: CNPJ por conjunto de dígitos, raiz
+    do CNPJ (8 dígitos) por dicionário, códigos por token e domínios por trie.
+    A ordem do cadastro é preservada nos desempates, então os resultados são
+    os mesmos da varredura linear.
+
+    Args:
+        cadastro: CNPJ (qualquer formato) → payload com 'razao_social'.
+    """
+
+    # Limites de tamanho dos códigos usados em cada heurística
+    NOME_NOSSO_CODE_LEN = (2, 6)
+    DOMAIN_CODE_LEN = (2, 10)
+
+    def __init__(self, cadastro: Mapping[str, Mapping[str, Any]]):
+        normalized: Dict[str, Dict[str, Any]] = {}
+        for cnpj, payload in (cadastro or {}).items():
+            cnpj_digits = normalize_cnpj_to_digits(str(cnpj))
+            if cnpj_digits:
+                normalized[cnpj_digits] = dict(payload or {})
+
+        self.cadastro: Mapping[str, Dict[str, Any]] = MappingProxyType(normalized)
+        self.cnpjs: FrozenSet[str] = frozenset(normalized)
+
+        by_root: Dict[str, List[str]] = {}
+        # CNPJ → (razão social, código); por código, a 1ª empresa na ordem do cadastro
+        self._empresas: Dict[str, Tuple[str, str]] = {}
+        self._first_by_code: Dict[str, Tuple[int, str, str]] = {}
+        self._first_by_domain_code: Dict[str, Tuple[int, str, str]] = {}
+        nome_nosso_codes: Set[str] = set()
+
+        for order, (cnpj_digits, payload) in enumerate(normalized.items()):
+            by_root.setdefault(cnpj_digits[:8], []).append(cnpj_digits)
+            razao = (payload.get("razao_social") or "").strip()
+            codigo = empresa_codigo_from_razao(razao)
+            self._empresas[cnpj_digits] = (razao, codigo)
+            if not razao or not codigo:
+                continue
+
+            self._first_by_code.setdefault(codigo, (order, cnpj_digits, razao))
+
+            codigo_up = codigo.upper().strip()
+            low, high = self.NOME_NOSSO_CODE_LEN
+            if low <= len(codigo_up) <= high and codigo_up not in _NOME_STOPWORDS:
+                nome_nosso_codes.add(codigo_up)
+            low, high = self.DOMAIN_CODE_LEN
+            if low <= len(codigo_up) <= high:
+                self._first_by_domain_code.setdefault(codigo_up, (order, cnpj_digits, razao))
+
+        self.by_root: Mapping[str, Tuple[str, ...]] = MappingProxyType(
+            {root: tuple(cnpjs) for root, cnpjs in by_root.items()}
+        )
+        self._code_matcher = _CodeMatcher(self._first_by_code)
+        self._nome_nosso_matcher = _CodeMatcher(nome_nosso_codes)
+        self._domain_trie = _PrefixTrie(self._first_by_domain_code)
+        # Códigos atípicos (fora de [A-Z0-9]) não viram rótulo: busca por regex
+        self._domain_other: List[Tuple[str, "re.Pattern[str]"]] = [
+            (code, re.compile(rf"(?<![A-Z0-9]){re.escape(code)}(?![A-Z0-9])"))
+            for code in self._first_by_domain_code
+            if not _DOMAIN_TOKEN_RE.fullmatch(code)
+        ]
+
+    def __len__(self) -> int:
+        return len(self.cnpjs)
+
+    def __contains__(self, cnpj_digits: object) -> bool:
+        return cnpj_digits in self.cnpjs
+
+    def empresa(self, cnpj_digits: str) -> Optional[Tuple[str, str]]:
+        """(razão social, código) da empresa do CNPJ, ou None se não é nossa."""
+        return self._empresas.get(cnpj_digits)
+
+    def cnpjs_da_raiz(self, cnpj: str) -> Tuple[str, ...]:
+        """CNPJs do cadastro com a mesma raiz (8 primeiros dígitos: mesma empresa)."""
+        digits = re.sub(r"\D+", "", cnpj or "")
+        if len(digits) < 8:
+            return ()
+        return self.by_root.get(digits[:8], ())
+
+    def codes_in_text(self, text_upper: str) -> Set[str]:
+        """Códigos de empresas presentes no texto (maiúsculo) como palavra inteira."""
+        return self._code_matcher.found(text_upper)
+
+    def match_nome(self, text_upper: str) -> Optional[EmpresaMatch]:
+        """1ª empresa (na ordem do cadastro) cujo código aparece no texto."""
+        found = self.codes_in_text(text_upper)
+        if not found:
+            return None
+        _order, cnpj_digits, razao = min(self._first_by_code[code] for code in found)
+        return EmpresaMatch(
+            cnpj_digits=cnpj_digits,
+            razao_social=razao,
+            codigo=self._empresas[cnpj_digits][1],
+            method="nome",
+            score=5,
+        )
+
+    def match_domains(self, domains: Iterable[str]) -> Optional[EmpresaMatch]:
+        """Empresa cujo código inicia o domínio principal ou é um rótulo do domínio."""
+        matched: Set[str] = set()
+        for dom in domains:
+            dom_up = dom.upper()
+            # Extrai a parte principal do domínio (ex.: "soumaster" de "soumaster.com.br")
+            dom_main = dom_up.split(".")[0] if "." in dom_up else dom_up
+            # Exige match exato do código com o início do domínio principal,
+            # ou que o código seja palavra isolada (evita "MASTER" em "SOUMASTER")
+            matched.update(self._domain_trie.prefixes_of(dom_main))
+            matched.update(
+                token
+                for token in _DOMAIN_TOKEN_RE.findall(dom_up)
+                if token in self._first_by_domain_code
+            )
+            matched.update(code for code, pattern in self._domain_other if pattern.search(dom_up))
+
+        if not matched:
+            return None
+
+        # Maior score; empate fica com a empresa que vem antes no cadastro
+        def rank(code: str) -> Tuple[int, int]:
+            return (7 + min(3, len(code)), -self._first_by_domain_code[code][0])
+
+        codigo_up = max(matched, key=rank)
+        _order, cnpj_digits, razao = self._first_by_domain_code[codigo_up]
+        return EmpresaMatch(
+            cnpj_digits=cnpj_digits,
+            razao_social=razao,
+            codigo=codigo_up,
+            method="domain",
+            score=rank(codigo_up)[0],
+        )
+
+    def is_nome_nosso(self, nome_upper: str) -> bool:
+        """Se o nome (maiúsculo) contém um código curto/distintivo do cadastro."""
+        return self._nome_nosso_matcher.any(nome_upper)
+
+
+_empresa_index: Optional[EmpresaIndex] = None
+_empresa_index_lock = threading.Lock()
+
+
+def get_empresa_index() -> EmpresaIndex:
+    """Índice do cadastro de empresas deste processo (construído uma única vez)."""
+    global _empresa_index
+    if _empresa_index is None:
+        with _empresa_index_lock:
+            if _empresa_index is None:
+                _empresa_index = EmpresaIndex(_read_empresas_cadastro())
+    return _empresa_index
+
+
 def iter_cnpjs_in_text(text: str) -> Iterable[Tuple[str, int, int, str]]:
     """Itera sobre todos os CNPJs encontrados no texto.
 
@@ -243,8 +528,8 @@ def find_empresa_no_texto(text: str) -> Optional[EmpresaMatch]:
         >>> if match:
         ...     print(f"{match.codigo}: {match.razao_social} (via {match.method})")
     """
-    cadastro = _load_empresas_cadastro()
-    if not cadastro or not text:
+    index = get_empresa_index()
+    if not len(index) or not text:
         return None
 
     # 1) Preferência: match por CNPJ
@@ -252,21 +537,19 @@ def find_empresa_no_texto(text: str) -> Optional[EmpresaMatch]:
     upper = text.upper()
 
     for cnpj_digits, start, end, _raw in iter_cnpjs_in_text(text):
-        if cnpj_digits not in cadastro:
+        empresa = index.empresa(cnpj_digits)
+        if empresa is None:
             continue
-
-        payload = cadastro.get(cnpj_digits) or {}
-        razao = (payload.get("razao_social") or "").strip()
-        codigo = empresa_codigo_from_razao(razao)
+        razao, codigo = empresa
 
         # Score contextual (pagador/tomador/destinatário geralmente são "nós")
         window = upper[max(0, start - 250) : min(len(upper), end + 250)]
         score = 10
-        if re.search(r"\b(DADOS\s+DO\s+PAGADOR|PAGADOR|SACADO)\b", window):
+        if _PAGADOR_CTX_RE.search(window):
             score += 6
-        if re.search(r"\b(TOMADOR|DESTINAT[ÁA]RIO|CLIENTE|CONTRATANTE)\b", window):
+        if _TOMADOR_CTX_RE.search(window):
             score += 4
-        if re.search(r"\bCNPJ\b", window):
+        if _CNPJ_CTX_RE.search(window):
             score += 1
 
         cand = EmpresaMatch(
@@ -283,75 +566,19 @@ def find_empresa_no_texto(text: str) -> Optional[EmpresaMatch]:
         return best
 
     # 2) Fallback: match por razão social (apenas se não achou CNPJ)
-    # Mantém simples e barato: procura pelo "código" (primeiro token) e por parte do nome.
-    # Evita varrer o texto inteiro por dezenas de nomes quando já existe CNPJ.
-    for cnpj_digits, payload in cadastro.items():
-        razao = (payload.get("razao_social") or "").strip()
-        if not razao:
-            continue
-        codigo = empresa_codigo_from_razao(razao)
-        if codigo and re.search(rf"\b{re.escape(codigo)}\b", upper):
-            return EmpresaMatch(
-                cnpj_digits=cnpj_digits,
-                razao_social=razao,
-                codigo=codigo,
-                method="nome",
-                score=5,
-            )
+    # Procura pelo "código" (primeiro token) de cada empresa; em caso de vários,
+    # vale a primeira empresa na ordem do cadastro.
+    match = index.match_nome(upper)
+    if match:
+        return match
 
     # 3) Fallback por domínio/e-mail: útil quando o documento não traz nosso CNPJ,
     # mas traz e-mail/dominio corporativo (ex.: fatura Locaweb com "soumaster.com.br").
+    # Conservador: só usa códigos curtos/distintivos; score maior para códigos
+    # mais longos (7 + até 3).
     domains = list(iter_domains_in_text(text))
     if domains:
-        best_domain: Optional[EmpresaMatch] = None
-        domains_up = [d.upper() for d in domains]
-
-        for cnpj_digits, payload in cadastro.items():
-            razao = (payload.get("razao_social") or "").strip()
-            if not razao:
-                continue
-            codigo = empresa_codigo_from_razao(razao)
-            codigo_up = (codigo or "").upper().strip()
-            if not codigo_up:
-                continue
-
-            # Conservador: só usa códigos curtos/distintivos (mesma regra do is_nome_nosso)
-            if len(codigo_up) < 2 or len(codigo_up) > 10:
-                continue
-
-            score = 0
-            for dom_up in domains_up:
-                # Extrai a parte principal do domínio (ex.: "soumaster" de "soumaster.com.br")
-                dom_main = dom_up.split(".")[0] if "." in dom_up else dom_up
-
-                # Exige match exato do código com o início do domínio principal,
-                # ou que o código seja palavra isolada (evita "MASTER" em "SOUMASTER")
-                is_prefix_match = dom_main.startswith(codigo_up)
-                is_word_boundary = bool(
-                    re.search(
-                        rf"(?<![A-Z0-9]){re.escape(codigo_up)}(?![A-Z0-9])", dom_up
-                    )
-                )
-
-                if is_prefix_match or is_word_boundary:
-                    # pontua por match no domínio; quanto mais "limpo" o match, maior o score
-                    score = max(score, 7 + min(3, len(codigo_up)))
-
-            if score <= 0:
-                continue
-
-            cand = EmpresaMatch(
-                cnpj_digits=cnpj_digits,
-                razao_social=razao,
-                codigo=codigo_up,
-                method="domain",
-                score=score,
-            )
-            if best_domain is None or cand.score > best_domain.score:
-                best_domain = cand
-
-        if best_domain:
-            return best_domain
+        return index.match_domains(domains)
 
     return None
 
@@ -373,9 +600,8 @@ def is_cnpj_nosso(cnpj_value: Optional[str]) -> bool:
     """
     if not cnpj_value:
         return False
-    cadastro = _load_empresas_cadastro()
     digits = normalize_cnpj_to_digits(cnpj_value)
-    return bool(digits and digits in cadastro)
+    return bool(digits and digits in get_empresa_index())
 
 
 def is_nome_nosso(nome: Optional[str]) -> bool:
@@ -398,82 +624,18 @@ def is_nome_nosso(nome: Optional[str]) -> bool:
     """
     if not nome:
         return False
-    cadastro = _load_empresas_cadastro()
-    if not cadastro:
+    index = get_empresa_index()
+    if not len(index):
         return False
 
     n_up = re.sub(r"\s+", " ", nome).strip().upper()
     if not n_up:
         return False
 
-    # Heurística: se contém um "código" curto/distintivo (primeiro token) de alguma empresa nossa.
-    # IMPORTANTe: evitar falsos positivos com tokens genéricos (ex: SERVICOS, CONSULTORIA).
-    stopwords = {
-        "SERVICO",
-        "SERVICOS",
-        "CONSULTORIA",
-        "GESTAO",
-        "INTEGRADA",
-        "COMERCIO",
-        "INDUSTRIA",
-        "TECNOLOGIA",
-        "SOLUCOES",
-        "SISTEMA",
-        "SISTEMAS",
-        "EMPRESA",
-        "EMPRESAS",
-        "ADMINISTRACAO",
-        "ADMINISTRADORA",
-        "PARTICIPACOES",
-        "GRUPO",
-        "HOLDING",
-        "COMPANHIA",
-        "CIA",
-        "LTDA",
-        "SA",
-        "S/A",
-        # Nomes geográficos genéricos (evitar falsos positivos como "AUTO POSTO PORTAL DE MINAS")
-        "MINAS",
-        "GERAIS",
-        "PAULO",
-        "JANEIRO",
-        "BAHIA",
-        "GOIAS",
-        "BRASIL",
-        "NACIONAL",
-        "REGIONAL",
-        "FEDERAL",
-        "ESTADUAL",
-        "NORTE",
-        "SUL",
-        "LESTE",
-        "OESTE",
-        "CENTRO",
-        "CENTRAL",
-        "PORTAL",
-        "DIGITAL",
-        "TELECOM",
-    }
-    for payload in cadastro.values():
-        razao = (payload.get("razao_social") or "").strip()
-        codigo = empresa_codigo_from_razao(razao)
-        if not codigo:
-            continue
-
-        codigo_up = codigo.upper().strip()
-
-        # Só usa códigos curtos (tendem a ser siglas como CSC/OP11/RBC). Tokens longos
-        # são frequentemente genéricos e geram falsos positivos.
-        if len(codigo_up) < 2 or len(codigo_up) > 6:
-            continue
-
-        if codigo_up in stopwords:
-            continue
-
-        if re.search(rf"\b{re.escape(codigo_up)}\b", n_up):
-            return True
-
-    return False
+    # Heurística: se contém um "código" curto/distintivo (primeiro token) de alguma
+    # empresa nossa. Códigos longos e genéricos (_NOME_STOPWORDS) ficam de fora do
+    # índice para evitar falsos positivos.
+    return index.is_nome_nosso(n_up)
 
 
 def pick_first_non_our_cnpj(text: str) -> Optional[str]:
@@ -493,12 +655,12 @@ def pick_first_non_our_cnpj(text: str) -> Optional[str]:
         >>> pick_first_non_our_cnpj(texto_boleto)
         '12345678000190'  # CNPJ do fornecedor
     """
-    cadastro = _load_empresas_cadastro()
+    index = get_empresa_index()
     if not text:
         return None
 
     for cnpj_digits, _start, _end, _raw in iter_cnpjs_in_text(text):
-        if cnpj_digits in cadastro:
+        if cnpj_digits in index:
             continue
         return cnpj_digits
 
@@ -515,7 +677,7 @@ def infer_fornecedor_from_text(
     if not text:
         return None
 
-    cadastro = _load_empresas_cadastro()
+    index = get_empresa_index()
     empresa_cnpj_digits_norm = normalize_cnpj_to_digits(empresa_cnpj_digits or "")
 
     label_re = re.compile(
@@ -568,7 +730,7 @@ def infer_fornecedor_from_text(
             digits = normalize_cnpj_to_digits(m.group(0))
             if not digits:
                 continue
-            if digits in cadastro:
+            if digits in index:
                 continue
             if empresa_cnpj_digits_norm and digits == empresa_cnpj_digits_norm:
                 continue
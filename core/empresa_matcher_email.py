@@ -15,14 +15,12 @@ para trabalhar com os extratores de PDF/XML.
 
 import re
 from collections import defaultdict
-from typing import Dict, List, Optional, Tuple
-
-from config.empresas import EMPRESAS_CADASTRO
+from typing import Dict, List, Mapping, Optional, Tuple
 
 from core.empresa_matcher import (
     empresa_codigo_from_razao,
+    get_empresa_index,
     iter_cnpjs_in_text,
-    normalize_cnpj_to_digits,
 )
 
 
@@ -90,14 +88,9 @@ class EmpresaDetectorEmail:
         self.cadastro = self._load_cadastro()
         self.empresas_por_codigo = self._build_codigo_map()
 
-    def _load_cadastro(self) -> Dict[str, Dict]:
-        """Carrega cadastro normalizado."""
-        normalized = {}
-        for cnpj, payload in (EMPRESAS_CADASTRO or {}).items():
-            cnpj_digits = normalize_cnpj_to_digits(str(cnpj))
-            if cnpj_digits:
-                normalized[cnpj_digits] = payload
-        return normalized
+    def _load_cadastro(self) -> Mapping[str, Dict]:
+        """Cadastro normalizado (o mesmo índice de core.empresa_matcher)."""
+        return get_empresa_index().cadastro
 
     def _build_codigo_map(self) -> Dict[str, List[str]]:
         """Mapeia código -> lista de CNPJs."""
@@ -217,15 +210,16 @@ class EmpresaDetectorEmail:
         # 2) Tenta por código exato (word boundary)
         codigos_contexto_seguro = []
         codigos_contexto_normal = []
-        
+
+        # Códigos presentes como palavra completa, em uma passada pelo texto
+        codigos_no_texto = get_empresa_index().codes_in_text(texto_upper)
+
         for codigo, _cnpjs in self.empresas_por_codigo.items():
             # Ignora códigos muito curtos ou stopwords
             if len(codigo) < 3 or codigo in self.STOPWORDS:
                 continue
 
-            # Busca como palavra completa
-            pattern = rf'\b{re.escape(codigo)}\b'
-            if re.search(pattern, texto_upper):
+            if codigo in codigos_no_texto:
                 # Verifica contexto
                 em_contexto_seguro = self._aparece_em_contexto_seguro(codigo, texto_upper)
                 em_contexto_ignorar = self._aparece_em_contexto_ignorar(codigo, texto_upper)
@@ -17,3 +17,7 @@ class ExtractionError(ScrapperException):
 class IngestionError(ScrapperException):
     """Levantada quando falha a conexão ou download de e-mails."""
     pass
+
+class WorkerCrashedError(ScrapperException):
+    """Levantada quando um processo worker supervisionado morre sem responder."""
+    pass
@@ -7,14 +7,26 @@ formatos (Google Sheets, SQL, etc.) sem modificar código existente (OCP).
 Conformidade: GoogleSheetsExporter com retry strategy para Política 5.9.
 """
 
+import csv
 import logging
+import math
+import typing
+import uuid
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Type
+from urllib.parse import quote
 
 import pandas as pd
 
-from core.models import DocumentData
+from core.models import (
+    BoletoData,
+    DanfeData,
+    DocumentData,
+    EmailAvisoData,
+    InvoiceData,
+    OtherDocumentData,
+)
 
 # Imports para Google Sheets (instalados via requirements.txt)
 try:
@@ -33,6 +45,18 @@ except ImportError:
     gspread = None
     APIError = Exception
 
+# Saída colunar (Parquet) - opcional: pip install pyarrow
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as pa_dataset
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    pa = None
+    pa_dataset = None
+    pq = None
+
 logger = logging.getLogger('scrapper')
 
 
@@ -95,6 +119,372 @@ class CsvExporter(DataExporter):
         )
 
 
+# Tipos de documento conhecidos, na ordem em que as colunas aparecem no
+# relatório consolidado
+DOCUMENT_CLASSES: Dict[str, Type[DocumentData]] = {
+    "NFSE": InvoiceData,
+    "DANFE": DanfeData,
+    "BOLETO": BoletoData,
+    "OUTRO": OtherDocumentData,
+    "AVISO": EmailAvisoData,
+}
+
+
+def document_columns(doc_type: str) -> Optional[List[str]]:
+    """
+    Colunas de `to_dict()` de um tipo de documento (esquema fixo do CSV).
+
+    Os `to_dict()` dos modelos têm chaves fixas por classe; o esquema sai de
+    uma instância vazia, então novos campos nos modelos entram no CSV sem
+    manutenção aqui.
+
+    Returns:
+        Lista de colunas ou None para tipo desconhecido.
+    """
+    doc_class = DOCUMENT_CLASSES.get(doc_type)
+    if doc_class is None:
+        return None
+    return list(doc_class(arquivo_origem="").to_dict())
+
+
+def all_document_columns() -> List[str]:
+    """União (ordenada) das colunas de todos os tipos de documento."""
+    columns: Dict[str, None] = {}
+    for doc_type in DOCUMENT_CLASSES:
+        columns.update(dict.fromkeys(document_columns(doc_type)))
+    return list(columns)
+
+
+def prioritize_columns(priority: Sequence[str], columns: Sequence[str]) -> List[str]:
+    """Coloca as colunas de `priority` primeiro, mantendo as demais na ordem."""
+    first = [c for c in priority if c in columns]
+    return first + [c for c in columns if c not in first]
+
+
+class CsvStreamWriter:
+    """
+    Escrita incremental de CSV com esquema de colunas fixo.
+
+    Alternativa ao `pd.DataFrame(registros).to_csv()` para relatórios
+    grandes: cada registro é escrito assim que chega, sem montar a tabela
+    inteira em memória. Segue o formato dos demais CSVs do projeto
+    (separador ';', 'utf-8-sig', decimal ',', None como célula vazia);
+    chaves fora do esquema são ignoradas.
+
+    O arquivo só é criado no primeiro `write()`: sem registros, nada é
+    gerado (como no fluxo com DataFrame, que pulava listas vazias).
+
+    Example:
+        >>> with CsvStreamWriter(path, ["batch_id", "valor_total"]) as writer:
+        ...     for record in records:
+        ...         writer.write(record)
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        columns: Sequence[str],
+        sep: str = ";",
+        decimal: str = ",",
+        encoding: str = "utf-8-sig",
+    ):
+        self.path = Path(path)
+        self.columns = list(columns)
+        self.sep = sep
+        self.decimal = decimal
+        self.encoding = encoding
+        self.rows = 0
+        self._file = None
+        self._writer = None
+
+    def _open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "w", encoding=self.encoding, newline="")
+        self._writer = csv.writer(self._file, delimiter=self.sep, lineterminator="\n")
+        self._writer.writerow(self.columns)
+
+    def _format(self, value: Any) -> Any:
+        if value is None:
+            return ""
+        if isinstance(value, float):
+            if math.isnan(value):
+                return ""
+            text = repr(value)
+            return text.replace(".", self.decimal) if self.decimal != "." else text
+        return value
+
+    def write(self, record: Dict[str, Any]) -> None:
+        """Escreve um registro (dicionário) como uma linha do CSV."""
+        if self._writer is None:
+            self._open()
+        self._writer.writerow([self._format(record.get(c)) for c in self.columns])
+        self.rows += 1
+
+    def close(self) -> None:
+        """Fecha o arquivo (se chegou a ser criado)."""
+        if self._file is not None:
+            self._file.close()
+        self._file = None
+        self._writer = None
+
+    def __enter__(self) -> "CsvStreamWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# Partições dos datasets Parquet de documentos (diretórios Hive: chave=valor)
+DOCUMENT_PARTITIONS = ("tipo_documento", "data_processamento")
+
+# Valor de partição para None (convenção Hive, entendida pelo pyarrow)
+_NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+
+def _require_pyarrow() -> None:
+    if not PYARROW_AVAILABLE:
+        raise ImportError(
+            "pyarrow não está instalado. "
+            "Execute: pip install pyarrow"
+        )
+
+
+def _python_type(annotation: Any) -> Optional[type]:
+    """Tipo base de uma anotação (desembrulha Optional[X])."""
+    if annotation in (str, float, int, bool):
+        return annotation
+    args = [a for a in typing.get_args(annotation) if a is not type(None)]
+    if len(args) == 1 and args[0] in (str, float, int, bool):
+        return args[0]
+    return None
+
+
+def document_column_types(extra_columns: Sequence[str] = ()) -> Dict[str, type]:
+    """
+    Tipo Python de cada coluna de documento, derivado dos dataclasses.
+
+    Usa a anotação do campo (`Optional[float]` -> float); chaves de
+    `to_dict()` que não são campos (ex.: `tipo_documento`, propriedades)
+    usam o tipo do valor da instância vazia e, se None, str.
+
+    Args:
+        extra_columns: Colunas de texto adicionais (ex.: contexto do lote)
+    """
+    types: Dict[str, type] = {}
+    for doc_class in DOCUMENT_CLASSES.values():
+        hints = typing.get_type_hints(doc_class)
+        for column, value in doc_class(arquivo_origem="").to_dict().items():
+            if column in types:
+                continue
+            column_type = _python_type(hints.get(column))
+            if column_type is None:
+                column_type = type(value) if isinstance(value, (float, int, bool)) else str
+            types[column] = column_type
+    for column in extra_columns:
+        types.setdefault(column, str)
+    return types
+
+
+def arrow_schema(column_types: Dict[str, type]) -> "pa.Schema":
+    """Schema Arrow a partir de {coluna: tipo Python} (str, float, int, bool)."""
+    _require_pyarrow()
+    arrow_types = {
+        str: pa.string(),
+        float: pa.float64(),
+        int: pa.int64(),
+        bool: pa.bool_(),
+    }
+    return pa.schema([(name, arrow_types[kind]) for name, kind in column_types.items()])
+
+
+def _coerce(value: Any, kind: type) -> Any:
+    """Converte um valor para o tipo da coluna (None se não convertível)."""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    if isinstance(value, kind) and not isinstance(value, bool):
+        return value
+    if kind is str:
+        return str(value)
+    try:
+        return kind(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class ParquetDatasetWriter:
+    """
+    Escrita incremental de um dataset Parquet particionado (layout Hive).
+
+    Os registros são agrupados pelas colunas de partição
+    (`tipo_documento=NFSE/data_processamento=2025-01-15/part-<id>.parquet`)
+    e gravados em arquivos de até `rows_per_file` linhas, com schema fixo:
+    a memória fica limitada ao buffer de cada partição aberta.
+
+    Cada partição tocada é substituída na primeira gravação (os arquivos
+    antigos dela são removidos), como os CSVs que são reescritos a cada
+    exportação; partições de outras datas continuam no dataset, o que
+    permite análises mês a mês lendo o diretório inteiro.
+
+    Args:
+        root: Diretório raiz do dataset
+        column_types: {coluna: tipo Python} (ver `document_column_types`)
+        partition_by: Colunas de partição (viram diretórios, não colunas)
+        rows_per_file: Linhas por arquivo Parquet
+
+    Raises:
+        ImportError: Se pyarrow não estiver instalado
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        column_types: Dict[str, type],
+        partition_by: Sequence[str] = DOCUMENT_PARTITIONS,
+        rows_per_file: int = 50_000,
+    ):
+        _require_pyarrow()
+        self.root = Path(root)
+        self.partition_by = tuple(partition_by)
+        self.rows_per_file = rows_per_file
+        self.column_types = {
+            c: t for c, t in column_types.items() if c not in self.partition_by
+        }
+        self.schema = arrow_schema(self.column_types)
+        self.rows = 0
+        self._buffers: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        self._touched: set = set()
+
+    def _partition_dir(self, key: Tuple[str, ...]) -> Path:
+        path = self.root
+        for column, value in zip(self.partition_by, key):
+            path = path / f"{column}={value}"
+        return path
+
+    def write(self, record: Dict[str, Any]) -> None:
+        """Acrescenta um registro (dicionário) ao dataset."""
+        key = tuple(
+            _NULL_PARTITION if record.get(c) in (None, "") else quote(str(record[c]), safe="")
+            for c in self.partition_by
+        )
+        buffer = self._buffers.setdefault(key, [])
+        buffer.append(
+            {c: _coerce(record.get(c), t) for c, t in self.column_types.items()}
+        )
+        self.rows += 1
+        if len(buffer) >= self.rows_per_file:
+            self._flush(key)
+
+    def _flush(self, key: Tuple[str, ...]) -> None:
+        rows = self._buffers.pop(key, None)
+        if not rows:
+            return
+        directory = self._partition_dir(key)
+        if key not in self._touched:
+            # Primeira gravação nesta partição: substitui o conteúdo anterior
+            self._touched.add(key)
+            if directory.exists():
+                for old in directory.glob("*.parquet"):
+                    old.unlink()
+        directory.mkdir(parents=True, exist_ok=True)
+        table = pa.Table.from_pylist(rows, schema=self.schema)
+        pq.write_table(table, directory / f"part-{uuid.uuid4().hex}.parquet")
+
+    def close(self) -> None:
+        """Grava os buffers pendentes."""
+        for key in list(self._buffers):
+            self._flush(key)
+
+    def __enter__(self) -> "ParquetDatasetWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class ParquetExporter(DataExporter):
+    """
+    Exportador para dataset Parquet particionado por tipo e data.
+
+    Alternativa tipada aos CSVs: valores numéricos ficam como float64 (sem
+    a conversão de vírgula decimal na leitura) e `read_parquet_dataset` lê
+    só as colunas/partições necessárias.
+
+    Requer pyarrow (opcional): pip install pyarrow
+    """
+
+    def __init__(self, rows_per_file: int = 50_000):
+        _require_pyarrow()
+        self.rows_per_file = rows_per_file
+
+    def export(self, data: Iterable[DocumentData], destination: str) -> None:
+        """
+        Exporta documentos para o dataset em `destination` (diretório).
+
+        Raises:
+            ValueError: Se a lista de dados estiver vazia
+        """
+        with ParquetDatasetWriter(
+            Path(destination), document_column_types(), rows_per_file=self.rows_per_file
+        ) as writer:
+            for doc in data:
+                writer.write(doc.to_dict())
+        if not writer.rows:
+            raise ValueError("Lista de dados vazia. Nada para exportar.")
+
+
+def read_parquet_dataset(
+    path: Path,
+    columns: Optional[Sequence[str]] = None,
+    partition_by: Sequence[str] = DOCUMENT_PARTITIONS,
+    **equals: Any,
+) -> pd.DataFrame:
+    """
+    Lê um dataset Parquet (layout Hive) como DataFrame.
+
+    Só as colunas pedidas são lidas (projeção) e filtros de igualdade em
+    colunas de partição descartam diretórios inteiros sem abri-los.
+
+    Example:
+        >>> df = read_parquet_dataset(
+        ...     Path("data/output/datasets/documentos"),
+        ...     columns=["data_processamento", "valor_total"],
+        ...     tipo_documento="NFSE",
+        ... )
+
+    Args:
+        path: Diretório raiz do dataset
+        columns: Colunas a ler (None = todas)
+        partition_by: Colunas de partição do dataset (lidas como texto)
+        **equals: Filtros coluna=valor
+
+    Raises:
+        ImportError: Se pyarrow não estiver instalado
+    """
+    _require_pyarrow()
+    partitioning = pa_dataset.partitioning(
+        pa.schema([(c, pa.string()) for c in partition_by]), flavor="hive"
+    )
+    dataset = pa_dataset.dataset(
+        str(path), format="parquet", partitioning=partitioning
+    )
+    condition = None
+    for column, value in equals.items():
+        expr = pa_dataset.field(column) == value
+        condition = expr if condition is None else condition & expr
+    table = dataset.to_table(
+        columns=list(columns) if columns is not None else None, filter=condition
+    )
+    return table.to_pandas()
+
+
+# Colunas da planilha PAF (ordem de `DocumentData.to_sheets_row`)
+PAF_HEADERS = [
+    "DATA", "SETOR", "EMPRESA", "FORNECEDOR", "NF", "EMISSÃO", "VALOR",
+    "Nº PEDIDO", "VENCIMENTO", "FORMA PAGTO", "", "DT CLASS", "Nº FAT",
+    "TP DOC", "TRAT PAF", "LANC SISTEMA", "OBSERVAÇÕES", "OBS INTERNA",
+]
+
+
 class GoogleSheetsExporter(DataExporter):
     """
     Exportador para Google Sheets com retry strategy.
@@ -108,6 +498,7 @@ class GoogleSheetsExporter(DataExporter):
     - Logging detalhado para auditoria
     - Batch processing (100 linhas por vez) para performance
     - Modo single row para tempo real (ingestão de e-mails)
+    - `sync`: sincronização por chave, sem duplicar linhas em reexportações
     """
 
     def __init__(self, credentials_path: str = 'credentials.json',
@@ -260,6 +651,36 @@ class GoogleSheetsExporter(DataExporter):
         logger.info(f"Documento exportado com sucesso: {doc.arquivo_origem} - "
                    f"Tipo: {doc.doc_type}")
 
+    def sync(self, data: Iterable[DocumentData], destination: str,
+             batch_size: int = 500, state: Optional[Any] = None) -> Any:
+        """
+        Sincroniza documentos com a aba por chave, sem duplicar linhas.
+
+        Diferente de `export`, lê a coluna ID da aba uma vez e envia só as
+        linhas novas (append_rows) ou alteradas (batch_update), respeitando
+        SHEETS_REQUESTS_PER_MINUTE (ver `core.sheets_sync`).
+
+        Args:
+            data: Documentos a sincronizar
+            destination: Nome da aba/worksheet na planilha
+            batch_size: Máximo de linhas por requisição
+            state: `SheetSyncState` com os hashes já enviados
+                (default: SHEETS_SYNC_STATE_PATH)
+
+        Returns:
+            SyncResult: Contagem de inserções, atualizações e inalteradas
+        """
+        from core.sheets_sync import SheetSync, SheetSyncState, sheet_row_key
+
+        if state is None:
+            from config.settings import SHEETS_SYNC_STATE_PATH
+            state = SheetSyncState(SHEETS_SYNC_STATE_PATH)
+
+        worksheet = self._get_worksheet(destination)
+        return SheetSync(worksheet, PAF_HEADERS, state=state, chunk_rows=batch_size).sync(
+            (sheet_row_key(doc), doc.to_sheets_row()) for doc in data
+        )
+
 
 class FileSystemManager:
     """
@@ -0,0 +1,216 @@
+"""
+Roteador de extratores compilado (passada única de palavras-chave).
+
+Antes, `BaseInvoiceProcessor._get_extractor` percorria o `EXTRACTOR_REGISTRY`
+chamando `can_handle(text)` de cada extrator, e cada um refazia `upper()`,
+remoção de acentos e suas próprias regexes: rotear um documento custava
+cerca de 25 passadas completas sobre o mesmo texto.
+
+O `ExtractorRouter`:
+    1. Normaliza o texto uma vez (`text_views`), visão compartilhada pelos
+       `can_handle` dos extratores.
+    2. Compila as `ROUTING_KEYWORDS` de todos os extratores em um único
+       autômato (regex com lookahead, estilo Aho-Corasick) e descobre em uma
+       passada sobre o texto compactado quais palavras-chave aparecem.
+    3. Percorre o registro NA ORDEM ORIGINAL, pulando apenas os extratores
+       cujas palavras-chave obrigatórias não aparecem no texto.
+
+A semântica é a mesma da varredura linear: o primeiro extrator (na ordem do
+registro) cujo `can_handle` aceita o texto é o escolhido. O tempo gasto por
+extrator fica disponível em `profile()`.
+
+Example:
+    >>> from core.extractor_router import get_router
+    >>> extractor_cls = get_router().route(texto)
+    >>> get_router().profile()["DanfeExtractor"]["seconds"]
+"""
+
+import logging
+import re
+import threading
+import time
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Set, Tuple, Type
+
+from core.extractors import EXTRACTOR_REGISTRY, compact_keyword, text_views
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractorRouter:
+    """
+    Escolhe o extrator de um texto preservando a ordem do registro.
+
+    O autômato é recompilado automaticamente quando o registro muda
+    (ex: extratores registrados depois da criação do roteador).
+
+    Args:
+        registry: Lista de classes de extratores (default: EXTRACTOR_REGISTRY).
+    """
+
+    def __init__(self, registry: Optional[List[Type[Any]]] = None):
+        self._registry = registry if registry is not None else EXTRACTOR_REGISTRY
+        self._compiled_for: Tuple[Type[Any], ...] = ()
+        self._pattern: Optional["re.Pattern[str]"] = None
+        self._implied: Dict[str, Tuple[str, ...]] = {}
+        self._required: List[FrozenSet[str]] = []
+        self._lock = threading.Lock()
+        self._profile: Dict[str, Dict[str, float]] = {}
+
+    # ------------------------------------------------------------------
+    # Compilação
+    # ------------------------------------------------------------------
+
+    def _compile(self) -> None:
+        """Compila as palavras-chave do registro atual em um único autômato."""
+        snapshot = tuple(self._registry)
+        required: List[FrozenSet[str]] = []
+        keywords: Set[str] = set()
+
+        for extractor_cls in snapshot:
+            declared = getattr(extractor_cls, "ROUTING_KEYWORDS", ())
+            kws = frozenset(filter(None, (compact_keyword(kw) for kw in declared)))
+            required.append(kws)
+            keywords.update(kws)
+
+        # Lookahead em cada posição encontra a MAIOR palavra-chave que começa
+        # ali; as menores que começam na mesma posição são prefixos dela.
+        ordered = sorted(keywords, key=len, reverse=True)
+        self._pattern = (
+            re.compile("(?=(" + "|".join(re.escape(k) for k in ordered) + "))")
+            if ordered else None
+        )
+        self._implied = {
+            k: tuple(p for p in keywords if k.startswith(p)) for k in keywords
+        }
+        self._required = required
+        self._compiled_for = snapshot
+
+        logger.debug(
+            f"[Router] Compilado: {len(snapshot)} extratores, {len(keywords)} palavras-chave"
+        )
+
+    def _ensure_compiled(self) -> Tuple[Type[Any], ...]:
+        if tuple(self._registry) != self._compiled_for:
+            with self._lock:
+                if tuple(self._registry) != self._compiled_for:
+                    self._compile()
+        return self._compiled_for
+
+    # ------------------------------------------------------------------
+    # Roteamento
+    # ------------------------------------------------------------------
+
+    def keyword_hits(self, text: str) -> Set[str]:
+        """Palavras-chave de roteamento presentes no texto (passada única)."""
+        self._ensure_compiled()
+        if self._pattern is None:
+            return set()
+
+        hits: Set[str] = set()
+        for match in self._pattern.finditer(text_views(text).compact):
+            longest = match.group(1)
+            if longest not in hits:
+                hits.update(self._implied[longest])
+        return hits
+
+    def candidates(self, text: str) -> List[Type[Any]]:
+        """Extratores cujo `can_handle` precisa ser consultado, na ordem do registro."""
+        registry = self._ensure_compiled()
+        hits = self.keyword_hits(text)
+        return [
+            extractor_cls
+            for extractor_cls, kws in zip(registry, self._required)
+            if not kws or not kws.isdisjoint(hits)
+        ]
+
+    def route(self, text: str) -> Optional[Type[Any]]:
+        """
+        Retorna a classe do primeiro extrator que aceita o texto.
+
+        Args:
+            text: Texto bruto do documento.
+
+        Returns:
+            Classe do extrator ou None se nenhum aceitar.
+        """
+        registry = self._ensure_compiled()
+        hits = self.keyword_hits(text)
+
+        for extractor_cls, kws in zip(registry, self._required):
+            name = extractor_cls.__name__
+            if kws and kws.isdisjoint(hits):
+                self._record(name, skipped=True)
+                logger.debug(f"[Router] {name} ignorado (sem palavras-chave)")
+                continue
+
+            start = time.perf_counter()
+            result = extractor_cls.can_handle(text)
+            self._record(name, elapsed=time.perf_counter() - start, selected=bool(result))
+
+            if result:
+                return extractor_cls
+            logger.debug(f"[Router] {name} recusou")
+
+        return None
+
+    # ------------------------------------------------------------------
+    # Perfil
+    # ------------------------------------------------------------------
+
+    def _record(
+        self, name: str, elapsed: float = 0.0, skipped: bool = False, selected: bool = False
+    ) -> None:
+        with self._lock:
+            stats = self._profile.setdefault(
+                name, {"calls": 0, "skipped": 0, "selected": 0, "seconds": 0.0}
+            )
+            if skipped:
+                stats["skipped"] += 1
+            else:
+                stats["calls"] += 1
+                stats["seconds"] += elapsed
+            if selected:
+                stats["selected"] += 1
+
+    def profile(self) -> Dict[str, Dict[str, float]]:
+        """
+        Tempo de roteamento por extrator desde o último `reset_profile()`.
+
+        Returns:
+            Dict nome → {"calls", "skipped", "selected", "seconds"}, na ordem
+            do registro.
+        """
+        with self._lock:
+            ordem = [cls.__name__ for cls in self._compiled_for]
+            nomes = ordem + [n for n in self._profile if n not in ordem]
+            return {n: dict(self._profile[n]) for n in nomes if n in self._profile}
+
+    def reset_profile(self) -> None:
+        """Zera o perfil de roteamento."""
+        with self._lock:
+            self._profile.clear()
+
+    def log_profile(self, level: int = logging.INFO, top: Optional[int] = None) -> None:
+        """Loga os extratores que mais consumiram tempo de roteamento."""
+        ranking: Sequence[Tuple[str, Dict[str, float]]] = sorted(
+            self.profile().items(), key=lambda item: item[1]["seconds"], reverse=True
+        )
+        if top is not None:
+            ranking = ranking[:top]
+        for name, stats in ranking:
+            logger.log(
+                level,
+                f"[Router] {name}: {stats['calls']:.0f} chamada(s), "
+                f"{stats['skipped']:.0f} ignorada(s), {stats['seconds'] * 1000:.1f}ms",
+            )
+
+
+_default_router: Optional[ExtractorRouter] = None
+
+
+def get_router() -> ExtractorRouter:
+    """Roteador padrão sobre o EXTRACTOR_REGISTRY global."""
+    global _default_router
+    if _default_router is None:
+        _default_router = ExtractorRouter()
+    return _default_router
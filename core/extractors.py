@@ -1,6 +1,8 @@
 import re
+import unicodedata
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
 
 # 1. O Registro (Lista de plugins disponíveis)
 EXTRACTOR_REGISTRY = []
@@ -78,10 +80,85 @@ def find_linha_digitavel(text: str) -> bool:
     return False
 
 
+class TextViews:
+    """
+    Visões normalizadas do texto de um documento, calculadas sob demanda.
+
+    O roteador consulta até ~25 `can_handle` sobre o mesmo texto; cada um
+    costumava refazer `upper()`, remoção de acentos e compactação. Com
+    `text_views(text)` essas visões são calculadas uma vez por documento e
+    compartilhadas entre os extratores.
+
+    Attributes:
+        upper: Texto em maiúsculas (equivale a `text.upper()`).
+        normalized: Maiúsculas sem acentos (`strip_accents(text.upper())`).
+        compact: Apenas A-Z e 0-9 de `normalized` (ex: "NOTAFISCAL").
+    """
+
+    __slots__ = ("text", "_upper", "_normalized", "_compact")
+
+    def __init__(self, text: str):
+        self.text = text or ""
+        self._upper: Optional[str] = None
+        self._normalized: Optional[str] = None
+        self._compact: Optional[str] = None
+
+    @property
+    def upper(self) -> str:
+        if self._upper is None:
+            self._upper = self.text.upper()
+        return self._upper
+
+    @property
+    def normalized(self) -> str:
+        if self._normalized is None:
+            decomposed = unicodedata.normalize("NFKD", self.upper)
+            self._normalized = "".join(
+                ch for ch in decomposed if not unicodedata.combining(ch)
+            )
+        return self._normalized
+
+    @property
+    def compact(self) -> str:
+        if self._compact is None:
+            self._compact = re.sub(r"[^A-Z0-9]+", "", self.normalized)
+        return self._compact
+
+
+@lru_cache(maxsize=8)
+def text_views(text: str) -> TextViews:
+    """
+    Retorna as visões normalizadas do texto (cacheadas para os últimos textos).
+
+    Chamadas repetidas com o mesmo texto (ex: todos os `can_handle` durante o
+    roteamento de um documento) reaproveitam upper/normalized/compact.
+    """
+    return TextViews(text)
+
+
+def compact_keyword(value: str) -> str:
+    """Forma compacta de uma palavra-chave (mesma regra de `TextViews.compact`)."""
+    return TextViews(value).compact
+
+
 # 2. A Interface Base
 class BaseExtractor(ABC):
     """Contrato que toda cidade deve implementar."""
 
+    # Palavras-chave de roteamento: se preenchida, `can_handle` só é chamado
+    # quando ao menos uma delas aparece no texto compactado (A-Z0-9, sem
+    # acentos). Declare apenas termos SEM os quais `can_handle` nunca aceita
+    # o documento. Vazia = sempre consultado (ver core.extractor_router).
+    ROUTING_KEYWORDS: Tuple[str, ...] = ()
+
+    # Orçamento de páginas (PDFs longos): (primeiras, últimas) páginas que o
+    # extrator lê. Declare só se o documento é reconhecido (can_handle) e
+    # extraído a partir dessas páginas. None = documento inteiro.
+    PAGE_SCOPE: Optional[Tuple[int, int]] = None
+    # Campos que encerram a leitura: se algum vier vazio do texto parcial,
+    # o documento inteiro é lido e a extração é refeita.
+    REQUIRED_FIELDS: Tuple[str, ...] = ()
+
     @classmethod
     @abstractmethod
     def can_handle(cls, text: str) -> bool:
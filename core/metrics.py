@@ -27,6 +27,7 @@ Versão: 1.0.0
 
 import json
 import logging
+import re
 import threading
 import time
 from collections import defaultdict
@@ -35,7 +36,7 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 logger = logging.getLogger(__name__)
 
@@ -104,6 +105,19 @@ class Histogram:
                 if value <= bucket:
                     self._counts[i] += 1
 
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        """Cópia do estado (contagens por bucket, soma, total)."""
+        with self._lock:
+            return list(self._counts), self._sum, self._count
+
+    def merge(self, counts: List[int], total_sum: float, count: int) -> None:
+        """Soma observações vindas de outro histograma com os mesmos buckets."""
+        with self._lock:
+            for i, c in enumerate(counts):
+                self._counts[i] += c
+            self._sum += total_sum
+            self._count += count
+
     def get_stats(self) -> Dict[str, Any]:
         """Retorna estatísticas do histograma."""
         with self._lock:
@@ -238,6 +252,73 @@ class MetricsCollector:
                 "descriptions": dict(self._descriptions),
             }
 
+    def snapshot_counters(self) -> Dict[str, float]:
+        """Cópia dos contadores atuais (base para `counter_deltas`)."""
+        with self._data_lock:
+            return dict(self._counters)
+
+    def counter_deltas(self, since: Dict[str, float]) -> Dict[str, Any]:
+        """
+        Incrementos dos contadores desde um snapshot.
+
+        Usado por processos worker para devolver ao processo pai as métricas
+        registradas durante uma tarefa (ver `merge_counter_deltas`).
+        """
+        with self._data_lock:
+            return {
+                key: (value - since.get(key, 0.0), self._labels.get(key))
+                for key, value in self._counters.items()
+                if value != since.get(key, 0.0)
+            }
+
+    def merge_counter_deltas(self, deltas: Dict[str, Any]) -> None:
+        """Soma incrementos de contadores vindos de outro processo."""
+        with self._data_lock:
+            for key, (value, labels) in deltas.items():
+                self._counters[key] += value
+                if labels:
+                    self._labels[key] = labels
+
+    def snapshot_histograms(self) -> Dict[str, Tuple[List[int], float, int]]:
+        """Cópia do estado dos histogramas (base para `histogram_deltas`)."""
+        with self._data_lock:
+            return {key: h.snapshot() for key, h in self._histograms.items()}
+
+    def histogram_deltas(self, since: Dict[str, Tuple[List[int], float, int]]) -> Dict[str, Any]:
+        """
+        Observações dos histogramas desde um snapshot.
+
+        Equivalente de `counter_deltas` para histogramas: tempos por página
+        de OCR, estágios da sessão de PDF etc. registrados em um worker
+        voltam ao processo pai (ver `merge_histogram_deltas`).
+        """
+        with self._data_lock:
+            deltas: Dict[str, Any] = {}
+            for key, histogram in self._histograms.items():
+                counts, total_sum, count = histogram.snapshot()
+                old_counts, old_sum, old_count = since.get(key, ([0] * len(counts), 0.0, 0))
+                if count == old_count:
+                    continue
+                deltas[key] = (
+                    histogram.name,
+                    list(histogram.buckets),
+                    [c - o for c, o in zip(counts, old_counts)],
+                    total_sum - old_sum,
+                    count - old_count,
+                    self._labels.get(key),
+                )
+            return deltas
+
+    def merge_histogram_deltas(self, deltas: Dict[str, Any]) -> None:
+        """Soma observações de histogramas vindas de outro processo."""
+        with self._data_lock:
+            for key, (name, buckets, counts, total_sum, count, labels) in deltas.items():
+                if key not in self._histograms:
+                    self._histograms[key] = Histogram(name, buckets)
+                self._histograms[key].merge(counts, total_sum, count)
+                if labels:
+                    self._labels[key] = labels
+
     def reset(self) -> None:
         """Reseta todas as métricas."""
         with self._data_lock:
@@ -353,6 +434,16 @@ class IngestionMetrics:
     FETCH_DURATION = "ingestion_fetch_duration_seconds"
     PROCESS_DURATION = "ingestion_process_duration_seconds"
     BATCH_DURATION = "ingestion_batch_duration_seconds"
+    WORKER_KILLS = "ingestion_worker_kills_total"
+    WORKER_RECYCLES = "ingestion_worker_recycles_total"
+    TEXT_CACHE_LOOKUPS = "ingestion_text_cache_lookups_total"
+    PDF_PASSWORD_RESOLUTIONS = "ingestion_pdf_password_resolutions_total"
+    PDF_PASSWORD_ATTEMPTS = "ingestion_pdf_password_attempts"
+    PDF_PASSWORD_DURATION = "ingestion_pdf_password_duration_seconds"
+    STAGE_ITEMS = "ingestion_stage_items_total"
+    STAGE_DURATION = "ingestion_stage_duration_seconds"
+    STAGE_QUEUE_DEPTH = "ingestion_stage_queue_depth"
+    STAGE_THROUGHPUT = "ingestion_stage_throughput_per_second"
 
     def __init__(self, collector: Optional[MetricsCollector] = None):
         """
@@ -468,6 +559,116 @@ class IngestionMetrics:
             "Total de avisos criados"
         )
 
+    def record_worker_killed(self, executor: str) -> None:
+        """Registra um worker supervisionado encerrado por timeout."""
+        self._collector.increment(
+            self.WORKER_KILLS, 1, {"executor": executor},
+            "Total de workers encerrados por timeout"
+        )
+
+    def record_worker_recycled(self, executor: str) -> None:
+        """Registra um worker supervisionado reciclado após N tarefas."""
+        self._collector.increment(
+            self.WORKER_RECYCLES, 1, {"executor": executor},
+            "Total de workers reciclados por limite de tarefas"
+        )
+
+    def record_text_cache_lookup(self, hit: bool) -> None:
+        """Registra uma consulta ao cache de texto extraído."""
+        self._collector.increment(
+            self.TEXT_CACHE_LOOKUPS, 1, {"result": "hit" if hit else "miss"},
+            "Consultas ao cache de texto extraído"
+        )
+
+    def record_pdf_password_resolution(
+        self,
+        source: str,
+        attempts: int,
+        duration_seconds: float
+    ) -> None:
+        """
+        Registra a resolução de senha de um PDF protegido.
+
+        Args:
+            source: 'file' (senha lembrada para o arquivo), 'search' (candidatos
+                testados), 'unknown' (nenhum funcionou) ou 'unprotected'.
+            attempts: Candidatos verificados.
+            duration_seconds: Tempo da resolução.
+        """
+        self._collector.increment(
+            self.PDF_PASSWORD_RESOLUTIONS, 1, {"source": source},
+            "Resoluções de senha de PDF por origem"
+        )
+        self._collector.observe_histogram(
+            self.PDF_PASSWORD_ATTEMPTS, attempts, {"source": source},
+            "Candidatos de senha verificados por PDF"
+        )
+        self._collector.observe_histogram(
+            self.PDF_PASSWORD_DURATION, duration_seconds, {"source": source},
+            "Tempo para resolver a senha de um PDF"
+        )
+
+    def record_stage_item(
+        self,
+        stage: str,
+        duration_seconds: float,
+        ok: bool = True
+    ) -> None:
+        """Registra um item concluído por um estágio do pipeline."""
+        self._collector.increment(
+            self.STAGE_ITEMS, 1,
+            {"stage": stage, "status": "ok" if ok else "error"},
+            "Itens concluídos por estágio do pipeline"
+        )
+        self._collector.observe_histogram(
+            self.STAGE_DURATION, duration_seconds, {"stage": stage},
+            "Duração por item em cada estágio do pipeline"
+        )
+
+    def set_stage_queue_depth(self, stage: str, depth: int) -> None:
+        """Define a profundidade atual da fila de entrada de um estágio."""
+        self._collector.set_gauge(
+            self.STAGE_QUEUE_DEPTH, depth, {"stage": stage},
+            "Itens aguardando na fila de entrada do estágio"
+        )
+
+    def set_stage_throughput(self, stage: str, items_per_second: float) -> None:
+        """Define a vazão (itens/s) de um estágio desde o início do pipeline."""
+        self._collector.set_gauge(
+            self.STAGE_THROUGHPUT, items_per_second, {"stage": stage},
+            "Vazão do estágio do pipeline (itens/s)"
+        )
+
+    def get_stage_summary(self) -> Dict[str, Dict[str, float]]:
+        """Itens, vazão e profundidade de fila por estágio do pipeline."""
+        metrics = self._collector.get_all_metrics()
+        summary: Dict[str, Dict[str, float]] = {}
+        stage_re = re.compile(r"stage=([^,}]+)")
+
+        def entry(key: str) -> Optional[Dict[str, float]]:
+            match = stage_re.search(key)
+            if not match:
+                return None
+            return summary.setdefault(
+                match.group(1), {"items": 0, "throughput": 0.0, "queue_depth": 0}
+            )
+
+        for key, value in metrics["counters"].items():
+            if key.startswith(self.STAGE_ITEMS):
+                stats = entry(key)
+                if stats is not None:
+                    stats["items"] += value
+        for key, value in metrics["gauges"].items():
+            if key.startswith(self.STAGE_THROUGHPUT):
+                stats = entry(key)
+                if stats is not None:
+                    stats["throughput"] = value
+            elif key.startswith(self.STAGE_QUEUE_DEPTH):
+                stats = entry(key)
+                if stats is not None:
+                    stats["queue_depth"] = value
+        return summary
+
     @contextmanager
     def measure_fetch(self, operation: str = "generic"):
         """Mede duração de operação de fetch."""
@@ -532,6 +733,16 @@ class IngestionMetrics:
                 v for k, v in metrics["counters"].items()
                 if k.startswith(self.AVISOS_CREATED)
             ),
+            "workers_killed": sum(
+                v for k, v in metrics["counters"].items()
+                if k.startswith(self.WORKER_KILLS)
+            ),
+            "text_cache_hits": metrics["counters"].get(
+                f"{self.TEXT_CACHE_LOOKUPS}{{result=hit}}", 0
+            ),
+            "text_cache_misses": metrics["counters"].get(
+                f"{self.TEXT_CACHE_LOOKUPS}{{result=miss}}", 0
+            ),
         }
 
     def log_session_summary(self, level: int = logging.INFO) -> None:
@@ -551,6 +762,23 @@ class IngestionMetrics:
         logger.log(level, f"   Lotes processados: {summary['batches_processed']}")
         logger.log(level, f"   Documentos extraídos: {summary['documents_extracted']}")
         logger.log(level, f"   Avisos criados: {summary['avisos_created']}")
+        if summary['workers_killed']:
+            logger.log(level, f"   Workers encerrados por timeout: {summary['workers_killed']}")
+        if summary['text_cache_hits'] or summary['text_cache_misses']:
+            logger.log(
+                level,
+                f"   Cache de texto: {summary['text_cache_hits']} acerto(s), "
+                f"{summary['text_cache_misses']} falta(s)"
+            )
+        stages = self.get_stage_summary()
+        if stages:
+            logger.log(level, "   Pipeline:")
+            for stage, stats in stages.items():
+                logger.log(
+                    level,
+                    f"      {stage}: {stats['items']:.0f} item(ns), "
+                    f"{stats['throughput']:.2f}/s, fila={stats['queue_depth']:.0f}"
+                )
         logger.log(level, "=" * 60)
 
     def export_session(self, output_dir: Union[str, Path]) -> Path:
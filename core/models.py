@@ -1,13 +1,111 @@
 from __future__ import annotations
 
+import re
+import sys
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from datetime import date, datetime
-from typing import TYPE_CHECKING, Optional
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Optional
 
 if TYPE_CHECKING:
     from core.metadata import EmailMetadata
 
+# Tamanho do snippet de texto guardado em `texto_bruto`
+TEXTO_BRUTO_LIMITE = 500
+
+_PALAVRA_RE = re.compile(r"\S+")
+
+
+def texto_snippet(texto: Optional[str], limite: int = TEXTO_BRUTO_LIMITE) -> str:
+    """
+    Início do texto com espaços normalizados, para `texto_bruto`.
+
+    Equivale a `' '.join(texto.split())[:limite]`, mas percorre só as
+    palavras necessárias para preencher o limite, em vez de normalizar o
+    texto inteiro do documento (dezenas de KB em PDFs longos ou OCR).
+    """
+    if not texto:
+        return ""
+    palavras = []
+    tamanho = -1
+    for match in _PALAVRA_RE.finditer(texto):
+        palavras.append(match.group())
+        tamanho += len(palavras[-1]) + 1
+        if tamanho >= limite:
+            break
+    return " ".join(palavras)[:limite]
+
+
+# Formatadores das linhas de planilha (to_sheets_row / to_anexos_row /
+# to_sem_anexos_row). As mesmas datas se repetem em milhares de documentos
+# de uma execução: as conversões ficam em cache.
+@lru_cache(maxsize=4096)
+def _parse_iso_date(iso_date: str) -> date:
+    """Data ISO (YYYY-MM-DD) -> date. ValueError/TypeError se inválida."""
+    return datetime.strptime(iso_date, '%Y-%m-%d').date()
+
+
+@lru_cache(maxsize=4096)
+def _fmt_date(iso_date: Optional[str]) -> str:
+    """Converte data ISO para formato brasileiro DD/MM/YYYY ("" se inválida)."""
+    if not iso_date:
+        return ""
+    try:
+        return _parse_iso_date(iso_date).strftime('%d/%m/%Y')
+    except (ValueError, TypeError):
+        return ""
+
+
+def _fmt_num(value: Optional[float]) -> float:
+    """Converte None para 0.0 em campos numéricos."""
+    return value if value is not None else 0.0
+
+
+def _fmt_str(value: Optional[str]) -> str:
+    """Converte None para string vazia."""
+    return value if value is not None else ""
+
+
+def _compartilhar_strings(doc: Any, campos: tuple) -> None:
+    """
+    Troca os valores de texto repetitivos do documento pela cópia interna
+    (`sys.intern`): empresa, fornecedor, banco, datas... se repetem em
+    milhares de documentos de uma execução e passam a ocupar memória uma vez.
+    """
+    for campo in campos:
+        valor = getattr(doc, campo)
+        if type(valor) is str:
+            setattr(doc, campo, sys.intern(valor))
+
+
+def _com_slots(cls: type) -> type:
+    """
+    Recria a dataclass com `__slots__` (sem `__dict__` por instância).
+
+    Equivale a `@dataclass(slots=True)`, que só existe a partir do Python
+    3.10. Cada classe declara slots só para os campos novos; os herdados já
+    têm slot na classe base. Os valores default saem do corpo da classe (o
+    `__init__` gerado já os guarda) para não esconderem os slots.
+    """
+    herdados = {
+        nome for base in cls.__mro__[1:] for nome in getattr(base, "__slots__", ())
+    }
+    nomes = tuple(f.name for f in fields(cls))
+    slots = tuple(nome for nome in nomes if nome not in herdados)
+    namespace = dict(cls.__dict__)
+    for nome in nomes + ("__dict__", "__weakref__"):
+        namespace.pop(nome, None)
+    namespace["__slots__"] = slots
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+
+@lru_cache(maxsize=1)
+def _calendario_sp():
+    """Calendário de SP compartilhado (o cache de feriados é por instância)."""
+    from config.feriados_sp import SPBusinessCalendar
+    return SPBusinessCalendar()
+
 
 def _calcular_situacao_vencimento(vencimento_str: Optional[str], valor: Optional[float], numero_nf: Optional[str]) -> tuple[str, str]:
     """
@@ -36,13 +134,12 @@ def _calcular_situacao_vencimento(vencimento_str: Optional[str], valor: Optional
     if vencimento_str:
         try:
             # Tenta parsear a data de vencimento
-            venc_date = datetime.strptime(vencimento_str, '%Y-%m-%d').date()
+            venc_date = _parse_iso_date(vencimento_str)
             hoje = date.today()
 
-            # Importa calendário de SP para calcular dias úteis
+            # Calendário de SP (compartilhado) para calcular dias úteis
             try:
-                from config.feriados_sp import SPBusinessCalendar
-                calendario = SPBusinessCalendar()
+                calendario = _calendario_sp()
                 dias_uteis = calendario.get_working_days_delta(
                     datetime.combine(hoje, datetime.min.time()),
                     datetime.combine(venc_date, datetime.min.time())
@@ -70,6 +167,7 @@ def _calcular_situacao_vencimento(vencimento_str: Optional[str], valor: Optional
     return situacao, " | ".join(avisos_list) if avisos_list else ""
 
 
+@_com_slots
 @dataclass
 class DocumentData(ABC):
     """
@@ -78,6 +176,11 @@ class DocumentData(ABC):
     Define o contrato comum que todos os modelos de documento devem seguir,
     facilitando a extensão do sistema para novos tipos (OCP - Open/Closed Principle).
 
+    Os modelos são dataclasses com `__slots__` (`_com_slots`: sem `__dict__`
+    por instância, só os campos declarados podem ser atribuídos). Os textos repetitivos
+    (`_CAMPOS_COMPARTILHADOS`) são compartilhados na construção e
+    `texto_bruto` guarda só o snippet de `texto_snippet`.
+
     Attributes:
         arquivo_origem (str): Nome do arquivo PDF processado.
         texto_bruto (str): Snippet do texto extraído (para debug).
@@ -112,6 +215,15 @@ class DocumentData(ABC):
     email_date: Optional[str] = None  # Data de recebimento do email (ISO format)
     vencimento: Optional[str] = None  # Data de vencimento (ISO format)
 
+    # Campos de texto que se repetem entre documentos (ver _compartilhar_strings)
+    _CAMPOS_COMPARTILHADOS = (
+        "data_processamento", "setor", "empresa", "source_email_sender",
+        "status_conciliacao", "email_date", "vencimento",
+    )
+
+    def __post_init__(self) -> None:
+        _compartilhar_strings(self, self._CAMPOS_COMPARTILHADOS)
+
     @property
     @abstractmethod
     def doc_type(self) -> str:
@@ -181,6 +293,7 @@ class DocumentData(ABC):
         # Implementação padrão - subclasses devem sobrescrever
         return []
 
+@_com_slots
 @dataclass
 class InvoiceData(DocumentData):
     """
@@ -261,6 +374,10 @@ class InvoiceData(DocumentData):
 
     link_drive: Optional[str] = None
 
+    _CAMPOS_COMPARTILHADOS = DocumentData._CAMPOS_COMPARTILHADOS + (
+        "fornecedor_nome", "cnpj_prestador", "forma_pagamento",
+    )
+
     @property
     def total_retencoes(self) -> float:
         """
@@ -346,52 +463,34 @@ class InvoiceData(DocumentData):
         Returns:
             list: Lista com 18 elementos para append no Google Sheets
         """
-        def fmt_date(iso_date: Optional[str]) -> str:
-            """Converte data ISO para formato brasileiro DD/MM/YYYY."""
-            if not iso_date:
-                return ""
-            try:
-                dt = datetime.strptime(iso_date, '%Y-%m-%d')
-                return dt.strftime('%d/%m/%Y')
-            except (ValueError, TypeError):
-                return ""
-
-        def fmt_num(value: Optional[float]) -> float:
-            """Converte None para 0.0 em campos numéricos."""
-            return value if value is not None else 0.0
-
-        def fmt_str(value: Optional[str]) -> str:
-            """Converte None para string vazia."""
-            return value if value is not None else ""
-
         # MVP: número de NF será preenchido via ingestão (e-mail), então exportamos vazio.
         try:
             from config.settings import PAF_EXPORT_NF_EMPTY
         except Exception:
             PAF_EXPORT_NF_EMPTY = False
 
-        nf_value = "" if PAF_EXPORT_NF_EMPTY else fmt_str(self.numero_nota)
-        fat_value = "" if PAF_EXPORT_NF_EMPTY else fmt_str(self.numero_fatura)
+        nf_value = "" if PAF_EXPORT_NF_EMPTY else _fmt_str(self.numero_nota)
+        fat_value = "" if PAF_EXPORT_NF_EMPTY else _fmt_str(self.numero_fatura)
 
         return [
-            fmt_date(self.data_processamento),  # 1. DATA
-            fmt_str(self.setor),                 # 2. SETOR
-            fmt_str(self.empresa),               # 3. EMPRESA
-            fmt_str(self.fornecedor_nome),       # 4. FORNECEDOR
+            _fmt_date(self.data_processamento),  # 1. DATA
+            _fmt_str(self.setor),                # 2. SETOR
+            _fmt_str(self.empresa),              # 3. EMPRESA
+            _fmt_str(self.fornecedor_nome),      # 4. FORNECEDOR
             nf_value,                            # 5. NF
-            fmt_date(self.data_emissao),         # 6. EMISSÃO
-            fmt_num(self.valor_total),           # 7. VALOR
-            fmt_str(self.numero_pedido),         # 8. Nº PEDIDO
-            fmt_date(self.vencimento),           # 9. VENCIMENTO
-            fmt_str(self.forma_pagamento),       # 10. FORMA PAGTO
+            _fmt_date(self.data_emissao),        # 6. EMISSÃO
+            _fmt_num(self.valor_total),          # 7. VALOR
+            _fmt_str(self.numero_pedido),        # 8. Nº PEDIDO
+            _fmt_date(self.vencimento),          # 9. VENCIMENTO
+            _fmt_str(self.forma_pagamento),      # 10. FORMA PAGTO
             "",                                  # 11. (coluna vazia/índice)
-            fmt_date(self.dt_classificacao),     # 12. DT CLASS
+            _fmt_date(self.dt_classificacao),    # 12. DT CLASS
             fat_value,                           # 13. Nº FAT
-            fmt_str(self.tipo_doc_paf),           # 14. TP DOC
-            fmt_str(self.trat_paf),               # 15. TRAT PAF
-            fmt_str(self.lanc_sistema),           # 16. LANC SISTEMA
-            fmt_str(self.observacoes),            # 17. OBSERVAÇÕES
-            fmt_str(self.obs_interna),            # 18. OBS INTERNA
+            _fmt_str(self.tipo_doc_paf),         # 14. TP DOC
+            _fmt_str(self.trat_paf),             # 15. TRAT PAF
+            _fmt_str(self.lanc_sistema),         # 16. LANC SISTEMA
+            _fmt_str(self.observacoes),          # 17. OBSERVAÇÕES
+            _fmt_str(self.obs_interna),          # 18. OBS INTERNA
         ]
 
     def to_anexos_row(self) -> list:
@@ -411,21 +510,6 @@ class InvoiceData(DocumentData):
         10. SITUACAO: status calculado
         11. AVISOS: concatenação de status + divergência + observações
         """
-        def fmt_date(iso_date: Optional[str]) -> str:
-            if not iso_date:
-                return ""
-            try:
-                dt = datetime.strptime(iso_date, '%Y-%m-%d')
-                return dt.strftime('%d/%m/%Y')
-            except (ValueError, TypeError):
-                return ""
-
-        def fmt_str(value: Optional[str]) -> str:
-            return value if value is not None else ""
-
-        def fmt_num(value: Optional[float]) -> float:
-            return value if value is not None else 0.0
-
         # Calcula situação e avisos
         situacao_calc, avisos_calc = _calcular_situacao_vencimento(
             self.vencimento, self.valor_total, self.numero_nota
@@ -446,20 +530,21 @@ class InvoiceData(DocumentData):
         avisos_final = " | ".join(avisos_parts) if avisos_parts else ""
 
         return [
-            fmt_date(self.data_processamento),   # 1. PROCESSADO
-            fmt_date(self.email_date),           # 2. RECEBIDO (data do email)
-            fmt_str(self.source_email_subject),  # 3. ASSUNTO
+            _fmt_date(self.data_processamento),   # 1. PROCESSADO
+            _fmt_date(self.email_date),           # 2. RECEBIDO (data do email)
+            _fmt_str(self.source_email_subject),  # 3. ASSUNTO
             "",                                   # 4. N_PEDIDO (vazio)
-            fmt_str(self.empresa),               # 5. EMPRESA
-            fmt_date(self.vencimento),           # 6. VENCIMENTO
-            fmt_str(self.fornecedor_nome),       # 7. FORNECEDOR
-            fmt_str(self.numero_nota),           # 8. NF
-            fmt_num(self.valor_total),           # 9. VALOR
-            fmt_str(situacao_final),             # 10. SITUACAO
-            fmt_str(avisos_final),               # 11. AVISOS
+            _fmt_str(self.empresa),               # 5. EMPRESA
+            _fmt_date(self.vencimento),           # 6. VENCIMENTO
+            _fmt_str(self.fornecedor_nome),       # 7. FORNECEDOR
+            _fmt_str(self.numero_nota),           # 8. NF
+            _fmt_num(self.valor_total),           # 9. VALOR
+            _fmt_str(situacao_final),             # 10. SITUACAO
+            _fmt_str(avisos_final),               # 11. AVISOS
         ]
 
 
+@_com_slots
 @dataclass
 class DanfeData(DocumentData):
     """Modelo para DANFE / NF-e (produto) - modelo 55.
@@ -485,6 +570,10 @@ class DanfeData(DocumentData):
 
     chave_acesso: Optional[str] = None
 
+    _CAMPOS_COMPARTILHADOS = DocumentData._CAMPOS_COMPARTILHADOS + (
+        "fornecedor_nome", "cnpj_emitente", "forma_pagamento",
+    )
+
     @property
     def doc_type(self) -> str:
         return 'DANFE'
@@ -519,48 +608,33 @@ class DanfeData(DocumentData):
         }
 
     def to_sheets_row(self) -> list:
-        def fmt_date(iso_date: Optional[str]) -> str:
-            if not iso_date:
-                return ""
-            try:
-                dt = datetime.strptime(iso_date, '%Y-%m-%d')
-                return dt.strftime('%d/%m/%Y')
-            except (ValueError, TypeError):
-                return ""
-
-        def fmt_num(value: Optional[float]) -> float:
-            return value if value is not None else 0.0
-
-        def fmt_str(value: Optional[str]) -> str:
-            return value if value is not None else ""
-
         try:
             from config.settings import PAF_EXPORT_NF_EMPTY
         except Exception:
             PAF_EXPORT_NF_EMPTY = False
 
-        nf_value = "" if PAF_EXPORT_NF_EMPTY else fmt_str(self.numero_nota)
-        fat_value = "" if PAF_EXPORT_NF_EMPTY else fmt_str(self.numero_fatura)
+        nf_value = "" if PAF_EXPORT_NF_EMPTY else _fmt_str(self.numero_nota)
+        fat_value = "" if PAF_EXPORT_NF_EMPTY else _fmt_str(self.numero_fatura)
 
         return [
-            fmt_date(self.data_processamento),  # 1. DATA
-            fmt_str(self.setor),                 # 2. SETOR
-            fmt_str(self.empresa),               # 3. EMPRESA
-            fmt_str(self.fornecedor_nome),       # 4. FORNECEDOR
+            _fmt_date(self.data_processamento),  # 1. DATA
+            _fmt_str(self.setor),                # 2. SETOR
+            _fmt_str(self.empresa),              # 3. EMPRESA
+            _fmt_str(self.fornecedor_nome),      # 4. FORNECEDOR
             nf_value,                            # 5. NF
-            fmt_date(self.data_emissao),         # 6. EMISSÃO
-            fmt_num(self.valor_total),           # 7. VALOR
-            fmt_str(self.numero_pedido),         # 8. Nº PEDIDO
-            fmt_date(self.vencimento),           # 9. VENCIMENTO
-            fmt_str(self.forma_pagamento),       # 10. FORMA PAGTO
+            _fmt_date(self.data_emissao),        # 6. EMISSÃO
+            _fmt_num(self.valor_total),          # 7. VALOR
+            _fmt_str(self.numero_pedido),        # 8. Nº PEDIDO
+            _fmt_date(self.vencimento),          # 9. VENCIMENTO
+            _fmt_str(self.forma_pagamento),      # 10. FORMA PAGTO
             "",                                  # 11. (vazio)
-            fmt_date(self.dt_classificacao),     # 12. DT CLASS
+            _fmt_date(self.dt_classificacao),    # 12. DT CLASS
             fat_value,                           # 13. Nº FAT
             "NF",                                # 14. TP DOC
-            fmt_str(self.trat_paf),              # 15. TRAT PAF
-            fmt_str(self.lanc_sistema),          # 16. LANC SISTEMA
-            fmt_str(self.observacoes),           # 17. OBSERVAÇÕES
-            fmt_str(self.obs_interna),           # 18. OBS INTERNA
+            _fmt_str(self.trat_paf),             # 15. TRAT PAF
+            _fmt_str(self.lanc_sistema),         # 16. LANC SISTEMA
+            _fmt_str(self.observacoes),          # 17. OBSERVAÇÕES
+            _fmt_str(self.obs_interna),          # 18. OBS INTERNA
         ]
 
     def to_anexos_row(self) -> list:
@@ -580,21 +654,6 @@ class DanfeData(DocumentData):
         10. SITUACAO: status calculado
         11. AVISOS: concatenação de status + divergência + observações
         """
-        def fmt_date(iso_date: Optional[str]) -> str:
-            if not iso_date:
-                return ""
-            try:
-                dt = datetime.strptime(iso_date, '%Y-%m-%d')
-                return dt.strftime('%d/%m/%Y')
-            except (ValueError, TypeError):
-                return ""
-
-        def fmt_str(value: Optional[str]) -> str:
-            return value if value is not None else ""
-
-        def fmt_num(value: Optional[float]) -> float:
-            return value if value is not None else 0.0
-
         # Calcula situação e avisos
         situacao_calc, avisos_calc = _calcular_situacao_vencimento(
             self.vencimento, self.valor_total, self.numero_nota
@@ -613,20 +672,21 @@ class DanfeData(DocumentData):
         avisos_final = " | ".join(avisos_parts) if avisos_parts else ""
 
         return [
-            fmt_date(self.data_processamento),   # 1. PROCESSADO
-            fmt_date(self.email_date),           # 2. RECEBIDO (data do email)
-            fmt_str(self.source_email_subject),  # 3. ASSUNTO
+            _fmt_date(self.data_processamento),   # 1. PROCESSADO
+            _fmt_date(self.email_date),           # 2. RECEBIDO (data do email)
+            _fmt_str(self.source_email_subject),  # 3. ASSUNTO
             "",                                   # 4. N_PEDIDO (vazio)
-            fmt_str(self.empresa),               # 5. EMPRESA
-            fmt_date(self.vencimento),           # 6. VENCIMENTO
-            fmt_str(self.fornecedor_nome),       # 7. FORNECEDOR
-            fmt_str(self.numero_nota),           # 8. NF
-            fmt_num(self.valor_total),           # 9. VALOR
-            fmt_str(situacao_final),             # 10. SITUACAO
-            fmt_str(avisos_final),               # 11. AVISOS
+            _fmt_str(self.empresa),               # 5. EMPRESA
+            _fmt_date(self.vencimento),           # 6. VENCIMENTO
+            _fmt_str(self.fornecedor_nome),       # 7. FORNECEDOR
+            _fmt_str(self.numero_nota),           # 8. NF
+            _fmt_num(self.valor_total),           # 9. VALOR
+            _fmt_str(situacao_final),             # 10. SITUACAO
+            _fmt_str(avisos_final),               # 11. AVISOS
         ]
 
 
+@_com_slots
 @dataclass
 class OtherDocumentData(DocumentData):
     """Modelo genérico para documentos que não são NFSe nem Boleto nem DANFE."""
@@ -645,6 +705,10 @@ class OtherDocumentData(DocumentData):
 
     subtipo: Optional[str] = None
 
+    _CAMPOS_COMPARTILHADOS = DocumentData._CAMPOS_COMPARTILHADOS + (
+        "fornecedor_nome", "cnpj_fornecedor", "subtipo",
+    )
+
     @property
     def doc_type(self) -> str:
         return 'OUTRO'
@@ -676,40 +740,25 @@ class OtherDocumentData(DocumentData):
         }
 
     def to_sheets_row(self) -> list:
-        def fmt_date(iso_date: Optional[str]) -> str:
-            if not iso_date:
-                return ""
-            try:
-                dt = datetime.strptime(iso_date, '%Y-%m-%d')
-                return dt.strftime('%d/%m/%Y')
-            except (ValueError, TypeError):
-                return ""
-
-        def fmt_num(value: Optional[float]) -> float:
-            return value if value is not None else 0.0
-
-        def fmt_str(value: Optional[str]) -> str:
-            return value if value is not None else ""
-
         return [
-            fmt_date(self.data_processamento),  # 1. DATA
-            fmt_str(self.setor),                 # 2. SETOR
-            fmt_str(self.empresa),               # 3. EMPRESA
-            fmt_str(self.fornecedor_nome),       # 4. FORNECEDOR
-            fmt_str(self.numero_documento),                                  # 5. NF (não aplicável)
-            fmt_date(self.data_emissao),         # 6. EMISSÃO
-            fmt_num(self.valor_total),           # 7. VALOR
+            _fmt_date(self.data_processamento),  # 1. DATA
+            _fmt_str(self.setor),                # 2. SETOR
+            _fmt_str(self.empresa),              # 3. EMPRESA
+            _fmt_str(self.fornecedor_nome),      # 4. FORNECEDOR
+            _fmt_str(self.numero_documento),     # 5. NF (não aplicável)
+            _fmt_date(self.data_emissao),        # 6. EMISSÃO
+            _fmt_num(self.valor_total),          # 7. VALOR
             "",                                  # 8. Nº PEDIDO
-            fmt_date(self.vencimento),           # 9. VENCIMENTO
+            _fmt_date(self.vencimento),          # 9. VENCIMENTO
             "",                                  # 10. FORMA PAGTO
             "",                                  # 11. (vazio)
-            fmt_date(self.dt_classificacao),     # 12. DT CLASS
+            _fmt_date(self.dt_classificacao),    # 12. DT CLASS
             "",                                  # 13. Nº FAT
-            fmt_str(self.tipo_doc_paf),          # 14. TP DOC
-            fmt_str(self.trat_paf),              # 15. TRAT PAF
-            fmt_str(self.lanc_sistema),          # 16. LANC SISTEMA
-            fmt_str(self.observacoes),           # 17. OBSERVAÇÕES
-            fmt_str(self.obs_interna),           # 18. OBS INTERNA
+            _fmt_str(self.tipo_doc_paf),         # 14. TP DOC
+            _fmt_str(self.trat_paf),             # 15. TRAT PAF
+            _fmt_str(self.lanc_sistema),         # 16. LANC SISTEMA
+            _fmt_str(self.observacoes),          # 17. OBSERVAÇÕES
+            _fmt_str(self.obs_interna),          # 18. OBS INTERNA
         ]
 
     def to_anexos_row(self) -> list:
@@ -729,21 +778,6 @@ class OtherDocumentData(DocumentData):
         10. SITUACAO
         11. AVISOS
         """
-        def fmt_date(iso_date: Optional[str]) -> str:
-            if not iso_date:
-                return ""
-            try:
-                dt = datetime.strptime(iso_date, '%Y-%m-%d')
-                return dt.strftime('%d/%m/%Y')
-            except (ValueError, TypeError):
-                return ""
-
-        def fmt_str(value: Optional[str]) -> str:
-            return value if value is not None else ""
-
-        def fmt_num(value: Optional[float]) -> float:
-            return value if value is not None else 0.0
-
         # Calcula situação e avisos
         situacao_calc, avisos_calc = _calcular_situacao_vencimento(
             self.vencimento, self.valor_total, self.numero_documento
@@ -762,20 +796,21 @@ class OtherDocumentData(DocumentData):
         avisos_final = " | ".join(avisos_parts) if avisos_parts else ""
 
         return [
-            fmt_date(self.data_processamento),   # 1. PROCESSADO
-            fmt_date(self.email_date),           # 2. RECEBIDO (data do email)
-            fmt_str(self.source_email_subject),  # 3. ASSUNTO
+            _fmt_date(self.data_processamento),   # 1. PROCESSADO
+            _fmt_date(self.email_date),           # 2. RECEBIDO (data do email)
+            _fmt_str(self.source_email_subject),  # 3. ASSUNTO
             "",                                   # 4. N_PEDIDO (vazio)
-            fmt_str(self.empresa),               # 5. EMPRESA
-            fmt_date(self.vencimento),           # 6. VENCIMENTO
-            fmt_str(self.fornecedor_nome),       # 7. FORNECEDOR
-            fmt_str(self.numero_documento),      # 8. NF
-            fmt_num(self.valor_total),           # 9. VALOR
-            fmt_str(situacao_final),             # 10. SITUACAO
-            fmt_str(avisos_final),               # 11. AVISOS
+            _fmt_str(self.empresa),               # 5. EMPRESA
+            _fmt_date(self.vencimento),           # 6. VENCIMENTO
+            _fmt_str(self.fornecedor_nome),       # 7. FORNECEDOR
+            _fmt_str(self.numero_documento),      # 8. NF
+            _fmt_num(self.valor_total),           # 9. VALOR
+            _fmt_str(situacao_final),             # 10. SITUACAO
+            _fmt_str(avisos_final),               # 11. AVISOS
         ]
 
 
+@_com_slots
 @dataclass
 class EmailAvisoData(DocumentData):
     """
@@ -813,6 +848,10 @@ class EmailAvisoData(DocumentData):
     trat_paf: Optional[str] = None
     lanc_sistema: str = "PENDENTE"
 
+    _CAMPOS_COMPARTILHADOS = DocumentData._CAMPOS_COMPARTILHADOS + (
+        "fornecedor_nome", "dominio_portal",
+    )
+
     @property
     def doc_type(self) -> str:
         return 'AVISO'
@@ -875,18 +914,6 @@ class EmailAvisoData(DocumentData):
         Coluna OBSERVAÇÕES contém o aviso formatado:
         "[SEM ANEXO] Link: ... | Código: ... | NF: ..."
         """
-        def fmt_date(iso_date: Optional[str]) -> str:
-            if not iso_date:
-                return ""
-            try:
-                dt = datetime.strptime(iso_date, '%Y-%m-%d')
-                return dt.strftime('%d/%m/%Y')
-            except (ValueError, TypeError):
-                return ""
-
-        def fmt_str(value: Optional[str]) -> str:
-            return value if value is not None else ""
-
         # Monta observação com link e código
         obs_parts = ["[SEM ANEXO]"]
         if self.link_nfe:
@@ -900,24 +927,24 @@ class EmailAvisoData(DocumentData):
         observacao_final = self.observacoes or " | ".join(obs_parts)
 
         return [
-            fmt_date(self.data_processamento),  # 1. DATA
-            fmt_str(self.setor),                 # 2. SETOR
-            fmt_str(self.empresa),               # 3. EMPRESA
-            fmt_str(self.fornecedor_nome),       # 4. FORNECEDOR
-            fmt_str(self.numero_nota),           # 5. NF
+            _fmt_date(self.data_processamento),  # 1. DATA
+            _fmt_str(self.setor),                # 2. SETOR
+            _fmt_str(self.empresa),              # 3. EMPRESA
+            _fmt_str(self.fornecedor_nome),      # 4. FORNECEDOR
+            _fmt_str(self.numero_nota),          # 5. NF
             "",                                  # 6. EMISSÃO
             0.0,                                 # 7. VALOR
             "",                                  # 8. Nº PEDIDO
-            fmt_date(self.vencimento),           # 9. VENCIMENTO
+            _fmt_date(self.vencimento),          # 9. VENCIMENTO
             "",                                  # 10. FORMA PAGTO
             "",                                  # 11. (vazio)
-            fmt_date(self.dt_classificacao),     # 12. DT CLASS
+            _fmt_date(self.dt_classificacao),    # 12. DT CLASS
             "",                                  # 13. Nº FAT
-            fmt_str(self.tipo_doc_paf),          # 14. TP DOC
-            fmt_str(self.trat_paf),              # 15. TRAT PAF
-            fmt_str(self.lanc_sistema),          # 16. LANC SISTEMA
-            fmt_str(observacao_final),           # 17. OBSERVAÇÕES
-            fmt_str(self.obs_interna),           # 18. OBS INTERNA
+            _fmt_str(self.tipo_doc_paf),         # 14. TP DOC
+            _fmt_str(self.trat_paf),             # 15. TRAT PAF
+            _fmt_str(self.lanc_sistema),         # 16. LANC SISTEMA
+            _fmt_str(observacao_final),          # 17. OBSERVAÇÕES
+            _fmt_str(self.obs_interna),          # 18. OBS INTERNA
         ]
 
     def to_sem_anexos_row(self) -> list:
@@ -935,31 +962,19 @@ class EmailAvisoData(DocumentData):
         8. LINK: link_nfe
         9. CODIGO: codigo_verificacao
         """
-        def fmt_date(iso_date: Optional[str]) -> str:
-            if not iso_date:
-                return ""
-            try:
-                dt = datetime.strptime(iso_date, '%Y-%m-%d')
-                return dt.strftime('%d/%m/%Y')
-            except (ValueError, TypeError):
-                return ""
-
-        def fmt_str(value: Optional[str]) -> str:
-            return value if value is not None else ""
-
         # Usa source_email_subject se disponível, senão email_subject_full
         assunto = self.source_email_subject or self.email_subject_full or ""
 
         return [
-            fmt_date(self.data_processamento),   # 1. PROCESSADO
-            fmt_date(self.email_date),           # 2. RECEBIDO (data do email)
-            fmt_str(assunto),                    # 3. ASSUNTO
-            "",                                   # 4. N_PEDIDO (vazio)
-            fmt_str(self.empresa),               # 5. EMPRESA
-            fmt_str(self.fornecedor_nome),       # 6. FORNECEDOR
-            fmt_str(self.numero_nota),           # 7. NF
-            fmt_str(self.link_nfe),              # 8. LINK
-            fmt_str(self.codigo_verificacao),    # 9. CODIGO
+            _fmt_date(self.data_processamento),  # 1. PROCESSADO
+            _fmt_date(self.email_date),          # 2. RECEBIDO (data do email)
+            _fmt_str(assunto),                   # 3. ASSUNTO
+            "",                                  # 4. N_PEDIDO (vazio)
+            _fmt_str(self.empresa),              # 5. EMPRESA
+            _fmt_str(self.fornecedor_nome),      # 6. FORNECEDOR
+            _fmt_str(self.numero_nota),          # 7. NF
+            _fmt_str(self.link_nfe),             # 8. LINK
+            _fmt_str(self.codigo_verificacao),   # 9. CODIGO
         ]
 
     @classmethod
@@ -1071,6 +1086,7 @@ class EmailAvisoData(DocumentData):
         return None
 
 
+@_com_slots
 @dataclass
 class BoletoData(DocumentData):
     """
@@ -1137,10 +1153,15 @@ class BoletoData(DocumentData):
     trat_paf: Optional[str] = None
     lanc_sistema: str = "PENDENTE"
 
+    _CAMPOS_COMPARTILHADOS = DocumentData._CAMPOS_COMPARTILHADOS + (
+        "fornecedor_nome", "cnpj_beneficiario", "banco_nome", "forma_pagamento",
+    )
+
     def __post_init__(self) -> None:
         # Mantém compatibilidade: alguns chamadores usam data_vencimento.
         if not self.vencimento and self.data_vencimento:
             self.vencimento = self.data_vencimento
+        DocumentData.__post_init__(self)
 
     @property
     def doc_type(self) -> str:
@@ -1205,24 +1226,6 @@ class BoletoData(DocumentData):
         Returns:
             list: Lista com 18 elementos para append no Google Sheets
         """
-        def fmt_date(iso_date: Optional[str]) -> str:
-            """Converte data ISO para formato brasileiro DD/MM/YYYY."""
-            if not iso_date:
-                return ""
-            try:
-                dt = datetime.strptime(iso_date, '%Y-%m-%d')
-                return dt.strftime('%d/%m/%Y')
-            except (ValueError, TypeError):
-                return ""
-
-        def fmt_num(value: Optional[float]) -> float:
-            """Converte None para 0.0 em campos numéricos."""
-            return value if value is not None else 0.0
-
-        def fmt_str(value: Optional[str]) -> str:
-            """Converte None para string vazia."""
-            return value if value is not None else ""
-
         # MVP: coluna NF será preenchida via ingestão (e-mail), então exportamos vazio.
         try:
             from config.settings import PAF_EXPORT_NF_EMPTY
@@ -1231,28 +1234,28 @@ class BoletoData(DocumentData):
 
         # Prioriza referencia_nfse (herdado da DANFE/NFSe via correlação)
         # Fallback para numero_documento se não houver correlação
-        nf_value = "" if PAF_EXPORT_NF_EMPTY else fmt_str(self.referencia_nfse or self.numero_documento)
-        fat_value = "" if PAF_EXPORT_NF_EMPTY else fmt_str(self.referencia_nfse or self.numero_documento)
+        nf_value = "" if PAF_EXPORT_NF_EMPTY else _fmt_str(self.referencia_nfse or self.numero_documento)
+        fat_value = "" if PAF_EXPORT_NF_EMPTY else _fmt_str(self.referencia_nfse or self.numero_documento)
 
         return [
-            fmt_date(self.data_processamento),  # 1. DATA
-            fmt_str(self.setor),                 # 2. SETOR
-            fmt_str(self.empresa),               # 3. EMPRESA
-            fmt_str(self.fornecedor_nome),       # 4. FORNECEDOR
-            nf_value,                             # 5. NF (MVP: vazio)
-            fmt_date(self.data_emissao),          # 6. EMISSÃO
-            fmt_num(self.valor_documento),       # 7. VALOR
-            fmt_str(self.numero_pedido),         # 8. Nº PEDIDO
-            fmt_date(self.vencimento),           # 9. VENCIMENTO
-            fmt_str(self.forma_pagamento),       # 10. FORMA PAGTO
+            _fmt_date(self.data_processamento),  # 1. DATA
+            _fmt_str(self.setor),                # 2. SETOR
+            _fmt_str(self.empresa),              # 3. EMPRESA
+            _fmt_str(self.fornecedor_nome),      # 4. FORNECEDOR
+            nf_value,                            # 5. NF (MVP: vazio)
+            _fmt_date(self.data_emissao),        # 6. EMISSÃO
+            _fmt_num(self.valor_documento),      # 7. VALOR
+            _fmt_str(self.numero_pedido),        # 8. Nº PEDIDO
+            _fmt_date(self.vencimento),          # 9. VENCIMENTO
+            _fmt_str(self.forma_pagamento),      # 10. FORMA PAGTO
             "",                                  # 11. (coluna vazia/índice)
-            fmt_date(self.dt_classificacao),     # 12. DT CLASS
-            fat_value,                            # 13. Nº FAT (MVP: vazio)
-            fmt_str(self.tipo_doc_paf),          # 14. TP DOC
-            fmt_str(self.trat_paf),              # 15. TRAT PAF
-            fmt_str(self.lanc_sistema),          # 16. LANC SISTEMA
-            fmt_str(self.observacoes),           # 17. OBSERVAÇÕES
-            fmt_str(self.obs_interna),           # 18. OBS INTERNA
+            _fmt_date(self.dt_classificacao),    # 12. DT CLASS
+            fat_value,                           # 13. Nº FAT (MVP: vazio)
+            _fmt_str(self.tipo_doc_paf),         # 14. TP DOC
+            _fmt_str(self.trat_paf),             # 15. TRAT PAF
+            _fmt_str(self.lanc_sistema),         # 16. LANC SISTEMA
+            _fmt_str(self.observacoes),          # 17. OBSERVAÇÕES
+            _fmt_str(self.obs_interna),          # 18. OBS INTERNA
         ]
 
     def to_anexos_row(self) -> list:
@@ -1272,21 +1275,6 @@ class BoletoData(DocumentData):
         10. SITUACAO: status calculado
         11. AVISOS: concatenação de status + divergência + observações
         """
-        def fmt_date(iso_date: Optional[str]) -> str:
-            if not iso_date:
-                return ""
-            try:
-                dt = datetime.strptime(iso_date, '%Y-%m-%d')
-                return dt.strftime('%d/%m/%Y')
-            except (ValueError, TypeError):
-                return ""
-
-        def fmt_str(value: Optional[str]) -> str:
-            return value if value is not None else ""
-
-        def fmt_num(value: Optional[float]) -> float:
-            return value if value is not None else 0.0
-
         # Calcula situação e avisos
         situacao_calc, avisos_calc = _calcular_situacao_vencimento(
             self.vencimento, self.valor_documento, self.numero_documento
@@ -1305,15 +1293,15 @@ class BoletoData(DocumentData):
         avisos_final = " | ".join(avisos_parts) if avisos_parts else ""
 
         return [
-            fmt_date(self.data_processamento),   # 1. PROCESSADO
-            fmt_date(self.email_date),           # 2. RECEBIDO (data do email)
-            fmt_str(self.source_email_subject),  # 3. ASSUNTO
+            _fmt_date(self.data_processamento),   # 1. PROCESSADO
+            _fmt_date(self.email_date),           # 2. RECEBIDO (data do email)
+            _fmt_str(self.source_email_subject),  # 3. ASSUNTO
             "",                                   # 4. N_PEDIDO (vazio)
-            fmt_str(self.empresa),               # 5. EMPRESA
-            fmt_date(self.vencimento),           # 6. VENCIMENTO
-            fmt_str(self.fornecedor_nome),       # 7. FORNECEDOR
-            fmt_str(self.numero_documento),      # 8. NF (numero_documento para boletos)
-            fmt_num(self.valor_documento),       # 9. VALOR
-            fmt_str(situacao_final),             # 10. SITUACAO
-            fmt_str(avisos_final),               # 11. AVISOS
+            _fmt_str(self.empresa),               # 5. EMPRESA
+            _fmt_date(self.vencimento),           # 6. VENCIMENTO
+            _fmt_str(self.fornecedor_nome),       # 7. FORNECEDOR
+            _fmt_str(self.numero_documento),      # 8. NF (numero_documento para boletos)
+            _fmt_num(self.valor_documento),       # 9. VALOR
+            _fmt_str(situacao_final),             # 10. SITUACAO
+            _fmt_str(avisos_final),               # 11. AVISOS
         ]
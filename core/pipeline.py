@@ -0,0 +1,315 @@
+"""
+Pipeline em estágios com filas limitadas (produtor/consumidor).
+
+Antes, a fase de e-mails com anexos era sequencial: baixava e gravava todos
+os lotes, depois extraía o texto de um lote por vez, correlacionava e salvava.
+O `StagedPipeline` liga uma fonte (ex: lotes sendo baixados) a uma sequência
+de estágios, cada um com seu próprio número de threads e uma fila limitada
+na entrada:
+
+    fonte ──▶ [fila] ──▶ estágio 1 (N threads) ──▶ [fila] ──▶ ... ──▶ consumidor
+
+Quando uma fila enche, o estágio anterior espera (backpressure): o download
+não se adianta indefinidamente em relação à extração, e o consumidor recebe
+o primeiro resultado assim que ele atravessa todos os estágios.
+
+Falhas de um estágio não derrubam o pipeline: o item segue até o consumidor
+com `error` preenchido (os estágios seguintes não o processam). Um erro na
+fonte é relançado ao consumidor depois que os itens em andamento terminam.
+
+Profundidade das filas, itens por estágio e vazão são publicados em
+`IngestionMetrics` (`ingestion_stage_*`).
+
+Example:
+    >>> pipeline = StagedPipeline(
+    ...     pastas,
+    ...     [Stage("extract", extrair, workers=2), Stage("correlate", correlacionar)],
+    ...     metrics=IngestionMetrics(),
+    ... )
+    >>> for item in pipeline:
+    ...     if item.ok:
+    ...         salvar(item.value)
+"""
+
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+# Intervalo (s) em que threads bloqueadas em filas verificam o pedido de parada
+_POLL_SECONDS = 0.2
+
+
+@dataclass
+class Stage:
+    """
+    Estágio do pipeline.
+
+    Attributes:
+        name: Nome do estágio (rótulo das métricas).
+        func: Função aplicada a cada item; o retorno segue para o próximo estágio.
+        workers: Threads executando `func` em paralelo.
+        queue_size: Itens aguardando na fila de entrada do estágio.
+    """
+
+    name: str
+    func: Callable[[Any], Any]
+    workers: int = 1
+    queue_size: int = 4
+
+
+@dataclass
+class PipelineItem:
+    """
+    Item entregue ao consumidor.
+
+    Attributes:
+        source: Item como saiu da fonte (ex: pasta do lote).
+        value: Resultado do último estágio (None se houve falha).
+        error: Exceção levantada por algum estágio.
+        failed_stage: Nome do estágio que falhou.
+    """
+
+    source: Any
+    value: Any = None
+    error: Optional[BaseException] = None
+    failed_stage: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class StagedPipeline:
+    """
+    Executa uma fonte e uma sequência de estágios em threads ligadas por filas.
+
+    Iterar o pipeline inicia as threads e entrega os itens na ordem em que
+    terminam o último estágio. Sair da iteração antes do fim (break, exceção
+    ou `should_stop()` verdadeiro) chama `close()`, que sinaliza a parada às
+    threads: itens em andamento são descartados.
+
+    Args:
+        source: Iterável consumido em uma thread própria (estágio `source_name`).
+        stages: Estágios aplicados em ordem.
+        source_name: Nome do estágio da fonte nas métricas.
+        output_queue_size: Itens prontos aguardando o consumidor.
+        metrics: `IngestionMetrics` para profundidade de fila e vazão.
+        should_stop: Consultado periodicamente; True encerra a iteração.
+        join_timeout: Espera máxima (s) pelas threads em `close()`; threads
+            ainda ocupadas (ex: lote em extração) terminam em segundo plano.
+    """
+
+    def __init__(
+        self,
+        source: Iterable[Any],
+        stages: Sequence[Stage],
+        source_name: str = "source",
+        output_queue_size: int = 4,
+        metrics: Optional[Any] = None,
+        should_stop: Optional[Callable[[], bool]] = None,
+        join_timeout: float = 30.0,
+    ):
+        self._source = source
+        self.stages = list(stages)
+        self.source_name = source_name
+        self._metrics = metrics
+        self._should_stop = should_stop
+        self._join_timeout = join_timeout
+
+        # queues[i] alimenta stages[i]; a última alimenta o consumidor
+        self._queues: List["queue.Queue[Any]"] = [
+            queue.Queue(maxsize=max(1, stage.queue_size)) for stage in self.stages
+        ]
+        self._queues.append(queue.Queue(maxsize=max(1, output_queue_size)))
+
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._source_error: Optional[BaseException] = None
+
+        self._lock = threading.Lock()
+        self._alive: Dict[str, int] = {}
+        self._counts: Dict[str, int] = {}
+        self._started_at = 0.0
+
+    # ------------------------------------------------------------------
+    # Métricas
+    # ------------------------------------------------------------------
+
+    def _queue_name(self, index: int) -> str:
+        return self.stages[index].name if index < len(self.stages) else "output"
+
+    def _report_depth(self, index: int) -> None:
+        if self._metrics is not None:
+            self._metrics.set_stage_queue_depth(
+                self._queue_name(index), self._queues[index].qsize()
+            )
+
+    def report_item(self, stage: str, duration: float, ok: bool = True) -> None:
+        """Contabiliza um item concluído (também usado pelo consumidor como estágio final)."""
+        with self._lock:
+            self._counts[stage] = self._counts.get(stage, 0) + 1
+            count = self._counts[stage]
+        if self._metrics is not None:
+            self._metrics.record_stage_item(stage, duration, ok=ok)
+            elapsed = time.time() - self._started_at
+            if elapsed > 0:
+                self._metrics.set_stage_throughput(stage, count / elapsed)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Itens concluídos, vazão (itens/s) e profundidade da fila por estágio."""
+        elapsed = max(time.time() - self._started_at, 1e-9) if self._started_at else 0.0
+        names = [self.source_name] + [stage.name for stage in self.stages]
+        result: Dict[str, Dict[str, float]] = {}
+        with self._lock:
+            # Estágios extras contabilizados via `report_item` (ex: consumidor)
+            names += [name for name in self._counts if name not in names]
+            for i, name in enumerate(names):
+                count = self._counts.get(name, 0)
+                if i == 0:
+                    depth = 0  # a fonte não tem fila de entrada
+                elif i <= len(self.stages):
+                    depth = self._queues[i - 1].qsize()
+                else:
+                    depth = self._queues[-1].qsize()
+                result[name] = {
+                    "items": count,
+                    "throughput": count / elapsed if elapsed else 0.0,
+                    "queue_depth": depth,
+                }
+        return result
+
+    # ------------------------------------------------------------------
+    # Threads
+    # ------------------------------------------------------------------
+
+    def _put(self, index: int, item: Any) -> bool:
+        """Enfileira respeitando o limite; desiste se o pipeline parou."""
+        while not self._stop.is_set():
+            try:
+                self._queues[index].put(item, timeout=_POLL_SECONDS)
+                self._report_depth(index)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, index: int) -> Any:
+        """Retira da fila; retorna _DONE se o pipeline parou."""
+        while not self._stop.is_set():
+            try:
+                item = self._queues[index].get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                continue
+            self._report_depth(index)
+            return item
+        return _DONE
+
+    def _run_source(self) -> None:
+        iterator = iter(self._source)
+        try:
+            while not self._stop.is_set():
+                start = time.time()
+                try:
+                    value = next(iterator)
+                except StopIteration:
+                    break
+                self.report_item(self.source_name, time.time() - start, ok=True)
+                if not self._put(0, PipelineItem(source=value, value=value)):
+                    break
+        except Exception as e:
+            logger.error(f"Fonte do pipeline ({self.source_name}) falhou: {e}")
+            self._source_error = e
+        finally:
+            # Geradores são fechados na thread que os iterava
+            close = getattr(iterator, "close", None)
+            if callable(close):
+                try:
+                    close()
+                except Exception as e:
+                    logger.debug(f"Erro ao fechar fonte do pipeline: {e}")
+            self._put(0, _DONE)
+
+    def _run_stage(self, index: int) -> None:
+        stage = self.stages[index]
+        try:
+            while True:
+                item = self._get(index)
+                if item is _DONE:
+                    # Devolve o marcador para as outras threads do estágio
+                    self._put(index, _DONE)
+                    break
+
+                if item.ok:
+                    start = time.time()
+                    try:
+                        item.value = stage.func(item.value)
+                        ok = True
+                    except Exception as e:
+                        item.value = None
+                        item.error = e
+                        item.failed_stage = stage.name
+                        ok = False
+                    self.report_item(stage.name, time.time() - start, ok=ok)
+
+                if not self._put(index + 1, item):
+                    break
+        finally:
+            with self._lock:
+                self._alive[stage.name] -= 1
+                last = self._alive[stage.name] == 0
+            if last:
+                self._put(index + 1, _DONE)
+
+    def _start(self) -> None:
+        self._started_at = time.time()
+        self._threads.append(threading.Thread(
+            target=self._run_source, name=f"pipeline-{self.source_name}", daemon=True
+        ))
+        for index, stage in enumerate(self.stages):
+            workers = max(1, stage.workers)
+            self._alive[stage.name] = workers
+            for n in range(workers):
+                self._threads.append(threading.Thread(
+                    target=self._run_stage,
+                    args=(index,),
+                    name=f"pipeline-{stage.name}-{n}",
+                    daemon=True,
+                ))
+        for thread in self._threads:
+            thread.start()
+
+    def close(self) -> None:
+        """Sinaliza a parada e aguarda as threads (até `join_timeout` no total)."""
+        self._stop.set()
+        deadline = time.time() + self._join_timeout
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout=max(0.0, deadline - time.time()))
+
+    def __iter__(self) -> Iterator[PipelineItem]:
+        self._start()
+        output = len(self.stages)
+        try:
+            while True:
+                if self._should_stop is not None and self._should_stop():
+                    return
+                try:
+                    item = self._queues[output].get(timeout=_POLL_SECONDS)
+                except queue.Empty:
+                    continue
+                self._report_depth(output)
+                if item is _DONE:
+                    break
+                yield item
+
+            if self._source_error is not None:
+                raise self._source_error
+        finally:
+            self.close()
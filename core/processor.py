@@ -2,7 +2,7 @@ import concurrent.futures  # Adicionado para timeout granular
 import os
 from abc import ABC
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 # ORDEM IMPORTANTE: Importar apenas o pacote extractors
 # A ordem de registro é controlada pelo extractors/__init__.py
@@ -16,6 +16,7 @@ from core.empresa_matcher import (
     is_nome_nosso,
     pick_first_non_our_cnpj,
 )
+from core.extractor_router import get_router
 from core.extractors import EXTRACTOR_REGISTRY
 from core.interfaces import TextExtractionStrategy
 from core.models import (
@@ -24,8 +25,13 @@ from core.models import (
     DocumentData,
     InvoiceData,
     OtherDocumentData,
+    texto_snippet,
 )
+from core.supervised_executor import run_with_timeout
+from core.tracing import current_span, span, traced
 from strategies.fallback import SmartExtractionStrategy
+from strategies.pdf_session import PagedText
+from strategies.text_cache import get_text_cache
 
 
 class BaseInvoiceProcessor(ABC):
@@ -49,7 +55,10 @@ class BaseInvoiceProcessor(ABC):
                 Permite injeção de dependência para testes (DIP).
     """
     def __init__(self, reader: Optional[TextExtractionStrategy] = None):
-        self.reader = reader if reader is not None else SmartExtractionStrategy()
+        self.reader = (
+            reader if reader is not None
+            else SmartExtractionStrategy(text_cache=get_text_cache())
+        )
         self.last_extractor: Optional[str] = None
 
     def _get_extractor(self, text: str):
@@ -62,18 +71,90 @@ class BaseInvoiceProcessor(ABC):
             logger.debug(f"[Router] Ordem: {[cls.__name__ for cls in EXTRACTOR_REGISTRY]}")
             self._logged_order = True
         
-        for extractor_cls in EXTRACTOR_REGISTRY:
-            result = extractor_cls.can_handle(text)
-            if result:
-                self.last_extractor = extractor_cls.__name__
-                logger.info(f"[Router] {extractor_cls.__name__} selecionado")
-                return extractor_cls()
-            else:
-                logger.debug(f"[Router] {extractor_cls.__name__} recusou")
-        
+        # Roteador compilado: normaliza o texto uma vez e só consulta os
+        # can_handle cujas palavras-chave aparecem (mesma ordem do registro)
+        extractor_cls = get_router().route(text)
+        if extractor_cls is not None:
+            self.last_extractor = extractor_cls.__name__
+            logger.info(f"[Router] {extractor_cls.__name__} selecionado")
+            return extractor_cls()
+
         logger.warning("[Router] Nenhum extrator compatível encontrado")
         raise ValueError("Nenhum extrator compatível encontrado para este documento.")
 
+    def _page_budget(self) -> Optional[Tuple[int, int]]:
+        """(primeiras, últimas) páginas da leitura nativa, ou None se desativado."""
+        from config import settings
+
+        if not getattr(settings, "PDF_PAGE_BUDGET_ENABLED", False):
+            return None
+        if not isinstance(self.reader, SmartExtractionStrategy):
+            return None
+        first = getattr(settings, "PDF_PAGE_BUDGET_FIRST", 0)
+        last = getattr(settings, "PDF_PAGE_BUDGET_LAST", 0)
+        if first <= 0 and last <= 0:
+            return None
+        return first, last
+
+    def _route_and_extract(
+        self, raw_text: str, file_context: Dict[str, Any], extract_fn
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Roteia o texto e executa o extrator escolhido.
+
+        Texto parcial (`PagedText`, orçamento de páginas): o roteamento usa as
+        páginas já lidas. Extrator sem PAGE_SCOPE recebe o documento inteiro
+        (e é roteado de novo sobre ele, como na leitura completa); com
+        PAGE_SCOPE, recebe só essas páginas e o documento inteiro é lido
+        apenas se algum de seus REQUIRED_FIELDS vier vazio.
+
+        Returns:
+            (texto efetivamente usado, dados extraídos)
+        """
+        try:
+            with span("processor.route"):
+                try:
+                    extractor = self._get_extractor(raw_text)
+                except ValueError:
+                    if not isinstance(raw_text, PagedText) or raw_text.complete:
+                        raise
+                    raw_text = raw_text.full()
+                    extractor = self._get_extractor(raw_text)
+
+                if isinstance(raw_text, PagedText) and not raw_text.complete:
+                    scope = type(extractor).PAGE_SCOPE
+                    if scope is None:
+                        raw_text = raw_text.full()
+                        extractor = self._get_extractor(raw_text)
+                    else:
+                        raw_text = raw_text.with_pages(*scope)
+
+            # Timeout de 5 minutos para extração
+            with span("extractor.extract", extractor=type(extractor).__name__):
+                extracted_data = run_with_timeout(
+                    extract_fn, extractor, raw_text, file_context, timeout=300
+                )
+
+            if (
+                isinstance(raw_text, PagedText)
+                and not raw_text.complete
+                and any(not extracted_data.get(f) for f in type(extractor).REQUIRED_FIELDS)
+            ):
+                raw_text = raw_text.full()
+                with span("extractor.extract", extractor=type(extractor).__name__, pages="all"):
+                    extracted_data = run_with_timeout(
+                        extract_fn, extractor, raw_text, file_context, timeout=300
+                    )
+            return raw_text, extracted_data
+        finally:
+            if isinstance(raw_text, PagedText):
+                current_span().set(
+                    pages_parsed=len(raw_text.pages_read),
+                    pages_skipped=raw_text.page_count - len(raw_text.pages_read),
+                )
+                raw_text.close()
+
+    @traced("processor.process")
     def process(self, file_path: str) -> DocumentData:
         """
         Executa o pipeline de processamento para um único arquivo.
@@ -84,14 +165,22 @@ class BaseInvoiceProcessor(ABC):
         Returns:
             DocumentData: Objeto contendo os dados extraídos (InvoiceData, BoletoData, etc.).
         """
+        current_span().set(file=os.path.basename(file_path))
+
         # 1. Leitura com timeout granular (OCR pode travar)
+        page_budget = self._page_budget()
+
         def extract_text_with_reader(reader, file_path):
+            if page_budget is not None:
+                return reader.extract(file_path, page_budget=page_budget)
             return reader.extract(file_path)
 
         try:
-            with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-                future = executor.submit(extract_text_with_reader, self.reader, file_path)
-                raw_text = future.result(timeout=300)  # Timeout de 5 minutos para OCR/leitura
+            # Timeout de 5 minutos para OCR/leitura (não bloqueia após o prazo)
+            with span("processor.read"):
+                raw_text = run_with_timeout(
+                    extract_text_with_reader, self.reader, file_path, timeout=300
+                )
         except concurrent.futures.TimeoutError:
             print(f"Timeout atingido na extração de texto (OCR) para {file_path}")
             return InvoiceData(
@@ -100,6 +189,8 @@ class BaseInvoiceProcessor(ABC):
             )
 
         if not raw_text or "Falha" in raw_text:
+            if isinstance(raw_text, PagedText):
+                raw_text.close()
             # Retorna objeto vazio de NFSe por padrão
             return InvoiceData(
                 arquivo_origem=os.path.basename(file_path),
@@ -122,10 +213,9 @@ class BaseInvoiceProcessor(ABC):
                 return extractor.extract(text)
 
         try:
-            extractor = self._get_extractor(raw_text)
-            with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-                future = executor.submit(extract_with_extractor, extractor, raw_text, file_context)
-                extracted_data = future.result(timeout=300)  # Timeout de 5 minutos para extração
+            raw_text, extracted_data = self._route_and_extract(
+                raw_text, file_context, extract_with_extractor
+            )
 
             # Dados comuns PAF (aplicados a todos os documentos)
             now_iso = datetime.now().strftime('%Y-%m-%d')
@@ -145,7 +235,8 @@ class BaseInvoiceProcessor(ABC):
             # --- Regra de negócio (EMPRESA nossa) ---
             # Se existir um CNPJ do nosso cadastro no documento, ele define a coluna EMPRESA.
             # Qualquer outro CNPJ no documento tende a ser fornecedor/terceiro.
-            empresa_match = find_empresa_no_texto(raw_text or "")
+            with span("processor.empresa_match"):
+                empresa_match = find_empresa_no_texto(raw_text or "")
 
             if empresa_match:
                 # Padroniza para um identificador curto (ex: CSC, MASTER, OP11, RBC)
@@ -191,7 +282,7 @@ class BaseInvoiceProcessor(ABC):
             if extracted_data.get('tipo_documento') == 'BOLETO':
                 return BoletoData(
                     arquivo_origem=os.path.basename(file_path),
-                    texto_bruto=' '.join(raw_text.split())[:500],
+                    texto_bruto=texto_snippet(raw_text),
                     # Campos PAF comuns
                     **common_data,
                     # Campos básicos do boleto
@@ -213,7 +304,7 @@ class BaseInvoiceProcessor(ABC):
             elif extracted_data.get('tipo_documento') == 'DANFE':
                 return DanfeData(
                     arquivo_origem=os.path.basename(file_path),
-                    texto_bruto=' '.join(raw_text.split())[:500],
+                    texto_bruto=texto_snippet(raw_text),
                     # Campos PAF comuns
                     **common_data,
                     # Campos do DANFE
@@ -233,7 +324,7 @@ class BaseInvoiceProcessor(ABC):
                 # Contas de utilidade (energia, água, etc.) -> OtherDocumentData
                 return OtherDocumentData(
                     arquivo_origem=os.path.basename(file_path),
-                    texto_bruto=' '.join(raw_text.split())[:500],
+                    texto_bruto=texto_snippet(raw_text),
                     # Campos PAF comuns
                     **common_data,
                     fornecedor_nome=extracted_data.get('fornecedor_nome'),
@@ -247,7 +338,7 @@ class BaseInvoiceProcessor(ABC):
             elif extracted_data.get('tipo_documento') == 'OUTRO':
                 return OtherDocumentData(
                     arquivo_origem=os.path.basename(file_path),
-                    texto_bruto=' '.join(raw_text.split())[:500],
+                    texto_bruto=texto_snippet(raw_text),
                     # Campos PAF comuns
                     **common_data,
                     fornecedor_nome=extracted_data.get('fornecedor_nome'),
@@ -262,7 +353,7 @@ class BaseInvoiceProcessor(ABC):
                 # NFSe
                 return InvoiceData(
                     arquivo_origem=os.path.basename(file_path),
-                    texto_bruto=' '.join(raw_text.split())[:500],
+                    texto_bruto=texto_snippet(raw_text),
                     # Campos PAF comuns
                     **common_data,
                     # Campos básicos da NFSe
@@ -288,11 +379,11 @@ class BaseInvoiceProcessor(ABC):
             print(f"Timeout atingido na extração dos dados para {file_path}")
             return InvoiceData(
                 arquivo_origem=os.path.basename(file_path),
-                texto_bruto=' '.join(raw_text.split())[:500] + " [Timeout na extração dos dados]"
+                texto_bruto=texto_snippet(raw_text) + " [Timeout na extração dos dados]"
             )
         except ValueError as e:
             print(f"Erro ao processar {file_path}: {e}")
             return InvoiceData(
                 arquivo_origem=os.path.basename(file_path),
-                texto_bruto=' '.join(raw_text.split())[:500]  # Remove whitespace, then take 500 chars
+                texto_bruto=texto_snippet(raw_text)
             )
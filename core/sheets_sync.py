@@ -0,0 +1,557 @@
+"""
+Sincronização incremental de linhas com uma aba do Google Sheets.
+
+Os exportadores faziam `append_rows` de tudo a cada execução: reexportar o
+mesmo relatório duplicava as linhas da planilha, e exportações grandes
+esbarravam na cota da API (requisições por minuto), contornada só com
+retries.
+
+O `SheetSync` trata a aba como uma tabela com chave:
+    - a última coluna (`ID`) guarda a chave da linha (`sheet_row_key`:
+      batch_id e/ou arquivo_origem);
+    - a aba é lida UMA vez (`get_all_values`) para mapear chave -> linha;
+    - cada linha a exportar é comparada com o hash da versão enviada na
+      sincronização anterior (`SheetSyncState`, SQLite): chave nova vira
+      inserção, hash diferente vira atualização, hash igual é ignorado;
+    - inserções saem em `append_rows` e atualizações em `batch_update`
+      (vários intervalos por requisição, linhas consecutivas no mesmo
+      intervalo), até `chunk_rows` linhas por chamada;
+    - toda chamada passa pelo `TokenBucket`, e 429/5xx são repetidos com
+      espera crescente;
+    - o hash de cada linha é gravado logo após a chamada que a enviou: uma
+      execução interrompida retoma enviando só o que faltou.
+
+Linhas antigas da aba (de antes da coluna ID) podem ser adotadas: com
+`legacy_columns`, uma linha sem ID cujas colunas indicadas coincidem com as
+de uma inserção é atualizada no lugar (recebendo o ID) em vez de duplicada.
+
+Example:
+    >>> sync = SheetSync(worksheet, ANEXOS_HEADERS, state=SheetSyncState(path))
+    >>> result = sync.sync((sheet_row_key(doc), doc.to_anexos_row()) for doc in docs)
+    >>> result.inserted, result.updated, result.unchanged
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+try:
+    from gspread.exceptions import APIError
+except ImportError:
+    APIError = None
+
+logger = logging.getLogger(__name__)
+
+# Cabeçalho da coluna de chave (última coluna da aba)
+KEY_HEADER = "ID"
+
+# Respostas da API que valem nova tentativa (cota excedida / instabilidade)
+RETRYABLE_STATUS = frozenset({429, 500, 502, 503})
+
+# Arquivos auxiliares do modo WAL (removidos junto com o banco)
+_WAL_SUFFIXES = ("-wal", "-shm")
+
+
+def sheet_row_key(doc: Any) -> str:
+    """
+    Chave da linha de um documento na planilha.
+
+    batch_id e arquivo_origem, sem repetição: lotes (arquivo_origem = batch_id)
+    ficam só com o batch_id, avisos só com o arquivo_origem e documentos do
+    relatório consolidado com `batch_id/arquivo`.
+    """
+    parts: List[str] = []
+    for value in (getattr(doc, "batch_id", None), getattr(doc, "arquivo_origem", None)):
+        if value and str(value) not in parts:
+            parts.append(str(value))
+    return "/".join(parts)
+
+
+def row_hash(row: Sequence[Any]) -> str:
+    """Hash do conteúdo de uma linha (detecção de alterações)."""
+    payload = json.dumps(list(row), ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def column_letter(index: int) -> str:
+    """Letra da coluna em notação A1 (1 -> A, 27 -> AA)."""
+    letters = ""
+    while index > 0:
+        index, rest = divmod(index - 1, 26)
+        letters = chr(ord("A") + rest) + letters
+    return letters
+
+
+def _status_code(exc: Exception) -> Optional[int]:
+    """Código HTTP de um erro da API do gspread (None para outros erros)."""
+    if APIError is None or not isinstance(exc, APIError):
+        return None
+    code = getattr(exc, "code", None)
+    if code is None:
+        code = getattr(getattr(exc, "response", None), "status_code", None)
+    return code
+
+
+class TokenBucket:
+    """
+    Limitador de requisições por minuto (token bucket).
+
+    Cada requisição consome uma ficha; as fichas são repostas continuamente
+    à taxa configurada, até `capacity` (rajada permitida). Sem ficha
+    disponível, `acquire` dorme o tempo exato até a próxima reposição.
+
+    Args:
+        requests_per_minute: Taxa sustentada
+        capacity: Rajada máxima (default: 10 s de requisições, mínimo 1)
+        clock / sleep: Injetáveis para testes
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float,
+        capacity: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if requests_per_minute <= 0:
+            raise ValueError("requests_per_minute deve ser positivo")
+        self.rate = requests_per_minute / 60.0
+        self.capacity = capacity or max(1, int(requests_per_minute // 6))
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(self.capacity)
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self) -> float:
+        """Consome uma ficha, esperando se preciso. Retorna os segundos esperados."""
+        waited = 0.0
+        with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                wait = (1 - self._tokens) / self.rate
+                self._sleep(wait)
+                waited += wait
+
+    def drain(self) -> None:
+        """Esvazia o balde (após um 429, a cota já está esgotada do lado da API)."""
+        with self._lock:
+            self._refill()
+            self._tokens = 0.0
+
+
+class SheetSyncState:
+    """
+    Hash da última versão enviada de cada linha, por aba (SQLite, WAL).
+
+    Args:
+        path: Caminho do arquivo SQLite.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS sheet_rows (
+                    sheet TEXT NOT NULL,
+                    row_key TEXT NOT NULL,
+                    row_hash TEXT NOT NULL,
+                    PRIMARY KEY (sheet, row_key)
+                ) WITHOUT ROWID
+                """
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        """Fecha a conexão (reaberta sob demanda)."""
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+        self._conn = None
+
+    def hashes(self, sheet: str) -> Dict[str, str]:
+        """Chave -> hash das linhas já enviadas para a aba."""
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT row_key, row_hash FROM sheet_rows WHERE sheet = ?", (sheet,)
+            )
+            return dict(rows.fetchall())
+
+    def record(self, sheet: str, items: Iterable[Tuple[str, str]]) -> None:
+        """Grava (chave, hash) das linhas enviadas, em uma transação."""
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO sheet_rows (sheet, row_key, row_hash) VALUES (?, ?, ?)",
+                    ((sheet, key, digest) for key, digest in items),
+                )
+
+    def clear(self, sheet: str) -> None:
+        """Esquece o estado de uma aba (a próxima sincronização reenvia tudo)."""
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM sheet_rows WHERE sheet = ?", (sheet,))
+
+    def delete(self) -> None:
+        """Fecha a conexão e remove o banco (e os arquivos do WAL)."""
+        with self._lock:
+            self.close()
+            for path in [self.path] + [
+                self.path.with_name(self.path.name + suffix) for suffix in _WAL_SUFFIXES
+            ]:
+                if path.exists():
+                    path.unlink()
+
+
+@dataclass
+class SyncPlan:
+    """Diferença entre as linhas a exportar e o conteúdo da aba."""
+
+    # (chave, linha) a acrescentar no fim da aba
+    inserts: List[Tuple[str, List[Any]]] = field(default_factory=list)
+    # (nº da linha na aba, chave, linha) a sobrescrever
+    updates: List[Tuple[int, str, List[Any]]] = field(default_factory=list)
+    # Linhas antigas (sem ID) atualizadas no lugar: recebem também o ID
+    adopted: List[Tuple[int, str, List[Any]]] = field(default_factory=list)
+    unchanged: int = 0
+
+    @property
+    def empty(self) -> bool:
+        return not (self.inserts or self.updates or self.adopted)
+
+
+@dataclass
+class SyncResult:
+    """Resumo de uma sincronização."""
+
+    inserted: int = 0
+    updated: int = 0
+    adopted: int = 0
+    unchanged: int = 0
+    requests: int = 0
+
+
+class SheetSync:
+    """
+    Sincroniza linhas com chave em uma aba do Google Sheets.
+
+    Args:
+        worksheet: Worksheet do gspread (ou objeto com a mesma interface:
+            `title`, `col_count`, `get_all_values`, `batch_update`,
+            `append_rows`, `add_cols`)
+        headers: Cabeçalhos das colunas de dados (a coluna ID vem depois)
+        state: Hashes da última sincronização (None: toda linha existente é
+            reenviada, nenhuma é duplicada)
+        bucket: Limitador de requisições (default: SHEETS_REQUESTS_PER_MINUTE)
+        legacy_columns: Cabeçalhos usados para reconhecer linhas sem ID
+        chunk_rows: Máximo de linhas por requisição
+        key_header: Cabeçalho da coluna de chave
+        max_retries: Tentativas por requisição em 429/5xx
+    """
+
+    def __init__(
+        self,
+        worksheet: Any,
+        headers: Sequence[str],
+        state: Optional[SheetSyncState] = None,
+        bucket: Optional[TokenBucket] = None,
+        legacy_columns: Sequence[str] = (),
+        chunk_rows: int = 500,
+        key_header: str = KEY_HEADER,
+        max_retries: int = 5,
+        value_input_option: str = "USER_ENTERED",
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if bucket is None:
+            from config.settings import SHEETS_REQUESTS_PER_MINUTE
+            bucket = TokenBucket(SHEETS_REQUESTS_PER_MINUTE, sleep=sleep)
+
+        self.worksheet = worksheet
+        self.headers = list(headers)
+        self.state = state
+        self.bucket = bucket
+        self.legacy_columns = list(legacy_columns)
+        self.chunk_rows = max(1, chunk_rows)
+        self.key_header = key_header
+        self.max_retries = max_retries
+        self.value_input_option = value_input_option
+        self._sleep = sleep
+        self.requests = 0
+
+        # Preenchidos por read_sheet()
+        self._loaded = False
+        self._key_col = len(self.headers)          # índice (base 0) da coluna ID
+        self._header_missing = False
+        self._empty = False
+        self._rows_by_key: Dict[str, int] = {}
+        self._legacy_rows: Dict[Tuple[str, ...], List[int]] = {}
+
+    @property
+    def sheet_id(self) -> str:
+        """Identificador da aba no estado de sincronização."""
+        spreadsheet_id = getattr(self.worksheet, "spreadsheet_id", "") or ""
+        return f"{spreadsheet_id}/{self.worksheet.title}"
+
+    # ------------------------------------------------------------------
+    # Requisições
+    # ------------------------------------------------------------------
+
+    def _call(self, method: Callable, *args, **kwargs) -> Any:
+        """Executa uma requisição respeitando o limitador, com retry em 429/5xx."""
+        for attempt in range(self.max_retries):
+            self.bucket.acquire()
+            try:
+                result = method(*args, **kwargs)
+                self.requests += 1
+                return result
+            except Exception as e:
+                status = _status_code(e)
+                if status not in RETRYABLE_STATUS or attempt == self.max_retries - 1:
+                    raise
+                if status == 429:
+                    self.bucket.drain()
+                wait_time = min(2 ** attempt, 32)
+                logger.warning(
+                    f"⚠️ Google Sheets respondeu {status} "
+                    f"(tentativa {attempt + 1}/{self.max_retries}). Aguardando {wait_time}s..."
+                )
+                self._sleep(wait_time)
+
+    # ------------------------------------------------------------------
+    # Leitura e diferença
+    # ------------------------------------------------------------------
+
+    def read_sheet(self) -> None:
+        """Lê a aba (uma requisição) e mapeia chave -> nº da linha."""
+        values = self._call(self.worksheet.get_all_values) or []
+        header = [str(cell).strip() for cell in values[0]] if values else []
+        self._empty = not any(header)
+
+        if self.key_header in header:
+            self._key_col = header.index(self.key_header)
+            self._header_missing = False
+        else:
+            # Coluna ID logo após o último cabeçalho preenchido (sem sobrescrever
+            # colunas extras criadas à mão na planilha)
+            used = len(header)
+            while used and not header[used - 1]:
+                used -= 1
+            self._key_col = max(used, len(self.headers))
+            self._header_missing = True
+
+        legacy_idx = [header.index(name) for name in self.legacy_columns if name in header]
+
+        self._rows_by_key = {}
+        self._legacy_rows = {}
+        for number, row in enumerate(values[1:], start=2):
+            key = str(row[self._key_col]).strip() if self._key_col < len(row) else ""
+            if key:
+                self._rows_by_key.setdefault(key, number)
+            elif legacy_idx and any(str(cell).strip() for cell in row):
+                fingerprint = self._fingerprint(row, legacy_idx)
+                if fingerprint:
+                    self._legacy_rows.setdefault(fingerprint, []).append(number)
+
+        self._loaded = True
+
+    @staticmethod
+    def _normalize(value: Any) -> str:
+        """Valor comparável entre o que é enviado e o que a planilha exibe."""
+        text = str(value).strip().casefold()
+        if text.isdigit():
+            # USER_ENTERED transforma "000123" em 123
+            text = text.lstrip("0") or "0"
+        return text
+
+    def _fingerprint(self, row: Sequence[Any], indexes: Sequence[int]) -> Optional[Tuple[str, ...]]:
+        values = tuple(self._normalize(row[i]) if i < len(row) else "" for i in indexes)
+        return values if any(values) else None
+
+    def plan(self, items: Iterable[Tuple[str, Sequence[Any]]]) -> SyncPlan:
+        """
+        Calcula inserções e atualizações para as linhas (chave, valores).
+
+        Chaves repetidas na entrada ficam com a última linha.
+        """
+        if not self._loaded:
+            self.read_sheet()
+
+        known = self.state.hashes(self.sheet_id) if self.state else {}
+        legacy_idx = [self.headers.index(name) for name in self.legacy_columns if name in self.headers]
+        legacy_rows = {fp: list(numbers) for fp, numbers in self._legacy_rows.items()}
+
+        rows: Dict[str, List[Any]] = {}
+        for key, row in items:
+            if not key:
+                logger.warning(f"⚠️ Linha sem chave ignorada na sincronização: {list(row)[:3]}")
+                continue
+            rows[key] = list(row)
+
+        plan = SyncPlan()
+        for key, row in rows.items():
+            number = self._rows_by_key.get(key)
+            if number is not None:
+                if known.get(key) == row_hash(row):
+                    plan.unchanged += 1
+                else:
+                    plan.updates.append((number, key, row))
+                continue
+
+            fingerprint = self._fingerprint(row, legacy_idx) if legacy_rows else None
+            candidates = legacy_rows.get(fingerprint) if fingerprint else None
+            if candidates:
+                plan.adopted.append((candidates.pop(0), key, row))
+            else:
+                plan.inserts.append((key, row))
+
+        return plan
+
+    # ------------------------------------------------------------------
+    # Envio
+    # ------------------------------------------------------------------
+
+    def _record(self, rows: Iterable[Tuple[str, Sequence[Any]]]) -> None:
+        if self.state is not None:
+            self.state.record(self.sheet_id, [(key, row_hash(row)) for key, row in rows])
+
+    def _ensure_key_column(self) -> None:
+        """Garante espaço na grade para a coluna ID (planilhas criadas sem ela)."""
+        col_count = getattr(self.worksheet, "col_count", None)
+        if col_count is not None and col_count < self._key_col + 1:
+            self._call(self.worksheet.add_cols, self._key_col + 1 - col_count)
+
+    def _range(self, first_row: int, last_row: int, first_col: int, last_col: int) -> str:
+        return f"{column_letter(first_col)}{first_row}:{column_letter(last_col)}{last_row}"
+
+    def _update_ranges(
+        self, updates: List[Tuple[int, str, List[Any]]], with_key: bool
+    ) -> List[Dict[str, Any]]:
+        """Intervalos do batch_update; linhas consecutivas saem em um só intervalo."""
+        width = len(self.headers)
+        ranges: List[Dict[str, Any]] = []
+        run: List[Tuple[int, str, List[Any]]] = []
+
+        def flush():
+            if run:
+                ranges.append({
+                    "range": self._range(run[0][0], run[-1][0], 1, width),
+                    "values": [row[:width] + [""] * (width - len(row)) for _, _, row in run],
+                })
+                run.clear()
+
+        for item in sorted(updates, key=lambda entry: entry[0]):
+            if run and item[0] != run[-1][0] + 1:
+                flush()
+            run.append(item)
+        flush()
+
+        if with_key:
+            key_col = self._key_col + 1
+            for number, key, _ in updates:
+                ranges.append({
+                    "range": self._range(number, number, key_col, key_col),
+                    "values": [[key]],
+                })
+        return ranges
+
+    def _insert_row(self, key: str, row: List[Any]) -> List[Any]:
+        """Linha completa para inserção: dados, colunas extras vazias e ID."""
+        values = row[:self._key_col] + [""] * (self._key_col - len(row))
+        return values + [key]
+
+    def apply(self, plan: SyncPlan) -> SyncResult:
+        """Envia o plano em poucas requisições, gravando o progresso a cada uma."""
+        result = SyncResult(unchanged=plan.unchanged)
+        start_requests = self.requests
+
+        if not plan.empty and self._header_missing:
+            self._ensure_key_column()
+            header = [{
+                "range": self._range(1, 1, self._key_col + 1, self._key_col + 1),
+                "values": [[self.key_header]],
+            }]
+            if self._empty:
+                # Aba vazia: grava o cabeçalho completo
+                header = [{
+                    "range": self._range(1, 1, 1, self._key_col + 1),
+                    "values": [self._insert_row(self.key_header, self.headers)],
+                }]
+            self._call(self.worksheet.batch_update, header, value_input_option=self.value_input_option)
+            self._header_missing = False
+            self._empty = False
+
+        # Atualizações (linhas com ID) e adoções (linhas antigas, recebem o ID)
+        pending = [(entry, False) for entry in plan.updates] + [(entry, True) for entry in plan.adopted]
+        for start in range(0, len(pending), self.chunk_rows):
+            chunk = pending[start:start + self.chunk_rows]
+            updates = [entry for entry, adopt in chunk if not adopt]
+            adopted = [entry for entry, adopt in chunk if adopt]
+            data = self._update_ranges(updates, with_key=False)
+            data += self._update_ranges(adopted, with_key=True)
+            self._call(self.worksheet.batch_update, data, value_input_option=self.value_input_option)
+            self._record((key, row) for _, key, row in updates + adopted)
+            for number, key, _ in adopted:
+                self._rows_by_key[key] = number
+            result.updated += len(updates)
+            result.adopted += len(adopted)
+
+        # Inserções no fim da aba
+        for start in range(0, len(plan.inserts), self.chunk_rows):
+            chunk = plan.inserts[start:start + self.chunk_rows]
+            self._call(
+                self.worksheet.append_rows,
+                [self._insert_row(key, row) for key, row in chunk],
+                value_input_option=self.value_input_option,
+            )
+            self._record(chunk)
+            result.inserted += len(chunk)
+            logger.info(
+                f"📤 {result.inserted}/{len(plan.inserts)} linhas inseridas em '{self.worksheet.title}'"
+            )
+
+        # Linhas inseridas/adotadas mudam o mapa da aba: próxima sincronização relê
+        self._loaded = False
+        result.requests = self.requests - start_requests
+        return result
+
+    def sync(self, items: Iterable[Tuple[str, Sequence[Any]]]) -> SyncResult:
+        """Lê a aba, calcula a diferença e envia. Retorna o resumo."""
+        start_requests = self.requests
+        self.read_sheet()
+        result = self.apply(self.plan(items))
+        result.requests = self.requests - start_requests
+        logger.info(
+            f"✅ Sincronização '{self.worksheet.title}': {result.inserted} inseridas, "
+            f"{result.updated} atualizadas, {result.adopted} adotadas, "
+            f"{result.unchanged} sem alteração ({result.requests} requisições)"
+        )
+        return result
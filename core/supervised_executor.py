@@ -0,0 +1,493 @@
+"""
+Executor Supervisionado em Processo Dedicado.
+
+Os timeouts originais (`ThreadPoolExecutor(max_workers=1)` + `future.result(timeout)`)
+não interrompem nada: a thread travada em pdfminer/Tesseract continua consumindo
+CPU e o `__exit__` do executor espera por ela, bloqueando o chamador mesmo
+depois do "timeout".
+
+Este módulo executa a tarefa em um processo worker persistente:
+- Se a resposta não chega dentro do prazo, o worker é encerrado (SIGTERM e,
+  se necessário, SIGKILL no grupo de processos, levando junto o Tesseract)
+  e `concurrent.futures.TimeoutError` é levantado, como antes.
+- O worker é reciclado após N tarefas para limitar crescimento de memória.
+- Encerramentos e reciclagens são contabilizados em `core.metrics`.
+- Contadores e histogramas registrados pela tarefa (`core.metrics`) voltam
+  com o resultado e são somados às métricas do processo pai.
+- Spans registrados pela tarefa (`core.tracing`) voltam com o resultado e
+  entram na coleta ativa do processo pai.
+
+Chamadas aninhadas (ex: timeout por arquivo dentro de um lote já supervisionado)
+só abrem um novo worker se o prazo interno for menor que o tempo restante do
+supervisor externo; caso contrário rodam inline, pois o externo já encerraria
+o processo antes.
+
+Uso:
+    from core.supervised_executor import SupervisedProcessExecutor
+
+    executor = SupervisedProcessExecutor(target=processor, name="file")
+    doc = executor.call("process", "nota.pdf", timeout=90)
+"""
+
+import atexit
+import contextvars
+import logging
+import multiprocessing
+import os
+import pickle
+import signal
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from core.exceptions import WorkerCrashedError
+
+logger = logging.getLogger(__name__)
+
+# Limite padrão de tarefas por worker antes da reciclagem
+DEFAULT_MAX_TASKS_PER_WORKER = 50
+
+# Tempo de espera entre SIGTERM e SIGKILL ao encerrar um worker
+KILL_GRACE_SECONDS = 2.0
+
+# Prazo (time.monotonic) da tarefa em execução neste processo, se for um worker
+_current_deadline: Optional[float] = None
+
+# Executores vivos neste processo (para encerrar workers na saída)
+_live_executors: "weakref.WeakSet[SupervisedProcessExecutor]" = weakref.WeakSet()
+
+
+def remaining_time() -> Optional[float]:
+    """
+    Tempo restante (segundos) até o prazo do supervisor deste processo.
+
+    Returns:
+        None se o processo atual não está rodando uma tarefa supervisionada.
+    """
+    if _current_deadline is None:
+        return None
+    return _current_deadline - time.monotonic()
+
+
+def run_with_timeout(func: Callable[..., Any], *args: Any, timeout: float, **kwargs: Any) -> Any:
+    """
+    Executa `func` com timeout em thread, sem bloquear o chamador após o prazo.
+
+    Usado onde a tarefa não pode sair do processo (ex: objetos injetados em
+    testes). Dentro de um worker supervisionado cujo prazo vence antes,
+    executa inline: o supervisor externo encerra o processo se travar.
+
+    Raises:
+        concurrent.futures.TimeoutError: Se o prazo for excedido.
+    """
+    restante = remaining_time()
+    if restante is not None and restante <= timeout:
+        return func(*args, **kwargs)
+
+    executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        # Copia o contexto: spans da tarefa continuam ligados ao span do chamador
+        context = contextvars.copy_context()
+        future = executor.submit(context.run, func, *args, **kwargs)
+        return future.result(timeout=timeout)
+    finally:
+        # Não espera a thread travada (ela termina sozinha ou com o processo)
+        executor.shutdown(wait=False)
+
+
+def _record_event(event: str, executor_name: str) -> None:
+    """Registra kill/recycle (dentro de um worker, chega ao pai via `counter_deltas`)."""
+    from core.metrics import IngestionMetrics
+
+    metrics = IngestionMetrics()
+    if event == "kill":
+        metrics.record_worker_killed(executor_name)
+    elif event == "recycle":
+        metrics.record_worker_recycled(executor_name)
+
+
+def _picklable_exception(exc: BaseException) -> BaseException:
+    """Garante que a exceção possa voltar ao processo pai."""
+    try:
+        pickle.loads(pickle.dumps(exc))
+        return exc
+    except Exception:
+        return RuntimeError(f"{type(exc).__name__}: {exc}")
+
+
+def _shutdown_live_executors() -> None:
+    """Encerra todos os workers vivos deste processo."""
+    for executor in list(_live_executors):
+        try:
+            executor.shutdown()
+        except Exception:
+            pass
+
+
+def _on_worker_sigterm(signum, frame) -> None:
+    """SIGTERM no worker: encerra workers aninhados antes de sair."""
+    _shutdown_live_executors()
+    os._exit(1)
+
+
+def _worker_main(conn: Any, target: Any, parent_conn: Any = None) -> None:
+    """Loop do processo worker: recebe tarefas, executa e devolve o resultado."""
+    global _current_deadline
+
+    from core.metrics import MetricsCollector
+    from core.tracing import collect_spans
+
+    collector = MetricsCollector()
+    if parent_conn is not None:
+        # Com fork, a ponta do pai é herdada; fechá-la garante EOF se o pai morrer
+        parent_conn.close()
+    # Ctrl+C é tratado pelo processo pai (que encerra o worker)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if hasattr(os, "setpgrp"):
+        # Grupo próprio: o pai consegue matar também subprocessos (tesseract)
+        os.setpgrp()
+        signal.signal(signal.SIGTERM, _on_worker_sigterm)
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            break
+        if message is None:
+            break
+
+        func, args, kwargs, timeout = message
+        antes = collector.snapshot_counters()
+        histogramas_antes = collector.snapshot_histograms()
+        _current_deadline = time.monotonic() + timeout
+        with collect_spans() as trace:
+            try:
+                fn = getattr(target, func) if isinstance(func, str) else func
+                payload: Tuple[str, Any] = ("ok", fn(*args, **kwargs))
+            except BaseException as e:  # noqa: BLE001 - devolve qualquer falha ao pai
+                payload = ("err", _picklable_exception(e))
+            finally:
+                _current_deadline = None
+
+        # Contadores, histogramas e spans registrados durante a tarefa
+        # (cache, kills aninhados, tempos por página de OCR...)
+        deltas = collector.counter_deltas(antes)
+        histogramas = collector.histogram_deltas(histogramas_antes)
+        spans = trace.to_dicts()
+        try:
+            conn.send((payload[0], payload[1], deltas, histogramas, spans))
+        except Exception as e:
+            conn.send((
+                "err", WorkerCrashedError(f"Resultado não serializável: {e}"),
+                deltas, histogramas, spans,
+            ))
+
+    _shutdown_live_executors()
+
+
+def _mp_context() -> Any:
+    """Prefere fork (herda estado já importado); spawn onde não há fork (Windows)."""
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context("spawn")
+
+
+class SupervisedProcessExecutor:
+    """
+    Executa tarefas em um processo worker que pode ser encerrado no timeout.
+
+    O worker recebe `target` uma única vez (na criação) e as tarefas chegam
+    como nome de método de `target` ou como função serializável. Um executor
+    mantém no máximo um worker; chamadas concorrentes são serializadas.
+
+    Args:
+        target: Objeto cujos métodos serão chamados no worker (opcional).
+        name: Nome usado nos logs e no label `executor` das métricas.
+        max_tasks_per_worker: Tarefas antes de reciclar o worker
+            (default: settings.WORKER_MAX_TASKS).
+    """
+
+    def __init__(
+        self,
+        target: Any = None,
+        name: str = "default",
+        max_tasks_per_worker: Optional[int] = None,
+    ):
+        if max_tasks_per_worker is None:
+            from config import settings
+
+            max_tasks_per_worker = int(
+                getattr(settings, "WORKER_MAX_TASKS", DEFAULT_MAX_TASKS_PER_WORKER)
+            )
+
+        self.target = target
+        self.name = name
+        self.max_tasks_per_worker = max(1, max_tasks_per_worker)
+
+        self._lock = threading.Lock()
+        self._process: Optional[Any] = None
+        self._conn: Optional[Any] = None
+        self._owner_pid = os.getpid()
+        self._tasks_done = 0
+
+        self.kills = 0
+        self.recycles = 0
+
+        _live_executors.add(self)
+
+    # ------------------------------------------------------------------
+    # Serialização / fork
+    # ------------------------------------------------------------------
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Handles de processo não viajam para outros processos."""
+        state = self.__dict__.copy()
+        state["_lock"] = None
+        state["_process"] = None
+        state["_conn"] = None
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._owner_pid = os.getpid()
+        self._tasks_done = 0
+        _live_executors.add(self)
+
+    def _reset_if_forked(self) -> None:
+        """Após fork, o worker herdado pertence ao processo pai: descarta."""
+        if self._owner_pid != os.getpid():
+            self._process = None
+            self._conn = None
+            self._tasks_done = 0
+            self._owner_pid = os.getpid()
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida do worker
+    # ------------------------------------------------------------------
+
+    @property
+    def worker_pid(self) -> Optional[int]:
+        """PID do worker atual (None se não há worker vivo)."""
+        if self._process is not None and self._process.is_alive():
+            return self._process.pid
+        return None
+
+    def _ensure_worker(self) -> None:
+        self._reset_if_forked()
+        if self._process is not None and self._process.is_alive():
+            return
+
+        self._discard_worker()
+        ctx = _mp_context()
+        parent_conn, child_conn = ctx.Pipe(duplex=True)
+        # daemon=False: workers de lote precisam criar workers de arquivo
+        herdada = parent_conn if ctx.get_start_method() == "fork" else None
+        process = ctx.Process(
+            target=_worker_main,
+            args=(child_conn, self.target, herdada),
+            name=f"supervised-{self.name}",
+            daemon=False,
+        )
+        process.start()
+        child_conn.close()
+
+        self._process = process
+        self._conn = parent_conn
+        self._tasks_done = 0
+        logger.debug(f"[Supervisor:{self.name}] worker iniciado (pid={process.pid})")
+
+    def _discard_worker(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+        self._conn = None
+        self._process = None
+
+    def _kill_worker(self) -> None:
+        """Encerra o worker atual (e seu grupo de processos, no POSIX)."""
+        process = self._process
+        if process is None:
+            return
+
+        pid = process.pid
+        try:
+            if hasattr(os, "killpg"):
+                try:
+                    os.killpg(pid, signal.SIGTERM)
+                except (ProcessLookupError, PermissionError):
+                    process.terminate()
+            else:
+                process.terminate()
+
+            process.join(KILL_GRACE_SECONDS)
+            if process.is_alive():
+                if hasattr(os, "killpg"):
+                    try:
+                        os.killpg(pid, signal.SIGKILL)
+                    except (ProcessLookupError, PermissionError):
+                        process.kill()
+                else:
+                    process.kill()
+                process.join(KILL_GRACE_SECONDS)
+        finally:
+            self._discard_worker()
+
+    def _stop_worker(self) -> None:
+        """Encerramento gracioso (pede para sair; força se não responder)."""
+        process = self._process
+        if process is None:
+            return
+        try:
+            if self._conn is not None:
+                self._conn.send(None)
+            process.join(KILL_GRACE_SECONDS)
+        except Exception:
+            pass
+        if process.is_alive():
+            self._kill_worker()
+        else:
+            self._discard_worker()
+
+    def shutdown(self) -> None:
+        """Encerra o worker (se houver). O executor pode ser reutilizado depois."""
+        if self._owner_pid != os.getpid():
+            return
+        lock = self._lock
+        if lock is None:
+            return
+        with lock:
+            self._stop_worker()
+
+    def terminate(self) -> None:
+        """
+        Mata o worker imediatamente, mesmo com uma tarefa em andamento.
+
+        Não espera o lock: a chamada em andamento (em outra thread) recebe
+        `WorkerCrashedError` e faz a limpeza. Usado ao abandonar tarefas
+        (ex: consumidor de `iter_batches_parallel` parou de iterar).
+        """
+        process = self._process
+        if process is None or self._owner_pid != os.getpid():
+            return
+        if hasattr(os, "killpg"):
+            try:
+                # Grupo do worker (leva junto o Tesseract)
+                os.killpg(process.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError, OSError):
+                pass
+        try:
+            # Worker recém-criado pode ainda não ter o próprio grupo
+            process.kill()
+        except (ProcessLookupError, PermissionError, OSError, ValueError):
+            pass
+
+    def __del__(self) -> None:
+        # Pede ao worker para sair sem esperar (coleta de lixo não deve bloquear)
+        try:
+            if self._conn is not None and self._owner_pid == os.getpid():
+                self._conn.send(None)
+                self._conn.close()
+        except Exception:
+            pass
+
+    def __enter__(self) -> "SupervisedProcessExecutor":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.shutdown()
+
+    # ------------------------------------------------------------------
+    # Execução
+    # ------------------------------------------------------------------
+
+    def call(
+        self,
+        func: Union[str, Callable[..., Any]],
+        *args: Any,
+        timeout: float,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Executa `func(*args, **kwargs)` no worker com prazo máximo.
+
+        Args:
+            func: Nome de método de `target` ou função serializável.
+            *args: Argumentos posicionais (serializáveis).
+            timeout: Prazo em segundos; ao exceder, o worker é encerrado.
+            **kwargs: Argumentos nomeados (serializáveis).
+
+        Returns:
+            O valor retornado pela tarefa.
+
+        Raises:
+            concurrent.futures.TimeoutError: Se o prazo for excedido.
+            WorkerCrashedError: Se o worker morrer sem responder.
+            Exception: Qualquer exceção levantada pela tarefa.
+        """
+        restante = remaining_time()
+        if restante is not None and restante <= timeout:
+            # O supervisor externo encerra este processo antes do nosso prazo
+            fn = getattr(self.target, func) if isinstance(func, str) else func
+            return fn(*args, **kwargs)
+
+        with self._lock:
+            self._ensure_worker()
+            assert self._conn is not None and self._process is not None
+
+            try:
+                self._conn.send((func, args, kwargs, timeout))
+            except (BrokenPipeError, EOFError, OSError) as e:
+                self._kill_worker()
+                raise WorkerCrashedError(f"Worker {self.name} indisponível: {e}") from e
+
+            if not self._conn.poll(timeout):
+                pid = self._process.pid
+                self._kill_worker()
+                self.kills += 1
+                _record_event("kill", self.name)
+                logger.error(
+                    f"⏱️ [Supervisor:{self.name}] worker pid={pid} encerrado após {timeout}s"
+                )
+                raise FuturesTimeoutError(f"Tarefa excedeu {timeout}s (worker encerrado)")
+
+            try:
+                status, payload, deltas, histogramas, spans = self._conn.recv()
+            except (EOFError, OSError) as e:
+                exitcode = self._process.exitcode
+                self._kill_worker()
+                raise WorkerCrashedError(
+                    f"Worker {self.name} morreu durante a tarefa (exitcode={exitcode})"
+                ) from e
+
+            if deltas or histogramas:
+                from core.metrics import MetricsCollector
+
+                MetricsCollector().merge_counter_deltas(deltas)
+                MetricsCollector().merge_histogram_deltas(histogramas)
+            if spans:
+                from core.tracing import adopt_spans
+
+                adopt_spans(spans)
+
+            self._tasks_done += 1
+            if self._tasks_done >= self.max_tasks_per_worker:
+                self._stop_worker()
+                self.recycles += 1
+                _record_event("recycle", self.name)
+                logger.debug(
+                    f"[Supervisor:{self.name}] worker reciclado após "
+                    f"{self.max_tasks_per_worker} tarefa(s)"
+                )
+
+        if status == "err":
+            raise payload
+        return payload
+
+
+atexit.register(_shutdown_live_executors)
@@ -0,0 +1,340 @@
+"""
+Spans de tempo por estágio (tracing leve).
+
+`IngestionMetrics` só recebe números agregados (duração do lote, do fetch),
+e `BatchResult.processing_time` é um valor único: não dá para saber se um
+lote lento gastou o tempo na leitura nativa, nas tabelas, no complemento
+OCR, no roteamento ou em um extrator específico.
+
+Este módulo registra spans (nome, início, duração, atributos e span pai)
+nos pontos quentes do pipeline:
+
+    batch.process
+    ├── batch.duplicate_index
+    ├── file.xml / file.pdf
+    │   └── processor.process
+    │       ├── processor.read
+    │       │   └── strategy.smart
+    │       │       ├── strategy.native / strategy.table / strategy.ocr
+    │       │       └── strategy.hybrid_ocr
+    │       │           └── strategy.ocr_regions / strategy.ocr
+    │       ├── processor.route
+    │       ├── extractor.extract
+    │       └── processor.empresa_match
+    ├── batch.email_body
+    └── correlation.correlate
+        ├── correlation.duplicates
+        └── correlation.cross_values
+
+`pairing.pair_documents` roda na exportação (`BatchResult.to_summaries`) e
+só é medido quando o chamador abre a própria coleta.
+
+Spans só são gravados dentro de `collect_spans()` (o `BatchProcessor` abre
+um por lote e guarda o resultado em `BatchResult.spans`); fora dele, `span`
+e `traced` não medem nada. O contexto segue para threads de
+`run_with_timeout` (contextvars) e os spans de workers supervisionados
+voltam ao processo pai junto com o resultado da tarefa (`adopt_spans`).
+
+Exportação: JSONL (um span por linha) e formato Chrome trace-event,
+visualizável em chrome://tracing ou https://ui.perfetto.dev.
+
+Example:
+    >>> from core.tracing import collect_spans, span, traced
+    >>> @traced("extractor.extract")
+    ... def extrair(texto): ...
+    >>> with collect_spans() as trace:
+    ...     with span("processor.read", file="nota.pdf") as s:
+    ...         texto = ler()
+    ...         s.set(chars=len(texto))
+    ...     extrair(texto)
+    >>> export_chrome_trace(trace.to_dicts(), "trace.json")
+"""
+
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TypeVar, Union
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Limite de spans por coleta (evita crescimento sem fim em lotes enormes)
+DEFAULT_MAX_SPANS = 5000
+
+_ids = itertools.count(1)
+
+
+@dataclass
+class Span:
+    """
+    Intervalo de tempo de um estágio.
+
+    Attributes:
+        name: Nome do estágio (ex: "strategy.native").
+        start: Início (epoch, segundos).
+        duration: Duração em segundos.
+        span_id: Identificador único (inclui o PID: spans de workers não colidem).
+        parent_id: Span que estava aberto quando este começou.
+        pid: Processo que executou o estágio.
+        tid: Thread que executou o estágio.
+        attrs: Atributos livres (arquivo, extrator, contagens...).
+    """
+
+    name: str
+    start: float
+    duration: float = 0.0
+    span_id: str = ""
+    parent_id: Optional[str] = None
+    pid: int = 0
+    tid: int = 0
+    attrs: Dict[str, Any] = field(default_factory=dict)
+
+    def set(self, **attrs: Any) -> None:
+        """Adiciona atributos ao span."""
+        self.attrs.update(attrs)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class _NoopSpan:
+    """Devolvido quando não há coleta ativa: `set` não faz nada."""
+
+    name = ""
+
+    def set(self, **attrs: Any) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    """
+    Spans coletados (thread-safe).
+
+    Args:
+        max_spans: Spans acima do limite são descartados e contados em `dropped`.
+    """
+
+    def __init__(self, max_spans: int = DEFAULT_MAX_SPANS):
+        self.max_spans = max_spans
+        self.spans: List[Dict[str, Any]] = []
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def add(self, span_dict: Dict[str, Any]) -> None:
+        with self._lock:
+            if len(self.spans) >= self.max_spans:
+                self.dropped += 1
+            else:
+                self.spans.append(span_dict)
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Spans em ordem de início."""
+        with self._lock:
+            return sorted(self.spans, key=lambda s: s["start"])
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def _enabled() -> bool:
+    from config import settings
+
+    return getattr(settings, "TRACING_ENABLED", True)
+
+
+@contextmanager
+def collect_spans(max_spans: int = DEFAULT_MAX_SPANS) -> Iterator[Trace]:
+    """
+    Ativa a coleta de spans no contexto atual.
+
+    Coletas aninhadas são independentes: os spans ficam só na mais interna.
+    """
+    trace = Trace(max_spans=max_spans)
+    trace_token = _current_trace.set(trace if _enabled() else None)
+    span_token = _current_span.set(None)
+    try:
+        yield trace
+    finally:
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Union[Span, _NoopSpan]]:
+    """
+    Mede o bloco como um span filho do span aberto no contexto.
+
+    Exceções são registradas em `attrs["error"]` e relançadas.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield _NOOP_SPAN
+        return
+
+    parent = _current_span.get()
+    current = Span(
+        name=name,
+        start=time.time(),
+        span_id=f"{os.getpid()}-{next(_ids)}",
+        parent_id=parent.span_id if parent is not None else None,
+        pid=os.getpid(),
+        tid=threading.get_ident(),
+        attrs=dict(attrs),
+    )
+    token = _current_span.set(current)
+    started = time.perf_counter()
+    try:
+        yield current
+    except BaseException as e:
+        current.attrs["error"] = type(e).__name__
+        raise
+    finally:
+        current.duration = time.perf_counter() - started
+        _current_span.reset(token)
+        trace.add(current.to_dict())
+
+
+def traced(name: Optional[str] = None, **attrs: Any) -> Callable[[F], F]:
+    """
+    Decorator: cada chamada da função vira um span.
+
+    Chamadas recursivas (ex: `extract` que abre a própria sessão e chama a
+    si mesmo) ficam no span da chamada externa.
+
+    Args:
+        name: Nome do span (padrão: `Classe.metodo`).
+    """
+
+    def decorator(func: F) -> F:
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            parent = _current_span.get()
+            if _current_trace.get() is None or (parent is not None and parent.name == span_name):
+                return func(*args, **kwargs)
+            with span(span_name, **attrs):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def current_span() -> Union[Span, _NoopSpan]:
+    """Span aberto no contexto (no-op se não houver coleta)."""
+    if _current_trace.get() is None:
+        return _NOOP_SPAN
+    return _current_span.get() or _NOOP_SPAN
+
+
+def adopt_spans(spans: Iterable[Dict[str, Any]]) -> None:
+    """
+    Incorpora spans produzidos em outro processo à coleta atual.
+
+    Spans sem pai passam a ser filhos do span aberto no contexto (ex: os
+    spans de `processor.process` de um worker ficam sob o `file.pdf` do lote).
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        return
+    parent = _current_span.get()
+    parent_id = parent.span_id if parent is not None else None
+    for span_dict in spans:
+        if span_dict.get("parent_id") is None:
+            span_dict = {**span_dict, "parent_id": parent_id}
+        trace.add(span_dict)
+
+
+# =============================================================================
+# RESUMO E EXPORTAÇÃO
+# =============================================================================
+
+
+def summarize_spans(spans: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    """Chamadas e tempo total (s) por nome de span, do mais caro ao mais barato."""
+    summary: Dict[str, Dict[str, float]] = {}
+    for span_dict in spans:
+        entry = summary.setdefault(span_dict["name"], {"count": 0, "seconds": 0.0})
+        entry["count"] += 1
+        entry["seconds"] += span_dict.get("duration", 0.0)
+    return dict(sorted(summary.items(), key=lambda item: item[1]["seconds"], reverse=True))
+
+
+def export_jsonl(
+    spans: Iterable[Dict[str, Any]],
+    path: Union[str, Path],
+    append: bool = True,
+    **extra: Any,
+) -> Path:
+    """
+    Grava os spans em JSONL (um por linha).
+
+    Args:
+        spans: Spans (ex: `BatchResult.spans`).
+        path: Arquivo de saída.
+        append: Acrescenta ao arquivo em vez de sobrescrever.
+        **extra: Campos adicionados a cada linha (ex: batch_id).
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a" if append else "w", encoding="utf-8") as f:
+        for span_dict in spans:
+            f.write(json.dumps({**span_dict, **extra}, ensure_ascii=False, default=str) + "\n")
+    return path
+
+
+def load_jsonl(path: Union[str, Path]) -> List[Dict[str, Any]]:
+    """Lê spans gravados por `export_jsonl` (linhas inválidas são ignoradas)."""
+    spans: List[Dict[str, Any]] = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                spans.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return spans
+
+
+def to_chrome_trace(spans: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Converte spans para o formato Chrome trace-event (eventos completos "X")."""
+    events = []
+    for span_dict in spans:
+        args = dict(span_dict.get("attrs") or {})
+        for key in ("batch_id", "span_id", "parent_id"):
+            if span_dict.get(key) is not None:
+                args[key] = span_dict[key]
+        events.append({
+            "name": span_dict["name"],
+            "cat": span_dict["name"].split(".", 1)[0],
+            "ph": "X",
+            "ts": round(span_dict["start"] * 1_000_000),
+            "dur": round(span_dict.get("duration", 0.0) * 1_000_000),
+            "pid": span_dict.get("pid", 0),
+            "tid": span_dict.get("tid", 0),
+            "args": args,
+        })
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def export_chrome_trace(spans: Iterable[Dict[str, Any]], path: Union[str, Path]) -> Path:
+    """Grava os spans no formato Chrome trace-event (JSON)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        json.dumps(to_chrome_trace(spans), ensure_ascii=False, default=str), encoding="utf-8"
+    )
+    return path
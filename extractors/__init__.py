@@ -80,7 +80,12 @@ from .aditivo_contrato import AditivoContratoExtractor
 # Extractores genéricos (vêm depois dos específicos)
 from .outros import OutrosExtractor
 from .nfse_generic import NfseGenericExtractor
-from .xml_extractor import XmlExtractionResult, XmlExtractor, extract_xml
+from .xml_extractor import (
+    XmlExtractionResult,
+    XmlExtractor,
+    extract_xml,
+    extract_xml_directory,
+)
 
 __all__ = [
     "BoletoRepromaqExtractor",
@@ -102,6 +107,7 @@ __all__ = [
     "XmlExtractor",
     "XmlExtractionResult",
     "extract_xml",
+    "extract_xml_directory",
     # Extrator de corpo de e-mail
     "EmailBodyExtractor",
     "EmailBodyExtractionResult",
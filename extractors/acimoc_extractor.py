@@ -33,7 +33,7 @@ import re
 import logging
 from typing import Any, Dict, Optional
 
-from core.extractors import BaseExtractor, register_extractor
+from core.extractors import BaseExtractor, register_extractor, text_views
 from extractors.utils import (
     normalize_entity_name,
     parse_date_br,
@@ -56,6 +56,14 @@ class AcimocExtractor(BaseExtractor):
     classificação e extração de valores.
     """
 
+    # Indicadores obrigatórios de can_handle
+    ROUTING_KEYWORDS = (
+        "ACIMOC",
+        "ASSOCIAÇÃO COMERCIAL INDUSTRIAL E DE SERVIÇOS DE MONTES CLAROS",
+        "ASSOCIAÇÃO COML. INDL. E SERVIÇOS DE MONTES CLAROS",
+        "RECIBO DO SACADO",
+    )
+
     @classmethod
     def can_handle(cls, text: str) -> bool:
         """
@@ -76,8 +84,9 @@ class AcimocExtractor(BaseExtractor):
         if not text:
             return False
 
-        text_upper = text.upper()
-        text_compact = _compact(text_upper)
+        views = text_views(text)
+        text_upper = views.upper
+        text_compact = views.compact
 
         # Indicadores positivos da ACIMOC
         acimoc_indicators = [
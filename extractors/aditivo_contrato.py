@@ -6,7 +6,7 @@ que alteram ou adicionam clausulas a contratos existentes.
 """
 import re
 from typing import Any, Dict, Optional
-from core.extractors import BaseExtractor, register_extractor
+from core.extractors import BaseExtractor, register_extractor, text_views
 
 
 @register_extractor
@@ -40,10 +40,13 @@ class AditivoContratoExtractor(BaseExtractor):
         '27.103.413/0001-57',  # CARRIER TELECOM S/A
     ]
 
+    # Termos presentes em todos os ADITIVO_INDICATORS
+    ROUTING_KEYWORDS = ("ADITIVO", "CONTRATO DE PRESTACAO DE SERVICOS")
+
     @classmethod
     def can_handle(cls, text: str) -> bool:
         """Verifica se o texto eh um aditivo de contrato."""
-        text_upper = text.upper()
+        text_upper = text_views(text).upper
         
         # Verificar indicadores de aditivo
         aditivo_matches = 0
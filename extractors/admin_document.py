@@ -42,7 +42,7 @@ import logging
 import re
 from typing import Any, Dict
 
-from core.extractors import BaseExtractor, register_extractor
+from core.extractors import BaseExtractor, register_extractor, text_views
 from extractors.utils import (
     BR_MONEY_RE,
     parse_br_money,
@@ -78,7 +78,7 @@ class AdminDocumentExtractor(BaseExtractor):
         if not text:
             return False
 
-        t = text.upper()
+        t = text_views(text).upper
 
         # Padrões negativos para excluir documentos fiscais/NFSEs
         # Baseado na análise dos casos problemáticos: 11/21 casos eram NFSEs capturadas incorretamente
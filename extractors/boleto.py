@@ -33,7 +33,12 @@ from datetime import datetime, timedelta
 from typing import Any, Dict, Optional
 
 from config.bancos import NOMES_BANCOS
-from core.extractors import BaseExtractor, find_linha_digitavel, register_extractor
+from core.extractors import (
+    BaseExtractor,
+    find_linha_digitavel,
+    register_extractor,
+    text_views,
+)
 from extractors.utils import (
     normalize_entity_name,
     parse_date_br,
@@ -135,9 +140,9 @@ class BoletoExtractor(BaseExtractor):
         # Normaliza para ficar tolerante a acentos/extrações estranhas do PDF.
         # Além disso, alguns PDFs quebram palavras no meio (ex: "Bene\nficiário").
         # Para a classificação, usamos também uma versão compactada (só A-Z0-9).
-        text_upper = (text or "").upper()
-        text_norm_upper = strip_accents(text_upper)
-        text_compact = re.sub(r"[^A-Z0-9]+", "", text_norm_upper)
+        views = text_views(text)
+        text_norm_upper = views.normalized
+        text_compact = views.compact
 
         # ========== VERIFICAÇÃO DE EXCLUSÃO: DANFSe e NFCom ==========
         # DANFSe (Documento Auxiliar da NFS-e) NÃO é boleto, mesmo tendo
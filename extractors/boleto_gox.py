@@ -13,7 +13,7 @@ import logging
 import re
 from typing import Any, Dict, Optional
 
-from core.extractors import BaseExtractor, register_extractor
+from core.extractors import BaseExtractor, register_extractor, text_views
 from extractors.utils import parse_date_br
 
 
@@ -32,6 +32,9 @@ class BoletoGoxExtractor(BaseExtractor):
     # Padrões no nome do arquivo
     PADRAO_NUMERO_RECEBER = r'receber_(\d+)'
     
+    # can_handle exige "GOX" no texto
+    ROUTING_KEYWORDS = ("GOX",)
+
     @classmethod
     def can_handle(cls, text: str) -> bool:
         """
@@ -45,7 +48,7 @@ class BoletoGoxExtractor(BaseExtractor):
         if not text:
             return False
             
-        text_upper = text.upper()
+        text_upper = text_views(text).upper
         
         # Precisa ter GOX e o CNPJ ou email para confirmar
         tem_gox = "GOX" in text_upper
@@ -45,19 +45,13 @@ import re
 
 from typing import Any, Dict, List, Optional
 
-from core.extractors import BaseExtractor, register_extractor
+from core.extractors import BaseExtractor, register_extractor, text_views
 from extractors.utils import (
     normalize_entity_name,
     parse_date_br,
-    strip_accents,
 )
 
 
-def _compact(text: str) -> str:
-    """Compacta texto removendo caracteres não alfanuméricos."""
-    return re.sub(r"[^A-Z0-9]+", "", strip_accents((text or "").upper()))
-
-
 def _is_noise_line(line: str) -> bool:
     """
     Verifica se uma linha é ruído do OCR (ex: dígito isolado da carteira).
@@ -116,6 +110,9 @@ class BoletoRepromaqExtractor(BaseExtractor):
     FORNECEDOR_NOME = "REPROMAQ COM. E IND. LTDA"
     BANCO_NOME = "Bradesco"
 
+    # can_handle exige REPROMAQ/REPROMAO (e BRADESCO)
+    ROUTING_KEYWORDS = ("REPROMAQ", "REPROMAO")
+
     @classmethod
     def can_handle(cls, text: str) -> bool:
         """
@@ -141,7 +138,7 @@ class BoletoRepromaqExtractor(BaseExtractor):
         trecho = (text or "")[:200].replace("\n", " ")
         logger.info(f"[BoletoRepromaqExtractor] can_handle chamado. Trecho: '{trecho}'")
 
-        text_compact = _compact(text)
+        text_compact = text_views(text).compact
 
         # REPROMAQ ou REPROMAO (OCR frequentemente confunde Q com O)
         has_repromaq = "REPROMAQ" in text_compact or "REPROMAO" in text_compact
@@ -38,7 +38,7 @@ import logging
 import re
 from typing import Any, Dict, Optional
 
-from core.extractors import BaseExtractor, register_extractor
+from core.extractors import BaseExtractor, register_extractor, text_views
 from extractors.utils import (
     BR_MONEY_RE,
     extract_cnpj,
@@ -135,7 +135,7 @@ class ComprovanteBancarioExtractor(BaseExtractor):
             return False
 
         logger = logging.getLogger(__name__)
-        t = text.upper()
+        t = text_views(text).upper
 
         # Exclusões: documentos que definitivamente NÃO são comprovantes
         exclusion_patterns = [
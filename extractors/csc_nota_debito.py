@@ -41,21 +41,12 @@ import logging
 import re
 from typing import Any, Dict, Optional
 
-from core.extractors import BaseExtractor, register_extractor
+from core.extractors import BaseExtractor, register_extractor, text_views
 from extractors.utils import normalize_entity_name, parse_date_br
 
 logger = logging.getLogger(__name__)
 
 
-def _compact(text: str) -> str:
-    """Compacta texto removendo caracteres não alfanuméricos e acentos."""
-    import unicodedata
-
-    text_normalized = unicodedata.normalize("NFKD", text or "")
-    text_ascii = text_normalized.encode("ASCII", "ignore").decode("ASCII")
-    return re.sub(r"[^A-Z0-9]+", "", text_ascii.upper())
-
-
 @register_extractor
 class CscNotaDebitoExtractor(BaseExtractor):
     """
@@ -80,6 +71,9 @@ class CscNotaDebitoExtractor(BaseExtractor):
         r"N\s*O\s*T\s*A\s+D\s*[ÉE]\s*B\s*I\s*T\s*O",
     ]
 
+    # can_handle exige o CNPJ ou o nome da CSC (além de "NOTA DÉBITO")
+    ROUTING_KEYWORDS = ("38.323.227/0001-40", "CSC GESTAO")
+
     @classmethod
     def can_handle(cls, text: str) -> bool:
         """
@@ -100,8 +94,9 @@ class CscNotaDebitoExtractor(BaseExtractor):
         if not text:
             return False
 
-        text_upper = text.upper()
-        text_compact = _compact(text)
+        views = text_views(text)
+        text_upper = views.upper
+        text_compact = views.compact
 
         # Verificar identificadores principais
         has_nota_debito = False
@@ -31,7 +31,7 @@ Example:
 import re
 from typing import Any, Dict, List, Optional, Tuple
 
-from core.extractors import BaseExtractor, register_extractor
+from core.extractors import BaseExtractor, register_extractor, text_views
 from extractors.utils import (
     extract_best_money_from_segment,
     normalize_digits,
@@ -359,7 +359,7 @@ class DanfeExtractor(BaseExtractor):
         if not text:
             return False
 
-        t = text.upper()
+        t = text_views(text).upper
 
         # Identificadores fortes
         if "DANFE" in t:
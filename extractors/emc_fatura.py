@@ -20,7 +20,7 @@ import re
 from datetime import datetime
 from typing import Any, Dict, Optional
 
-from core.extractors import BaseExtractor, register_extractor
+from core.extractors import BaseExtractor, register_extractor, text_views
 
 
 def _parse_br_money(value: str) -> float:
@@ -56,6 +56,9 @@ class EmcFaturaExtractor(BaseExtractor):
     em documentos de múltiplas páginas.
     """
 
+    # can_handle exige "EMC TECNOLOGIA" nos dois critérios
+    ROUTING_KEYWORDS = ("EMC TECNOLOGIA",)
+
     @classmethod
     def can_handle(cls, text: str) -> bool:
         """
@@ -69,7 +72,7 @@ class EmcFaturaExtractor(BaseExtractor):
         if not text:
             return False
 
-        t = text.upper()
+        t = text_views(text).upper
 
         # Verificação principal: é uma fatura de locação EMC?
         is_fatura_locacao = (
@@ -34,7 +34,7 @@ import re
 import logging
 from typing import Any, Dict, Optional
 
-from core.extractors import BaseExtractor, register_extractor
+from core.extractors import BaseExtractor, register_extractor, text_views
 from extractors.utils import (
     normalize_entity_name,
     parse_date_br,
@@ -50,6 +50,9 @@ class MugoExtractor(BaseExtractor):
     resolvendo problemas de reconhecimento e extração de valores.
     """
 
+    # can_handle exige "MUGO TELECOM"
+    ROUTING_KEYWORDS = ("MUGO TELECOM",)
+
     @classmethod
     def can_handle(cls, text: str) -> bool:
         """
@@ -60,7 +63,7 @@ class MugoExtractor(BaseExtractor):
         if not text:
             return False
 
-        text_upper = text.upper()
+        text_upper = text_views(text).upper
 
         # Deve conter MUGO TELECOM
         if "MUGO TELECOM" not in text_upper:
@@ -25,7 +25,7 @@ Example:
 import re
 from typing import Any, Dict, Optional
 
-from core.extractors import BaseExtractor, register_extractor
+from core.extractors import BaseExtractor, register_extractor, text_views
 from extractors.utils import (
     format_cnpj,
     parse_br_money,
@@ -65,9 +65,9 @@ class NetCenterExtractor(BaseExtractor):
 
     @classmethod
     def can_handle(cls, text: str) -> bool:
-        text_up = (text or "").upper()
-        text_norm = strip_accents(text_up)
-        text_compact = re.sub(r"[^A-Z0-9]+", "", text_norm)
+        views = text_views(text)
+        text_norm = views.normalized
+        text_compact = views.compact
 
         digits_only = re.sub(r"\D+", "", text or "")
 
@@ -36,7 +36,7 @@ Example:
 import re
 from typing import Any, Dict, Optional
 
-from core.extractors import BaseExtractor, register_extractor
+from core.extractors import BaseExtractor, register_extractor, text_views
 from extractors.utils import (
     normalize_entity_name,
     parse_br_money,
@@ -63,6 +63,11 @@ class NFComExtractor(BaseExtractor):
     - Chave de acesso
     """
 
+    # Cabeçalho, totais e chave ficam na primeira página; o restante da fatura
+    # costuma ser detalhamento de serviços
+    PAGE_SCOPE = (2, 1)
+    REQUIRED_FIELDS = ("numero_nota", "valor_total")
+
     @classmethod
     def can_handle(cls, text: str) -> bool:
         """
@@ -77,8 +82,9 @@ class NFComExtractor(BaseExtractor):
         2. Se sim, retorna True (ignora indicadores de boleto)
         3. Se não, verifica exclusões e outras heurísticas
         """
-        text_upper = (text or "").upper()
-        text_compact = _compact(text)
+        views = text_views(text)
+        text_upper = views.upper
+        text_compact = views.compact
 
         # ========== VERIFICAÇÃO PRIORITÁRIA: Início do documento ==========
         # Se o documento COMEÇA com indicadores de NFCom, é NFCom
@@ -24,7 +24,7 @@ import logging
 from typing import Dict, Any, Optional
 from datetime import datetime
 
-from core.extractors import BaseExtractor, register_extractor
+from core.extractors import BaseExtractor, register_extractor, text_views
 
 from extractors.utils import (
     parse_br_money,
@@ -70,7 +70,7 @@ class NfcomTelcablesExtractor(BaseExtractor):
         if not text:
             return False
 
-        text_upper = text.upper()
+        text_upper = text_views(text).upper
 
         # 1. Verifica CNPJ da Telcables Brasil
         cnpj = extract_cnpj_flexible(text)
@@ -21,7 +21,12 @@ Implementação:
 import re
 from typing import Any, Dict, Optional
 
-from core.extractors import BaseExtractor, find_linha_digitavel, register_extractor
+from core.extractors import (
+    BaseExtractor,
+    find_linha_digitavel,
+    register_extractor,
+    text_views,
+)
 from extractors.utils import (
     normalize_text_for_extraction,
     parse_br_money,
@@ -39,12 +44,15 @@ class NfseCustomMontesClarosExtractor(BaseExtractor):
     - Indicadores típicos de NFS-e, e não apresenta linha digitável de boleto.
     """
 
+    # can_handle exige "MONTES CLAROS" (ou o domínio nota.montesclaros)
+    ROUTING_KEYWORDS = ("MONTES CLAROS",)
+
     @classmethod
     def can_handle(cls, text: str) -> bool:
         if not text:
             return False
 
-        t = (text or "").upper()
+        t = text_views(text).upper
         # Indicadores fortes de Montes Claros
         if (
             "MONTES CLAROS" in t
@@ -27,7 +27,7 @@ Example:
 import re
 from typing import Any, Dict, Optional
 
-from core.extractors import BaseExtractor, register_extractor
+from core.extractors import BaseExtractor, register_extractor, text_views
 
 
 @register_extractor
@@ -39,9 +39,12 @@ class NfseCustomVilaVelhaExtractor(BaseExtractor):
     a ordem de registro dos extractors.
     """
 
+    # can_handle exige "VILA VELHA" (e PREFEITURA)
+    ROUTING_KEYWORDS = ("VILA VELHA",)
+
     @classmethod
     def can_handle(cls, text: str) -> bool:
-        text_upper = (text or "").upper()
+        text_upper = text_views(text).upper
         # Critério de ativação: Nome da prefeitura no documento
         return "VILA VELHA" in text_upper and "PREFEITURA" in text_upper
 
@@ -1,14 +1,45 @@
 import re
-from typing import Any, Dict, Optional
-
-from config.empresas import EMPRESAS_CADASTRO
-from core.extractors import BaseExtractor, find_linha_digitavel, register_extractor
+from typing import Any, Dict, Optional, Tuple
+
+from core.empresa_matcher import get_empresa_index
+from core.extractors import (
+    BaseExtractor,
+    find_linha_digitavel,
+    register_extractor,
+    text_views,
+)
 from extractors.utils import (
     normalize_text_for_extraction,
     parse_br_money,
     parse_date_br,
 )
 
+# Sufixos societários ignorados ao comparar nomes com o cadastro
+_SUFIXO_SOCIETARIO_RE = re.compile(
+    r"\s*(LTDA|S/?A|EIRELI|ME|EPP|S\.A\.?|-\s*ME|-\s*EPP)\s*$",
+    flags=re.IGNORECASE,
+)
+
+_razoes_limpas: Optional[Tuple[str, ...]] = None
+
+
+def _razoes_limpas_cadastro() -> Tuple[str, ...]:
+    """Razões sociais do cadastro sem filial e sem sufixo societário (calculadas uma vez)."""
+    global _razoes_limpas
+    if _razoes_limpas is None:
+        razoes = []
+        for dados in get_empresa_index().cadastro.values():
+            razao = dados.get("razao_social", "").upper()
+            if not razao:
+                continue
+            # Extrai a parte principal do nome (antes de parênteses)
+            razao_principal = razao.split("(")[0].strip()
+            razao_limpa = _SUFIXO_SOCIETARIO_RE.sub("", razao_principal).strip()
+            if razao_limpa and razao_limpa not in razoes:
+                razoes.append(razao_limpa)
+        _razoes_limpas = tuple(razoes)
+    return _razoes_limpas
+
 
 @register_extractor
 class NfseGenericExtractor(BaseExtractor):
@@ -21,7 +52,7 @@ class NfseGenericExtractor(BaseExtractor):
     @classmethod
     def can_handle(cls, text: str) -> bool:
         """Retorna True apenas para textos que parecem NFSe (e não boleto/DANFE/outros)."""
-        text_upper = (text or "").upper()
+        text_upper = text_views(text).upper
 
         # Indicadores FORTES de NFS-e - se presentes, É NFS-e mesmo com outras palavras
         nfse_strong_indicators = [
@@ -451,39 +482,24 @@ class NfseGenericExtractor(BaseExtractor):
         # Se temos CNPJ, verifica diretamente no cadastro
         if cnpj:
             cnpj_limpo = re.sub(r"\D", "", cnpj)
-            if cnpj_limpo in EMPRESAS_CADASTRO:
+            if cnpj_limpo in get_empresa_index():
                 return True
 
         # Verifica se o nome contém alguma razão social do cadastro
-        for dados in EMPRESAS_CADASTRO.values():
-            razao = dados.get("razao_social", "").upper()
-            if not razao:
-                continue
-            # Extrai a parte principal do nome (antes de parênteses)
-            razao_principal = razao.split("(")[0].strip()
-            # Remove sufixos comuns para comparação mais flexível
-            razao_limpa = re.sub(
-                r"\s*(LTDA|S/?A|EIRELI|ME|EPP|S\.A\.?|-\s*ME|-\s*EPP)\s*$",
-                "",
-                razao_principal,
-                flags=re.IGNORECASE,
-            ).strip()
-            nome_limpo = re.sub(
-                r"\s*(LTDA|S/?A|EIRELI|ME|EPP|S\.A\.?|-\s*ME|-\s*EPP)\s*$",
-                "",
-                nome_upper,
-                flags=re.IGNORECASE,
-            ).strip()
+        # (comparação sem sufixos comuns, mais flexível)
+        nome_limpo = _SUFIXO_SOCIETARIO_RE.sub("", nome_upper).strip()
+        if not nome_limpo:
+            return False
 
+        for razao_limpa in _razoes_limpas_cadastro():
             # Verifica match exato ou se um contém o outro
-            if razao_limpa and nome_limpo:
-                if razao_limpa == nome_limpo:
-                    return True
-                # Verifica se o nome extraído é parte significativa da razão social
-                if len(nome_limpo) >= 10 and nome_limpo in razao_limpa:
-                    return True
-                if len(razao_limpa) >= 10 and razao_limpa in nome_limpo:
-                    return True
+            if razao_limpa == nome_limpo:
+                return True
+            # Verifica se o nome extraído é parte significativa da razão social
+            if len(nome_limpo) >= 10 and nome_limpo in razao_limpa:
+                return True
+            if len(razao_limpa) >= 10 and razao_limpa in nome_limpo:
+                return True
 
         return False
 
@@ -13,7 +13,7 @@ Exemplos:
 import re
 from typing import Any, Dict, Optional
 
-from core.extractors import BaseExtractor, register_extractor
+from core.extractors import BaseExtractor, register_extractor, text_views
 
 
 @register_extractor
@@ -39,6 +39,9 @@ class OcrDanfeExtractor(BaseExtractor):
         "07.355.400/0001-69": "AUTO POSTO PORTAL DE MINAS LTDA",
     }
 
+    # can_handle exige um indicador básico de DANFE
+    ROUTING_KEYWORDS = ("DANFE", "RECEBEMOS", "RECEHEMOS", "DOCUMENTO AUXILIAR")
+
     @classmethod
     def can_handle(cls, text: str) -> bool:
         """
@@ -57,7 +60,7 @@ class OcrDanfeExtractor(BaseExtractor):
             logger.debug("OcrDanfeExtractor.can_handle: texto vazio")
             return False
 
-        text_upper = text.upper()
+        text_upper = text_views(text).upper
 
         # Verificar se eh DANFE (indicadores basicos)
         is_danfe = False
@@ -32,7 +32,7 @@ import logging
 import re
 from typing import Any, Dict
 
-from core.extractors import BaseExtractor, register_extractor
+from core.extractors import BaseExtractor, register_extractor, text_views
 from extractors.utils import (
     BR_MONEY_RE,
     parse_br_money,
@@ -54,12 +54,21 @@ class OutrosExtractor(BaseExtractor):
     extrair pelo menos fornecedor + valor + datas quando possível.
     """
 
+    # can_handle só aceita por um destes termos (locação, fatura ou LOCAWEB)
+    ROUTING_KEYWORDS = (
+        "DEMONSTRATIVO",
+        "EXTRATO DE LOCA",
+        "VALOR DA LOCA",
+        "FATURA",
+        "LOCAWEB",
+    )
+
     @classmethod
     def can_handle(cls, text: str) -> bool:
         if not text:
             return False
 
-        t = text.upper()
+        t = text_views(text).upper
 
         # Exclusão de documentos fiscais (NFSE, DANFE, etc.)
         # 1. Indicadores fortes de NFSE
@@ -34,7 +34,7 @@ import re
 import logging
 from typing import Any, Dict, Optional
 
-from core.extractors import BaseExtractor, register_extractor
+from core.extractors import BaseExtractor, register_extractor, text_views
 from extractors.utils import (
     normalize_entity_name,
     parse_date_br,
@@ -56,6 +56,9 @@ class ProPainelExtractor(BaseExtractor):
     da PRÓ PAINEL, resolvendo problemas de reconhecimento e extração.
     """
 
+    # Todas as variações de "PRÓ - PAINEL" compactam para PROPAINEL
+    ROUTING_KEYWORDS = ("PROPAINEL",)
+
     @classmethod
     def can_handle(cls, text: str) -> bool:
         """
@@ -74,8 +77,9 @@ class ProPainelExtractor(BaseExtractor):
         if not text:
             return False
 
-        text_upper = text.upper()
-        text_compact = _compact(text_upper)
+        views = text_views(text)
+        text_upper = views.upper
+        text_compact = views.compact
 
         # Indicadores positivos da PRÓ PAINEL
         propainel_indicators = [
@@ -24,12 +24,7 @@ Example:
 import re
 from typing import Any, Dict
 
-from core.extractors import BaseExtractor, register_extractor
-from extractors.utils import strip_accents
-
-
-def _compact(text: str) -> str:
-    return re.sub(r"[^A-Z0-9]+", "", strip_accents((text or "").upper()))
+from core.extractors import BaseExtractor, register_extractor, text_views
 
 
 @register_extractor
@@ -40,9 +35,12 @@ class SicoobExtractor(BaseExtractor):
     na identificação do beneficiário/fornecedor.
     """
 
+    # can_handle exige assinatura do banco (SICOOB/BANCOOB/756)
+    ROUTING_KEYWORDS = ("SICOOB", "BANCOOB", "756")
+
     @classmethod
     def can_handle(cls, text: str) -> bool:
-        text_compact = _compact(text)
+        text_compact = text_views(text).compact
 
         # ========== EXCLUSÃO: NFCom e DANFSe ==========
         # NFCom (Nota Fiscal de Comunicação) NÃO é boleto, mesmo tendo
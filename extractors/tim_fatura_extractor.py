@@ -15,7 +15,7 @@ import logging
 import re
 from typing import Any, Dict, Optional
 
-from core.extractors import BaseExtractor, register_extractor
+from core.extractors import BaseExtractor, register_extractor, text_views
 from extractors.utils import parse_date_br
 
 
@@ -43,6 +43,23 @@ class TIMFaturaExtractor(BaseExtractor):
         r"Meu\s+TIM",
     ]
 
+    # Todo critério de can_handle passa por um destes termos (CNPJ, nome ou TIM_IDENTIFIERS)
+    ROUTING_KEYWORDS = (
+        "02421421",
+        "TIM SA",
+        "FATURA DE PAGAMENTO",
+        "CONTATIM",
+        "TIM BLACK",
+        "DO SEU TIM",
+        "TIM.COM.BR",
+        "MEU TIM",
+    )
+
+    # Resumo, identificação e código de barras ficam nas primeiras páginas e na
+    # última; o meio é detalhamento de chamadas
+    PAGE_SCOPE = (2, 1)
+    REQUIRED_FIELDS = ("valor_total", "vencimento")
+
     @classmethod
     def can_handle(cls, text: str) -> bool:
         """
@@ -62,7 +79,7 @@ class TIMFaturaExtractor(BaseExtractor):
         if not text:
             return False
 
-        text_upper = text.upper()
+        text_upper = text_views(text).upper
 
         # 1. Verifica CNPJ da TIM (padrão 02.421.421)
         if re.search(r"02\.?421\.?421[/\-]?\d{4}[\-]?\d{2}", text):
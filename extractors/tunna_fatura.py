@@ -25,7 +25,7 @@ Example:
 import re
 from typing import Any, Dict, Optional
 
-from core.extractors import BaseExtractor, register_extractor
+from core.extractors import BaseExtractor, register_extractor, text_views
 from extractors.utils import (
     normalize_text_for_extraction,
     parse_br_money,
@@ -45,6 +45,9 @@ class TunnaFaturaExtractor(BaseExtractor):
     # CNPJ da Tunna (verificado em documentos reais)
     CNPJ_TUNNA = "13.399.99"  # Placeholder - atualizar com CNPJ real completo
     
+    # can_handle exige a razão social da Tunna ou "FISHTV"
+    ROUTING_KEYWORDS = ("TUNNA ENTRETENIMENTO", "FISHTV")
+
     @classmethod
     def can_handle(cls, text: str) -> bool:
         """
@@ -64,7 +67,7 @@ class TunnaFaturaExtractor(BaseExtractor):
         if not text:
             return False
             
-        text_upper = text.upper()
+        text_upper = text_views(text).upper
         
         # Indicadores FORTES da Tunna
         tunna_patterns = [
@@ -5,7 +5,7 @@ Detecta faturas comerciais da Ufinet (não-fiscais).
 
 import re
 from typing import Any, Dict, Optional
-from core.extractors import BaseExtractor, register_extractor
+from core.extractors import BaseExtractor, register_extractor, text_views
 from extractors.utils import parse_br_money, parse_date_br
 
 
@@ -19,10 +19,13 @@ class UfinetExtractor(BaseExtractor):
         "UFINET BRASIL": "06.288.154/0006-11",
     }
 
+    # can_handle exige "UFINET"
+    ROUTING_KEYWORDS = ("UFINET",)
+
     @classmethod
     def can_handle(cls, text: str) -> bool:
         """Verifica se o texto é de uma fatura ou NF da Ufinet."""
-        text_upper = text.upper()
+        text_upper = text_views(text).upper
         
         # Deve conter UFINET
         if "UFINET" not in text_upper:
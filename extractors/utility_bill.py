@@ -13,7 +13,7 @@ import logging
 import re
 from typing import Any, Dict, Optional
 
-from core.extractors import BaseExtractor, register_extractor
+from core.extractors import BaseExtractor, register_extractor, text_views
 from extractors.utils import parse_date_br
 
 
@@ -69,7 +69,7 @@ class UtilityBillExtractor(BaseExtractor):
         if not text:
             return False
 
-        text_upper = text.upper()
+        text_upper = text_views(text).upper
         score = {"energy": 0, "water": 0}
 
         # Indicadores de energia
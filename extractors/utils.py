@@ -15,7 +15,8 @@ e facilita manutenção.
 import re
 import unicodedata
 from datetime import datetime
-from typing import List, Optional
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 
 # =============================================================================
 # REGEX COMPILADOS (evita recompilação a cada chamada)
@@ -493,6 +494,417 @@ def _fix_ocr_duplicated_chars(text: str) -> str:
     return text
 
 
+def _compile_subs(specs) -> Tuple[Tuple["re.Pattern[str]", str], ...]:
+    """Compila uma sequência de substituições (padrão, troca, flags)."""
+    return tuple((re.compile(pattern, flags), repl) for pattern, repl, flags in specs)
+
+
+def _apply_subs(name: str, subs) -> str:
+    for pattern, repl in subs:
+        name = pattern.sub(repl, name)
+    return name
+
+
+_I = re.IGNORECASE
+
+# Tamanho do memo de normalize_entity_name (nomes distintos mantidos)
+ENTITY_NAME_CACHE_SIZE = 4096
+
+# ============================================================
+# BLACKLIST DE HEADERS/LABELS (rejeitar completamente)
+# Padrões que NUNCA são nomes de fornecedor válidos
+# ============================================================
+_ENTITY_BLACKLIST_EXACT = frozenset({
+    # Labels de boleto
+    "DOCUMENTO(S)",
+    "DOCUMENTOS",
+    "DOCUMENTO",
+    "BENEFICIÁRIO",
+    "BENEFICIARIO",
+    "CEDENTE",
+    "SACADO",
+    "PAGADOR",
+    "RECEBEDOR",
+    "NOME DO RECEBEDOR",
+    # Labels de NFSe
+    "EMITENTE DA NFS-E",
+    "EMITENTE DA NFSE",
+    "PRESTADOR DE SERVIÇOS",
+    "PRESTADOR DE SERVICOS",
+    "PRESTADOR DO SERVIÇO",
+    "PRESTADOR DO SERVICO",
+    "TOMADOR DO SERVIÇO",
+    "TOMADOR DO SERVICO",
+    "TOMADOR DE SERVIÇOS",
+    "TOMADOR DE SERVICOS",
+    # Labels genéricos
+    "RAZÃO SOCIAL",
+    "RAZAO SOCIAL",
+    "NOME EMPRESARIAL",
+    "NOME FANTASIA",
+    "CNPJ",
+    "CPF",
+    "CEP",
+    "CNPJ/CPF",
+    "CPF/CNPJ",
+    # Outros
+    "VENCIMENTO",
+    "VALOR",
+    "CARTEIRA",
+    "ESPÉCIE",
+    "ESPECIE",
+    "ACEITE",
+    "AGÊNCIA",
+    "AGENCIA",
+    "CONTA",
+})
+
+# Blacklist de padrões (regex, ancorados no início)
+_ENTITY_BLACKLIST_PATTERNS = (
+    # Headers de boleto concatenados
+    r"^Cedente\s+N[úu]mero\s+do\s+Documento",
+    r"^N[úu]mero\s+do\s+Documento\s+Esp[ée]cie",
+    r"^Esp[ée]cie\s+Quantidade.*Valor",
+    r"^Valor\s+do\s+Documento",
+    # DOCUMENTO(S) com ou sem número
+    r"^DOCUMENTO\(S\)\s*:?\s*[\d\s]*$",
+    r"^DOCUMENTO\s*\(S\)\s*:?\s*[\d\s]*$",
+    r"^DOCUMENTOS?\s*:?\s*[\d\s]*$",
+    # Headers de NFSe concatenados
+    r"^EMITENTE\s+DA\s+NFS-?E\s+Prestador",
+    r"^Prestador\s+de\s+servi[çc]o\s+Nome",
+    r"^PRESTADOR\s+DE\s+SERVI[ÇC]OS?\s+[A-Z0-9\-]+\s+\d+",  # "PRESTADOR DE SERVIÇOS HCJQ-5R1R 20260202..."
+    r"^\w{4,8}-\w{4,8}\s+\d+u\d+\s+PRESTADOR",  # "HCJQ-5R1R 20260202u13114403000103 PRESTADOR..."
+    # Padrões de código + label
+    r"^[A-Z0-9\-]{6,12}\s+\d{8,}u?\d*\s+PRESTADOR",
+    # Nome/Nome Empresarial colado
+    r"^Nome\s*/?\s*Nome\s+Empresarial",
+    # Formulário de entrega
+    r"^\s*\(\s*\)\s*(Ausente|Mudou-se|Mudou|Recusado|Desconhecido|Falecido)",
+    r"^\s*\(\s*\)\s*N[ãa]o\s+(existe|procurado)",
+    r"^\s*\(\s*\)\s*Endere[çc]o\s+insuficiente",
+    r"^\s*\(\s*\)\s*Outros",
+    # Frases genéricas
+    r"^Valor\s+da\s+causa\s*$",
+    r"^No\s+Internet\s+Banking",
+    r"^para\s+pagamento:",
+    r"^FAVORECIDO:",
+    r"^Contas\s+a\s+(Receber|Pagar)",
+    # nome do recebedor (case insensitive)
+    r"^nome\s+do\s+recebedor\s*$",
+)
+_ENTITY_BLACKLIST_RE = re.compile(
+    "|".join(f"(?:{pattern})" for pattern in _ENTITY_BLACKLIST_PATTERNS), _I
+)
+
+# Formulário de entrega ("( ) Ausente", "( ) Mudou-se", etc.)
+_ENTITY_DELIVERY_FORM_RE = re.compile(
+    r"^\s*\(\s*\)\s*(Ausente|Mudou-se|Mudou|Recusado|Desconhecido|Falecido|N[ãa]o\s+existe|N[ãa]o\s+procurado|Endere[çc]o\s+insuficiente|Outros)",
+    _I,
+)
+
+# Prefixos genéricos que não são parte do nome da empresa
+_ENTITY_PREFIX_SUBS = _compile_subs((pattern, "", _I) for pattern in (
+    r"^E-mail\s+",
+    r"^Beneficiario\s+",
+    r"^Beneficiário\s+",
+    r"^Nome/NomeEmpresarial\s+",
+    r"^Nome\s+/\s*Nome\s+Empresarial\s+E-mail\s+",  # "Nome / Nome Empresarial E-mail"
+    r"^Nome\s+Empresarial\s+",
+    r"^Razão\s+Social\s+",
+    r"^Razao\s+Social\s+",
+    r"^CNPJ\s*[:\s]*",  # "CNPJ" ou "CNPJ:" sozinho no início
+    r"^CPF\s*[:\s]*",  # "CPF" ou "CPF:" sozinho no início
+))
+
+# Sufixos genéricos que não são parte do nome da empresa
+_ENTITY_SUFFIX_SUBS = _compile_subs((pattern, "", _I) for pattern in (
+    r"\s+CONTATO\s*$",
+    r"\s+CONTATO@[^\s]+\s*$",
+    r"\s+CPF\s+ou\s+CNPJ\s*$",
+    r"\s+CPF/CNPJ\s*$",
+    r"\s+-\s+CNPJ\s*$",  # "- CNPJ" no final
+    r"\s+-\s+CNPJ\s+\d{2}\.\d{3}\.\d{3}/\d{4}-\d{2}\s*$",  # "- CNPJ XX.XXX.XXX/XXXX-XX"
+    r"\s+\|\s*CNPJ\s+-\s+CNPJ\s*$",  # "| CNPJ - CNPJ"
+    r"\s+\|\s*CNPJ\s*$",  # "| CNPJ" no final
+    r"\s+\|\s+CNL\.\s*$",  # "| CNL." no final (ex: VERO S.A. CNL.)
+    r"\s+CNL\.\s*$",  # "CNL." solto no final
+    r"\s+\|\s*$",  # "|" solto no final
+    r"\s+=\s+CNPJ\s*$",  # "= CNPJ" no final
+    r"\s+-\s+Endereço.*$",
+    r"\s+-\s+Município.*$",
+    r"\s+-\s+CEP.*$",
+    r"\s+Endereço\s+Município\s+CEP.*$",  # "Endereço Município CEP PARAIBA"
+    r"\s+-\s+Endereço\s+Município\s+CEP.*$",  # "- Endereço Município CEP PARAIBA"
+    r"\s+Endereço\s*$",
+    r"\s+CNPJ:\s*Al\s+.*$",  # "CNPJ: Al Vicente" texto truncado
+    r"\s+CNPJ:\s*$",  # "CNPJ:" solto no final
+    r"\s+ao\s+assinar\s*$",  # "ao assinar" no final
+    r"\s+Gerente\s+de\s+conta:.*$",  # "Gerente de conta:NOME"
+    r"\s+\*{4,}/\*{4,}\s*$",  # "******/********" (CNPJ mascarado)
+    r"\s+\d{3,4}[-/]?\d*\s*$",  # Códigos de agência soltos no final (ex: "393", "401-301")
+    r"\s+CPF/CNPJ\s*$",  # "CPF/CNPJ" solto no final
+    r"\s+CPF\s*$",  # "CPF" solto no final
+    r"\s+CNPJ\s+\.\s*\.\d*\s*$",  # "CNPJ . .61" lixo OCR
+    r"\s+CNPJ\s*\.\s*\.\s*\d*\s*$",  # variação do padrão anterior
+    r"\s+Nome\s+Empresarial\s*$",  # "Nome Empresarial" no final
+    r"\s+Nome\s+/\s*Nome\s+Empresarial.*$",  # "Nome / Nome Empresarial..."
+    r"\s+Nome\s+Fantasia\s+.*$",  # "Nome Fantasia NEW CONT..."
+    # Emails/usernames colados ao nome da empresa
+    r"\s+[a-z]+\.[a-z]+@.*$",  # "janaina.campos@..."
+    r"\s+[a-z]+@.*$",  # "financeiro@..."
+    r"\s+joaopmsoares\s*$",  # username colado
+    r"\s+janaina\.campos\s*$",
+    r"\s+financeiro\s*$",  # departamento colado (minúsculo)
+    r"\s+comercial\s*$",  # departamento colado (minúsculo)
+    r"\s+COMERCIAL\s*$",  # departamento colado (maiúsculo)
+    r"\s+JOAOPMSOARES\s*$",
+    r"\s+CONEXAOIDEALMG\s*$",  # username colado
+    r"\s+[A-Z]+MG\s*$",  # usernames tipo "EMPRESAMG"
+    # Sites www colados
+    r"\s+www\.[a-z0-9\-]+\.[a-z\.]+\s*$",  # "www.voicecorp.com.br"
+    # Padrões "inscrita no CNPJ"
+    r",?\s+inscrita?\s+no\s+CNPJ.*$",  # ", inscrita no CNPJ/MF sob o nº"
+    r"\s+CNPJ/MF\s+sob.*$",
+    r"\s+CNPJ/CPF\s*$",  # "LTDA CNPJ/CPF"
+    r"\s+CNPJ\s*$",  # "LTDA CNPJ" no final
+    r"\bCNPJ\s*$",  # "Ltda CNPJ" - CNPJ colado no final (word boundary)
+    # Padrões de endereços/lixo que aparecem colados ao nome da empresa
+    r"\s+ENDEREÇO\s+AV\.?.*$",  # "ENDEREÇO AV. AMAZONAS"
+    r"\s+ENDERECO\s+AV\.?.*$",  # sem acento
+    r"\s+/\s*-?\d*\s*\d*\s*\(\s*\)\s*Mudou-se.*$",  # "/ -1 1 ( ) Mudou-se"
+    r"\s+Mudou-se.*$",  # "Mudou-se" no final
+    # Padrões de "Comprovante de Entrega" (formulário de correios)
+    r"^\s*\(\s*\)\s*Ausente.*$",  # "( ) Ausente"
+    r"^\s*\(\s*\)\s*Mudou-se.*$",  # "( ) Mudou-se"
+    r"^\s*\(\s*\)\s*Recusado.*$",  # "( ) Recusado"
+    r"^\s*\(\s*\)\s*Desconhecido.*$",  # "( ) Desconhecido"
+    r"^\s*\(\s*\)\s*Falecido.*$",  # "( ) Falecido"
+    r"^\s*\(\s*\)\s*N[ãa]o\s+existe.*$",  # "( ) Não existe"
+    r"^\s*\(\s*\)\s*N[ãa]o\s+procurado.*$",  # "( ) Não procurado"
+    r"^\s*\(\s*\)\s*Endere[çc]o\s+insuficiente.*$",  # "( ) Endereço insuficiente"
+    r"^\s*\(\s*\)\s*Outros.*$",  # "( ) Outros"
+    # "Florida USA" sem números (padrão de endereço americano)
+    r"^Florida\s+USA\s*$",  # "Florida USA" sozinho
+    r"\s+TAXID\d*-?.*$",  # "TAXID95-" e variações
+    r"\s+Inscrição\s+Municipal.*$",  # "Inscrição Municipal" no final
+    r"\s+Inscricao\s+Municipal.*$",  # sem acento
+    r"\s+[A-F0-9]{8,}\s+Inscrição\s+Municipal.*$",  # "F50C0E532 Inscrição Municipal"
+    r"\s+[A-F0-9]{8,}\s+Inscricao\s+Municipal.*$",  # sem acento
+    r"\s+Florida\d+USA.*$",  # "Florida33134USA"
+    r"\s+FINANCEIRO\s*$",  # "FINANCEIRO" solto no final
+    r"\s+R\s+vel\s+pela\s+Ret.*$",  # "R vel pela Retoncã" OCR corrompido
+    r"\s+Cod\.\s+de\s+Autenticidade.*$",  # "Cod. de Autenticidade"
+    r"\s+\d+\s+ANDAR.*$",  # "17 ANDAR" endereço
+    r"\s+EDIF\s+.*$",  # "EDIF PALACIO DA AGRICULTURA"
+    # Endereços com cidade/UF
+    r"\s+-\s+[A-Z]{2}\s+-\s+[A-Z][a-zA-Z\s]+$",  # "- CE - FORTALEZA"
+    r"\s+-\s+[A-Z][a-zA-Z\s]+/\s*[A-Z]{2}\s*$",  # "- CARMO/ RJ"
+    r"\s+CENTRO\s+NOVO\s+.*$",  # "CENTRO NOVO HAMBURGO/ RS"
+    r"\s+PC\s+PRESIDENTE\s+.*$",  # "PC PRESIDENTE GETULIO VARGAS..."
+    # Frases genéricas que não são nomes
+    r"^Valor\s+da\s+causa\s*$",  # "Valor da causa"
+    r"^No\s+Internet\s+Banking.*$",  # "No Internet Banking ou DDA..."
+    r"^para\s+pagamento:.*$",  # "para pagamento: FAVORECIDO:..."
+    r"^FAVORECIDO:.*$",  # "FAVORECIDO: EMPRESA"
+    # "NOTA DE DÉBITO" no meio do nome (lixo OCR)
+    r"\s+NOTA\s+DE\s+D[ÉE]BITO\s+",  # remove do meio
+    # Strings muito genéricas que não são nomes de empresa
+    r"^SISTEMAS\s+LTDA\s*$",  # "SISTEMAS LTDA" sozinho
+    r"^UTILIDADE\s*$",  # "UTILIDADE" sozinho
+    # Domínios de email/web no início ou como nome completo
+    r"^[a-z0-9\-]+\.[a-z]{2,3}\.br\s*.*$",  # "dcadvogados.com.br ..."
+    r"^[a-z0-9\-]+\.net\.br\s*.*$",  # "comunix.net.br ..."
+    # CEP solto como nome
+    r"^CEP[:\s].*$",  # "CEP: -325 - PRAIA..."
+))
+
+# Nomes rejeitados após a remoção de prefixos/sufixos
+_ENTITY_REJECT_RE = re.compile(
+    "|".join((
+        # Domínios .com.br / .net.br (OCR de rodapés, não nomes de fornecedor)
+        r"^[a-z0-9\-]+\.(com|net|org)\.br\b",
+        # "Florida" + dígitos (endereço americano)
+        r"^Florida\d+",
+        # "CEP" ou "CEP:" (endereço)
+        r"^CEP[:\s]",
+        # Frases genéricas (não nome de empresa)
+        r"^Valor\s+da\s+causa\s*$",
+        r"^No\s+Internet\s+Banking",
+        r"^para\s+pagamento:",
+        r"^FAVORECIDO:",
+        # Muito genéricos
+        r"^SISTEMAS\s+LTDA\s*$",
+        r"^UTILIDADE\s*$",
+        # Departamento, não fornecedor
+        r"^Contas\s+a\s+(Receber|Pagar)\s*$",
+        # Endereços
+        r"^Florida\s+USA\s*$",
+        r"^CENTRO\s+NOVO\s+",
+        r"^(PC|PRAÇA|PRACA)\s+PRESIDENTE\s+",
+    )),
+    _I,
+)
+
+# Apenas UF (MG, SP, RJ, etc.) ou "CNPJ"/"cnpj" sozinho
+_ENTITY_UF_RE = re.compile(
+    r"^(MG|SP|RJ|PR|SC|RS|BA|GO|DF|ES|PE|CE|PA|MA|MT|MS|CNPJ|CPF|CEP)$", _I
+)
+
+# Artefatos de OCR (antes da correção de caracteres duplicados)
+_ENTITY_ARTIFACT_SUBS = _compile_subs((
+    # Colchetes não são comuns em nomes de empresas (ex: "[dede", "Aeee [dede")
+    (r"\s*\[[^\]]*$", "", 0),  # Remove "[algo" no final (sem fechar)
+    (r"\s*\[[^\]]*\]", " ", 0),  # Remove "[algo]" completo
+    # Palavras curtas suspeitas no final (ex: "Aeee", "dede")
+    (r"\s+[A-Za-z]([a-z])\1{2,}\s*$", "", 0),  # "Aeee" (vogal + 3+ repetidas)
+    (r"\s+([a-z])\1([a-z])\2\s*$", "", 0),  # "dede" (padrão abab)
+    # Sufixos truncados como "..." ou ".." (em qualquer posição)
+    (r"\.{2,}", " ", 0),
+    # Prefixo "Beneficiário" colado (ex: "BeneficiárioREPROMAQ" -> "REPROMAQ")
+    (r"(?i)^benefici[aá]rio\s*", "", 0),
+    (r"\s+", " ", 0),
+))
+
+# Documentos e números embutidos
+_ENTITY_NUMBER_SUBS = _compile_subs((
+    (r"\b\d{2}\.\d{3}\.\d{3}/\d{4}-\d{2}\b", " ", 0),  # CNPJ
+    (r"\b\d{3}\.\d{3}\.\d{3}-\d{2}\b", " ", 0),  # CPF
+    (r"\b\d+[\./]\d+\b", " ", 0),  # Números de documento (ex: 2025.122, 1234/5678)
+    (r"\b\d{4,}\b", " ", 0),  # Sequências numéricas longas (4+ dígitos)
+))
+
+# Caracteres OCR problemáticos (Ê, □, etc.)
+_ENTITY_PROBLEMATIC_CHARS = ("Ê", "ê", "□", "▢", "■", "▭", "▯", "�")
+
+# Limpeza de sufixos residuais (após remover números)
+_ENTITY_CLEANUP_SUBS = _compile_subs((
+    # Sufixos residuais (ex: "// -- // --77")
+    (r"[\s/\-]+\d*\s*$", "", 0),
+    # Código de agência/conta no final (ex: "Skymail LTDA 393")
+    (r"\s+\d{3,4}\s*$", "", 0),
+    # CNPJ mascarado no final (ex: "******/********")
+    (r"\s+\*+/\*+\s*$", "", 0),
+    (r"\s*\|\s*CNPJ.*$", "", _I),  # "| CNPJ - CNPJ XX.XXX..."
+    (r"\s*=\s*CNPJ.*$", "", _I),  # "= CNPJ"
+    (r"\s*\|?\s*CNL\.\s*$", "", _I),  # "CNL." ou "| CNL."
+    # Endereço internacional (Florida, USA, TAXID)
+    (r"\s+Florida\d+USA.*$", "", _I),
+    (r"\s+Florida\s+USA\s*$", "", _I),
+    (r"\s+TAXID\d*-?.*$", "", _I),
+    # "CNPJ" colado no final (ex: "Rede Mulher de Televisao Ltda CNPJ")
+    (r"\s+CNPJ\s*$", "", _I),
+    # "/ -1 1 ( ) Mudou-se" e variações
+    (r"\s*/\s*-?\d*\s*\d*\s*\(\s*\)\s*Mudou-se.*$", "", _I),
+    (r"\s+Mudou-se.*$", "", _I),
+    # "Inscrição Municipal" e variações com hash
+    (r"\s+[A-Fa-f0-9]{6,}\s+Inscri[cç][aã]o\s+Municipal.*$", "", _I),
+    (r"\s+Inscri[cç][aã]o\s+Municipal.*$", "", _I),
+    # "- Endereço Município CEP" e variações
+    (r"\s+-\s+Endereço\s+Município\s+CEP.*$", "", _I),
+    (r"\s+Endereço\s+Município\s+CEP.*$", "", _I),
+    (r"\s+FINANCEIRO\s*$", "", _I),
+    # OCR corrompido tipo "R vel pela Retoncã" e domínios colados
+    (r"\s+R\s+vel\s+pela\s+Ret.*$", "", _I),
+    (r"\s+Q?comunix\.net\.br.*$", "", _I),
+    (r"\s+dcadvogados\.com\.br.*$", "", _I),
+    (r"\s+repromaq\.com\.br.*$", "", _I),
+    # Endereços ("ENDEREÇO AV.", EDIF, ANDAR)
+    (r"\s+ENDERE[CÇ]O\s+AV\.?.*$", "", _I),
+    (r"\s+EDIF\s+.*$", "", _I),
+    (r"\s+\d+\s+ANDAR.*$", "", _I),
+    (r"\s+Cod\.?\s+de\s+Autenticidade.*$", "", _I),
+    # Emails/usernames colados no final
+    (r"\s+[a-z]+\.[a-z]+@[^\s]*$", "", _I),
+    (r"\s+[a-z]+@[^\s]*$", "", _I),
+    (r"\s+(joaopmsoares|janaina\.campos|conexaoidealmg)\s*$", "", _I),
+    (r"\s+(financeiro|comercial)\s*$", "", _I),
+    (r"\s+Nome\s+Fantasia\s+.*$", "", _I),
+    # "NOTA DE DÉBITO" no meio do nome (lixo OCR) - mantém espaço
+    (r"\s+NOTA\s+DE\s+D[ÉE]BITO\s+", " DE ", _I),
+    (r"\s+www\.[a-z0-9\-\.]+\s*$", "", _I),
+    # ", inscrita no CNPJ" e variações
+    (r",?\s+inscrita?\s+no\s+CNPJ.*$", "", _I),
+    (r"\s+CNPJ/MF\s+sob.*$", "", _I),
+    (r"\s+CNPJ/CPF\s*$", "", _I),
+    (r"\s+CNPJ\s*$", "", _I),
+    # Cidade/UF no final
+    (r"\s+-\s+[A-Z]{2}\s+-\s+[A-Z][a-zA-Z\s]+$", "", 0),
+    (r"\s+-\s+[A-Z][a-zA-Z]+/\s*[A-Z]{2}\s*$", "", 0),
+    (r"\s+CPF/CNPJ\s*$", "", _I),
+    (r"\s+CNPJ\s*$", "", _I),
+    (r"\s+CPF\s*$", "", _I),
+    # Lixo OCR tipo "CNPJ . .61"
+    (r"\s+CNPJ\s*\.\s*\.\s*\d*\s*$", "", _I),
+))
+
+# Sufixos empresariais/UF válidos como última palavra curta
+_ENTITY_VALID_LAST_WORDS = frozenset({
+    "LTDA",
+    "SA",
+    "S/A",
+    "S.A",
+    "S.A.",
+    "ME",
+    "MEI",
+    "EPP",
+    "EIRELI",
+    "SS",
+    "SIMPLES",
+    "CIA",
+    "CIA.",
+    "INC",
+    "CORP",
+    "BRASIL",
+    "BR",
+    "SP",
+    "RJ",
+    "MG",
+    "PR",
+    "SC",
+    "RS",
+    "BA",
+    "GO",
+    "DF",
+    "ES",
+    "PE",
+    "CE",
+    "PA",
+    "MA",
+    "MT",
+    "MS",
+})
+
+# Última palavra com padrão de lixo OCR (ex: "Aeee")
+_ENTITY_JUNK_WORD_RE = re.compile(r"^[A-Za-z]([a-z])\1+$")
+
+# CNPJ/CPF/CEP que ficou no final após a limpeza (ex: "Empresa CNPJ: -8")
+_ENTITY_FINAL_SUBS = _compile_subs((
+    (r"\s+CNPJ\s*$", "", _I),
+    (r"\s+CPF\s*$", "", _I),
+    (r"\s+CEP\s*$", "", _I),
+))
+
+# Padrões rejeitados após toda a normalização
+_ENTITY_FINAL_REJECT_RE = re.compile(
+    "|".join((
+        # "Florida USA" (endereço americano resultante de limpeza de números)
+        r"^Florida\s+USA\s*$",
+        # Endereço americano genérico
+        r"^(Florida|California|Texas|New York)\s+(USA|US)?\s*$",
+        # "CNPJ" ou "CPF" que sobrou após limpeza
+        r"^(CNPJ|CPF|CEP)\s*$",
+    )),
+    _I,
+)
+_ENTITY_FINAL_UF_RE = re.compile(
+    r"^(MG|SP|RJ|PR|SC|RS|BA|GO|DF|ES|PE|CE|PA|MA|MT|MS|CNPJ|CPF|CEP|USA|BR)$", _I
+)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=ENTITY_NAME_CACHE_SIZE)
 def normalize_entity_name(raw: str) -> str:
     """
     Normaliza nome de entidade (empresa/pessoa).
@@ -509,6 +921,10 @@ def normalize_entity_name(raw: str) -> str:
     - Headers/labels de documentos (ex: "DOCUMENTO(S)", "EMITENTE DA NFS-e")
     - Nomes colados (tenta separar palavras quando possível)
 
+    Os mesmos candidatos passam por aqui várias vezes (extratores,
+    `BatchResult` e pareamento): as regras ficam pré-compiladas no módulo e
+    o resultado é memorizado (LRU de `ENTITY_NAME_CACHE_SIZE` nomes).
+
     Args:
         raw: Nome bruto extraído
 
@@ -529,540 +945,232 @@ def normalize_entity_name(raw: str) -> str:
     """
     name = (raw or "").strip()
 
-    # ============================================================
-    # BLACKLIST DE HEADERS/LABELS (rejeitar completamente)
-    # Padrões que NUNCA são nomes de fornecedor válidos
-    # ============================================================
-    blacklist_exact = [
-        # Labels de boleto
-        "DOCUMENTO(S)",
-        "DOCUMENTOS",
-        "DOCUMENTO",
-        "BENEFICIÁRIO",
-        "BENEFICIARIO",
-        "CEDENTE",
-        "SACADO",
-        "PAGADOR",
-        "RECEBEDOR",
-        "NOME DO RECEBEDOR",
-        # Labels de NFSe
-        "EMITENTE DA NFS-E",
-        "EMITENTE DA NFSE",
-        "PRESTADOR DE SERVIÇOS",
-        "PRESTADOR DE SERVICOS",
-        "PRESTADOR DO SERVIÇO",
-        "PRESTADOR DO SERVICO",
-        "TOMADOR DO SERVIÇO",
-        "TOMADOR DO SERVICO",
-        "TOMADOR DE SERVIÇOS",
-        "TOMADOR DE SERVICOS",
-        # Labels genéricos
-        "RAZÃO SOCIAL",
-        "RAZAO SOCIAL",
-        "NOME EMPRESARIAL",
-        "NOME FANTASIA",
-        "CNPJ",
-        "CPF",
-        "CEP",
-        "CNPJ/CPF",
-        "CPF/CNPJ",
-        # Outros
-        "VENCIMENTO",
-        "VALOR",
-        "CARTEIRA",
-        "ESPÉCIE",
-        "ESPECIE",
-        "ACEITE",
-        "AGÊNCIA",
-        "AGENCIA",
-        "CONTA",
-    ]
-
-    name_upper_stripped = name.upper().strip()
-    if name_upper_stripped in blacklist_exact:
+    if name.upper().strip() in _ENTITY_BLACKLIST_EXACT:
         return ""
-
-    # Blacklist de padrões (regex)
-    blacklist_patterns = [
-        # Headers de boleto concatenados
-        r"^Cedente\s+N[úu]mero\s+do\s+Documento",
-        r"^N[úu]mero\s+do\s+Documento\s+Esp[ée]cie",
-        r"^Esp[ée]cie\s+Quantidade.*Valor",
-        r"^Valor\s+do\s+Documento",
-        # DOCUMENTO(S) com ou sem número
-        r"^DOCUMENTO\(S\)\s*:?\s*[\d\s]*$",
-        r"^DOCUMENTO\s*\(S\)\s*:?\s*[\d\s]*$",
-        r"^DOCUMENTOS?\s*:?\s*[\d\s]*$",
-        # Headers de NFSe concatenados
-        r"^EMITENTE\s+DA\s+NFS-?E\s+Prestador",
-        r"^Prestador\s+de\s+servi[çc]o\s+Nome",
-        r"^PRESTADOR\s+DE\s+SERVI[ÇC]OS?\s+[A-Z0-9\-]+\s+\d+",  # "PRESTADOR DE SERVIÇOS HCJQ-5R1R 20260202..."
-        r"^\w{4,8}-\w{4,8}\s+\d+u\d+\s+PRESTADOR",  # "HCJQ-5R1R 20260202u13114403000103 PRESTADOR..."
-        # Padrões de código + label
-        r"^[A-Z0-9\-]{6,12}\s+\d{8,}u?\d*\s+PRESTADOR",
-        # Nome/Nome Empresarial colado
-        r"^Nome\s*/?\s*Nome\s+Empresarial",
-        # Formulário de entrega
-        r"^\s*\(\s*\)\s*(Ausente|Mudou-se|Mudou|Recusado|Desconhecido|Falecido)",
-        r"^\s*\(\s*\)\s*N[ãa]o\s+(existe|procurado)",
-        r"^\s*\(\s*\)\s*Endere[çc]o\s+insuficiente",
-        r"^\s*\(\s*\)\s*Outros",
-        # Frases genéricas
-        r"^Valor\s+da\s+causa\s*$",
-        r"^No\s+Internet\s+Banking",
-        r"^para\s+pagamento:",
-        r"^FAVORECIDO:",
-        r"^Contas\s+a\s+(Receber|Pagar)",
-        # nome do recebedor (case insensitive)
-        r"^nome\s+do\s+recebedor\s*$",
-    ]
-
-    for pattern in blacklist_patterns:
-        if re.match(pattern, name, re.IGNORECASE):
-            return ""
-
-    # VERIFICAÇÃO ANTECIPADA: Formulário de entrega (antes de qualquer processamento)
-    # "( ) Ausente", "( ) Mudou-se", etc. devem ser rejeitados completamente
-    if re.match(
-        r"^\s*\(\s*\)\s*(Ausente|Mudou-se|Mudou|Recusado|Desconhecido|Falecido|N[ãa]o\s+existe|N[ãa]o\s+procurado|Endere[çc]o\s+insuficiente|Outros)",
-        name,
-        re.IGNORECASE,
-    ):
+    if _ENTITY_BLACKLIST_RE.match(name) or _ENTITY_DELIVERY_FORM_RE.match(name):
         return ""
 
-    # Remove prefixos genéricos que não são parte do nome da empresa
-    prefixes_to_remove = [
-        r"^E-mail\s+",
-        r"^Beneficiario\s+",
-        r"^Beneficiário\s+",
-        r"^Nome/NomeEmpresarial\s+",
-        r"^Nome\s+/\s*Nome\s+Empresarial\s+E-mail\s+",  # "Nome / Nome Empresarial E-mail"
-        r"^Nome\s+Empresarial\s+",
-        r"^Razão\s+Social\s+",
-        r"^Razao\s+Social\s+",
-        r"^CNPJ\s*[:\s]*",  # "CNPJ" ou "CNPJ:" sozinho no início
-        r"^CPF\s*[:\s]*",  # "CPF" ou "CPF:" sozinho no início
-    ]
-    for prefix_pattern in prefixes_to_remove:
-        name = re.sub(prefix_pattern, "", name, flags=re.IGNORECASE)
-
-    # Remove sufixos genéricos que não são parte do nome da empresa
-    suffixes_to_remove = [
-        r"\s+CONTATO\s*$",
-        r"\s+CONTATO@[^\s]+\s*$",
-        r"\s+CPF\s+ou\s+CNPJ\s*$",
-        r"\s+CPF/CNPJ\s*$",
-        r"\s+-\s+CNPJ\s*$",  # "- CNPJ" no final
-        r"\s+-\s+CNPJ\s+\d{2}\.\d{3}\.\d{3}/\d{4}-\d{2}\s*$",  # "- CNPJ XX.XXX.XXX/XXXX-XX"
-        r"\s+\|\s*CNPJ\s+-\s+CNPJ\s*$",  # "| CNPJ - CNPJ"
-        r"\s+\|\s*CNPJ\s*$",  # "| CNPJ" no final
-        r"\s+\|\s+CNL\.\s*$",  # "| CNL." no final (ex: VERO S.A. CNL.)
-        r"\s+CNL\.\s*$",  # "CNL." solto no final
-        r"\s+\|\s*$",  # "|" solto no final
-        r"\s+=\s+CNPJ\s*$",  # "= CNPJ" no final
-        r"\s+-\s+Endereço.*$",
-        r"\s+-\s+Município.*$",
-        r"\s+-\s+CEP.*$",
-        r"\s+Endereço\s+Município\s+CEP.*$",  # "Endereço Município CEP PARAIBA"
-        r"\s+-\s+Endereço\s+Município\s+CEP.*$",  # "- Endereço Município CEP PARAIBA"
-        r"\s+Endereço\s*$",
-        r"\s+CNPJ:\s*Al\s+.*$",  # "CNPJ: Al Vicente" texto truncado
-        r"\s+CNPJ:\s*$",  # "CNPJ:" solto no final
-        r"\s+ao\s+assinar\s*$",  # "ao assinar" no final
-        r"\s+Gerente\s+de\s+conta:.*$",  # "Gerente de conta:NOME"
-        r"\s+\*{4,}/\*{4,}\s*$",  # "******/********" (CNPJ mascarado)
-        r"\s+\d{3,4}[-/]?\d*\s*$",  # Códigos de agência soltos no final (ex: "393", "401-301")
-        r"\s+CPF/CNPJ\s*$",  # "CPF/CNPJ" solto no final
-        r"\s+CPF\s*$",  # "CPF" solto no final
-        r"\s+CNPJ\s+\.\s*\.\d*\s*$",  # "CNPJ . .61" lixo OCR
-        r"\s+CNPJ\s*\.\s*\.\s*\d*\s*$",  # variação do padrão anterior
-        r"\s+Nome\s+Empresarial\s*$",  # "Nome Empresarial" no final
-        r"\s+Nome\s+/\s*Nome\s+Empresarial.*$",  # "Nome / Nome Empresarial..."
-        r"\s+Nome\s+Fantasia\s+.*$",  # "Nome Fantasia NEW CONT..."
-        # Emails/usernames colados ao nome da empresa
-        r"\s+[a-z]+\.[a-z]+@.*$",  # "janaina.campos@..."
-        r"\s+[a-z]+@.*$",  # "financeiro@..."
-        r"\s+joaopmsoares\s*$",  # username colado
-        r"\s+janaina\.campos\s*$",
-        r"\s+financeiro\s*$",  # departamento colado (minúsculo)
-        r"\s+comercial\s*$",  # departamento colado (minúsculo)
-        r"\s+COMERCIAL\s*$",  # departamento colado (maiúsculo)
-        r"\s+JOAOPMSOARES\s*$",
-        r"\s+CONEXAOIDEALMG\s*$",  # username colado
-        r"\s+[A-Z]+MG\s*$",  # usernames tipo "EMPRESAMG"
-        # Sites www colados
-        r"\s+www\.[a-z0-9\-]+\.[a-z\.]+\s*$",  # "www.voicecorp.com.br"
-        # Padrões "inscrita no CNPJ"
-        r",?\s+inscrita?\s+no\s+CNPJ.*$",  # ", inscrita no CNPJ/MF sob o nº"
-        r"\s+CNPJ/MF\s+sob.*$",
-        r"\s+CNPJ/CPF\s*$",  # "LTDA CNPJ/CPF"
-        r"\s+CNPJ\s*$",  # "LTDA CNPJ" no final
-        r"\bCNPJ\s*$",  # "Ltda CNPJ" - CNPJ colado no final (word boundary)
-        # Padrões de endereços/lixo que aparecem colados ao nome da empresa
-        r"\s+ENDEREÇO\s+AV\.?.*$",  # "ENDEREÇO AV. AMAZONAS"
-        r"\s+ENDERECO\s+AV\.?.*$",  # sem acento
-        r"\s+/\s*-?\d*\s*\d*\s*\(\s*\)\s*Mudou-se.*$",  # "/ -1 1 ( ) Mudou-se"
-        r"\s+Mudou-se.*$",  # "Mudou-se" no final
-        # Padrões de "Comprovante de Entrega" (formulário de correios)
-        r"^\s*\(\s*\)\s*Ausente.*$",  # "( ) Ausente"
-        r"^\s*\(\s*\)\s*Mudou-se.*$",  # "( ) Mudou-se"
-        r"^\s*\(\s*\)\s*Recusado.*$",  # "( ) Recusado"
-        r"^\s*\(\s*\)\s*Desconhecido.*$",  # "( ) Desconhecido"
-        r"^\s*\(\s*\)\s*Falecido.*$",  # "( ) Falecido"
-        r"^\s*\(\s*\)\s*N[ãa]o\s+existe.*$",  # "( ) Não existe"
-        r"^\s*\(\s*\)\s*N[ãa]o\s+procurado.*$",  # "( ) Não procurado"
-        r"^\s*\(\s*\)\s*Endere[çc]o\s+insuficiente.*$",  # "( ) Endereço insuficiente"
-        r"^\s*\(\s*\)\s*Outros.*$",  # "( ) Outros"
-        # "Florida USA" sem números (padrão de endereço americano)
-        r"^Florida\s+USA\s*$",  # "Florida USA" sozinho
-        r"\s+TAXID\d*-?.*$",  # "TAXID95-" e variações
-        r"\s+Inscrição\s+Municipal.*$",  # "Inscrição Municipal" no final
-        r"\s+Inscricao\s+Municipal.*$",  # sem acento
-        r"\s+[A-F0-9]{8,}\s+Inscrição\s+Municipal.*$",  # "F50C0E532 Inscrição Municipal"
-        r"\s+[A-F0-9]{8,}\s+Inscricao\s+Municipal.*$",  # sem acento
-        r"\s+Florida\d+USA.*$",  # "Florida33134USA"
-        r"\s+FINANCEIRO\s*$",  # "FINANCEIRO" solto no final
-        r"\s+R\s+vel\s+pela\s+Ret.*$",  # "R vel pela Retoncã" OCR corrompido
-        r"\s+Cod\.\s+de\s+Autenticidade.*$",  # "Cod. de Autenticidade"
-        r"\s+\d+\s+ANDAR.*$",  # "17 ANDAR" endereço
-        r"\s+EDIF\s+.*$",  # "EDIF PALACIO DA AGRICULTURA"
-        # Endereços com cidade/UF
-        r"\s+-\s+[A-Z]{2}\s+-\s+[A-Z][a-zA-Z\s]+$",  # "- CE - FORTALEZA"
-        r"\s+-\s+[A-Z][a-zA-Z\s]+/\s*[A-Z]{2}\s*$",  # "- CARMO/ RJ"
-        r"\s+CENTRO\s+NOVO\s+.*$",  # "CENTRO NOVO HAMBURGO/ RS"
-        r"\s+PC\s+PRESIDENTE\s+.*$",  # "PC PRESIDENTE GETULIO VARGAS..."
-        # Frases genéricas que não são nomes
-        r"^Valor\s+da\s+causa\s*$",  # "Valor da causa"
-        r"^No\s+Internet\s+Banking.*$",  # "No Internet Banking ou DDA..."
-        r"^para\s+pagamento:.*$",  # "para pagamento: FAVORECIDO:..."
-        r"^FAVORECIDO:.*$",  # "FAVORECIDO: EMPRESA"
-        # "NOTA DE DÉBITO" no meio do nome (lixo OCR)
-        r"\s+NOTA\s+DE\s+D[ÉE]BITO\s+",  # remove do meio
-        # Strings muito genéricas que não são nomes de empresa
-        r"^SISTEMAS\s+LTDA\s*$",  # "SISTEMAS LTDA" sozinho
-        r"^UTILIDADE\s*$",  # "UTILIDADE" sozinho
-        # Domínios de email/web no início ou como nome completo
-        r"^[a-z0-9\-]+\.[a-z]{2,3}\.br\s*.*$",  # "dcadvogados.com.br ..."
-        r"^[a-z0-9\-]+\.net\.br\s*.*$",  # "comunix.net.br ..."
-        # CEP solto como nome
-        r"^CEP[:\s].*$",  # "CEP: -325 - PRAIA..."
-    ]
-    for suffix_pattern in suffixes_to_remove:
-        name = re.sub(suffix_pattern, "", name, flags=re.IGNORECASE)
-
-    # Remove domínios .com.br / .net.br que aparecem como "nome" da empresa
-    # Esses são OCR de rodapés de documentos, não nomes de fornecedor
-    if re.match(r"^[a-z0-9\-]+\.(com|net|org)\.br\b", name, re.IGNORECASE):
-        # Se começa com domínio, provavelmente é lixo - limpa tudo
-        name = ""
-
-    # Se começa com "Florida" + dígitos (endereço americano), é lixo
-    if re.match(r"^Florida\d+", name, re.IGNORECASE):
-        name = ""
-
-    # Se começa com "CEP" ou "CEP:", é endereço, não fornecedor
-    if re.match(r"^CEP[:\s]", name, re.IGNORECASE):
-        name = ""
-
-    # Se é frase genérica (não nome de empresa)
-    if re.match(r"^Valor\s+da\s+causa\s*$", name, re.IGNORECASE):
-        name = ""
-    if re.match(r"^No\s+Internet\s+Banking", name, re.IGNORECASE):
-        name = ""
-    if re.match(r"^para\s+pagamento:", name, re.IGNORECASE):
-        name = ""
-    if re.match(r"^FAVORECIDO:", name, re.IGNORECASE):
-        name = ""
-
-    # Se é "SISTEMAS LTDA" ou "UTILIDADE" sozinho (muito genérico)
-    if re.match(r"^SISTEMAS\s+LTDA\s*$", name, re.IGNORECASE):
-        name = ""
-    if re.match(r"^UTILIDADE\s*$", name, re.IGNORECASE):
-        name = ""
-
-    # Se é "Contas a Receber" ou similar (departamento, não fornecedor)
-    if re.match(r"^Contas\s+a\s+(Receber|Pagar)\s*$", name, re.IGNORECASE):
-        name = ""
-
-    # Se é apenas UF (MG, SP, RJ, etc.) ou "CNPJ"/"cnpj" sozinho
-    if re.match(
-        r"^(MG|SP|RJ|PR|SC|RS|BA|GO|DF|ES|PE|CE|PA|MA|MT|MS|CNPJ|CPF|CEP)$",
-        name.strip(),
-        re.IGNORECASE,
-    ):
-        name = ""
-
-    # Se é "Florida USA" (endereço americano)
-    if re.match(r"^Florida\s+USA\s*$", name, re.IGNORECASE):
-        name = ""
-
-    # Se começa com "CENTRO NOVO" (endereço)
-    if re.match(r"^CENTRO\s+NOVO\s+", name, re.IGNORECASE):
-        name = ""
+    name = _apply_subs(name, _ENTITY_PREFIX_SUBS)
+    name = _apply_subs(name, _ENTITY_SUFFIX_SUBS)
 
-    # Se começa com "PC PRESIDENTE" ou "PRAÇA" (endereço)
-    if re.match(r"^(PC|PRAÇA|PRACA)\s+PRESIDENTE\s+", name, re.IGNORECASE):
+    if _ENTITY_REJECT_RE.match(name) or _ENTITY_UF_RE.match(name.strip()):
         name = ""
 
     # ============================================================
     # TRATAMENTO DE NOMES COLADOS (sem espaços)
-    # Detecta e tenta separar palavras em nomes concatenados
     # Ex: "RSMBRASILAUDITORIAECONSULTORIALTDA" -> "RSM BRASIL AUDITORIA E CONSULTORIA LTDA"
     # ============================================================
     name = _fix_concatenated_name(name)
 
-    # Remove artefatos OCR com colchetes (ex: "[dede", "[abc123", "Aeee [dede")
-    # Colchetes não são comuns em nomes de empresas
-    name = re.sub(r"\s*\[[^\]]*$", "", name)  # Remove "[algo" no final (sem fechar)
-    name = re.sub(r"\s*\[[^\]]*\]", " ", name)  # Remove "[algo]" completo
-
-    # Remove palavras curtas suspeitas no final (artefatos OCR como "Aeee", "dede")
-    # Padrão: palavras de 2-5 letras repetidas (ex: "Aeee", "eee", "dede")
-    name = re.sub(
-        r"\s+[A-Za-z]([a-z])\1{2,}\s*$", "", name
-    )  # "Aeee" (vogal + 3+ repetidas)
-    name = re.sub(r"\s+([a-z])\1([a-z])\2\s*$", "", name)  # "dede" (padrão abab)
-
-    # Remove sufixos truncados como "..." ou ".." (em qualquer posição)
-    name = re.sub(r"\.{2,}", " ", name)
-
-    # Remove prefixo "Beneficiário" colado (ex: "BeneficiárioREPROMAQ" -> "REPROMAQ")
-    name = re.sub(r"(?i)^benefici[aá]rio\s*", "", name)
-
-    # Normaliza espaços
-    name = re.sub(r"\s+", " ", name)
+    name = _apply_subs(name, _ENTITY_ARTIFACT_SUBS)
 
     # Corrige caracteres duplicados de OCR (ex: "LLOOCCAALLIIZZAA" -> "LOCALIZA")
     # Aplica por palavra para preservar espaços
-    words = name.split()
-    fixed_words = [_fix_ocr_duplicated_chars(word) for word in words]
-    name = " ".join(fixed_words)
-
-    # Remove CNPJ
-    name = re.sub(r"\b\d{2}\.\d{3}\.\d{3}/\d{4}-\d{2}\b", " ", name)
-
-    # Remove CPF
-    name = re.sub(r"\b\d{3}\.\d{3}\.\d{3}-\d{2}\b", " ", name)
-
-    # Remove números de documento (ex: 2025.122, 1234/5678)
-    name = re.sub(r"\b\d+[\./]\d+\b", " ", name)
+    name = " ".join(_fix_ocr_duplicated_chars(word) for word in name.split())
 
-    # Remove sequências numéricas longas (4+ dígitos)
-    name = re.sub(r"\b\d{4,}\b", " ", name)
-
-    # Remove caracteres OCR problemáticos (Ê, □, etc.)
-    name = name.replace("Ê", " ")
-    name = name.replace("ê", " ")
-    problematic_chars = ["□", "▢", "■", "▭", "▯", "�"]
-    for char in problematic_chars:
+    name = _apply_subs(name, _ENTITY_NUMBER_SUBS)
+    for char in _ENTITY_PROBLEMATIC_CHARS:
         name = name.replace(char, " ")
+    name = _apply_subs(name, _ENTITY_CLEANUP_SUBS)
 
-    # Remove sufixos residuais após limpeza (ex: "// -- // --77")
-    name = re.sub(r"[\s/\-]+\d*\s*$", "", name)
-
-    # Remove código de agência/conta no final (3-4 dígitos após nome)
-    # Ex: "Skymail LTDA 393" -> "Skymail LTDA"
-    name = re.sub(r"\s+\d{3,4}\s*$", "", name)
-
-    # Remove CNPJ mascarado no final (ex: "******/********")
-    name = re.sub(r"\s+\*+/\*+\s*$", "", name)
-
-    # Remove padrão "| CNPJ - CNPJ XX.XXX..." no final
-    name = re.sub(r"\s*\|\s*CNPJ.*$", "", name, flags=re.IGNORECASE)
-
-    # Remove padrão "= CNPJ" no final
-    name = re.sub(r"\s*=\s*CNPJ.*$", "", name, flags=re.IGNORECASE)
-
-    # Remove "CNL." ou "| CNL." no final
-    name = re.sub(r"\s*\|?\s*CNL\.\s*$", "", name, flags=re.IGNORECASE)
-
-    # Remove padrões de endereço internacional (Florida, USA, TAXID)
-    name = re.sub(r"\s+Florida\d+USA.*$", "", name, flags=re.IGNORECASE)
-    name = re.sub(r"\s+Florida\s+USA\s*$", "", name, flags=re.IGNORECASE)
-    name = re.sub(r"\s+TAXID\d*-?.*$", "", name, flags=re.IGNORECASE)
-
-    # Remove sufixo "CNPJ" que ficou colado no final após outras limpezas
-    # Ex: "Rede Mulher de Televisao Ltda CNPJ" -> "Rede Mulher de Televisao Ltda"
-    name = re.sub(r"\s+CNPJ\s*$", "", name, flags=re.IGNORECASE)
-
-    # Remove "/ -1 1 ( ) Mudou-se" e variações
-    name = re.sub(
-        r"\s*/\s*-?\d*\s*\d*\s*\(\s*\)\s*Mudou-se.*$", "", name, flags=re.IGNORECASE
-    )
-    name = re.sub(r"\s+Mudou-se.*$", "", name, flags=re.IGNORECASE)
-
-    # Remove "Inscrição Municipal" e variações com hash
-    name = re.sub(
-        r"\s+[A-Fa-f0-9]{6,}\s+Inscri[cç][aã]o\s+Municipal.*$",
-        "",
-        name,
-        flags=re.IGNORECASE,
-    )
-    name = re.sub(r"\s+Inscri[cç][aã]o\s+Municipal.*$", "", name, flags=re.IGNORECASE)
-
-    # Remove "- Endereço Município CEP" e variações
-    name = re.sub(
-        r"\s+-\s+Endereço\s+Município\s+CEP.*$", "", name, flags=re.IGNORECASE
-    )
-    name = re.sub(r"\s+Endereço\s+Município\s+CEP.*$", "", name, flags=re.IGNORECASE)
-
-    # Remove "FINANCEIRO" solto no final
-    name = re.sub(r"\s+FINANCEIRO\s*$", "", name, flags=re.IGNORECASE)
-
-    # Remove OCR corrompido tipo "R vel pela Retoncã"
-    name = re.sub(r"\s+R\s+vel\s+pela\s+Ret.*$", "", name, flags=re.IGNORECASE)
-    name = re.sub(r"\s+Q?comunix\.net\.br.*$", "", name, flags=re.IGNORECASE)
-    name = re.sub(r"\s+dcadvogados\.com\.br.*$", "", name, flags=re.IGNORECASE)
-    name = re.sub(r"\s+repromaq\.com\.br.*$", "", name, flags=re.IGNORECASE)
-
-    # Remove "ENDEREÇO AV." e variações
-    name = re.sub(r"\s+ENDERE[CÇ]O\s+AV\.?.*$", "", name, flags=re.IGNORECASE)
-
-    # Remove endereços com EDIF/ANDAR
-    name = re.sub(r"\s+EDIF\s+.*$", "", name, flags=re.IGNORECASE)
-    name = re.sub(r"\s+\d+\s+ANDAR.*$", "", name, flags=re.IGNORECASE)
-
-    # Remove "Cod. de Autenticidade" e similares
-    name = re.sub(r"\s+Cod\.?\s+de\s+Autenticidade.*$", "", name, flags=re.IGNORECASE)
-
-    # Remove emails/usernames colados no final
-    name = re.sub(r"\s+[a-z]+\.[a-z]+@[^\s]*$", "", name, flags=re.IGNORECASE)
-    name = re.sub(r"\s+[a-z]+@[^\s]*$", "", name, flags=re.IGNORECASE)
-    name = re.sub(
-        r"\s+(joaopmsoares|janaina\.campos|conexaoidealmg)\s*$",
-        "",
-        name,
-        flags=re.IGNORECASE,
-    )
-    name = re.sub(r"\s+(financeiro|comercial)\s*$", "", name, flags=re.IGNORECASE)
-
-    # Remove "Nome Fantasia ..." colado no final
-    name = re.sub(r"\s+Nome\s+Fantasia\s+.*$", "", name, flags=re.IGNORECASE)
-
-    # Remove "NOTA DE DÉBITO" do meio do nome (lixo OCR) - mantém espaço
-    name = re.sub(r"\s+NOTA\s+DE\s+D[ÉE]BITO\s+", " DE ", name, flags=re.IGNORECASE)
-
-    # Remove www. colado no final
-    name = re.sub(r"\s+www\.[a-z0-9\-\.]+\s*$", "", name, flags=re.IGNORECASE)
-
-    # Remove ", inscrita no CNPJ" e variações
-    name = re.sub(r",?\s+inscrita?\s+no\s+CNPJ.*$", "", name, flags=re.IGNORECASE)
-    name = re.sub(r"\s+CNPJ/MF\s+sob.*$", "", name, flags=re.IGNORECASE)
-
-    # Remove "CNPJ/CPF" ou "CNPJ" solto no final (após nome da empresa)
-    name = re.sub(r"\s+CNPJ/CPF\s*$", "", name, flags=re.IGNORECASE)
-    # Já existe regex para CNPJ solto, mas reforçando:
-    name = re.sub(r"\s+CNPJ\s*$", "", name, flags=re.IGNORECASE)
-
-    # Remove padrões de cidade/UF no final
-    name = re.sub(r"\s+-\s+[A-Z]{2}\s+-\s+[A-Z][a-zA-Z\s]+$", "", name)
-    name = re.sub(r"\s+-\s+[A-Z][a-zA-Z]+/\s*[A-Z]{2}\s*$", "", name)
-
-    # Remove "CPF/CNPJ" ou "CNPJ" solto no final
-    name = re.sub(r"\s+CPF/CNPJ\s*$", "", name, flags=re.IGNORECASE)
-    name = re.sub(r"\s+CNPJ\s*$", "", name, flags=re.IGNORECASE)
-    name = re.sub(r"\s+CPF\s*$", "", name, flags=re.IGNORECASE)
-
-    # Remove lixo OCR tipo "CNPJ . .61"
-    name = re.sub(r"\s+CNPJ\s*\.\s*\.\s*\d*\s*$", "", name, flags=re.IGNORECASE)
-
-    # Remove palavras soltas no final que parecem lixo OCR
-    # (palavras muito curtas ou com padrões estranhos após empresa válida)
-    # Ex: "EMPRESA LTDA ABC" onde "ABC" é lixo
+    # Remove palavra solta no final que parece lixo OCR
+    # Ex: "EMPRESA LTDA Aeee" (curta, não é sufixo empresarial)
     words = name.split()
     if len(words) >= 3:
         last_word = words[-1]
-        # Se última palavra é curta (<=4 chars) e não é sufixo empresarial válido
-        valid_suffixes = {
-            "LTDA",
-            "SA",
-            "S/A",
-            "S.A",
-            "S.A.",
-            "ME",
-            "MEI",
-            "EPP",
-            "EIRELI",
-            "SS",
-            "SIMPLES",
-            "CIA",
-            "CIA.",
-            "INC",
-            "CORP",
-            "BRASIL",
-            "BR",
-            "SP",
-            "RJ",
-            "MG",
-            "PR",
-            "SC",
-            "RS",
-            "BA",
-            "GO",
-            "DF",
-            "ES",
-            "PE",
-            "CE",
-            "PA",
-            "MA",
-            "MT",
-            "MS",
-        }
-        if len(last_word) <= 4 and last_word.upper() not in valid_suffixes:
-            # Verifica se parece lixo (padrão de caracteres repetidos ou estranhos)
-            if re.match(r"^[A-Za-z]([a-z])\1+$", last_word):  # ex: "Aeee"
-                words = words[:-1]
-                name = " ".join(words)
+        if (
+            len(last_word) <= 4
+            and last_word.upper() not in _ENTITY_VALID_LAST_WORDS
+            and _ENTITY_JUNK_WORD_RE.match(last_word)
+        ):
+            name = " ".join(words[:-1])
 
     # Limpa espaços e pontuação residual
-    name = re.sub(r"\s+", " ", name).strip(" -:;/")
-
-    # ============================================================
-    # LIMPEZA FINAL DE SUFIXOS (após toda normalização)
-    # Remove sufixos que só aparecem após limpeza de números/pontuação
-    # ============================================================
-
-    # Remove CNPJ/CPF que ficou no final após limpeza (ex: "Empresa CNPJ: -8" -> "Empresa CNPJ")
-    name = re.sub(r"\s+CNPJ\s*$", "", name, flags=re.IGNORECASE)
-    name = re.sub(r"\s+CPF\s*$", "", name, flags=re.IGNORECASE)
-    name = re.sub(r"\s+CEP\s*$", "", name, flags=re.IGNORECASE)
+    name = _WHITESPACE_RE.sub(" ", name).strip(" -:;/")
+    name = _apply_subs(name, _ENTITY_FINAL_SUBS)
 
     # ============================================================
     # VERIFICAÇÕES FINAIS (após toda a limpeza)
     # Rejeita padrões que só se tornam visíveis após normalização
     # ============================================================
-
     final_name = name.strip()
 
-    # Rejeita "Florida USA" (endereço americano resultante de limpeza de números)
-    if re.match(r"^Florida\s+USA\s*$", final_name, re.IGNORECASE):
-        return ""
-
-    # Rejeita strings muito curtas (menos de 3 caracteres) - provavelmente lixo OCR
+    # Strings muito curtas (menos de 3 caracteres) são provavelmente lixo OCR
     if len(final_name) < 3:
         return ""
-
-    # Rejeita se é apenas UF ou sigla genérica após toda limpeza
-    if re.match(
-        r"^(MG|SP|RJ|PR|SC|RS|BA|GO|DF|ES|PE|CE|PA|MA|MT|MS|CNPJ|CPF|CEP|USA|BR)$",
-        final_name.strip(),
-        re.IGNORECASE,
-    ):
+    if _ENTITY_FINAL_REJECT_RE.match(final_name) or _ENTITY_FINAL_UF_RE.match(final_name):
         return ""
 
-    # Rejeita padrões de endereço americano genéricos
-    if re.match(
-        r"^(Florida|California|Texas|New York)\s+(USA|US)?\s*$",
-        final_name,
-        re.IGNORECASE,
-    ):
-        return ""
+    return final_name
 
-    # Rejeita "CNPJ" ou "CPF" que sobrou após limpeza
-    if re.match(r"^(CNPJ|CPF|CEP)\s*$", final_name, re.IGNORECASE):
-        return ""
 
-    return final_name
+# Dicionário de palavras conhecidas em nomes de empresas brasileiras
+# (palavras curtas como "A", "E", "DE" ficam de fora: sobram entre as conhecidas)
+_KNOWN_NAME_WORDS = (
+    # Palavras longas primeiro (ordem decrescente de tamanho)
+    "TELECOMUNICACOES",
+    "TELECOMUNICAÇÕES",
+    "TELECOMUNICACAO",
+    "TELECOMUNICAÇÃO",
+    "DESENVOLVIMENTO",
+    "COMPARTILHADOS",
+    "COMPARTILHADO",
+    "INTERMEDIACAO",
+    "INTERMEDIAÇÃO",
+    "ADMINISTRACAO",
+    "ADMINISTRAÇÃO",
+    "ADMINISTRADORA",
+    "INVESTIMENTOS",
+    "INVESTIMENTO",
+    "PARTICIPACOES",
+    "PARTICIPAÇÕES",
+    "PARTICIPACAO",
+    "PARTICIPAÇÃO",
+    "INTELIGENCIA",
+    "INTELIGÊNCIA",
+    "COMUNICACOES",
+    "COMUNICAÇÕES",
+    "COMUNICACAO",
+    "COMUNICAÇÃO",
+    "ESTRATEGICA",
+    "ESTRATÉGICA",
+    "ESTRATEGICO",
+    "ESTRATÉGICO",
+    "ESCRITORIOS",
+    "ESCRITÓRIO",
+    "ESCRITORIO",
+    "CONSULTORIA",
+    "PERFORMANCE",
+    "PERFOMANCE",
+    "INFORMATICA",
+    "INFORMÁTICA",
+    "AUDIOVISUAL",
+    "TECNOLOGIA",
+    "TECHNOLOGY",
+    "ARTIFICIAL",
+    "ASSESSORIA",
+    "AUDITORIA",
+    "ASSOCIADOS",
+    "ASSOCIADO",
+    "ADVOGADOS",
+    "ADVOGADO",
+    "INTERFOCUS",
+    "CONCEITOS",
+    "CONCEITO",
+    "SOFTWARE",
+    "SERVICOS",
+    "SERVIÇOS",
+    "SERVICO",
+    "SERVIÇO",
+    "SOLUCOES",
+    "SOLUÇÕES",
+    "SOLUCAO",
+    "SOLUÇÃO",
+    "SISTEMAS",
+    "SISTEMA",
+    "PROJETOS",
+    "PROJETO",
+    "INTERNET",
+    "PARTNERS",
+    "OLIVEIRA",
+    "WALQUIRIA",
+    "CRISTINA",
+    "FERNANDO",
+    "DENYSON",
+    "BARBOSA",
+    "RIBEIRO",
+    "RODOLFO",
+    "SUPORTE",
+    "DIGITAL",
+    "CONEXAO",
+    "CONEXÃO",
+    "SERVICE",
+    "GESTAO",
+    "GESTÃO",
+    "BRASIL",
+    "NEWERT",
+    "CAMPOS",
+    "SOARES",
+    "GLAUCO",
+    "MENDES",
+    "BRITO",
+    "NEWER",
+    "CESAR",
+    "SILVA",
+    "REGUS",
+    "FOCUS",
+    "APOIO",
+    "IDEAL",
+    "BENS",
+)
+
+
+def _build_word_trie(words) -> Dict[str, Any]:
+    """Trie de caracteres; a chave "" marca o fim de uma palavra."""
+    trie: Dict[str, Any] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = word
+    return trie
+
+
+_KNOWN_NAME_TRIE = _build_word_trie(_KNOWN_NAME_WORDS)
+
+# Sufixos empresariais (tratados separadamente)
+_COMPANY_SUFFIXES = ("LTDA", "EIRELI", "S.A.", "S.A", "S/A", "EPP")
+_COMPANY_SUFFIX_SUBS = _compile_subs((
+    (r"(LTDA)$", r" \1", 0),
+    (r"(S\.A\.?)$", r" \1", 0),
+    (r"(S/A)$", r" \1", 0),
+    (r"(EIRELI)$", r" \1", 0),
+    (r"(EPP)$", r" \1", 0),
+))
+
+
+def _segment_known_words(text: str) -> List[Tuple[int, int, str]]:
+    """
+    Escolhe as palavras conhecidas que cobrem o maior trecho do texto.
+
+    Programação dinâmica sobre as ocorrências encontradas na trie: maximiza
+    os caracteres cobertos e, no empate, usa menos palavras (mais longas).
+    Trechos não cobertos (siglas, "E", "DE"...) ficam entre as palavras.
+
+    Returns:
+        Lista de (início, fim, palavra) sem sobreposição, em ordem.
+    """
+    n = len(text)
+    # best[i] = (cobertos, -palavras, palavra escolhida em i ou None) para text[i:]
+    best: List[Tuple[int, int, Optional[str]]] = [(0, 0, None)] * (n + 1)
+    for i in range(n - 1, -1, -1):
+        skip = best[i + 1]
+        choice = (skip[0], skip[1], None)
+        node = _KNOWN_NAME_TRIE
+        j = i
+        while j < n:
+            node = node.get(text[j])
+            if node is None:
+                break
+            j += 1
+            word = node.get("")
+            if word is not None:
+                rest = best[j]
+                candidate = (rest[0] + len(word), rest[1] - 1, word)
+                if candidate[:2] >= choice[:2]:
+                    choice = candidate
+        best[i] = choice
+
+    found: List[Tuple[int, int, str]] = []
+    i = 0
+    while i < n:
+        word = best[i][2]
+        if word is None:
+            i += 1
+        else:
+            found.append((i, i + len(word), word))
+            i += len(word)
+    return found
 
 
 def _fix_concatenated_name(name: str) -> str:
@@ -1090,166 +1198,35 @@ def _fix_concatenated_name(name: str) -> str:
         return name
 
     name_upper = name.upper()
-
-    # Dicionário de palavras conhecidas em nomes de empresas brasileiras
-    # Ordenado do mais longo para o mais curto para evitar matches parciais
-    # IMPORTANTE: Palavras curtas (1-2 chars) como "A", "E", "DE" são tratadas separadamente
-    known_words = [
-        # Palavras longas primeiro (ordem decrescente de tamanho)
-        "TELECOMUNICACOES",
-        "TELECOMUNICAÇÕES",
-        "TELECOMUNICACAO",
-        "TELECOMUNICAÇÃO",
-        "DESENVOLVIMENTO",
-        "COMPARTILHADOS",
-        "COMPARTILHADO",
-        "INTERMEDIACAO",
-        "INTERMEDIAÇÃO",
-        "ADMINISTRACAO",
-        "ADMINISTRAÇÃO",
-        "ADMINISTRADORA",
-        "INVESTIMENTOS",
-        "INVESTIMENTO",
-        "PARTICIPACOES",
-        "PARTICIPAÇÕES",
-        "PARTICIPACAO",
-        "PARTICIPAÇÃO",
-        "INTELIGENCIA",
-        "INTELIGÊNCIA",
-        "COMUNICACOES",
-        "COMUNICAÇÕES",
-        "COMUNICACAO",
-        "COMUNICAÇÃO",
-        "ESTRATEGICA",
-        "ESTRATÉGICA",
-        "ESTRATEGICO",
-        "ESTRATÉGICO",
-        "ESCRITORIOS",
-        "ESCRITÓRIO",
-        "ESCRITORIO",
-        "CONSULTORIA",
-        "PERFORMANCE",
-        "PERFOMANCE",
-        "INFORMATICA",
-        "INFORMÁTICA",
-        "AUDIOVISUAL",
-        "TECNOLOGIA",
-        "TECHNOLOGY",
-        "ARTIFICIAL",
-        "ASSESSORIA",
-        "AUDITORIA",
-        "ASSOCIADOS",
-        "ASSOCIADO",
-        "ADVOGADOS",
-        "ADVOGADO",
-        "INTERFOCUS",
-        "CONCEITOS",
-        "CONCEITO",
-        "SOFTWARE",
-        "SERVICOS",
-        "SERVIÇOS",
-        "SERVICO",
-        "SERVIÇO",
-        "SOLUCOES",
-        "SOLUÇÕES",
-        "SOLUCAO",
-        "SOLUÇÃO",
-        "SISTEMAS",
-        "SISTEMA",
-        "PROJETOS",
-        "PROJETO",
-        "INTERNET",
-        "PARTNERS",
-        "OLIVEIRA",
-        "WALQUIRIA",
-        "CRISTINA",
-        "FERNANDO",
-        "DENYSON",
-        "BARBOSA",
-        "RIBEIRO",
-        "RODOLFO",
-        "SUPORTE",
-        "DIGITAL",
-        "CONEXAO",
-        "CONEXÃO",
-        "SERVICE",
-        "GESTAO",
-        "GESTÃO",
-        "BRASIL",
-        "NEWERT",
-        "CAMPOS",
-        "SOARES",
-        "GLAUCO",
-        "MENDES",
-        "BRITO",
-        "NEWER",
-        "CESAR",
-        "SILVA",
-        "REGUS",
-        "FOCUS",
-        "APOIO",
-        "IDEAL",
-        "BENS",
-    ]
-
-    # Sufixos empresariais (tratados separadamente)
-    company_suffixes = ["LTDA", "EIRELI", "S.A.", "S.A", "S/A", "EPP"]
-
-    # Tenta encontrar e separar palavras conhecidas usando abordagem greedy
     result = name_upper
 
-    # Primeiro, encontra todas as palavras conhecidas (greedy, do mais longo para mais curto)
-    remaining = result
-    offset = 0
-    found_words = []
-
-    for word in known_words:
-        idx = 0
-        while True:
-            pos = remaining.find(word, idx)
-            if pos == -1:
-                break
-            # Verifica se não sobrepõe com palavra já encontrada
-            actual_pos = pos + offset
-            overlap = False
-            for fw_start, fw_end, _ in found_words:
-                if not (actual_pos + len(word) <= fw_start or actual_pos >= fw_end):
-                    overlap = True
-                    break
-            if not overlap:
-                found_words.append((actual_pos, actual_pos + len(word), word))
-            idx = pos + 1
-
-    # Ordena por posição
-    found_words.sort(key=lambda x: x[0])
+    # O sufixo empresarial fica fora da segmentação ("SERVICOS/A" -> "SERVICO S/A")
+    body, tail = name_upper, ""
+    for suffix in _COMPANY_SUFFIXES:
+        if name_upper.endswith(suffix) and len(name_upper) > len(suffix):
+            body, tail = name_upper[: -len(suffix)], suffix
+            break
 
+    found_words = _segment_known_words(body)
     if found_words:
-        # Reconstroi a string com espaços
+        # Reconstroi a string com espaços (trechos entre palavras viram "palavras")
         result_parts = []
         last_end = 0
         for start, end, word in found_words:
-            # Adiciona o que veio antes (pode ser sigla ou prefixo)
             if start > last_end:
-                prefix = name_upper[last_end:start]
-                if prefix:
-                    result_parts.append(prefix)
+                result_parts.append(body[last_end:start])
             result_parts.append(word)
             last_end = end
+        if last_end < len(body):
+            result_parts.append(body[last_end:])
+        if tail:
+            result_parts.append(tail)
 
-        # Adiciona o que sobrou no final
-        if last_end < len(name_upper):
-            suffix = name_upper[last_end:]
-            if suffix:
-                result_parts.append(suffix)
-
-        result = " ".join(result_parts)
-        result = re.sub(r"\s+", " ", result).strip()
+        result = _WHITESPACE_RE.sub(" ", " ".join(result_parts)).strip()
 
-    # Trata sufixos empresariais no final
-    for suffix in company_suffixes:
-        # Verifica se termina com sufixo colado
+    # Trata sufixos empresariais colados no final
+    for suffix in _COMPANY_SUFFIXES:
         if result.endswith(suffix) and not result.endswith(" " + suffix):
-            # Encontra onde o sufixo começa
             suffix_start = len(result) - len(suffix)
             if suffix_start > 0:
                 result = result[:suffix_start] + " " + suffix
@@ -1259,19 +1236,10 @@ def _fix_concatenated_name(name: str) -> str:
         return result
 
     # Fallback: tenta separar apenas o sufixo empresarial
-    suffixes_patterns = [
-        (r"(LTDA)$", r" \1"),
-        (r"(S\.A\.?)$", r" \1"),
-        (r"(S/A)$", r" \1"),
-        (r"(EIRELI)$", r" \1"),
-        (r"(EPP)$", r" \1"),
-    ]
-
     result = name_upper
-    for pattern, replacement in suffixes_patterns:
-        if re.search(pattern, result):
-            result = re.sub(pattern, replacement, result)
-            result = re.sub(r"\s+", " ", result).strip()
+    for pattern, replacement in _COMPANY_SUFFIX_SUBS:
+        if pattern.search(result):
+            result = _WHITESPACE_RE.sub(" ", pattern.sub(replacement, result)).strip()
 
     # Se conseguiu separar pelo menos o sufixo, retorna
     if result != name_upper and " " in result:
@@ -38,8 +38,9 @@ import re
 import xml.etree.ElementTree as ET
 from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
 
 from core.models import (
     BoletoData,
@@ -72,6 +73,165 @@ class XmlExtractionResult:
     raw_data: Optional[Dict[str, Any]] = None
 
 
+# Tipo pelo namespace da raiz: (trecho do namespace, raízes aceitas, tipo).
+# Só vale para os esquemas oficiais; o resto cai na detecção textual.
+_ROOT_TYPES = (
+    ("portalfiscal.inf.br/nfcom", None, "NFCOM"),
+    ("portalfiscal.inf.br/nfe", ("nfeProc", "NFe"), "NFE"),
+    ("sped.fazenda.gov.br/nfse", ("NFSe",), "NFSE_SPED"),
+    ("abrasf.org.br", None, "NFSE"),
+)
+
+# Namespaces que não contêm campos buscados: atributos xsi:schemaLocation e a
+# assinatura digital (<Signature xmlns="...xmldsig#"> em toda NF-e autorizada)
+_IGNORED_NAMESPACES = frozenset({
+    b"http://www.w3.org/2001/XMLSchema-instance",
+    b"http://www.w3.org/2001/XMLSchema",
+    b"http://www.w3.org/2000/09/xmldsig#",
+})
+_XMLNS_RE = re.compile(rb"""xmlns(:[\w.\-]+)?\s*=\s*["']([^"']*)["']""")
+
+# Mensagem de erro de parse por tipo (caminho textual)
+_PARSE_ERRORS = {
+    "NFE": "Erro ao fazer parse do XML: {}",
+    "NFCOM": "Erro ao parsear XML NFCom: {}",
+    "NFSE": "Erro ao fazer parse do XML: {}",
+    "NFSE_SIGISS": "Erro ao fazer parse do XML SigISS: {}",
+    "NFSE_SPED": "Erro ao fazer parse do XML SPED: {}",
+}
+
+
+def _decode_xml(data: bytes) -> str:
+    """Decodifica como UTF-8 e, se falhar, como Latin-1."""
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        return data.decode("latin-1")
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+@lru_cache(maxsize=1024)
+def _qualified_paths(namespace: str, path: str) -> Tuple[str, str]:
+    """Caminhos (filho direto, descendente) de `path` no namespace, prontos para find()."""
+    if namespace:
+        prefix = "{" + namespace + "}"
+        path = "/".join(prefix + part for part in path.split("/"))
+    return path, ".//" + path
+
+
+class ParsedXml:
+    """
+    XML parseado uma única vez, com buscas por nome local.
+
+    Documentos com um único namespace (o caso dos esquemas oficiais) não são
+    reescritos: os caminhos pedidos pelos extratores ("emit", "Servico/Valores")
+    são qualificados com o namespace da raiz e guardados prontos, e a busca
+    `.//{ns}tag` roda no iterador em C do ElementTree. Documentos sem
+    namespace são usados como estão; com mais de um namespace (ou com
+    elementos prefixados fora do namespace padrão), as tags são reescritas
+    para o nome local uma vez, no lugar da antiga remoção por regex no texto.
+
+    Attributes:
+        root: Elemento raiz.
+        root_namespace: Namespace original da raiz (usado na detecção do tipo).
+        namespace: Namespace dos caminhos de busca ("" se não há ou se foi removido).
+    """
+
+    def __init__(self, root: ET.Element, declared: Optional[Set[bytes]] = None):
+        self.root = root
+        self.root_namespace = root.tag[1:].partition("}")[0] if root.tag[:1] == "{" else ""
+        self.namespace = ""
+
+        uris = (declared or set()) - _IGNORED_NAMESPACES
+        if self.root_namespace and uris == {self.root_namespace.encode()}:
+            self.namespace = self.root_namespace
+        elif self.root_namespace or uris:
+            self._strip_namespaces()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Optional["ParsedXml"]:
+        """Parseia os bytes como UTF-8 (como a leitura em texto fazia); None se falhar."""
+        try:
+            parser = ET.XMLParser(encoding="utf-8")
+            parser.feed(data)
+            root = parser.close()
+        except ET.ParseError:
+            return None
+        declarations = _XMLNS_RE.findall(data)
+        declared = {uri for _, uri in declarations}
+        if any(prefix and uri not in _IGNORED_NAMESPACES for prefix, uri in declarations):
+            # Com prefixo declarado, pode haver elementos fora do namespace padrão
+            declared.add(b"")
+        return cls(root, declared)
+
+    def _strip_namespaces(self) -> None:
+        for elem in self.root.iter():
+            if elem.tag[:1] == "{":
+                elem.tag = elem.tag.rsplit("}", 1)[1]
+
+    @property
+    def root_type(self) -> str:
+        """Tipo do documento pela raiz (namespace + nome), ou '' se não for conclusivo."""
+        root_name = _local_name(self.root.tag)
+        for fragment, roots, doc_type in _ROOT_TYPES:
+            if fragment in self.root_namespace and (roots is None or root_name in roots):
+                if doc_type == "NFSE_SPED":
+                    # Mesmo critério textual (namespace + "<infNFSe Id=...")
+                    inf_nfse = self.find(self.root, "infNFSe")
+                    if inf_nfse is None or not inf_nfse.attrib:
+                        return ""
+                return doc_type
+        return ""
+
+    def child(self, parent: ET.Element, path: str) -> Optional[ET.Element]:
+        """Equivalente a `parent.find(path)` (filho direto)."""
+        return parent.find(_qualified_paths(self.namespace, path)[0])
+
+    def find(self, parent: ET.Element, path: str) -> Optional[ET.Element]:
+        """Equivalente a `parent.find(".//" + path)` (primeiro descendente)."""
+        return parent.find(_qualified_paths(self.namespace, path)[1])
+
+    def text(self, parent: ET.Element, tag: str) -> Optional[str]:
+        """Obtém texto de um elemento filho direto ou descendente."""
+        # Tenta filho direto primeiro
+        elem = self.child(parent, tag)
+        if elem is not None and elem.text:
+            return elem.text.strip()
+
+        # Tenta descendente
+        elem = self.find(parent, tag)
+        if elem is not None and elem.text:
+            return elem.text.strip()
+
+        return None
+
+    def first_element(
+        self, parent: ET.Element, tags: List[str]
+    ) -> Optional[ET.Element]:
+        """Busca o primeiro elemento encontrado de uma lista de possíveis tags."""
+        for tag in tags:
+            # Tenta filho direto
+            elem = self.child(parent, tag)
+            if elem is not None:
+                return elem
+            # Tenta descendente
+            elem = self.find(parent, tag)
+            if elem is not None:
+                return elem
+        return None
+
+    def text_in_paths(self, parent: ET.Element, paths: List[str]) -> Optional[str]:
+        """Busca texto no primeiro caminho encontrado."""
+        for path in paths:
+            text = self.text(parent, path)
+            if text is not None:
+                return text
+        return None
+
+
 class XmlExtractor:
     """
     Extrator de dados de arquivos XML de NF-e e NFS-e.
@@ -106,39 +266,69 @@ class XmlExtractor:
             )
 
         try:
-            # Lê o conteúdo do arquivo
-            with open(path, "r", encoding="utf-8") as f:
-                xml_content = f.read()
-        except UnicodeDecodeError:
-            # Tenta com encoding alternativo
-            try:
-                with open(path, "r", encoding="latin-1") as f:
-                    xml_content = f.read()
-            except Exception as e:
-                return XmlExtractionResult(
-                    success=False, error=f"Erro ao ler arquivo: {e}"
-                )
+            data = path.read_bytes()
         except Exception as e:
             return XmlExtractionResult(success=False, error=f"Erro ao ler arquivo: {e}")
 
-        # Detecta o tipo de documento e extrai
+        return self.extract_bytes(data, path.name)
+
+    def extract_bytes(self, data: bytes, filename: str) -> XmlExtractionResult:
+        """
+        Extrai dados do conteúdo de um XML.
+
+        O XML é parseado uma vez a partir dos bytes e o tipo vem da raiz
+        (`ParsedXml.root_type`) quando ela é de um esquema oficial; nos demais
+        casos vale a detecção textual. XMLs que o parser rejeita como estão
+        (prefixo sem declaração, bytes que não são UTF-8) seguem pelo caminho
+        textual de antes.
+
+        Args:
+            data: Conteúdo bruto do arquivo
+            filename: Nome do arquivo de origem
+
+        Returns:
+            XmlExtractionResult com o documento extraído ou erro
+        """
+        doc = ParsedXml.from_bytes(data)
+        if doc is None:
+            return self._extract_text(_decode_xml(data), filename)
+
+        doc_type = doc.root_type or self._detect_document_type(_decode_xml(data))
+        return self._extract_parsed(doc_type, doc, filename)
+
+    def _extract_text(self, xml_content: str, filename: str) -> XmlExtractionResult:
+        """Detecta pelo texto, remove namespaces com regex e só então parseia."""
         doc_type = self._detect_document_type(xml_content)
+        if doc_type not in _PARSE_ERRORS:
+            return self._extract_parsed(doc_type, None, filename)
+
+        try:
+            root = ET.fromstring(self._remove_namespaces(xml_content.lstrip("\ufeff")))
+        except ET.ParseError as e:
+            return XmlExtractionResult(
+                success=False, error=_PARSE_ERRORS[doc_type].format(e)
+            )
+        return self._extract_parsed(doc_type, ParsedXml(root), filename)
 
+    def _extract_parsed(
+        self, doc_type: str, doc: Optional["ParsedXml"], filename: str
+    ) -> XmlExtractionResult:
+        """Encaminha o XML parseado para o extrator do tipo detectado."""
+        if doc is None or not doc_type:
+            return XmlExtractionResult(
+                success=False,
+                error="Tipo de documento XML não reconhecido (esperado NF-e ou NFS-e)",
+            )
         if doc_type == "NFE":
-            return self._extract_nfe(xml_content, path.name)
+            return self._extract_nfe(doc, filename)
         elif doc_type == "NFCOM":
-            return self._extract_nfcom(xml_content, path.name)
+            return self._extract_nfcom(doc, filename)
         elif doc_type == "NFSE":
-            return self._extract_nfse(xml_content, path.name)
+            return self._extract_nfse(doc, filename)
         elif doc_type == "NFSE_SIGISS":
-            return self._extract_nfse_sigiss(xml_content, path.name)
-        elif doc_type == "NFSE_SPED":
-            return self._extract_nfse_sped(xml_content, path.name)
+            return self._extract_nfse_sigiss(doc, filename)
         else:
-            return XmlExtractionResult(
-                success=False,
-                error="Tipo de documento XML não reconhecido (esperado NF-e ou NFS-e)",
-            )
+            return self._extract_nfse_sped(doc, filename)
 
     def _detect_document_type(self, xml_content: str) -> str:
         """
@@ -250,7 +440,7 @@ class XmlExtractor:
 
         return ""
 
-    def _extract_nfcom(self, xml_content: str, filename: str) -> XmlExtractionResult:
+    def _extract_nfcom(self, doc: "ParsedXml", filename: str) -> XmlExtractionResult:
         """
         Extrai dados de XML de NFCom (Nota Fiscal de Comunicação Eletrônica - modelo 62).
 
@@ -258,22 +448,20 @@ class XmlExtractor:
         Estrutura similar à NFe, mas com namespace e tags específicas.
 
         Args:
-            xml_content: Conteúdo do XML
+            doc: XML já parseado (sem namespaces)
             filename: Nome do arquivo para referência
 
         Returns:
             XmlExtractionResult com DanfeData (tratada como DANFE para compatibilidade)
         """
         try:
-            # Remove namespaces para facilitar parsing
-            xml_clean = self._remove_namespaces(xml_content)
-            root = ET.fromstring(xml_clean)
+            root = doc.root
 
             # Busca infNFCom (informações da NFCom)
-            inf_nfcom = root.find(".//infNFCom")
+            inf_nfcom = doc.find(root, "infNFCom")
             if inf_nfcom is None:
                 # Tenta buscar diretamente em NFCom
-                inf_nfcom = root.find(".//NFCom")
+                inf_nfcom = doc.find(root, "NFCom")
 
             if inf_nfcom is None:
                 return XmlExtractionResult(
@@ -281,15 +469,15 @@ class XmlExtractor:
                 )
 
             # Extrai dados do emitente (prestador de serviço)
-            emit = inf_nfcom.find(".//emit")
+            emit = doc.find(inf_nfcom, "emit")
             cnpj_emit = (
-                self._get_element_text(emit, "CNPJ") if emit is not None else None
+                doc.text(emit, "CNPJ") if emit is not None else None
             )
             razao_social = (
-                self._get_element_text(emit, "xNome") if emit is not None else None
+                doc.text(emit, "xNome") if emit is not None else None
             )
             nome_fantasia = (
-                self._get_element_text(emit, "xFant") if emit is not None else None
+                doc.text(emit, "xFant") if emit is not None else None
             )
 
             # Formata CNPJ se necessário
@@ -297,32 +485,32 @@ class XmlExtractor:
                 cnpj_emit = self._format_cnpj(cnpj_emit)
 
             # Extrai dados da identificação
-            ide = inf_nfcom.find(".//ide")
-            numero_nf = self._get_element_text(ide, "nNF") if ide is not None else None
-            serie = self._get_element_text(ide, "serie") if ide is not None else None
+            ide = doc.find(inf_nfcom, "ide")
+            numero_nf = doc.text(ide, "nNF") if ide is not None else None
+            serie = doc.text(ide, "serie") if ide is not None else None
             data_emissao = (
-                self._get_element_text(ide, "dhEmi") if ide is not None else None
+                doc.text(ide, "dhEmi") if ide is not None else None
             )
 
             # Extrai totais
-            total = inf_nfcom.find(".//total")
+            total = doc.find(inf_nfcom, "total")
             valor_total = (
-                self._parse_float(self._get_element_text(total, "vNF"))
+                self._parse_float(doc.text(total, "vNF"))
                 if total is not None
                 else None
             )
             if valor_total is None or valor_total == 0:
                 valor_total = (
-                    self._parse_float(self._get_element_text(total, "vProd"))
+                    self._parse_float(doc.text(total, "vProd"))
                     if total is not None
                     else None
                 )
 
             # Extrai dados de faturamento (vencimento)
-            g_fat = inf_nfcom.find(".//gFat")
+            g_fat = doc.find(inf_nfcom, "gFat")
             vencimento = None
             if g_fat is not None:
-                venc_str = self._get_element_text(g_fat, "dVencFat")
+                venc_str = doc.text(g_fat, "dVencFat")
                 if venc_str:
                     vencimento = self._parse_date(venc_str)
 
@@ -368,40 +556,29 @@ class XmlExtractor:
                 success=True, document=danfe, doc_type="NFCOM", raw_data=raw_data
             )
 
-        except ET.ParseError as e:
-            return XmlExtractionResult(
-                success=False, error=f"Erro ao parsear XML NFCom: {e}"
-            )
         except Exception as e:
             return XmlExtractionResult(
                 success=False, error=f"Erro ao extrair NFCom: {e}"
             )
 
-    def _extract_nfe(self, xml_content: str, filename: str) -> XmlExtractionResult:
+    def _extract_nfe(self, doc: "ParsedXml", filename: str) -> XmlExtractionResult:
         """
         Extrai dados de XML de NF-e (modelo 55).
 
         Args:
-            xml_content: Conteúdo do XML
+            doc: XML já parseado (sem namespaces)
             filename: Nome do arquivo de origem
 
         Returns:
             XmlExtractionResult com DanfeData
         """
         try:
-            # Remove BOM se presente
-            xml_content = xml_content.lstrip("\ufeff")
-
-            # Remove namespaces do XML para facilitar parsing
-            xml_content = self._remove_namespaces(xml_content)
-
-            # Parse do XML
-            root = ET.fromstring(xml_content)
+            root = doc.root
 
             # Busca os elementos principais (sem namespace agora)
-            inf_nfe = root.find(".//infNFe")
+            inf_nfe = doc.find(root, "infNFe")
             if inf_nfe is None:
-                inf_nfe = root.find(".//InfNFe")
+                inf_nfe = doc.find(root, "InfNFe")
 
             if inf_nfe is None:
                 return XmlExtractionResult(
@@ -418,68 +595,68 @@ class XmlExtractor:
             raw_data["chave_acesso"] = chave
 
             # Identificação (ide)
-            ide = inf_nfe.find(".//ide")
+            ide = doc.find(inf_nfe, "ide")
             if ide is not None:
-                raw_data["numero_nota"] = self._get_element_text(ide, "nNF")
-                raw_data["serie_nf"] = self._get_element_text(ide, "serie")
+                raw_data["numero_nota"] = doc.text(ide, "nNF")
+                raw_data["serie_nf"] = doc.text(ide, "serie")
                 raw_data["data_emissao"] = self._parse_date(
-                    self._get_element_text(ide, "dhEmi")
+                    doc.text(ide, "dhEmi")
                 )
-                raw_data["natureza_operacao"] = self._get_element_text(ide, "natOp")
+                raw_data["natureza_operacao"] = doc.text(ide, "natOp")
 
             # Emitente (emit)
-            emit = inf_nfe.find(".//emit")
+            emit = doc.find(inf_nfe, "emit")
             if emit is not None:
                 raw_data["cnpj_emitente"] = self._format_cnpj(
-                    self._get_element_text(emit, "CNPJ")
+                    doc.text(emit, "CNPJ")
                 )
-                raw_data["fornecedor_nome"] = self._get_element_text(emit, "xNome")
+                raw_data["fornecedor_nome"] = doc.text(emit, "xNome")
 
             # Totais (total/ICMSTot)
-            total = inf_nfe.find(".//total")
+            total = doc.find(inf_nfe, "total")
             if total is not None:
-                icms_tot = total.find(".//ICMSTot")
+                icms_tot = doc.find(total, "ICMSTot")
                 if icms_tot is not None:
                     raw_data["valor_total"] = self._parse_float(
-                        self._get_element_text(icms_tot, "vNF")
+                        doc.text(icms_tot, "vNF")
                     )
                     raw_data["valor_icms"] = self._parse_float(
-                        self._get_element_text(icms_tot, "vICMS")
+                        doc.text(icms_tot, "vICMS")
                     )
                     raw_data["base_calculo_icms"] = self._parse_float(
-                        self._get_element_text(icms_tot, "vBC")
+                        doc.text(icms_tot, "vBC")
                     )
 
             # Cobrança (cobr) - vencimentos
-            cobr = inf_nfe.find(".//cobr")
+            cobr = doc.find(inf_nfe, "cobr")
             if cobr is not None:
                 # Pega a primeira duplicata
-                dup = cobr.find(".//dup")
+                dup = doc.find(cobr, "dup")
                 if dup is not None:
                     raw_data["vencimento"] = self._parse_date(
-                        self._get_element_text(dup, "dVenc")
+                        doc.text(dup, "dVenc")
                     )
-                    raw_data["numero_fatura"] = self._get_element_text(dup, "nDup")
+                    raw_data["numero_fatura"] = doc.text(dup, "nDup")
 
                 # Fatura
-                fat = cobr.find(".//fat")
+                fat = doc.find(cobr, "fat")
                 if fat is not None:
                     raw_data["numero_fatura"] = raw_data.get(
                         "numero_fatura"
-                    ) or self._get_element_text(fat, "nFat")
+                    ) or doc.text(fat, "nFat")
 
             # Pagamento (pag) - forma de pagamento
-            pag = inf_nfe.find(".//pag")
+            pag = doc.find(inf_nfe, "pag")
             if pag is not None:
-                det_pag = pag.find(".//detPag")
+                det_pag = doc.find(pag, "detPag")
                 if det_pag is not None:
-                    tp_pag = self._get_element_text(det_pag, "tPag")
+                    tp_pag = doc.text(det_pag, "tPag")
                     raw_data["forma_pagamento"] = self._map_forma_pagamento(tp_pag)
 
             # Informações complementares (podem conter número do pedido)
-            inf_adic = inf_nfe.find(".//infAdic")
+            inf_adic = doc.find(inf_nfe, "infAdic")
             if inf_adic is not None:
-                inf_cpl = self._get_element_text(inf_adic, "infCpl")
+                inf_cpl = doc.text(inf_adic, "infCpl")
                 if inf_cpl:
                     raw_data["info_complementar"] = inf_cpl
                     # Tenta extrair número do pedido
@@ -508,17 +685,13 @@ class XmlExtractor:
                 success=True, document=document, doc_type="NFE", raw_data=raw_data
             )
 
-        except ET.ParseError as e:
-            return XmlExtractionResult(
-                success=False, error=f"Erro ao fazer parse do XML: {e}"
-            )
         except Exception as e:
             return XmlExtractionResult(
                 success=False, error=f"Erro ao processar NF-e: {e}"
             )
 
     def _extract_nfse_sigiss(
-        self, xml_content: str, filename: str
+        self, doc: "ParsedXml", filename: str
     ) -> XmlExtractionResult:
         """
         Extrai dados de XML de NFS-e no formato SigISS (municipal).
@@ -536,27 +709,20 @@ class XmlExtractor:
         </NFe>
 
         Args:
-            xml_content: Conteúdo do XML
+            doc: XML já parseado (sem namespaces)
             filename: Nome do arquivo de origem
 
         Returns:
             XmlExtractionResult com InvoiceData
         """
         try:
-            # Remove BOM se presente
-            xml_content = xml_content.lstrip("\ufeff")
-
-            # Remove namespaces do XML para facilitar parsing
-            xml_content = self._remove_namespaces(xml_content)
-
-            # Parse do XML
-            root = ET.fromstring(xml_content)
+            root = doc.root
 
             raw_data = {}
 
             # Se a raiz é NFe, usa ela diretamente
             local_tag = root.tag.split("}")[-1] if "}" in root.tag else root.tag
-            nfe_elem = root if local_tag == "NFe" else root.find(".//NFe")
+            nfe_elem = root if local_tag == "NFe" else doc.find(root, "NFe")
 
             if nfe_elem is None:
                 return XmlExtractionResult(
@@ -565,80 +731,80 @@ class XmlExtractor:
                 )
 
             # Número da NFS-e (dentro de ChaveNFe)
-            chave_nfe = nfe_elem.find("ChaveNFe")
+            chave_nfe = doc.child(nfe_elem, "ChaveNFe")
             if chave_nfe is not None:
-                raw_data["numero_nota"] = self._get_element_text(chave_nfe, "NumeroNFe")
-                raw_data["serie"] = self._get_element_text(chave_nfe, "SerieNFe")
-                raw_data["codigo_verificacao"] = self._get_element_text(
+                raw_data["numero_nota"] = doc.text(chave_nfe, "NumeroNFe")
+                raw_data["serie"] = doc.text(chave_nfe, "SerieNFe")
+                raw_data["codigo_verificacao"] = doc.text(
                     chave_nfe, "CodigoVerificacao"
                 )
 
                 # Data de emissão
-                data_emissao_raw = self._get_element_text(chave_nfe, "DataEmissaoNFe")
+                data_emissao_raw = doc.text(chave_nfe, "DataEmissaoNFe")
                 raw_data["data_emissao"] = self._parse_date(data_emissao_raw)
 
             # CNPJ do prestador
-            cnpj_prestador_elem = nfe_elem.find("CPFCNPJPrestador")
+            cnpj_prestador_elem = doc.child(nfe_elem, "CPFCNPJPrestador")
             if cnpj_prestador_elem is not None:
-                cnpj = self._get_element_text(cnpj_prestador_elem, "CNPJ")
+                cnpj = doc.text(cnpj_prestador_elem, "CNPJ")
                 if not cnpj:
-                    cnpj = self._get_element_text(cnpj_prestador_elem, "CPF")
+                    cnpj = doc.text(cnpj_prestador_elem, "CPF")
                 raw_data["cnpj_prestador"] = self._format_cnpj(cnpj)
 
             # Razão social do prestador
-            raw_data["fornecedor_nome"] = self._get_element_text(
+            raw_data["fornecedor_nome"] = doc.text(
                 nfe_elem, "RazaoSocialPrestador"
             )
 
             # Valores
             raw_data["valor_total"] = self._parse_float(
-                self._get_element_text(nfe_elem, "ValorServicos")
+                doc.text(nfe_elem, "ValorServicos")
             )
             raw_data["valor_base"] = self._parse_float(
-                self._get_element_text(nfe_elem, "ValorBase")
+                doc.text(nfe_elem, "ValorBase")
             )
             raw_data["valor_iss"] = self._parse_float(
-                self._get_element_text(nfe_elem, "ValorISS")
+                doc.text(nfe_elem, "ValorISS")
             )
             raw_data["valor_ir"] = self._parse_float(
-                self._get_element_text(nfe_elem, "ValorIR")
+                doc.text(nfe_elem, "ValorIR")
             )
             raw_data["valor_inss"] = self._parse_float(
-                self._get_element_text(nfe_elem, "ValorINSS")
+                doc.text(nfe_elem, "ValorINSS")
             )
             raw_data["valor_pis"] = self._parse_float(
-                self._get_element_text(nfe_elem, "ValorPIS")
+                doc.text(nfe_elem, "ValorPIS")
             )
             raw_data["valor_cofins"] = self._parse_float(
-                self._get_element_text(nfe_elem, "ValorCOFINS")
+                doc.text(nfe_elem, "ValorCOFINS")
             )
             raw_data["valor_csll"] = self._parse_float(
-                self._get_element_text(nfe_elem, "ValorCSLL")
+                doc.text(nfe_elem, "ValorCSLL")
             )
             raw_data["aliquota"] = self._parse_float(
-                self._get_element_text(nfe_elem, "AliquotaServicos")
+                doc.text(nfe_elem, "AliquotaServicos")
             )
 
             # Status da NFe
-            raw_data["status"] = self._get_element_text(nfe_elem, "StatusNFe")
+            raw_data["status"] = doc.text(nfe_elem, "StatusNFe")
 
             # Prefeitura/Município
-            raw_data["prefeitura"] = self._get_element_text(nfe_elem, "Prefeitura")
+            raw_data["prefeitura"] = doc.text(nfe_elem, "Prefeitura")
 
             # Tomador de serviço
-            cnpj_tomador_elem = nfe_elem.find("CPFCNPJTomador")
+            cnpj_tomador_elem = doc.child(nfe_elem, "CPFCNPJTomador")
             if cnpj_tomador_elem is not None:
-                cnpj = self._get_element_text(cnpj_tomador_elem, "CNPJ")
+                cnpj = doc.text(cnpj_tomador_elem, "CNPJ")
                 if not cnpj:
-                    cnpj = self._get_element_text(cnpj_tomador_elem, "CPF")
+                    cnpj = doc.text(cnpj_tomador_elem, "CPF")
                 raw_data["cnpj_tomador"] = self._format_cnpj(cnpj)
 
-            raw_data["tomador_nome"] = self._get_element_text(
+            raw_data["tomador_nome"] = doc.text(
                 nfe_elem, "RazaoSocialTomador"
             )
 
             # Discriminação do serviço
-            discriminacao = self._get_element_text(nfe_elem, "Discriminacao")
+            discriminacao = doc.text(nfe_elem, "Discriminacao")
             if discriminacao:
                 raw_data["info_complementar"] = discriminacao
                 pedido = self._extract_numero_pedido(discriminacao)
@@ -669,17 +835,13 @@ class XmlExtractor:
                 raw_data=raw_data,
             )
 
-        except ET.ParseError as e:
-            return XmlExtractionResult(
-                success=False, error=f"Erro ao fazer parse do XML SigISS: {e}"
-            )
         except Exception as e:
             return XmlExtractionResult(
                 success=False, error=f"Erro ao processar NFS-e SigISS: {e}"
             )
 
     def _extract_nfse_sped(
-        self, xml_content: str, filename: str
+        self, doc: "ParsedXml", filename: str
     ) -> XmlExtractionResult:
         """
         Extrai dados de XML de NFS-e no padrão SPED/SEFIN Nacional.
@@ -688,95 +850,88 @@ class XmlExtractor:
         Tags principais: <NFSe>, <infNFSe>, <emit>, <DPS>, <infDPS>, <prest>, <toma>
 
         Args:
-            xml_content: Conteúdo do XML
+            doc: XML já parseado (sem namespaces)
             filename: Nome do arquivo de origem
 
         Returns:
             XmlExtractionResult com InvoiceData
         """
         try:
-            # Remove BOM se presente
-            xml_content = xml_content.lstrip("\ufeff")
-
-            # Remove namespaces do XML para facilitar parsing
-            xml_content = self._remove_namespaces(xml_content)
-
-            # Parse do XML
-            root = ET.fromstring(xml_content)
+            root = doc.root
 
             raw_data = {}
 
             # Busca infNFSe (elemento principal)
-            inf_nfse = root.find(".//infNFSe")
+            inf_nfse = doc.find(root, "infNFSe")
             if inf_nfse is None:
                 inf_nfse = root
 
             # Número da NFS-e
-            raw_data["numero_nota"] = self._find_text_in_paths(
+            raw_data["numero_nota"] = doc.text_in_paths(
                 inf_nfse, ["nNFSe", "nDFSe", "Numero"]
             )
 
             # Data de emissão (busca em infNFSe ou DPS/infDPS)
-            data_emissao_raw = self._find_text_in_paths(inf_nfse, ["dhProc", "dhEmi"])
+            data_emissao_raw = doc.text_in_paths(inf_nfse, ["dhProc", "dhEmi"])
             # Também tenta no DPS
             if not data_emissao_raw:
-                dps = inf_nfse.find(".//DPS")
+                dps = doc.find(inf_nfse, "DPS")
                 if dps is not None:
-                    inf_dps = dps.find(".//infDPS")
+                    inf_dps = doc.find(dps, "infDPS")
                     if inf_dps is not None:
-                        data_emissao_raw = self._find_text_in_paths(
+                        data_emissao_raw = doc.text_in_paths(
                             inf_dps, ["dhEmi", "dCompet"]
                         )
             raw_data["data_emissao"] = self._parse_date(data_emissao_raw)
 
             # Emitente/Prestador (emit)
-            emit = inf_nfse.find(".//emit")
+            emit = doc.find(inf_nfse, "emit")
             if emit is not None:
                 raw_data["cnpj_prestador"] = self._format_cnpj(
-                    self._get_element_text(emit, "CNPJ")
+                    doc.text(emit, "CNPJ")
                 )
-                raw_data["fornecedor_nome"] = self._get_element_text(emit, "xNome")
+                raw_data["fornecedor_nome"] = doc.text(emit, "xNome")
 
             # Valores
-            valores = inf_nfse.find(".//valores")
+            valores = doc.find(inf_nfse, "valores")
             if valores is not None:
                 # Valor líquido
                 raw_data["valor_total"] = self._parse_float(
-                    self._find_text_in_paths(valores, ["vLiq", "vServ", "vTotServ"])
+                    doc.text_in_paths(valores, ["vLiq", "vServ", "vTotServ"])
                 )
 
             # Se não achou valores na raiz, tenta no DPS
             if not raw_data.get("valor_total"):
-                dps = inf_nfse.find(".//DPS")
+                dps = doc.find(inf_nfse, "DPS")
                 if dps is not None:
-                    inf_dps = dps.find(".//infDPS")
+                    inf_dps = doc.find(dps, "infDPS")
                     if inf_dps is not None:
-                        valores_dps = inf_dps.find(".//valores")
+                        valores_dps = doc.find(inf_dps, "valores")
                         if valores_dps is not None:
-                            v_serv_prest = valores_dps.find(".//vServPrest")
+                            v_serv_prest = doc.find(valores_dps, "vServPrest")
                             if v_serv_prest is not None:
                                 raw_data["valor_total"] = self._parse_float(
-                                    self._get_element_text(v_serv_prest, "vServ")
+                                    doc.text(v_serv_prest, "vServ")
                                 )
 
             # Tomador (toma) - cliente que recebeu o serviço
-            dps = inf_nfse.find(".//DPS")
+            dps = doc.find(inf_nfse, "DPS")
             if dps is not None:
-                inf_dps = dps.find(".//infDPS")
+                inf_dps = doc.find(dps, "infDPS")
                 if inf_dps is not None:
-                    toma = inf_dps.find(".//toma")
+                    toma = doc.find(inf_dps, "toma")
                     if toma is not None:
                         raw_data["cnpj_tomador"] = self._format_cnpj(
-                            self._get_element_text(toma, "CNPJ")
+                            doc.text(toma, "CNPJ")
                         )
-                        raw_data["tomador_nome"] = self._get_element_text(toma, "xNome")
+                        raw_data["tomador_nome"] = doc.text(toma, "xNome")
 
                     # Descrição do serviço (pode conter número do pedido)
-                    serv = inf_dps.find(".//serv")
+                    serv = doc.find(inf_dps, "serv")
                     if serv is not None:
-                        c_serv = serv.find(".//cServ")
+                        c_serv = doc.find(serv, "cServ")
                         if c_serv is not None:
-                            desc_serv = self._get_element_text(c_serv, "xDescServ")
+                            desc_serv = doc.text(c_serv, "xDescServ")
                             if desc_serv:
                                 raw_data["info_complementar"] = desc_serv
                                 pedido = self._extract_numero_pedido(desc_serv)
@@ -811,16 +966,12 @@ class XmlExtractor:
                 success=True, document=document, doc_type="NFSE", raw_data=raw_data
             )
 
-        except ET.ParseError as e:
-            return XmlExtractionResult(
-                success=False, error=f"Erro ao fazer parse do XML SPED: {e}"
-            )
         except Exception as e:
             return XmlExtractionResult(
                 success=False, error=f"Erro ao processar NFS-e SPED: {e}"
             )
 
-    def _extract_nfse(self, xml_content: str, filename: str) -> XmlExtractionResult:
+    def _extract_nfse(self, doc: "ParsedXml", filename: str) -> XmlExtractionResult:
         """
         Extrai dados de XML de NFS-e.
 
@@ -829,32 +980,25 @@ class XmlExtractor:
         - Variantes municipais (SP, RJ, etc.)
 
         Args:
-            xml_content: Conteúdo do XML
+            doc: XML já parseado (sem namespaces)
             filename: Nome do arquivo de origem
 
         Returns:
             XmlExtractionResult com InvoiceData
         """
         try:
-            # Remove BOM se presente
-            xml_content = xml_content.lstrip("\ufeff")
-
-            # Remove namespaces do XML para facilitar parsing
-            xml_content = self._remove_namespaces(xml_content)
-
-            # Parse do XML
-            root = ET.fromstring(xml_content)
+            root = doc.root
 
             raw_data = {}
 
             # Tenta diferentes estruturas de NFS-e (sem namespace agora)
-            inf_nfse = root.find(".//InfNfse")
+            inf_nfse = doc.find(root, "InfNfse")
             if inf_nfse is None:
-                inf_nfse = root.find(".//infNfse")
+                inf_nfse = doc.find(root, "infNfse")
             if inf_nfse is None:
-                inf_nfse = root.find(".//InfRps")
+                inf_nfse = doc.find(root, "InfRps")
             if inf_nfse is None:
-                inf_nfse = root.find(".//infRps")
+                inf_nfse = doc.find(root, "infRps")
 
             if inf_nfse is None:
                 # Tenta estrutura raiz direta
@@ -868,7 +1012,7 @@ class XmlExtractor:
                 )
 
             # Número da NFS-e
-            raw_data["numero_nota"] = self._find_text_in_paths(
+            raw_data["numero_nota"] = doc.text_in_paths(
                 inf_nfse,
                 [
                     "Numero",
@@ -880,12 +1024,12 @@ class XmlExtractor:
             )
 
             # Código de verificação
-            raw_data["codigo_verificacao"] = self._find_text_in_paths(
+            raw_data["codigo_verificacao"] = doc.text_in_paths(
                 inf_nfse, ["CodigoVerificacao", "codigoVerificacao", "CodVerificacao"]
             )
 
             # Data de emissão
-            data_emissao_raw = self._find_text_in_paths(
+            data_emissao_raw = doc.text_in_paths(
                 inf_nfse,
                 [
                     "DataEmissao",
@@ -899,7 +1043,7 @@ class XmlExtractor:
             raw_data["data_emissao"] = self._parse_date(data_emissao_raw)
 
             # Prestador de serviço (fornecedor)
-            prestador = self._find_first_element(
+            prestador = doc.first_element(
                 inf_nfse,
                 ["PrestadorServico", "Prestador", "prestadorServico", "DadosPrestador"],
             )
@@ -907,7 +1051,7 @@ class XmlExtractor:
             if prestador is not None:
                 # CNPJ do prestador
                 raw_data["cnpj_prestador"] = self._format_cnpj(
-                    self._find_text_in_paths(
+                    doc.text_in_paths(
                         prestador,
                         [
                             "Cnpj",
@@ -921,7 +1065,7 @@ class XmlExtractor:
                 )
 
                 # Razão social do prestador
-                raw_data["fornecedor_nome"] = self._find_text_in_paths(
+                raw_data["fornecedor_nome"] = doc.text_in_paths(
                     prestador,
                     [
                         "RazaoSocial",
@@ -934,14 +1078,14 @@ class XmlExtractor:
                 )
 
             # Serviço (valores)
-            servico = self._find_first_element(
+            servico = doc.first_element(
                 inf_nfse, ["Servico", "servico", "ValoresServico", "DadosServico"]
             )
 
             if servico is not None:
                 # Valor do serviço
                 raw_data["valor_total"] = self._parse_float(
-                    self._find_text_in_paths(
+                    doc.text_in_paths(
                         servico,
                         [
                             "ValorServicos",
@@ -956,7 +1100,7 @@ class XmlExtractor:
 
                 # Valor líquido (se diferente)
                 valor_liquido = self._parse_float(
-                    self._find_text_in_paths(
+                    doc.text_in_paths(
                         servico, ["ValorLiquidoNfse", "ValorLiquido", "valorLiquido"]
                     )
                 )
@@ -965,26 +1109,26 @@ class XmlExtractor:
 
                 # ISS
                 raw_data["valor_iss"] = self._parse_float(
-                    self._find_text_in_paths(
+                    doc.text_in_paths(
                         servico, ["ValorIss", "valorIss", "ValorISSQN", "vISS"]
                     )
                 )
 
                 # Retenções
                 raw_data["valor_ir"] = self._parse_float(
-                    self._find_text_in_paths(
+                    doc.text_in_paths(
                         servico, ["ValorIr", "valorIr", "ValorIRRF", "vIR"]
                     )
                 )
 
                 raw_data["valor_inss"] = self._parse_float(
-                    self._find_text_in_paths(
+                    doc.text_in_paths(
                         servico, ["ValorInss", "valorInss", "ValorINSS", "vINSS"]
                     )
                 )
 
                 raw_data["valor_csll"] = self._parse_float(
-                    self._find_text_in_paths(
+                    doc.text_in_paths(
                         servico, ["ValorCsll", "valorCsll", "ValorCSLL", "vCSLL"]
                     )
                 )
@@ -992,7 +1136,7 @@ class XmlExtractor:
             # Se não encontrou valores no serviço, tenta na raiz
             if not raw_data.get("valor_total"):
                 raw_data["valor_total"] = self._parse_float(
-                    self._find_text_in_paths(
+                    doc.text_in_paths(
                         inf_nfse,
                         [
                             "ValorServicos",
@@ -1004,14 +1148,14 @@ class XmlExtractor:
                 )
 
             # Tomador de serviço (cliente)
-            tomador = self._find_first_element(
+            tomador = doc.first_element(
                 inf_nfse,
                 ["TomadorServico", "Tomador", "tomadorServico", "DadosTomador"],
             )
 
             if tomador is not None:
                 raw_data["cnpj_tomador"] = self._format_cnpj(
-                    self._find_text_in_paths(
+                    doc.text_in_paths(
                         tomador,
                         [
                             "Cnpj",
@@ -1023,12 +1167,12 @@ class XmlExtractor:
                         ],
                     )
                 )
-                raw_data["tomador_nome"] = self._find_text_in_paths(
+                raw_data["tomador_nome"] = doc.text_in_paths(
                     tomador, ["RazaoSocial", "razaoSocial", "Nome", "nome"]
                 )
 
             # Tenta encontrar informações complementares/observações
-            obs = self._find_text_in_paths(
+            obs = doc.text_in_paths(
                 inf_nfse,
                 [
                     "OutrasInformacoes",
@@ -1063,10 +1207,6 @@ class XmlExtractor:
                 success=True, document=document, doc_type="NFSE", raw_data=raw_data
             )
 
-        except ET.ParseError as e:
-            return XmlExtractionResult(
-                success=False, error=f"Erro ao fazer parse do XML: {e}"
-            )
         except Exception as e:
             return XmlExtractionResult(
                 success=False, error=f"Erro ao processar NFS-e: {e}"
@@ -1087,50 +1227,6 @@ class XmlExtractor:
         xml_content = re.sub(r"<(/?)[\w]+:", r"<\1", xml_content)
         return xml_content
 
-    def _get_element_text(self, parent: ET.Element, tag: str) -> Optional[str]:
-        """Obtém texto de um elemento filho direto ou descendente."""
-        # Tenta filho direto primeiro
-        elem = parent.find(tag)
-        if elem is not None and elem.text:
-            return elem.text.strip()
-
-        # Tenta descendente
-        elem = parent.find(f".//{tag}")
-        if elem is not None and elem.text:
-            return elem.text.strip()
-
-        return None
-
-    def _find_first_element(
-        self, parent: ET.Element, tags: List[str]
-    ) -> Optional[ET.Element]:
-        """Busca o primeiro elemento encontrado de uma lista de possíveis tags."""
-        for tag in tags:
-            # Tenta filho direto
-            elem = parent.find(tag)
-            if elem is not None:
-                return elem
-            # Tenta descendente
-            elem = parent.find(f".//{tag}")
-            if elem is not None:
-                return elem
-        return None
-
-    def _find_text_in_paths(
-        self, parent: ET.Element, paths: List[str]
-    ) -> Optional[str]:
-        """Busca texto no primeiro caminho encontrado."""
-        for path in paths:
-            # Tenta caminho direto
-            elem = parent.find(path)
-            if elem is not None and elem.text:
-                return elem.text.strip()
-            # Tenta como descendente
-            elem = parent.find(f".//{path}")
-            if elem is not None and elem.text:
-                return elem.text.strip()
-        return None
-
     def _parse_date(self, date_str: Optional[str]) -> Optional[str]:
         """
         Converte data para formato ISO (YYYY-MM-DD).
@@ -1259,3 +1355,43 @@ def extract_xml(xml_path: str) -> XmlExtractionResult:
     """
     extractor = XmlExtractor()
     return extractor.extract(xml_path)
+
+
+def extract_xml_directory(
+    folder: Union[str, Path], workers: Optional[int] = None
+) -> Dict[str, XmlExtractionResult]:
+    """
+    Extrai todos os XMLs de uma pasta (não recursivo).
+
+    Com `workers > 1` os arquivos são distribuídos em um pool de processos,
+    em blocos (cada tarefa leva vários arquivos, o custo de IPC por XML fica
+    pequeno). O resultado é o mesmo da execução sequencial.
+
+    Args:
+        folder: Pasta com os arquivos .xml
+        workers: Processos paralelos (default: settings.XML_WORKERS)
+
+    Returns:
+        Dicionário caminho → XmlExtractionResult, em ordem de nome de arquivo
+    """
+    from config import settings
+
+    workers = int(workers or getattr(settings, "XML_WORKERS", 1))
+    paths = sorted(
+        str(item)
+        for item in Path(folder).iterdir()
+        if item.is_file() and item.suffix.lower() == ".xml"
+    )
+
+    if workers <= 1 or len(paths) < 2:
+        extractor = XmlExtractor()
+        return {path: extractor.extract(path) for path in paths}
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    from core.supervised_executor import _mp_context
+
+    chunksize = max(1, len(paths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_mp_context()) as executor:
+        results = list(executor.map(extract_xml, paths, chunksize=chunksize))
+    return dict(zip(paths, results))
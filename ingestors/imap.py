@@ -1,11 +1,26 @@
 import email
 import imaplib
 import logging
+import os
+import re
+import shutil
 from email.header import decode_header
 from email.message import Message
-from typing import Any, Dict, List, Optional
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple, Union
 
+from config import settings
 from core.interfaces import EmailIngestorStrategy
+from ingestors.imap_structure import (
+    BodyPart,
+    StreamDecoder,
+    decode_payload,
+    find_section,
+    parse_bodystructure,
+    parse_fetch_response,
+)
+from ingestors.imap_pool import ParallelImapDownloader
+from ingestors.sync_state import MailboxSyncState
 
 logger = logging.getLogger(__name__)
 
@@ -17,22 +32,58 @@ class ImapIngestor(EmailIngestorStrategy):
     Esta classe gerencia a conexão segura (SSL) com servidores de e-mail,
     realiza buscas filtradas por assunto e extrai anexos PDF e XML.
 
+    Além dos métodos que devolvem listas (`fetch_attachments`), oferece um
+    caminho em streaming (`iter_emails_with_attachments`): a estrutura MIME é
+    lida em lote via BODYSTRUCTURE e só as partes PDF/XML e o corpo em texto
+    são baixados, com os anexos gravados direto em disco.
+
     Attributes:
         host (str): Endereço do servidor IMAP (ex: imap.gmail.com).
         user (str): Usuário para autenticação.
         password (str): Senha ou App Password.
         folder (str): Pasta do e-mail a ser monitorada (Padrão: INBOX).
+        supports_streaming (bool): Se o caminho em streaming está ativo
+            (settings.IMAP_STREAMING).
+        pool_size (int): Conexões simultâneas no download em streaming
+            (settings.IMAP_POOL_SIZE; 1 = uma conexão, download sob demanda).
+        sync_state (MailboxSyncState | None): Estado de sincronização
+            incremental. Quando definido, o caminho em streaming busca só
+            UIDs acima da marca d'água e ignora Message-IDs já ingeridos.
     """
 
     # Extensões de arquivos válidos para extração
     VALID_EXTENSIONS = {'.pdf', '.xml'}
 
-    def __init__(self, host: str, user: str, password: str, folder: str = "INBOX"):
+    # Cabeçalhos pedidos junto do BODYSTRUCTURE (suficientes para os metadados do lote)
+    SUMMARY_HEADERS = ("MESSAGE-ID", "SUBJECT", "FROM", "DATE", "RECEIVED")
+
+    def __init__(
+        self,
+        host: str,
+        user: str,
+        password: str,
+        folder: str = "INBOX",
+        streaming: Optional[bool] = None,
+        pool_size: Optional[int] = None,
+    ):
         self.host = host
         self.user = user
         self.password = password
         self.folder = folder
         self.connection = None
+        self.supports_streaming = (
+            settings.IMAP_STREAMING if streaming is None else streaming
+        )
+        self.pool_size = max(1, settings.IMAP_POOL_SIZE if pool_size is None else pool_size)
+        self.sync_state: Optional[MailboxSyncState] = None
+
+    def _open_connection(self) -> imaplib.IMAP4:
+        """Abre uma conexão SSL autenticada com a pasta selecionada."""
+        # Conexão SSL padrão (Porta 993)
+        connection = imaplib.IMAP4_SSL(self.host)
+        connection.login(self.user, self.password)
+        connection.select(self.folder) # Seleciona caixa de entrada
+        return connection
 
     def connect(self) -> None:
         """
@@ -41,10 +92,7 @@ class ImapIngestor(EmailIngestorStrategy):
         Raises:
             imaplib.IMAP4.error: Se houver falha na conexão ou autenticação.
         """
-        # Conexão SSL padrão (Porta 993)
-        self.connection = imaplib.IMAP4_SSL(self.host)
-        self.connection.login(self.user, self.password)
-        self.connection.select(self.folder) # Seleciona caixa de entrada
+        self.connection = self._open_connection()
 
     def _decode_text(self, text: Optional[str]) -> str:
         """
@@ -401,6 +449,10 @@ class ImapIngestor(EmailIngestorStrategy):
                 - received_date (str): Data de recebimento.
                 - has_attachments (bool): False (sem anexos válidos).
         """
+        if self.supports_streaming:
+            # Decide pelo BODYSTRUCTURE, sem baixar e-mails que têm anexos
+            return list(self.iter_emails_without_attachments(subject_filter, limit))
+
         if not self.connection:
             self.connect()
         
@@ -481,3 +533,415 @@ class ImapIngestor(EmailIngestorStrategy):
                 continue
 
         return results
+
+    # ------------------------------------------------------------------
+    # Caminho em streaming (BODYSTRUCTURE + BODY.PEEK por parte)
+    # ------------------------------------------------------------------
+
+    def _build_email_id(self, message_id: Optional[str], fallback: str) -> str:
+        """email_id a partir do Message-ID (mesmo formato do caminho RFC822)."""
+        message_id = (message_id or "").strip()
+        if message_id:
+            return message_id.strip("<>").replace("@", "_").replace(".", "_")
+        return fallback
+
+    def _search_uids(self, subject_filter: str) -> List[str]:
+        """
+        UID SEARCH pelo assunto (vazio ou "*" = todos).
+
+        Com `sync_state`, busca apenas `UID n:*` acima da marca d'água da pasta.
+        """
+        if not self.connection:
+            self.connect()
+
+        if not self.connection:
+            raise RuntimeError("Falha ao conectar ao servidor IMAP")
+
+        criteria = []
+        last_uid = 0
+        if self.sync_state is not None:
+            last_uid = self.sync_state.begin(self.folder, self._uidvalidity())
+            if last_uid:
+                criteria.append(f'UID {last_uid + 1}:*')
+        if subject_filter and subject_filter != "*":
+            criteria.append(f'SUBJECT "{subject_filter}"')
+
+        query = f'({" ".join(criteria)})' if criteria else 'ALL'
+        _status, data = self.connection.uid('SEARCH', None, query)
+
+        if not data or not data[0]:
+            return []
+        uids = [
+            uid.decode('utf-8') if isinstance(uid, bytes) else str(uid)
+            for uid in data[0].split()
+        ]
+        # "n:*" sempre inclui a última mensagem, mesmo com UID < n
+        if last_uid:
+            uids = [uid for uid in uids if int(uid) > last_uid]
+            logger.info(f"Sincronização incremental: {len(uids)} e-mail(s) após UID {last_uid}")
+        return uids
+
+    def _uidvalidity(self) -> Optional[str]:
+        """UIDVALIDITY da pasta selecionada (resposta do SELECT ou STATUS)."""
+        try:
+            _typ, data = self.connection.response('UIDVALIDITY')  # type: ignore[union-attr]
+            if not data or not data[0]:
+                _typ, data = self.connection.status(self.folder, '(UIDVALIDITY)')  # type: ignore[union-attr]
+                raw = data[0].decode() if data and isinstance(data[0], bytes) else str(data and data[0])
+                match = re.search(r'UIDVALIDITY\s+(\d+)', raw)
+                return match.group(1) if match else None
+            value = data[-1]
+            return value.decode() if isinstance(value, bytes) else str(value)
+        except Exception as e:
+            logger.warning(f"Não foi possível ler UIDVALIDITY de '{self.folder}': {e}")
+            return None
+
+    def _sync_observe(self, uid: str, ok: bool = True) -> None:
+        if self.sync_state is not None and uid:
+            self.sync_state.observe(self.folder, uid, ok=ok)
+
+    def _claim_message(self, headers: Message) -> bool:
+        """Reserva o Message-ID para esta execução; False se já foi ingerido."""
+        return self.sync_state is None or self.sync_state.claim(headers.get("Message-ID"))
+
+    def _mark_ingested(self, headers: Message) -> None:
+        if self.sync_state is not None:
+            self.sync_state.mark_ingested(headers.get("Message-ID"))
+
+    @staticmethod
+    def _uid_set(uids: List[str]) -> str:
+        """Compacta UIDs em um conjunto IMAP (ex: "1:5,8,10:12")."""
+        numbers = sorted({int(uid) for uid in uids})
+        ranges: List[str] = []
+        start = prev = numbers[0]
+        for n in numbers[1:]:
+            if n == prev + 1:
+                prev = n
+                continue
+            ranges.append(f"{start}:{prev}" if start != prev else str(start))
+            start = prev = n
+        ranges.append(f"{start}:{prev}" if start != prev else str(start))
+        return ",".join(ranges)
+
+    def _uid_fetch(self, uid_set: str, items: str) -> List[Dict[str, Any]]:
+        """UID FETCH com a resposta já convertida em dicionários."""
+        status, data = self.connection.uid('FETCH', uid_set, items)  # type: ignore[union-attr]
+        if status != 'OK':
+            raise imaplib.IMAP4.error(f"UID FETCH {uid_set} falhou: {status}")
+        return parse_fetch_response(data)
+
+    def _iter_structures(self, uids: List[str]) -> Iterator[Tuple[str, Message, List[BodyPart]]]:
+        """
+        Gera (uid, cabeçalhos, partes) para os UIDs informados.
+
+        A estrutura e os cabeçalhos são pedidos em lotes de
+        IMAP_FETCH_BATCH_SIZE UIDs, sem baixar o conteúdo das mensagens.
+        """
+        batch_size = max(1, settings.IMAP_FETCH_BATCH_SIZE)
+        items = (
+            "(UID BODYSTRUCTURE BODY.PEEK[HEADER.FIELDS ("
+            + " ".join(self.SUMMARY_HEADERS)
+            + ")])"
+        )
+
+        for start in range(0, len(uids), batch_size):
+            chunk = uids[start:start + batch_size]
+            try:
+                responses = self._uid_fetch(self._uid_set(chunk), items)
+            except Exception as e:
+                logger.warning(f"Erro ao ler estrutura dos e-mails UID {chunk[0]}..{chunk[-1]}: {e}")
+                for uid in chunk:
+                    self._sync_observe(uid, ok=False)
+                continue
+
+            for response in responses:
+                uid = str(response.get("UID") or "")
+                try:
+                    header_bytes = find_section(response, "BODY[HEADER") or b""
+                    if isinstance(header_bytes, str):
+                        header_bytes = header_bytes.encode("utf-8")
+                    headers = email.message_from_bytes(header_bytes)
+                    parts = parse_bodystructure(response.get("BODYSTRUCTURE"))
+                except Exception as e:
+                    logger.warning(f"Erro ao interpretar e-mail UID {uid}: {e}")
+                    self._sync_observe(uid, ok=False)
+                    continue
+
+                self._sync_observe(uid)
+                yield uid, headers, parts
+
+    def _iter_message_structures(
+        self, subject_filter: str
+    ) -> Iterator[Tuple[str, Message, List[BodyPart]]]:
+        """Gera (uid, cabeçalhos, partes) para cada e-mail encontrado."""
+        yield from self._iter_structures(self._search_uids(subject_filter))
+
+    def _is_attachment_part(self, part: BodyPart) -> bool:
+        """Mesmo critério do caminho RFC822: Content-Disposition + nome PDF/XML."""
+        return part.disposition is not None and self._is_valid_attachment(part.filename)
+
+    @staticmethod
+    def _text_parts(parts: List[BodyPart]) -> List[BodyPart]:
+        """Partes text/plain e text/html que não são anexos (o corpo do e-mail)."""
+        return [
+            p for p in parts
+            if p.maintype == "text"
+            and p.subtype in ("plain", "html")
+            and p.disposition != "attachment"
+        ]
+
+    @staticmethod
+    def _combine_body(response: Dict[str, Any], text_parts: List[BodyPart]) -> str:
+        """Decodifica as partes de texto de uma resposta FETCH (plain + HTML)."""
+        body_text = ""
+        body_html = ""
+        for part in text_parts:
+            raw = response.get(f"BODY[{part.section}]")
+            if raw is None:
+                continue
+            if isinstance(raw, str):
+                raw = raw.encode("utf-8")
+            payload = decode_payload(raw, part.encoding)
+            try:
+                decoded = payload.decode(part.charset, errors="replace")
+            except LookupError:
+                decoded = payload.decode("latin-1", errors="replace")
+
+            if part.subtype == "plain":
+                body_text += decoded
+            else:
+                body_html += decoded
+
+        combined = body_text
+        if body_html:
+            combined += "\n\n--- HTML CONTENT ---\n\n" + body_html
+        return combined
+
+    def _fetch_body_text(self, uid: str, parts: List[BodyPart]) -> str:
+        """Baixa só as partes text/plain e text/html que não são anexos."""
+        text_parts = self._text_parts(parts)
+        if not text_parts:
+            return ""
+
+        items = "(" + " ".join(f"BODY.PEEK[{p.section}]" for p in text_parts) + ")"
+        responses = self._uid_fetch(uid, items)
+        if not responses:
+            return ""
+        return self._combine_body(responses[0], text_parts)
+
+    def _write_part(
+        self, uid: str, part: BodyPart, fh: BinaryIO, first_chunk: Optional[bytes] = None
+    ) -> int:
+        """
+        Baixa uma parte em blocos de IMAP_PART_CHUNK_BYTES e grava decodificada.
+
+        `first_chunk` é o bloco <0.N> já obtido em outro FETCH (evita repetir
+        a ida ao servidor quando a parte cabe em um bloco).
+        """
+        chunk_size = max(1, settings.IMAP_PART_CHUNK_BYTES)
+        decoder = StreamDecoder(part.encoding)
+        offset = 0
+        written = 0
+        data: Optional[bytes] = first_chunk
+
+        while True:
+            if data is None:
+                responses = self._uid_fetch(
+                    uid, f"(BODY.PEEK[{part.section}]<{offset}.{chunk_size}>)"
+                )
+                data = find_section(responses[0], f"BODY[{part.section}]") if responses else None
+            if not data:
+                break
+            if isinstance(data, str):
+                data = data.encode("utf-8")
+
+            decoded = decoder.feed(data)
+            fh.write(decoded)
+            written += len(decoded)
+            offset += len(data)
+            if len(data) < chunk_size:
+                break
+            data = None
+
+        tail = decoder.flush()
+        fh.write(tail)
+        return written + len(tail)
+
+    def _part_writer(self, uid: str, part: BodyPart) -> Callable[[Union[str, Path]], int]:
+        """
+        Cria a função que baixa uma parte e a grava em disco.
+
+        A parte é pedida em blocos (BODY.PEEK[seção]<offset.tamanho>),
+        decodificada incrementalmente e escrita em um arquivo `.part`,
+        renomeado ao final.
+        """
+        def save_to(path: Union[str, Path]) -> int:
+            path = Path(path)
+            tmp_path = path.with_name(path.name + ".part")
+            try:
+                with open(tmp_path, "wb") as fh:
+                    written = self._write_part(uid, part, fh)
+                os.replace(tmp_path, path)
+            except BaseException:
+                tmp_path.unlink(missing_ok=True)
+                raise
+            return written
+
+        return save_to
+
+    @staticmethod
+    def _staged_mover(staged_path: Path, size: int) -> Callable[[Union[str, Path]], int]:
+        """save_to de um anexo já baixado para a pasta de staging."""
+        def save_to(path: Union[str, Path]) -> int:
+            shutil.move(str(staged_path), str(path))
+            return size
+
+        return save_to
+
+    def _download_email(
+        self,
+        uid: str,
+        headers: Message,
+        parts: List[BodyPart],
+        attachment_parts: List[BodyPart],
+        staging_dir: Path,
+    ) -> Dict[str, Any]:
+        """
+        Baixa corpo e anexos de um e-mail para a pasta de staging.
+
+        Corpo e primeiro bloco de cada anexo vêm em um único FETCH; anexos
+        maiores que um bloco continuam em FETCHs parciais.
+        """
+        chunk_size = max(1, settings.IMAP_PART_CHUNK_BYTES)
+        text_parts = self._text_parts(parts)
+        items = [f"BODY.PEEK[{p.section}]" for p in text_parts]
+        items += [f"BODY.PEEK[{p.section}]<0.{chunk_size}>" for p in attachment_parts]
+        responses = self._uid_fetch(uid, "(" + " ".join(items) + ")")
+        response = responses[0] if responses else {}
+
+        email_data = self._summary(uid, headers)
+        email_data['body_text'] = self._combine_body(response, text_parts)
+        email_data['attachments'] = []
+
+        for idx, part in enumerate(attachment_parts, start=1):
+            first = find_section(response, f"BODY[{part.section}]<")
+            staged_path = staging_dir / f"{uid}_{idx:02d}.bin"
+            with open(staged_path, "wb") as fh:
+                size = self._write_part(uid, part, fh, first_chunk=first)
+            email_data['attachments'].append({
+                'filename': part.filename,
+                'size': size,
+                'save_to': self._staged_mover(staged_path, size),
+            })
+
+        return email_data
+
+    def _summary(self, uid: str, headers: Message) -> Dict[str, Any]:
+        sender_info = self._extract_sender_info(headers)
+        return {
+            'email_id': self._build_email_id(headers.get("Message-ID"), f"email_{uid}"),
+            'subject': self._decode_text(headers.get("Subject")),
+            'sender_name': sender_info['name'],
+            'sender_address': sender_info['address'],
+            'received_date': self._extract_date_with_fallback(headers),
+        }
+
+    def iter_emails_with_attachments(
+        self,
+        subject_filter: str = "",
+        staging_dir: Optional[Union[str, Path]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Gera um dict por e-mail com anexos PDF/XML, sem manter conteúdo em memória.
+
+        Equivalente em streaming de `fetch_emails_grouped`: os anexos não
+        trazem 'content', e sim 'save_to(path)', que grava a parte no arquivo
+        indicado e devolve o número de bytes gravados.
+
+        Com `pool_size > 1`, os e-mails são baixados por várias conexões em
+        paralelo (`ParallelImapDownloader`) e entregues por uma fila limitada;
+        os anexos ficam em uma pasta de staging dentro de `staging_dir`.
+
+        Args:
+            subject_filter (str): Texto para filtrar o assunto ("" ou "*" = todos).
+            staging_dir: Diretório onde criar a pasta de staging do download
+                paralelo (default: temp do sistema).
+
+        Yields:
+            Dict com email_id, subject, sender_name, sender_address, body_text,
+            received_date e attachments (lista de dicts com 'filename',
+            'size' e 'save_to').
+        """
+        if self.pool_size > 1:
+            downloader = ParallelImapDownloader(
+                self,
+                workers=self.pool_size,
+                queue_size=settings.IMAP_QUEUE_SIZE,
+                reconnect_attempts=settings.IMAP_RECONNECT_ATTEMPTS,
+            )
+            yield from downloader.iter_emails(self._search_uids(subject_filter), staging_dir)
+            return
+
+        for uid, headers, parts in self._iter_message_structures(subject_filter):
+            attachment_parts = [p for p in parts if self._is_attachment_part(p)]
+            if not attachment_parts or not self._claim_message(headers):
+                continue
+
+            try:
+                email_data = self._summary(uid, headers)
+                email_data['body_text'] = self._fetch_body_text(uid, parts)
+            except Exception as e:
+                logger.warning(f"Erro ao ler e-mail UID {uid}: {e}")
+                self._sync_observe(uid, ok=False)
+                continue
+
+            email_data['attachments'] = [
+                {
+                    'filename': part.filename,
+                    'size': part.size,
+                    'save_to': self._part_writer(uid, part),
+                }
+                for part in attachment_parts
+            ]
+            yield email_data
+            # Consumidor já gravou o lote ao pedir o próximo e-mail
+            self._mark_ingested(headers)
+
+    def iter_emails_without_attachments(
+        self,
+        subject_filter: str = "",
+        limit: int = 0,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Gera e-mails SEM anexos PDF/XML válidos, baixando apenas o corpo.
+
+        E-mails com anexos são descartados pelo BODYSTRUCTURE, sem download.
+
+        Args:
+            subject_filter (str): Texto para filtrar o assunto ("" ou "*" = todos).
+            limit (int): Máximo de e-mails a gerar (0 = sem limite).
+
+        Yields:
+            Mesmo formato de `fetch_emails_without_attachments`.
+        """
+        count = 0
+        for uid, headers, parts in self._iter_message_structures(subject_filter):
+            if limit > 0 and count >= limit:
+                return
+            if any(self._is_attachment_part(p) for p in parts):
+                continue
+            if not self._claim_message(headers):
+                continue
+
+            try:
+                email_data = self._summary(uid, headers)
+                email_data['body_text'] = self._fetch_body_text(uid, parts)
+            except Exception as e:
+                logger.warning(f"Erro ao ler e-mail UID {uid}: {e}")
+                self._sync_observe(uid, ok=False)
+                continue
+
+            email_data['has_attachments'] = False
+            yield email_data
+            self._mark_ingested(headers)
+            count += 1
@@ -0,0 +1,263 @@
+"""
+Download IMAP concorrente com várias conexões.
+
+O caminho em streaming do `ImapIngestor` usa uma única conexão: cada e-mail
+custa ao menos uma ida e volta ao servidor, e o download acontece antes do
+processamento dos PDFs. O `ParallelImapDownloader`:
+
+    1. Abre N conexões autenticadas (`ReconnectingConnection`), cada uma em
+       uma thread, e reparte entre elas a lista de UIDs em faixas contíguas.
+    2. Em cada e-mail, pede em um único FETCH o corpo em texto e o primeiro
+       bloco de cada anexo; só anexos maiores que IMAP_PART_CHUNK_BYTES
+       precisam de FETCHs adicionais.
+    3. Grava os anexos em uma pasta de staging (oculta, dentro do diretório de
+       lotes) e entrega o e-mail em uma fila limitada (IMAP_QUEUE_SIZE). O
+       consumidor (`IngestionService.ingest_single_email`) apenas move os
+       arquivos para a pasta do lote.
+
+Se uma conexão cair (`IMAP4.abort`, erro de socket/SSL), ela é reaberta e o
+comando repetido: comandos UID são idempotentes e os UIDs continuam válidos
+entre conexões da mesma pasta.
+
+Example:
+    >>> downloader = ParallelImapDownloader(ingestor, workers=4)
+    >>> for email_data in downloader.iter_emails(uids, staging_root=Path("temp_email")):
+    ...     service.ingest_single_email(email_data)
+"""
+
+import copy
+import imaplib
+import logging
+import queue
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Erros de transporte que justificam reabrir a conexão (ssl.SSLError e
+# socket.timeout são subclasses de OSError)
+RETRYABLE_ERRORS = (imaplib.IMAP4.abort, OSError, EOFError)
+
+_DONE = object()
+
+
+class ReconnectingConnection:
+    """
+    Conexão IMAP que se reabre e repete o comando quando cai.
+
+    Expõe o subconjunto de `imaplib.IMAP4` usado pelo ingestor (`uid`,
+    `response`, `status`, `logout`).
+
+    Args:
+        factory: Função que abre uma conexão autenticada com a pasta selecionada.
+        attempts: Reconexões tentadas por comando antes de desistir.
+        backoff: Espera (s) antes de cada reconexão, multiplicada pela tentativa.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        attempts: int = 3,
+        backoff: float = 1.0,
+    ):
+        self._factory = factory
+        self._attempts = max(0, attempts)
+        self._backoff = backoff
+        self._conn: Any = None
+        self.reconnects = 0
+
+    def _drop(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            try:
+                conn.shutdown()
+            except Exception:
+                pass
+
+    def _call(self, method: str, *args: Any) -> Any:
+        for attempt in range(self._attempts + 1):
+            try:
+                if self._conn is None:
+                    self._conn = self._factory()
+                return getattr(self._conn, method)(*args)
+            except RETRYABLE_ERRORS as e:
+                self._drop()
+                if attempt >= self._attempts:
+                    raise
+                self.reconnects += 1
+                logger.warning(
+                    f"Conexão IMAP perdida ({type(e).__name__}: {e}); "
+                    f"reconectando ({attempt + 1}/{self._attempts})..."
+                )
+                time.sleep(self._backoff * (attempt + 1))
+
+    def uid(self, *args: Any) -> Any:
+        return self._call("uid", *args)
+
+    def response(self, code: str) -> Any:
+        return self._call("response", code)
+
+    def status(self, *args: Any) -> Any:
+        return self._call("status", *args)
+
+    def logout(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            try:
+                conn.logout()
+            except Exception:
+                pass
+
+
+def partition(uids: List[str], parts: int) -> List[List[str]]:
+    """Divide UIDs em até `parts` faixas contíguas de tamanho parecido."""
+    parts = max(1, min(parts, len(uids)))
+    size, extra = divmod(len(uids), parts)
+    result = []
+    start = 0
+    for i in range(parts):
+        end = start + size + (1 if i < extra else 0)
+        result.append(uids[start:end])
+        start = end
+    return [chunk for chunk in result if chunk]
+
+
+class ParallelImapDownloader:
+    """
+    Baixa e-mails com anexos usando várias conexões IMAP em paralelo.
+
+    Args:
+        ingestor: `ImapIngestor` de origem (credenciais, pasta, critérios de
+            anexo e estado de sincronização).
+        workers: Número de conexões/threads.
+        queue_size: E-mails já baixados aguardando consumo (limita o uso de disco).
+        reconnect_attempts: Reconexões por comando em cada conexão.
+    """
+
+    def __init__(
+        self,
+        ingestor: Any,
+        workers: int = 4,
+        queue_size: int = 8,
+        reconnect_attempts: int = 3,
+    ):
+        self.ingestor = ingestor
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self.reconnect_attempts = reconnect_attempts
+
+    def _worker_ingestor(self) -> Any:
+        """Cópia do ingestor com conexão própria (imaplib não é thread-safe)."""
+        clone = copy.copy(self.ingestor)
+        clone.connection = ReconnectingConnection(
+            self.ingestor._open_connection, attempts=self.reconnect_attempts
+        )
+        return clone
+
+    def _put(self, out: "queue.Queue[Any]", item: Any, stop: threading.Event) -> bool:
+        """Enfileira respeitando o limite; desiste se o consumidor parou."""
+        while not stop.is_set():
+            try:
+                out.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run_worker(
+        self,
+        uids: List[str],
+        staging: Path,
+        out: "queue.Queue[Any]",
+        stop: threading.Event,
+    ) -> None:
+        worker = self._worker_ingestor()
+        try:
+            for uid, headers, parts in worker._iter_structures(uids):
+                if stop.is_set():
+                    break
+                attachment_parts = [p for p in parts if worker._is_attachment_part(p)]
+                if not attachment_parts or not worker._claim_message(headers):
+                    continue
+
+                try:
+                    email_data = worker._download_email(
+                        uid, headers, parts, attachment_parts, staging
+                    )
+                except Exception as e:
+                    logger.warning(f"Erro ao baixar e-mail UID {uid}: {e}")
+                    worker._sync_observe(uid, ok=False)
+                    continue
+
+                if not self._put(out, (email_data, headers), stop):
+                    break
+        except Exception as e:
+            logger.error(f"Worker IMAP encerrado com erro: {e}")
+            for uid in uids:
+                worker._sync_observe(uid, ok=False)
+        finally:
+            worker.connection.logout()
+            self._put(out, _DONE, stop)
+
+    def iter_emails(
+        self,
+        uids: List[str],
+        staging_root: Optional[Union[str, Path]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Gera os e-mails com anexos à medida que os workers terminam de baixá-los.
+
+        Os anexos trazem 'save_to(path)', que move o arquivo já baixado da
+        pasta de staging para o destino. Ao fim (ou se o consumidor parar), a
+        pasta de staging é removida com o que não foi consumido.
+
+        Args:
+            uids: UIDs a baixar (já filtrados por assunto/marca d'água).
+            staging_root: Onde criar a pasta de staging (default: temp do sistema).
+        """
+        chunks = partition(uids, self.workers)
+        if not chunks:
+            return
+
+        if staging_root is not None:
+            Path(staging_root).mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(
+            prefix=".imap_staging_", dir=str(staging_root) if staging_root else None
+        ))
+        out: "queue.Queue[Any]" = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        threads = [
+            threading.Thread(
+                target=self._run_worker,
+                args=(chunk, staging, out, stop),
+                name=f"imap-download-{i}",
+                daemon=True,
+            )
+            for i, chunk in enumerate(chunks)
+        ]
+        logger.info(
+            f"Baixando {len(uids)} e-mail(s) com {len(threads)} conexão(ões) IMAP em paralelo"
+        )
+        for thread in threads:
+            thread.start()
+
+        try:
+            pending = len(threads)
+            while pending:
+                item = out.get()
+                if item is _DONE:
+                    pending -= 1
+                    continue
+                email_data, headers = item
+                yield email_data
+                # Consumidor já gravou o lote ao pedir o próximo e-mail
+                self.ingestor._mark_ingested(headers)
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join(timeout=30)
+            shutil.rmtree(staging, ignore_errors=True)
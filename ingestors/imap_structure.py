@@ -0,0 +1,389 @@
+"""
+Parser de respostas IMAP FETCH e de BODYSTRUCTURE.
+
+Usado pelo caminho de ingestão em streaming do `ImapIngestor`: em vez de
+baixar o RFC822 completo de cada e-mail, o ingestor pede em lote apenas a
+estrutura MIME (`BODYSTRUCTURE`) e alguns cabeçalhos, decide por e-mail quais
+partes interessam (PDF/XML e o corpo em texto) e baixa somente essas seções
+(`BODY.PEEK[<seção>]`), em blocos, gravando direto em disco.
+
+Conteúdo:
+    - `parse_fetch_response`: converte a lista devolvida por
+      `imaplib.IMAP4.uid("FETCH", ...)` (bytes e tuplas com literais) em
+      dicionários {ITEM: valor} por mensagem.
+    - `parse_bodystructure`: percorre a árvore BODYSTRUCTURE e devolve as
+      partes folha (`BodyPart`) com o número de seção IMAP de cada uma.
+    - `StreamDecoder`: decodifica base64/quoted-printable incrementalmente,
+      bloco a bloco, sem manter a parte inteira em memória.
+
+Example:
+    >>> typ, data = conn.uid("FETCH", "1:50", "(UID BODYSTRUCTURE)")
+    >>> for item in parse_fetch_response(data):
+    ...     partes = parse_bodystructure(item["BODYSTRUCTURE"])
+"""
+
+import binascii
+import quopri
+from dataclasses import dataclass, field
+from email.header import decode_header
+from email.utils import collapse_rfc2231_value, decode_params
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+# Tokens estruturais do parser
+_LPAREN = object()
+_RPAREN = object()
+
+_ATOM_STOP = b" ()\"\r\n"
+
+Segment = Tuple[str, bytes]
+
+
+# ----------------------------------------------------------------------
+# Tokenização
+# ----------------------------------------------------------------------
+
+
+def _segments(data: Iterable[Any]) -> Iterator[Segment]:
+    """
+    Normaliza a resposta do imaplib em segmentos ("raw", bytes) / ("lit", bytes).
+
+    O imaplib devolve literais `{n}` como tuplas (prefixo, conteúdo); o
+    prefixo termina com o marcador `{n}`, que é removido aqui.
+    """
+    for item in data or []:
+        if item is None:
+            continue
+        if isinstance(item, tuple):
+            prefix, literal = item[0], item[1]
+            marker = prefix.rfind(b"{")
+            if marker != -1 and prefix.endswith(b"}"):
+                prefix = prefix[:marker]
+            yield ("raw", prefix)
+            yield ("lit", literal if isinstance(literal, bytes) else bytes(literal or b""))
+        else:
+            yield ("raw", item if isinstance(item, bytes) else str(item).encode())
+        # Limite entre itens equivale a um separador
+        yield ("raw", b" ")
+
+
+def _tokens(data: Iterable[Any]) -> Iterator[Any]:
+    """Gera tokens: _LPAREN, _RPAREN, str (átomos/strings) ou bytes (literais)."""
+    for kind, chunk in _segments(data):
+        if kind == "lit":
+            yield chunk
+            continue
+
+        i, n = 0, len(chunk)
+        while i < n:
+            c = chunk[i:i + 1]
+            if c in (b" ", b"\r", b"\n", b"\t"):
+                i += 1
+            elif c == b"(":
+                yield _LPAREN
+                i += 1
+            elif c == b")":
+                yield _RPAREN
+                i += 1
+            elif c == b'"':
+                i += 1
+                buf = bytearray()
+                while i < n and chunk[i:i + 1] != b'"':
+                    if chunk[i:i + 1] == b"\\" and i + 1 < n:
+                        i += 1
+                    buf += chunk[i:i + 1]
+                    i += 1
+                i += 1
+                yield _decode_bytes(bytes(buf))
+            else:
+                start = i
+                depth = 0
+                while i < n:
+                    c = chunk[i:i + 1]
+                    if c == b"[":
+                        depth += 1
+                    elif c == b"]":
+                        depth = max(0, depth - 1)
+                    elif depth == 0 and c in _ATOM_STOP:
+                        break
+                    i += 1
+                yield _decode_bytes(chunk[start:i])
+
+
+def _decode_bytes(value: bytes) -> str:
+    try:
+        return value.decode("utf-8")
+    except UnicodeDecodeError:
+        return value.decode("latin-1")
+
+
+def _parse_list(tokens: Iterator[Any]) -> List[Any]:
+    """Lê tokens até o ')' correspondente, montando listas aninhadas."""
+    result: List[Any] = []
+    for token in tokens:
+        if token is _RPAREN:
+            return result
+        if token is _LPAREN:
+            result.append(_parse_list(tokens))
+        elif isinstance(token, str) and token.upper() == "NIL":
+            result.append(None)
+        else:
+            result.append(token)
+    return result
+
+
+def parse_fetch_response(data: Iterable[Any]) -> List[Dict[str, Any]]:
+    """
+    Converte a resposta de FETCH em um dicionário por mensagem.
+
+    As chaves são os nomes dos itens em maiúsculas ("UID", "BODYSTRUCTURE",
+    "BODY[1]<0>", ...). O número de sequência fica em "SEQ".
+
+    Args:
+        data: Segundo elemento do retorno de `conn.uid("FETCH", ...)`.
+
+    Returns:
+        Lista de dicionários, na ordem da resposta.
+    """
+    tokens = _tokens(data)
+    messages: List[Dict[str, Any]] = []
+    seq: Optional[str] = None
+
+    for token in tokens:
+        if token is _LPAREN:
+            items = _parse_list(tokens)
+            message: Dict[str, Any] = {"SEQ": seq}
+            for key, value in zip(items[0::2], items[1::2]):
+                if isinstance(key, str):
+                    message[key.upper()] = value
+            messages.append(message)
+            seq = None
+        elif isinstance(token, str):
+            seq = token
+    return messages
+
+
+def find_section(message: Dict[str, Any], prefix: str) -> Any:
+    """Valor do primeiro item cuja chave começa com `prefix` (ex: "BODY[HEADER")."""
+    prefix = prefix.upper()
+    for key, value in message.items():
+        if key.startswith(prefix):
+            return value
+    return None
+
+
+# ----------------------------------------------------------------------
+# BODYSTRUCTURE
+# ----------------------------------------------------------------------
+
+
+@dataclass
+class BodyPart:
+    """Parte folha de uma mensagem, como descrita pelo BODYSTRUCTURE."""
+
+    section: str
+    maintype: str
+    subtype: str
+    params: Dict[str, str] = field(default_factory=dict)
+    encoding: str = "7bit"
+    size: int = 0
+    disposition: Optional[str] = None
+    disposition_params: Dict[str, str] = field(default_factory=dict)
+    filename: Optional[str] = None
+    is_root: bool = False
+
+    @property
+    def content_type(self) -> str:
+        return f"{self.maintype}/{self.subtype}"
+
+    @property
+    def charset(self) -> str:
+        return self.params.get("charset") or "utf-8"
+
+
+def _text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bytes):
+        return _decode_bytes(value)
+    return str(value)
+
+
+def _param_dict(raw: Any) -> Dict[str, str]:
+    """Lista plana (k v k v ...) → dict, decodificando RFC 2231 (filename*0*=...)."""
+    if not isinstance(raw, list):
+        return {}
+    pairs = [
+        (_text(k).lower(), _text(v))
+        for k, v in zip(raw[0::2], raw[1::2])
+    ]
+    result: Dict[str, str] = {}
+    # decode_params trata o primeiro par como o próprio content-type
+    for name, value in decode_params([("", "")] + pairs)[1:]:
+        if isinstance(value, tuple):
+            value = collapse_rfc2231_value(value)
+        else:
+            value = value.strip('"')
+        result[name.lower().rstrip("*")] = value
+    return result
+
+
+def decode_mime_words(value: Optional[str]) -> str:
+    """Decodifica encoded-words (=?utf-8?B?...?=) em nomes de arquivo."""
+    if not value:
+        return ""
+    parts = []
+    for content, encoding in decode_header(value):
+        if isinstance(content, bytes):
+            try:
+                parts.append(content.decode(encoding or "utf-8", errors="replace"))
+            except LookupError:
+                parts.append(content.decode("latin-1", errors="replace"))
+        else:
+            parts.append(content)
+    return "".join(parts)
+
+
+def _single_part(node: List[Any], section: str, is_root: bool) -> Tuple[BodyPart, Any]:
+    """Interpreta um body-type-1part; retorna a parte e o corpo encapsulado (message/rfc822)."""
+    maintype = _text(node[0]).lower()
+    subtype = _text(node[1]).lower() if len(node) > 1 else ""
+    params = _param_dict(node[2] if len(node) > 2 else None)
+    encoding = _text(node[5] if len(node) > 5 else "7bit").lower() or "7bit"
+    try:
+        size = int(_text(node[6])) if len(node) > 6 else 0
+    except ValueError:
+        size = 0
+
+    encapsulated = None
+    if maintype == "text":
+        ext = 8
+    elif maintype == "message" and subtype == "rfc822" and len(node) > 8:
+        encapsulated = node[8]
+        ext = 10
+    else:
+        ext = 7
+
+    disposition: Optional[str] = None
+    disposition_params: Dict[str, str] = {}
+    dsp = node[ext + 1] if len(node) > ext + 1 else None
+    if isinstance(dsp, list) and dsp:
+        disposition = _text(dsp[0]).lower()
+        disposition_params = _param_dict(dsp[1] if len(dsp) > 1 else None)
+
+    raw_name = disposition_params.get("filename") or params.get("name")
+    part = BodyPart(
+        section=section,
+        maintype=maintype,
+        subtype=subtype,
+        params=params,
+        encoding=encoding,
+        size=size,
+        disposition=disposition,
+        disposition_params=disposition_params,
+        filename=decode_mime_words(raw_name) if raw_name else None,
+        is_root=is_root,
+    )
+    return part, encapsulated
+
+
+def parse_bodystructure(node: Any) -> List[BodyPart]:
+    """
+    Lista as partes folha do BODYSTRUCTURE com seus números de seção.
+
+    Segue a numeração da RFC 3501: filhos de multipart recebem 1, 2, ...;
+    uma mensagem que não é multipart tem apenas a parte "1"; o corpo de um
+    message/rfc822 encapsulado é numerado a partir da seção da própria parte.
+
+    Args:
+        node: Valor do item BODYSTRUCTURE (lista aninhada).
+
+    Returns:
+        Lista de BodyPart (partes multipart/message não são incluídas).
+    """
+    parts: List[BodyPart] = []
+
+    def walk(n: Any, prefix: str, is_root: bool) -> None:
+        if not isinstance(n, list) or not n:
+            return
+
+        if isinstance(n[0], list):
+            # Multipart: filhos seguidos do subtipo e extensões
+            index = 0
+            for child in n:
+                if not isinstance(child, list):
+                    break
+                index += 1
+                walk(child, f"{prefix}.{index}" if prefix else str(index), False)
+            return
+
+        section = prefix or "1"
+        part, encapsulated = _single_part(n, section, is_root)
+        if encapsulated is not None:
+            if isinstance(encapsulated, list) and encapsulated and isinstance(encapsulated[0], list):
+                walk(encapsulated, section, False)
+            else:
+                walk(encapsulated, f"{section}.1", False)
+            return
+        parts.append(part)
+
+    walk(node, "", True)
+    return parts
+
+
+# ----------------------------------------------------------------------
+# Decodificação incremental
+# ----------------------------------------------------------------------
+
+
+class StreamDecoder:
+    """
+    Decodifica Content-Transfer-Encoding bloco a bloco.
+
+    base64 é decodificado em múltiplos de 4 caracteres; quoted-printable,
+    por linhas completas. Demais codificações (7bit, 8bit, binary) passam
+    sem alteração.
+    """
+
+    _WHITESPACE = b" \t\r\n"
+
+    def __init__(self, encoding: str):
+        self.encoding = (encoding or "7bit").lower()
+        self._pending = b""
+
+    def feed(self, chunk: Union[bytes, bytearray]) -> bytes:
+        """Decodifica o que for possível de `chunk`, guardando o restante."""
+        if self.encoding == "base64":
+            data = self._pending + bytes(chunk).translate(None, self._WHITESPACE)
+            cut = len(data) - len(data) % 4
+            self._pending = data[cut:]
+            return binascii.a2b_base64(data[:cut]) if cut else b""
+
+        if self.encoding == "quoted-printable":
+            data = self._pending + bytes(chunk)
+            cut = data.rfind(b"\n") + 1
+            self._pending = data[cut:]
+            return quopri.decodestring(data[:cut]) if cut else b""
+
+        return bytes(chunk)
+
+    def flush(self) -> bytes:
+        """Decodifica o restante ao final da parte."""
+        data, self._pending = self._pending, b""
+        if not data:
+            return b""
+        if self.encoding == "base64":
+            data = data.rstrip(b"=")
+            padding = b"=" * (-len(data) % 4)
+            try:
+                return binascii.a2b_base64(data + padding)
+            except binascii.Error:
+                return b""
+        if self.encoding == "quoted-printable":
+            return quopri.decodestring(data)
+        return data
+
+
+def decode_payload(data: bytes, encoding: str) -> bytes:
+    """Decodifica uma parte inteira (atalho para partes pequenas, ex: corpo)."""
+    decoder = StreamDecoder(encoding)
+    return decoder.feed(data) + decoder.flush()
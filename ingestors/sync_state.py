@@ -0,0 +1,230 @@
+"""
+Estado de sincronização incremental de caixas IMAP.
+
+Guarda, por pasta, o UIDVALIDITY e o maior UID já processado (marca d'água),
+além dos Message-IDs já ingeridos. Com ele o `ImapIngestor` busca apenas
+`UID SEARCH UID n:*` em vez da pasta inteira, e e-mails repetidos (mesma
+mensagem entregue duas vezes, ou UIDs renumerados após mudança de
+UIDVALIDITY) são descartados pelo Message-ID.
+
+A marca d'água só avança em `commit()`, chamado pelo orquestrador ao fim de
+uma execução completa: uma execução interrompida é refeita na próxima vez a
+partir da última marca confirmada.
+
+Estrutura do arquivo:
+    temp_email/
+    └── _sync_state.json
+        {
+          "folders": {"INBOX": {"uidvalidity": "1700000000", "last_uid": 5231}},
+          "message_ids": ["<abc@dominio>", ...]
+        }
+"""
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Union
+
+logger = logging.getLogger(__name__)
+
+
+class MailboxSyncState:
+    """
+    Marca d'água de UIDs por pasta + Message-IDs já ingeridos.
+
+    Args:
+        path: Arquivo JSON onde o estado é persistido.
+        max_message_ids: Quantidade máxima de Message-IDs lembrados
+            (os mais antigos são descartados).
+    """
+
+    MAX_MESSAGE_IDS = 100_000
+
+    def __init__(self, path: Union[str, Path], max_message_ids: Optional[int] = None):
+        self.path = Path(path)
+        self.max_message_ids = max_message_ids or self.MAX_MESSAGE_IDS
+        self._folders: Dict[str, Dict[str, Union[str, int]]] = {}
+        # dict preserva ordem de inserção: funciona como conjunto com descarte FIFO
+        self._message_ids: Dict[str, None] = {}
+
+        # Pendências da execução atual (confirmadas em commit)
+        self._seen_uids: Dict[str, int] = {}
+        self._failed_uids: Dict[str, int] = {}
+        self._new_message_ids: List[str] = []
+        self._claimed: Set[str] = set()
+
+        # Usado por várias threads no download paralelo (ingestors/imap_pool.py)
+        self._lock = threading.RLock()
+
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Persistência
+    # ------------------------------------------------------------------
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            self._folders = dict(data.get("folders", {}))
+            self._message_ids = dict.fromkeys(data.get("message_ids", []))
+        except Exception as e:
+            logger.warning(f"⚠️ Estado de sincronização ilegível ({e}). Sincronizando do zero.")
+            self._folders = {}
+            self._message_ids = {}
+
+    def save(self) -> None:
+        """Grava o estado de forma atômica (arquivo temporário + rename)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        payload = {
+            "folders": self._folders,
+            "message_ids": list(self._message_ids),
+        }
+        tmp_path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+    # ------------------------------------------------------------------
+    # Marca d'água por pasta
+    # ------------------------------------------------------------------
+
+    def begin(self, folder: str, uidvalidity: Optional[str]) -> int:
+        """
+        Retorna o último UID confirmado da pasta.
+
+        Se o UIDVALIDITY mudou (pasta recriada/renumerada), a marca d'água da
+        pasta é descartada e a busca volta a cobrir a pasta inteira; os
+        Message-IDs conhecidos continuam evitando reingestão.
+        """
+        state = self._folders.get(folder)
+        uidvalidity = str(uidvalidity) if uidvalidity else ""
+
+        if state is not None and uidvalidity and str(state.get("uidvalidity")) != uidvalidity:
+            logger.warning(
+                f"⚠️ UIDVALIDITY de '{folder}' mudou "
+                f"({state.get('uidvalidity')} → {uidvalidity}). Refazendo sincronização."
+            )
+            state = None
+            self._seen_uids.pop(folder, None)
+            self._failed_uids.pop(folder, None)
+
+        if state is None:
+            state = {"uidvalidity": uidvalidity, "last_uid": 0}
+            self._folders[folder] = state
+
+        return int(state.get("last_uid", 0))
+
+    def last_uid(self, folder: str) -> int:
+        """Último UID confirmado da pasta (0 = nunca sincronizada)."""
+        return int(self._folders.get(folder, {}).get("last_uid", 0))
+
+    def observe(self, folder: str, uid: Union[str, int], ok: bool = True) -> None:
+        """
+        Registra um UID visto na execução atual.
+
+        UIDs com falha (`ok=False`) seguram a marca d'água: o commit não passa
+        do UID anterior à primeira falha, para que ela seja tentada de novo.
+        """
+        uid = int(uid)
+        with self._lock:
+            if ok:
+                self._seen_uids[folder] = max(self._seen_uids.get(folder, 0), uid)
+            else:
+                current = self._failed_uids.get(folder)
+                self._failed_uids[folder] = uid if current is None else min(current, uid)
+
+    # ------------------------------------------------------------------
+    # Message-IDs
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _key(message_id: Optional[str]) -> str:
+        return (message_id or "").strip()
+
+    def is_known(self, message_id: Optional[str]) -> bool:
+        """Se o Message-ID já foi ingerido (em execuções anteriores ou nesta)."""
+        key = self._key(message_id)
+        with self._lock:
+            return bool(key) and key in self._message_ids
+
+    def claim(self, message_id: Optional[str]) -> bool:
+        """
+        Reserva o Message-ID para esta execução.
+
+        Returns:
+            False se já foi ingerido ou reservado (e-mail duplicado); True
+            caso contrário, inclusive para e-mails sem Message-ID.
+        """
+        key = self._key(message_id)
+        if not key:
+            return True
+        with self._lock:
+            if key in self._message_ids or key in self._claimed:
+                return False
+            self._claimed.add(key)
+            return True
+
+    def mark_ingested(self, message_ids: Union[str, Iterable[str], None]) -> None:
+        """Registra Message-IDs ingeridos nesta execução."""
+        if message_ids is None:
+            return
+        if isinstance(message_ids, str):
+            message_ids = [message_ids]
+        with self._lock:
+            for message_id in message_ids:
+                key = self._key(message_id)
+                if key and key not in self._message_ids:
+                    self._message_ids[key] = None
+                    self._new_message_ids.append(key)
+
+    # ------------------------------------------------------------------
+    # Confirmação
+    # ------------------------------------------------------------------
+
+    def commit(self) -> None:
+        """Avança as marcas d'água com o que foi visto nesta execução e grava."""
+        for folder, state in self._folders.items():
+            last = int(state.get("last_uid", 0))
+            seen = self._seen_uids.get(folder, last)
+            failed = self._failed_uids.get(folder)
+            if failed is not None:
+                seen = min(seen, failed - 1)
+            state["last_uid"] = max(last, seen)
+
+        overflow = len(self._message_ids) - self.max_message_ids
+        if overflow > 0:
+            for key in list(self._message_ids)[:overflow]:
+                del self._message_ids[key]
+
+        self.save()
+        logger.info(
+            "🔖 Sincronização confirmada: "
+            + ", ".join(f"{f}≤{s.get('last_uid')}" for f, s in self._folders.items())
+            + f" ({len(self._new_message_ids)} novo(s) Message-ID)"
+        )
+        self._clear_pending()
+
+    def rollback(self) -> None:
+        """Descarta as pendências da execução atual (não altera o arquivo)."""
+        for key in self._new_message_ids:
+            self._message_ids.pop(key, None)
+        self._clear_pending()
+
+    def _clear_pending(self) -> None:
+        self._seen_uids.clear()
+        self._failed_uids.clear()
+        self._claimed.clear()
+        self._new_message_ids = []
+
+    def reset(self, folder: Optional[str] = None) -> None:
+        """Apaga o estado (de uma pasta ou inteiro) e grava."""
+        if folder is None:
+            self._folders.clear()
+            self._message_ids.clear()
+        else:
+            self._folders.pop(folder, None)
+        self._clear_pending()
+        self.save()
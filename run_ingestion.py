@@ -34,6 +34,15 @@ Usage:
     # Reprocessar lotes existentes
     python run_ingestion.py --reprocess
 
+    # Reprocessar lotes existentes em paralelo (4 processos)
+    python run_ingestion.py --reprocess --workers 4
+
+    # Reprocessar ignorando o cache de texto (refaz leitura/OCR)
+    python run_ingestion.py --reprocess --no-text-cache
+
+    # Reprocessar sem marcar documentos já vistos em outros lotes
+    python run_ingestion.py --reprocess --no-duplicate-index
+
     # Processar pasta específica
     python run_ingestion.py --batch-folder temp_email/email_123
 
@@ -45,19 +54,36 @@ Usage:
 
     # Ver status do checkpoint atual
     python run_ingestion.py --status
+
+    # Gravar também datasets Parquet (data/output/datasets, requer pyarrow)
+    python run_ingestion.py --parquet
 """
 
 import argparse
 import logging
-from collections import defaultdict
+import os
+from dataclasses import dataclass, field
+from datetime import date
+from itertools import islice
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from config import settings
 from core.batch_processor import BatchProcessor, process_email_batch
 from core.batch_result import BatchResult
-
-from core.exporters import FileSystemManager
+from core.duplicate_index import get_duplicate_index
+
+from core.exporters import (
+    DOCUMENT_PARTITIONS,
+    PYARROW_AVAILABLE,
+    CsvStreamWriter,
+    FileSystemManager,
+    ParquetDatasetWriter,
+    all_document_columns,
+    document_column_types,
+    document_columns,
+    prioritize_columns,
+)
 from core.interfaces import EmailIngestorStrategy
 
 from core.models import EmailAvisoData
@@ -103,7 +129,107 @@ def create_ingestor_from_config() -> EmailIngestorStrategy:
     )
 
 
-def export_batch_results(batches: List[BatchResult], output_dir: Path) -> None:
+# Colunas que abrem o relatório consolidado (melhor visualização)
+COLUNAS_CONSOLIDADO = [
+    "batch_id",
+    "tipo_documento",
+    "status_conciliacao",
+    "valor_compra",
+    "fornecedor_nome",
+    "valor_documento",
+    "valor_total",
+    "vencimento",
+    "data_emissao",
+    "numero_nota",
+    "numero_documento",
+    "email_subject",
+]
+
+# Contexto do lote acrescentado a cada documento
+COLUNAS_CONTEXTO_LOTE = ["batch_id", "email_subject", "email_sender"]
+
+# Esquema do relatório de lotes (chaves de DocumentPair.to_summary)
+COLUNAS_LOTE = [
+    "batch_id",
+    "data",
+    "status_conciliacao",
+    "divergencia",
+    "diferenca_valor",
+    "fornecedor",
+    "vencimento",
+    "numero_nota",
+    "valor_compra",
+    "valor_boleto",
+    "total_documents",
+    "total_errors",
+    "danfes",
+    "boletos",
+    "nfses",
+    "outros",
+    "email_subject",
+    "email_sender",
+    "empresa",
+    "avisos",
+    "source_folder",
+]
+
+# Tipos das colunas do relatório de lotes no dataset Parquet
+TIPOS_LOTE: Dict[str, type] = {coluna: str for coluna in COLUNAS_LOTE}
+TIPOS_LOTE.update(
+    diferenca_valor=float,
+    valor_compra=float,
+    valor_boleto=float,
+    total_documents=int,
+    total_errors=int,
+    danfes=int,
+    boletos=int,
+    nfses=int,
+    outros=int,
+    avisos=int,
+)
+
+# Campos de texto livre do resumo sanitizados (quebras de linha e ';')
+_CAMPOS_SANITIZADOS_LOTE = ("email_subject", "email_sender", "divergencia")
+
+
+@dataclass
+class ExportSummary:
+    """Totais acumulados durante a exportação dos lotes."""
+
+    lotes: int = 0
+    pares: int = 0
+    documentos: int = 0
+    erros: int = 0
+    valor_total: float = 0.0
+    status: Dict[str, int] = field(default_factory=dict)
+
+
+def _sanitize_csv_text(value: str) -> str:
+    """Remove quebras de linha e troca ';' por ',' (evita conflito no CSV)."""
+    return value.replace("\n", " ").replace("\r", " ").replace(";", ",").strip()
+
+
+def _data_processamento(batch: BatchResult) -> str:
+    """Data de processamento do lote (primeiro documento que a tiver ou hoje)."""
+    for doc in batch.documents:
+        if doc.data_processamento:
+            return doc.data_processamento
+    return date.today().isoformat()
+
+
+def _parquet_writer(root: Path, column_types: Dict[str, type], partition_by) -> Optional[ParquetDatasetWriter]:
+    """Writer do dataset Parquet ou None (com aviso) se pyarrow faltar."""
+    if not PYARROW_AVAILABLE:
+        logger.warning("⚠️ pyarrow não instalado: datasets Parquet não serão gerados")
+        return None
+    return ParquetDatasetWriter(root, column_types, partition_by)
+
+
+def export_batch_results(
+    batches: Iterable[BatchResult],
+    output_dir: Path,
+    parquet_dir: Optional[Path] = None,
+) -> ExportSummary:
     """
     Exporta resultados dos lotes para CSVs.
 
@@ -118,167 +244,143 @@ def export_batch_results(batches: List[BatchResult], output_dir: Path) -> None:
 
     Todos os CSVs usam separador ';', encoding 'utf-8-sig' e decimal ','.
 
-    Args:
-        batches: Lista de resultados de lotes processados
-        output_dir: Diretório de saída para os arquivos CSV
-    """
-    import pandas as pd
-
-    # Agrupa documentos por tipo
-    documentos_por_tipo = defaultdict(list)
-
-    # Lista consolidada de TODOS os documentos
-    todos_documentos = []
+    A exportação é em fluxo: `batches` pode ser um gerador (ex.:
+    `IngestionResult.iter_batch_results()`, que lê o JSONL parcial sob
+    demanda) e cada lote é escrito nos CSVs assim que chega, com esquema de
+    colunas fixo. A memória fica limitada a um lote, qualquer que seja o
+    tamanho da execução.
 
-    # Lista de resumos por lote (agora pode ter múltiplos por batch)
-    resumos_lotes = []
+    Com `parquet_dir`, grava também os datasets tipados
+    `<parquet_dir>/documentos` (partições tipo_documento/data_processamento)
+    e `<parquet_dir>/lotes` (partição data_processamento).
 
-    for batch in batches:
-        for doc in batch.documents:
-            doc_type = doc.doc_type
-            doc_dict = doc.to_dict()
-
-            # Adiciona contexto do lote
-            doc_dict["batch_id"] = batch.batch_id
-            doc_dict["email_subject"] = batch.email_subject
-            doc_dict["email_sender"] = batch.email_sender
-
-            documentos_por_tipo[doc_type].append(doc_dict)
-            todos_documentos.append(doc_dict)
-
-        # Usa to_summaries() para gerar um resumo por par NF↔Boleto
-        # Isso separa múltiplas notas do mesmo email em linhas distintas
-        batch_summaries = batch.to_summaries()
-        resumos_lotes.extend(batch_summaries)
-
-        if len(batch_summaries) > 1:
-            logger.debug(
-                f"📊 Lote {batch.batch_id}: {len(batch_summaries)} pares NF↔Boleto identificados"
-            )
-
-    # Exporta cada tipo separadamente
-    for doc_type, documentos in documentos_por_tipo.items():
-        if not documentos:
-            continue
+    Args:
+        batches: Lotes processados (lista ou iterável)
+        output_dir: Diretório de saída para os arquivos CSV
+        parquet_dir: Raiz dos datasets Parquet (None = só CSV)
 
-        nome_arquivo = f"relatorio_{doc_type.lower()}.csv"
-        output_path = output_dir / nome_arquivo
-
-        df = pd.DataFrame(documentos)
-        df.to_csv(output_path, index=False, sep=";", encoding="utf-8-sig", decimal=",")
-
-        logger.info(f"✅ {len(documentos)} {doc_type} exportados -> {output_path}")
-
-    # Exporta tabela consolidada (TODOS os documentos juntos)
-    if todos_documentos:
-        output_consolidado = output_dir / "relatorio_consolidado.csv"
-        df_consolidado = pd.DataFrame(todos_documentos)
-
-        # Reordena colunas para melhor visualização
-        colunas_prioritarias = [
-            "batch_id",
-            "tipo_documento",
-            "status_conciliacao",
-            "valor_compra",
-            "fornecedor_nome",
-            "valor_documento",
-            "valor_total",
-            "vencimento",
-            "data_emissao",
-            "numero_nota",
-            "numero_documento",
-            "email_subject",
-        ]
-        colunas_existentes = [
-            c for c in colunas_prioritarias if c in df_consolidado.columns
-        ]
-        outras_colunas = [
-            c for c in df_consolidado.columns if c not in colunas_prioritarias
-        ]
-        df_consolidado = df_consolidado[colunas_existentes + outras_colunas]
-
-        df_consolidado.to_csv(
-            output_consolidado, index=False, sep=";", encoding="utf-8-sig", decimal=","
-        )
-        logger.info(
-            f"✅ {len(todos_documentos)} documentos -> {output_consolidado.name} (CONSOLIDADO)"
+    Returns:
+        ExportSummary com os totais (lotes, documentos, erros, valor, status)
+    """
+    summary = ExportSummary()
+    por_tipo: Dict[str, CsvStreamWriter] = {}
+    consolidado = CsvStreamWriter(
+        output_dir / "relatorio_consolidado.csv",
+        prioritize_columns(
+            COLUNAS_CONSOLIDADO, all_document_columns() + COLUNAS_CONTEXTO_LOTE
+        ),
+    )
+    lotes = CsvStreamWriter(output_dir / "relatorio_lotes.csv", COLUNAS_LOTE)
+    parquet_docs = parquet_lotes = None
+    if parquet_dir is not None:
+        parquet_docs = _parquet_writer(
+            parquet_dir / "documentos",
+            document_column_types(COLUNAS_CONTEXTO_LOTE),
+            DOCUMENT_PARTITIONS,
         )
+        if parquet_docs is not None:
+            parquet_lotes = _parquet_writer(
+                parquet_dir / "lotes", TIPOS_LOTE, ("data_processamento",)
+            )
 
-    # Exporta relatório de lotes (resumo por batch)
-    if resumos_lotes:
-        output_lotes = output_dir / "relatorio_lotes.csv"
-
-        # Sanitiza campos de texto para evitar quebras de linha no CSV
-        for resumo in resumos_lotes:
-            if resumo.get("email_subject"):
-                resumo["email_subject"] = (
-                    resumo["email_subject"]
-                    .replace("\n", " ")
-                    .replace("\r", " ")
-                    .replace(";", ",")  # Evita conflito com delimitador CSV
-                    .strip()
-                )
-            if resumo.get("email_sender"):
-                resumo["email_sender"] = (
-                    resumo["email_sender"]
-                    .replace("\n", " ")
-                    .replace("\r", " ")
-                    .replace(";", ",")
-                    .strip()
-                )
-            if resumo.get("divergencia"):
-                resumo["divergencia"] = (
-                    resumo["divergencia"]
-                    .replace("\n", " ")
-                    .replace("\r", " ")
-                    .replace(";", ",")
-                    .strip()
+    try:
+        for batch in batches:
+            for doc in batch.documents:
+                doc_type = doc.doc_type
+                doc_dict = doc.to_dict()
+
+                # Adiciona contexto do lote
+                doc_dict["batch_id"] = batch.batch_id
+                doc_dict["email_subject"] = batch.email_subject
+                doc_dict["email_sender"] = batch.email_sender
+
+                writer = por_tipo.get(doc_type)
+                if writer is None:
+                    colunas = document_columns(doc_type) or [
+                        c for c in doc_dict if c not in COLUNAS_CONTEXTO_LOTE
+                    ]
+                    writer = CsvStreamWriter(
+                        output_dir / f"relatorio_{doc_type.lower()}.csv",
+                        colunas + COLUNAS_CONTEXTO_LOTE,
+                    )
+                    por_tipo[doc_type] = writer
+                writer.write(doc_dict)
+                consolidado.write(doc_dict)
+                if parquet_docs is not None:
+                    parquet_docs.write(doc_dict)
+
+            # Usa to_summaries() para gerar um resumo por par NF↔Boleto
+            # Isso separa múltiplas notas do mesmo email em linhas distintas
+            batch_summaries = batch.to_summaries()
+            if len(batch_summaries) > 1:
+                logger.debug(
+                    f"📊 Lote {batch.batch_id}: {len(batch_summaries)} pares NF↔Boleto identificados"
                 )
-
-        df_lotes = pd.DataFrame(resumos_lotes)
-
-        # Reordena colunas do resumo
-        colunas_lote = [
-            "batch_id",
-            "data",
-            "status_conciliacao",
-            "divergencia",
-            "diferenca_valor",
-            "fornecedor",
-            "vencimento",
-            "numero_nota",
-            "valor_compra",
-            "valor_boleto",
-            "total_documents",
-            "total_errors",
-            "danfes",
-            "boletos",
-            "nfses",
-            "outros",
-            "email_subject",
-            "email_sender",
-            "empresa",
-        ]
-        colunas_existentes = [c for c in colunas_lote if c in df_lotes.columns]
-        outras_colunas = [c for c in df_lotes.columns if c not in colunas_lote]
-        df_lotes = df_lotes[colunas_existentes + outras_colunas]
-
-        df_lotes.to_csv(
-            output_lotes, index=False, sep=";", encoding="utf-8-sig", decimal=","
+            for resumo in batch_summaries:
+                for campo in _CAMPOS_SANITIZADOS_LOTE:
+                    if resumo.get(campo):
+                        resumo[campo] = _sanitize_csv_text(resumo[campo])
+                lotes.write(resumo)
+                if parquet_lotes is not None:
+                    resumo["data_processamento"] = _data_processamento(batch)
+                    parquet_lotes.write(resumo)
+
+            summary.lotes += 1
+            summary.pares += len(batch_summaries)
+            summary.documentos += batch.total_documents
+            summary.erros += batch.total_errors
+            summary.valor_total += batch.get_valor_compra()
+            summary.status[batch.status] = summary.status.get(batch.status, 0) + 1
+    finally:
+        for writer in [*por_tipo.values(), consolidado, lotes, parquet_docs, parquet_lotes]:
+            if writer is not None:
+                writer.close()
+
+    for doc_type, writer in por_tipo.items():
+        logger.info(f"✅ {writer.rows} {doc_type} exportados -> {writer.path}")
+
+    if consolidado.rows:
+        logger.info(
+            f"✅ {consolidado.rows} documentos -> {consolidado.path.name} (CONSOLIDADO)"
         )
 
+    if lotes.rows:
         # Conta quantos batches originais e quantos pares gerados
-        batches_originais = len(batches)
-        pares_gerados = len(resumos_lotes)
-        if pares_gerados > batches_originais:
+        if summary.pares > summary.lotes:
             logger.info(
-                f"✅ {pares_gerados} pares NF↔Boleto (de {batches_originais} emails) -> {output_lotes.name}"
+                f"✅ {summary.pares} pares NF↔Boleto (de {summary.lotes} emails) -> {lotes.path.name}"
             )
         else:
-            logger.info(f"✅ {pares_gerados} lotes -> {output_lotes.name} (AUDITORIA)")
+            logger.info(f"✅ {summary.pares} lotes -> {lotes.path.name} (AUDITORIA)")
+
+    if parquet_docs is not None and parquet_docs.rows:
+        logger.info(
+            f"✅ {parquet_docs.rows} documentos / {parquet_lotes.rows} lotes -> "
+            f"{parquet_dir} (Parquet)"
+        )
+
+    return summary
 
 
-def export_avisos_to_csv(avisos: List[EmailAvisoData], output_dir: Path) -> None:
+# Formato resumido de avisos (leitura humana rápida)
+COLUNAS_AVISOS_LINKS = [
+    "email_id",
+    "subject",
+    "sender_name",
+    "sender_address",
+    "received_date",
+    "link_nfe",
+    "codigo_verificacao",
+    "empresa",
+    "status",
+]
+
+
+def export_avisos_to_csv(
+    avisos: Iterable[EmailAvisoData],
+    output_dir: Path,
+    parquet_dir: Optional[Path] = None,
+) -> int:
     """
     Exporta avisos de e-mails sem anexo para CSV.
 
@@ -286,47 +388,62 @@ def export_avisos_to_csv(avisos: List[EmailAvisoData], output_dir: Path) -> None
     - avisos_emails_sem_anexo_latest.csv: Formato completo para integração Google Sheets
     - relatorio_avisos_links.csv: Formato resumido para leitura rápida
 
+    Como em `export_batch_results`, os avisos são escritos em fluxo; com
+    `parquet_dir`, também no dataset `<parquet_dir>/avisos`.
+
     Args:
-        avisos: Lista de EmailAvisoData
+        avisos: EmailAvisoData (lista ou iterável)
         output_dir: Diretório de saída
-    """
-    import pandas as pd
-
-    if not avisos:
-        return
+        parquet_dir: Raiz dos datasets Parquet (None = só CSV)
 
+    Returns:
+        Quantidade de avisos exportados
+    """
     # Formato completo usando to_dict() - compatível com export_to_sheets.py
-    avisos_dicts_full = [aviso.to_dict() for aviso in avisos]
-
-    # CSV principal para integração com Google Sheets
-    output_path_sheets = output_dir / "avisos_emails_sem_anexo_latest.csv"
-    df_full = pd.DataFrame(avisos_dicts_full)
-    df_full.to_csv(output_path_sheets, index=False, sep=";", encoding="utf-8-sig")
-    logger.info(
-        f"✅ {len(avisos)} aviso(s) -> {output_path_sheets.name} (Google Sheets)"
+    sheets = CsvStreamWriter(
+        output_dir / "avisos_emails_sem_anexo_latest.csv",
+        document_columns("AVISO"),
+        decimal=".",
     )
-
-    # Formato resumido para leitura humana rápida
-    avisos_dicts_simple = []
-    for aviso in avisos:
-        avisos_dicts_simple.append(
-            {
-                "email_id": aviso.email_id,
-                "subject": aviso.subject,
-                "sender_name": aviso.sender_name,
-                "sender_address": aviso.sender_address,
-                "received_date": aviso.received_date,
-                "link_nfe": aviso.link_nfe,
-                "codigo_verificacao": aviso.codigo_verificacao,
-                "empresa": aviso.empresa,
-                "status": "PENDENTE_DOWNLOAD",
-            }
+    simples = CsvStreamWriter(
+        output_dir / "relatorio_avisos_links.csv", COLUNAS_AVISOS_LINKS, decimal="."
+    )
+    parquet = None
+    if parquet_dir is not None:
+        parquet = _parquet_writer(
+            parquet_dir / "avisos", document_column_types(), DOCUMENT_PARTITIONS
         )
 
-    output_path_simple = output_dir / "relatorio_avisos_links.csv"
-    df_simple = pd.DataFrame(avisos_dicts_simple)
-    df_simple.to_csv(output_path_simple, index=False, sep=";", encoding="utf-8-sig")
-    logger.info(f"✅ {len(avisos)} aviso(s) -> {output_path_simple.name} (relatório)")
+    try:
+        for aviso in avisos:
+            aviso_dict = aviso.to_dict()
+            sheets.write(aviso_dict)
+            if parquet is not None:
+                parquet.write(aviso_dict)
+            simples.write(
+                {
+                    "email_id": aviso.email_id,
+                    "subject": aviso.subject,
+                    "sender_name": aviso.sender_name,
+                    "sender_address": aviso.sender_address,
+                    "received_date": aviso.received_date,
+                    "link_nfe": aviso.link_nfe,
+                    "codigo_verificacao": aviso.codigo_verificacao,
+                    "empresa": aviso.empresa,
+                    "status": "PENDENTE_DOWNLOAD",
+                }
+            )
+    finally:
+        sheets.close()
+        simples.close()
+        if parquet is not None:
+            parquet.close()
+
+    if sheets.rows:
+        logger.info(f"✅ {sheets.rows} aviso(s) -> {sheets.path.name} (Google Sheets)")
+        logger.info(f"✅ {simples.rows} aviso(s) -> {simples.path.name} (relatório)")
+
+    return sheets.rows
 
 
 def ingest_unified(
@@ -338,6 +455,7 @@ def ingest_unified(
     timeout_seconds: int = 300,
     max_emails: Optional[int] = None,
     links_first: bool = False,
+    incremental_sync: Optional[bool] = None,
 ) -> Tuple[IngestionResult, Optional[EmailIngestionOrchestrator]]:
     """
     Executa ingestão UNIFICADA de e-mails COM e SEM anexos.
@@ -360,6 +478,8 @@ def ingest_unified(
         timeout_seconds: Timeout por lote em segundos
         max_emails: Limite máximo de e-mails a processar (None = sem limite)
         links_first: Se True, processa e-mails SEM anexo ANTES dos COM anexo
+        incremental_sync: Busca só e-mails novos desde a última execução
+            completa (None = settings.IMAP_INCREMENTAL_SYNC)
 
     Returns:
         Tupla (IngestionResult, orchestrator) - orchestrator para acesso a dados parciais
@@ -370,6 +490,7 @@ def ingest_unified(
         orchestrator = create_orchestrator_from_config(
             temp_dir=settings.DIR_TEMP,
             batch_timeout_seconds=timeout_seconds,
+            incremental_sync=incremental_sync,
         )
 
         _current_orchestrator = orchestrator
@@ -504,7 +625,7 @@ def ingest_and_process(
 
     # 2. Prepara serviços
     ingestion_service = IngestionService(ingestor=ingestor, temp_dir=settings.DIR_TEMP)
-    batch_processor = BatchProcessor()
+    batch_processor = BatchProcessor(duplicate_index=get_duplicate_index())
 
     # 3. Prepara diretórios
     file_manager = FileSystemManager(
@@ -559,6 +680,7 @@ def reprocess_existing_batches(
     root_folder: Optional[Path] = None,
     apply_correlation: bool = True,
     timeout_seconds: int = 300,
+    workers: Optional[int] = None,
 ) -> List[BatchResult]:
     """
     Reprocessa lotes existentes (pastas já criadas).
@@ -570,6 +692,7 @@ def reprocess_existing_batches(
         root_folder: Pasta raiz com lotes (default: settings.DIR_TEMP)
         apply_correlation: Se True, aplica correlação entre documentos
         timeout_seconds: Timeout por lote em segundos
+        workers: Processos paralelos (default: settings.BATCH_WORKERS)
 
     Returns:
         Lista de BatchResult com documentos reprocessados
@@ -580,11 +703,12 @@ def reprocess_existing_batches(
         logger.warning(f"⚠️ Pasta não encontrada: {root_folder}")
         return []
 
-    batch_processor = BatchProcessor()
+    batch_processor = BatchProcessor(duplicate_index=get_duplicate_index())
     results = batch_processor.process_multiple_batches(
         root_folder,
         apply_correlation=apply_correlation,
         timeout_seconds=timeout_seconds,
+        workers=workers,
     )
 
     # Contabiliza resultados
@@ -642,7 +766,7 @@ def reprocess_timeout_batches(
     batch_ids = list(set(t["batch_id"] for t in timeouts))
     logger.info(f"🔄 Reprocessando {len(batch_ids)} lote(s) que deram timeout...")
 
-    batch_processor = BatchProcessor()
+    batch_processor = BatchProcessor(duplicate_index=get_duplicate_index())
     results = []
 
     for idx, batch_id in enumerate(batch_ids, 1):
@@ -772,6 +896,9 @@ Exemplos:
   # Forçar nova ingestão (ignorar checkpoint)
   python run_ingestion.py --fresh
 
+  # Execução agendada: só e-mails novos desde a última execução completa
+  python run_ingestion.py --incremental
+
   # Ver status do checkpoint
   python run_ingestion.py --status
 
@@ -781,6 +908,15 @@ Exemplos:
   # Reprocessar com timeout customizado (10 min)
   python run_ingestion.py --reprocess --timeout 600
 
+  # Reprocessar em paralelo com 8 processos
+  python run_ingestion.py --reprocess --workers 8
+
+  # Reprocessar refazendo leitura/OCR (ignora cache de texto)
+  python run_ingestion.py --reprocess --no-text-cache
+
+  # Reprocessar sem marcar documentos já vistos em outros lotes
+  python run_ingestion.py --reprocess --no-duplicate-index
+
   # Reprocessar apenas lotes que deram timeout
   python run_ingestion.py --reprocess-timeouts
 
@@ -798,6 +934,9 @@ Exemplos:
 
   # Reprocessar e limpar em seguida
   python run_ingestion.py --reprocess --cleanup
+
+  # Gravar também datasets Parquet para análise (requer pyarrow)
+  python run_ingestion.py --reprocess --parquet
         """,
     )
 
@@ -836,6 +975,23 @@ Exemplos:
         default=300,
         help="Timeout por lote em segundos (default: 300 = 5 min)",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Processos paralelos no reprocessamento de lotes (default: BATCH_WORKERS ou 1)",
+    )
+    parser.add_argument(
+        "--no-text-cache",
+        action="store_true",
+        help="Ignorar o cache de texto extraído (força nova leitura/OCR dos PDFs)",
+    )
+    parser.add_argument(
+        "--no-duplicate-index",
+        action="store_true",
+        help="Não consultar o índice de duplicatas "
+        "(não marca documentos já vistos em outros lotes)",
+    )
     parser.add_argument(
         "--only-attachments",
         action="store_true",
@@ -870,16 +1026,47 @@ Exemplos:
         action="store_true",
         help="Processar e-mails SEM anexo (links/códigos) ANTES dos COM anexo",
     )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Buscar apenas e-mails novos desde a última execução completa "
+        "(UID por pasta em temp_email/_sync_state.json)",
+    )
     parser.add_argument(
         "--export-metrics",
         action="store_true",
-        help="Exportar métricas de telemetria para arquivo JSON",
+        help="Exportar métricas de telemetria (JSON) e o trace por estágio (Chrome trace-event)",
+    )
+    parser.add_argument(
+        "--parquet",
+        action="store_true",
+        help="Gravar também datasets Parquet particionados em data/output/datasets "
+        "(default: EXPORT_PARQUET; requer pyarrow)",
     )
 
     args = parser.parse_args()
 
     apply_correlation = not args.no_correlation
 
+    if args.parquet:
+        settings.EXPORT_PARQUET = True
+
+    # O cache de texto só é ligado aqui, na ingestão (desligado no uso como
+    # biblioteca). Workers iniciados via spawn releem a configuração do ambiente.
+    if args.no_text_cache or os.getenv("TEXT_CACHE_ENABLED") == "0":
+        settings.TEXT_CACHE_ENABLED = False
+        os.environ["TEXT_CACHE_ENABLED"] = "0"
+        if args.no_text_cache:
+            logger.info("🧊 Cache de texto extraído desativado (--no-text-cache)")
+    else:
+        settings.TEXT_CACHE_ENABLED = True
+        os.environ["TEXT_CACHE_ENABLED"] = "1"
+
+    if args.no_duplicate_index:
+        settings.DUPLICATE_INDEX_ENABLED = False
+        os.environ["DUPLICATE_INDEX_ENABLED"] = "0"
+        logger.info("♻️ Índice de duplicatas entre lotes desativado (--no-duplicate-index)")
+
     # 0. Modo status: apenas exibe status e sai
     if args.status:
         show_ingestion_status()
@@ -929,7 +1116,10 @@ Exemplos:
         # Modo: Reprocessar lotes existentes
         logger.info("🔄 Reprocessando lotes existentes...")
         results = reprocess_existing_batches(
-            settings.DIR_TEMP, apply_correlation, timeout_seconds=args.timeout
+            settings.DIR_TEMP,
+            apply_correlation,
+            timeout_seconds=args.timeout,
+            workers=args.workers,
         )
 
     elif args.only_attachments:
@@ -964,6 +1154,7 @@ Exemplos:
             timeout_seconds=args.timeout,
             max_emails=args.max_emails,
             links_first=args.links_first,
+            incremental_sync=True if args.incremental else None,
         )
 
         # Extrai resultados
@@ -979,29 +1170,39 @@ Exemplos:
             orchestrator.export_partial_results_to_csv(settings.DIR_SAIDA)
 
     # 3. Exportação de resultados
-    if results or avisos:
-        logger.info("\n📊 Exportando resultados...")
+    batch_source: Iterable[BatchResult] = results
+    aviso_source: Iterable[EmailAvisoData] = avisos
+    has_history = False
+    if ingestion_result is not None:
+        batch_source = ingestion_result.iter_batch_results()
+        aviso_source = ingestion_result.iter_avisos()
+        has_history = bool(
+            ingestion_result.history_batches or ingestion_result.history_avisos
+        )
 
-        if results:
-            export_batch_results(results, settings.DIR_SAIDA)
+    if results or avisos or has_history:
+        logger.info("\n📊 Exportando resultados...")
 
-        if avisos:
-            export_avisos_to_csv(avisos, settings.DIR_SAIDA)
+        # Exportação em fluxo: lotes/avisos de execuções anteriores são lidos
+        # do JSONL parcial sob demanda (sem materializar tudo em memória)
+        parquet_dir = settings.DIR_DATASETS if settings.EXPORT_PARQUET else None
+        exported = export_batch_results(batch_source, settings.DIR_SAIDA, parquet_dir)
+        total_avisos = export_avisos_to_csv(aviso_source, settings.DIR_SAIDA, parquet_dir)
 
-        # Resumo final
-        total_docs = sum(r.total_documents for r in results)
-        total_erros = sum(r.total_errors for r in results)
-        valor_total = sum(r.get_valor_compra() for r in results)
+        # Resumo final (totais acumulados durante a exportação)
+        total_docs = exported.documentos
+        total_erros = exported.erros
+        valor_total = exported.valor_total
 
         # Contagem de status
-        ok_count = sum(1 for r in results if r.status == "OK")
-        timeout_count = sum(1 for r in results if r.status == "TIMEOUT")
-        error_count = sum(1 for r in results if r.status == "ERROR")
+        ok_count = exported.status.get("OK", 0)
+        timeout_count = exported.status.get("TIMEOUT", 0)
+        error_count = exported.status.get("ERROR", 0)
 
         logger.info("\n" + "=" * 60)
         logger.info("📊 RESUMO FINAL")
         logger.info("=" * 60)
-        logger.info(f"   Lotes processados: {len(results)}")
+        logger.info(f"   Lotes processados: {exported.lotes}")
         logger.info(f"      ✅ OK: {ok_count}")
         if timeout_count > 0:
             logger.info(f"      ⏱️ TIMEOUT: {timeout_count}")
@@ -1013,15 +1214,18 @@ Exemplos:
         logger.info("=" * 60)
 
         # Exibe avisos de links/códigos se houver
-        if avisos:
+        if total_avisos:
             logger.info("\n📋 AVISOS (e-mails sem anexo com links/códigos):")
-            logger.info(f"   Total de avisos: {len(avisos)}")
-            for aviso in avisos[:5]:  # Mostra apenas os 5 primeiros
+            logger.info(f"   Total de avisos: {total_avisos}")
+            primeiros = (
+                ingestion_result.iter_avisos() if ingestion_result else iter(avisos)
+            )
+            for aviso in islice(primeiros, 5):  # Mostra apenas os 5 primeiros
                 logger.info(
                     f"      • {aviso.subject[:50]}... -> {aviso.link_nfe or aviso.codigo_verificacao}"
                 )
-            if len(avisos) > 5:
-                logger.info(f"      ... e mais {len(avisos) - 5} aviso(s)")
+            if total_avisos > 5:
+                logger.info(f"      ... e mais {total_avisos - 5} aviso(s)")
 
         # Aviso se teve timeouts
         if timeout_count > 0:
@@ -1053,6 +1257,9 @@ Exemplos:
         metrics_path = orchestrator.export_metrics(settings.DIR_SAIDA)
         if metrics_path:
             logger.info(f"   Métricas salvas em: {metrics_path}")
+        trace_path = orchestrator.export_trace(settings.DIR_SAIDA)
+        if trace_path:
+            logger.info(f"   Trace (chrome://tracing) salvo em: {trace_path}")
 
     # Sempre mostra resumo de métricas se houver orchestrator
     if orchestrator:
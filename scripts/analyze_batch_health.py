@@ -27,8 +27,10 @@ Melhorias v2.0:
 
 Uso:
     python scripts/analyze_batch_health.py [--csv caminho] [--output caminho]
+    python scripts/analyze_batch_health.py --dataset data/output/datasets/lotes
 """
 
+import argparse
 import csv
 import json
 import logging
@@ -282,9 +284,13 @@ class BatchHealthAnalyzer:
     SEV_BAIXA = 0.5  # Alerta menor
     SEV_INFO = 0.1  # Apenas informativo (esperado)
 
-    def __init__(self, csv_path: Path, temp_email_path: Path):
+    def __init__(
+        self, csv_path: Path, temp_email_path: Path, dataset_path: Optional[Path] = None
+    ):
         self.csv_path = csv_path
         self.temp_email_path = temp_email_path
+        # Dataset Parquet de lotes (run_ingestion.py --parquet); substitui o CSV
+        self.dataset_path = dataset_path
         self.batches: List[BatchHealth] = []
 
     def load_csv_data(self) -> List[BatchHealth]:
@@ -341,6 +347,44 @@ class BatchHealthAnalyzer:
         logger.info(f"Carregados {len(batches)} batches do CSV")
         return batches
 
+    def load_dataset_data(self) -> List[BatchHealth]:
+        """Carrega dados do dataset Parquet (só as colunas usadas, já tipadas)."""
+        sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+        from core.exporters import read_parquet_dataset
+
+        text_columns = [
+            "batch_id", "status_conciliacao", "fornecedor", "vencimento", "numero_nota",
+            "empresa", "email_subject", "email_sender", "source_folder",
+        ]
+        number_columns = ["valor_compra", "valor_boleto", "outros", "nfses", "boletos", "total_errors"]
+        try:
+            df = read_parquet_dataset(
+                self.dataset_path,
+                columns=text_columns + number_columns,
+                partition_by=("data_processamento",),
+            )
+        except Exception as e:
+            logger.error(f"Erro ao carregar dataset: {e}")
+            return []
+
+        df = df.fillna({c: 0 for c in number_columns}).fillna("")
+        batches = [
+            BatchHealth(
+                row_number=i,
+                **{c: row[c] for c in text_columns},
+                valor_compra=float(row["valor_compra"]),
+                valor_boleto=float(row["valor_boleto"]),
+                outros=int(row["outros"]),
+                nfses=int(row["nfses"]),
+                boletos=int(row["boletos"]),
+                total_errors=int(row["total_errors"]),
+            )
+            for i, row in enumerate(df.to_dict("records"), 1)
+        ]
+
+        logger.info(f"Carregados {len(batches)} batches do dataset")
+        return batches
+
     def load_metadata(self, batch: BatchHealth) -> None:
         """Carrega metadata.json para um batch e detecta características especiais."""
         if not batch.source_folder:
@@ -704,8 +748,8 @@ class BatchHealthAnalyzer:
         """Executa análise completa de todos os batches."""
         logger.info("Iniciando análise de saúde dos batches...")
 
-        # 1. Carregar dados do CSV
-        self.batches = self.load_csv_data()
+        # 1. Carregar dados do CSV (ou do dataset Parquet)
+        self.batches = self.load_dataset_data() if self.dataset_path else self.load_csv_data()
 
         # 2. Para cada batch, carregar metadata e detectar problemas
         for i, batch in enumerate(self.batches, 1):
@@ -955,18 +999,27 @@ def main():
     print("=" * 100)
     print()
 
+    parser = argparse.ArgumentParser(description="Análise de saúde dos batches")
+    parser.add_argument(
+        "--dataset",
+        type=str,
+        help="Lê o dataset Parquet de lotes (ex.: data/output/datasets/lotes) ao invés do CSV",
+    )
+    args = parser.parse_args()
+
     # Configurar caminhos
     base_dir = Path(__file__).parent.parent
     csv_path = base_dir / "data" / "output" / "relatorio_lotes.csv"
     temp_email_path = base_dir / "temp_email"
     output_path = base_dir / "data" / "output" / "analise_saude_batches.txt"
+    dataset_path = Path(args.dataset) if args.dataset else None
 
-    if not csv_path.exists():
+    if dataset_path is None and not csv_path.exists():
         print(f"ERRO: CSV não encontrado: {csv_path}")
         sys.exit(1)
 
     # Executar análise
-    analyzer = BatchHealthAnalyzer(csv_path, temp_email_path)
+    analyzer = BatchHealthAnalyzer(csv_path, temp_email_path, dataset_path)
     analyzer.analyze_all()
 
     # Gerar relatório
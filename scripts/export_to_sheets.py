@@ -10,6 +10,7 @@ separando em duas abas:
 Fontes de Dados:
 - PADRÃO: relatorio_lotes.csv (resumo por e-mail - mais simples)
 - OPCIONAL: relatorio_consolidado.csv (detalhado por documento)
+- OPCIONAL: datasets Parquet de `run_ingestion.py --parquet` (lotes/avisos)
 
 Uso:
     # Exportar usando relatorio_lotes.csv (PADRÃO - recomendado)
@@ -25,12 +26,25 @@ Uso:
     python scripts/export_to_sheets.py --csv-lotes path/to/lotes.csv
     python scripts/export_to_sheets.py --csv-avisos path/to/avisos.csv
 
+    # Ler dos datasets Parquet (só a partição de uma data)
+    python scripts/export_to_sheets.py --dataset data/output/datasets --data-processamento 2025-01-15
+
     # Especificar spreadsheet ID
     python scripts/export_to_sheets.py --spreadsheet-id "1ABC..."
 
+    # Só acrescentar linhas (modo antigo, sem coluna ID nem sincronização)
+    python scripts/export_to_sheets.py --append
+
+Sincronização:
+    Por padrão as linhas são sincronizadas por chave (coluna ID = batch_id ou
+    arquivo_origem, ver core/sheets_sync.py): reexportar o mesmo relatório
+    não duplica linhas, só envia as novas e as alteradas.
+
 Variáveis de Ambiente:
     GOOGLE_SPREADSHEET_ID: ID da planilha do Google Sheets
     GOOGLE_CREDENTIALS_PATH: Caminho para credentials.json (default: credentials.json)
+    SHEETS_REQUESTS_PER_MINUTE: Limite de requisições por minuto (default: 60)
+    SHEETS_SYNC_STATE_PATH: Estado da sincronização (hash de cada linha enviada)
 
 Conformidade:
     - Política Interna 5.9
@@ -62,6 +76,7 @@ from core.models import (  # noqa: E402
     InvoiceData,
     OtherDocumentData,
 )
+from core.sheets_sync import KEY_HEADER, SheetSync, SheetSyncState, sheet_row_key  # noqa: E402
 
 # Importa configurações centralizadas
 try:
@@ -71,9 +86,15 @@ try:
     from config.settings import (
         GOOGLE_SPREADSHEET_ID as DEFAULT_SPREADSHEET_ID,
     )
+    from config.settings import (
+        SHEETS_SYNC_STATE_PATH as DEFAULT_SYNC_STATE_PATH,
+    )
 except ImportError:
     DEFAULT_SPREADSHEET_ID = os.getenv('GOOGLE_SPREADSHEET_ID', '')
     DEFAULT_CREDENTIALS_PATH = os.getenv('GOOGLE_CREDENTIALS_PATH', 'credentials.json')
+    DEFAULT_SYNC_STATE_PATH = Path(
+        os.getenv('SHEETS_SYNC_STATE_PATH', 'data/cache/sheets_sync.sqlite')
+    )
 
 # Usa a configuração de logging do settings.py (importado acima)
 # que configura RotatingFileHandler + console automaticamente
@@ -110,6 +131,11 @@ SEM_ANEXOS_HEADERS = [
     "CODIGO",
 ]
 
+# Colunas que reconhecem linhas antigas (exportadas antes da coluna ID):
+# uma linha sem ID com os mesmos valores é atualizada no lugar, sem duplicar
+ANEXOS_LEGACY_COLUMNS = ["RECEBIDO", "ASSUNTO", "FORNECEDOR", "NF"]
+SEM_ANEXOS_LEGACY_COLUMNS = ["RECEBIDO", "ASSUNTO", "NF", "LINK"]
+
 
 class GoogleSheetsExporterDualTab:
     """
@@ -118,13 +144,18 @@ class GoogleSheetsExporterDualTab:
     Separa documentos em:
     - Grupo A (anexos): InvoiceData, DanfeData, BoletoData, OtherDocumentData
     - Grupo B (sem_anexos): EmailAvisoData
+
+    Por padrão sincroniza por chave (coluna ID, `core.sheets_sync`): linhas
+    já presentes e sem alteração não são reenviadas.
     """
 
     def __init__(
         self,
         credentials_path: Optional[str] = None,
         spreadsheet_id: Optional[str] = None,
-        dry_run: bool = False
+        dry_run: bool = False,
+        sync: bool = True,
+        sync_state_path: Optional[Path] = None
     ):
         """
         Inicializa o exportador.
@@ -133,12 +164,18 @@ class GoogleSheetsExporterDualTab:
             credentials_path: Caminho para o arquivo de credenciais JSON
             spreadsheet_id: ID da planilha do Google Sheets
             dry_run: Se True, apenas simula a exportação sem enviar dados
+            sync: Se False, só acrescenta as linhas (sem coluna ID nem diferença)
+            sync_state_path: SQLite com o hash das linhas já enviadas
+                (default: SHEETS_SYNC_STATE_PATH)
         """
         self.credentials_path = credentials_path or DEFAULT_CREDENTIALS_PATH
         self.spreadsheet_id = spreadsheet_id or DEFAULT_SPREADSHEET_ID
         self.dry_run = dry_run
+        self.sync = sync
+        self.sync_state_path = Path(sync_state_path or DEFAULT_SYNC_STATE_PATH)
         self._client = None
         self._spreadsheet = None
+        self._sync_state: Optional[SheetSyncState] = None
 
         if not self.spreadsheet_id and not dry_run:
             raise ValueError(
@@ -326,27 +363,19 @@ class GoogleSheetsExporterDualTab:
                 logger.info(f"  ... e mais {len(documents) - 5} documentos")
             return
 
-        worksheet = self._get_or_create_worksheet(ANEXOS_SHEET_NAME, ANEXOS_HEADERS)
-
         # Prepara linhas
         rows = []
         for doc in documents:
             try:
                 row = doc.to_anexos_row()
                 if row:  # Ignora linhas vazias
-                    rows.append(row)
+                    rows.append((sheet_row_key(doc), row))
             except Exception as e:
                 logger.error(f"❌ Erro ao converter documento {doc.arquivo_origem}: {e}")
 
-        # Envia em batches
-        total_exported = 0
-        for i in range(0, len(rows), batch_size):
-            batch = rows[i:i + batch_size]
-            self._append_rows_with_retry(worksheet, batch)
-            total_exported += len(batch)
-            logger.info(f"📤 Batch exportado: {len(batch)} docs - Total: {total_exported}/{len(rows)}")
-
-        logger.info(f"✅ {total_exported} documentos exportados para '{ANEXOS_SHEET_NAME}'")
+        self._write_rows(
+            ANEXOS_SHEET_NAME, ANEXOS_HEADERS, rows, batch_size, ANEXOS_LEGACY_COLUMNS, "documentos"
+        )
 
     def _export_sem_anexos(self, documents: List[EmailAvisoData], batch_size: int = 100):
         """
@@ -365,27 +394,65 @@ class GoogleSheetsExporterDualTab:
                 logger.info(f"  ... e mais {len(documents) - 5} avisos")
             return
 
-        worksheet = self._get_or_create_worksheet(SEM_ANEXOS_SHEET_NAME, SEM_ANEXOS_HEADERS)
-
         # Prepara linhas
         rows = []
         for doc in documents:
             try:
                 row = doc.to_sem_anexos_row()
                 if row:  # Ignora linhas vazias
-                    rows.append(row)
+                    rows.append((sheet_row_key(doc), row))
             except Exception as e:
                 logger.error(f"❌ Erro ao converter aviso {doc.arquivo_origem}: {e}")
 
+        self._write_rows(
+            SEM_ANEXOS_SHEET_NAME, SEM_ANEXOS_HEADERS, rows, batch_size,
+            SEM_ANEXOS_LEGACY_COLUMNS, "avisos"
+        )
+
+    def _write_rows(
+        self,
+        sheet_name: str,
+        headers: List[str],
+        rows: List[Tuple[str, List]],
+        batch_size: int,
+        legacy_columns: List[str],
+        label: str
+    ):
+        """
+        Envia as linhas (chave, valores) para a aba.
+
+        Com `sync`, só as linhas novas ou alteradas são enviadas (inserções em
+        append_rows, atualizações em batch_update, até `batch_size` linhas por
+        requisição); sem `sync`, todas são acrescentadas ao fim da aba.
+        """
+        if self.sync:
+            worksheet = self._get_or_create_worksheet(sheet_name, headers + [KEY_HEADER])
+            if self._sync_state is None:
+                self._sync_state = SheetSyncState(self.sync_state_path)
+            result = SheetSync(
+                worksheet,
+                headers,
+                state=self._sync_state,
+                legacy_columns=legacy_columns,
+                chunk_rows=batch_size,
+            ).sync(rows)
+            logger.info(
+                f"✅ '{sheet_name}': {result.inserted} {label} inseridos, "
+                f"{result.updated + result.adopted} atualizados, {result.unchanged} sem alteração"
+            )
+            return
+
+        worksheet = self._get_or_create_worksheet(sheet_name, headers)
+
         # Envia em batches
         total_exported = 0
         for i in range(0, len(rows), batch_size):
-            batch = rows[i:i + batch_size]
+            batch = [row for _, row in rows[i:i + batch_size]]
             self._append_rows_with_retry(worksheet, batch)
             total_exported += len(batch)
-            logger.info(f"📤 Batch exportado: {len(batch)} avisos - Total: {total_exported}/{len(rows)}")
+            logger.info(f"📤 Batch exportado: {len(batch)} {label} - Total: {total_exported}/{len(rows)}")
 
-        logger.info(f"✅ {total_exported} avisos exportados para '{SEM_ANEXOS_SHEET_NAME}'")
+        logger.info(f"✅ {total_exported} {label} exportados para '{sheet_name}'")
 
 
 def _parse_float_br(value) -> float:
@@ -536,15 +603,49 @@ def load_lotes_from_csv(csv_path: Path) -> List[DocumentData]:
     Returns:
         Lista de DocumentData (OtherDocumentData) representando cada lote
     """
-    from datetime import datetime
-
     import pandas as pd
 
     if not csv_path.exists():
         logger.warning(f"⚠️ Arquivo não encontrado: {csv_path}")
         return []
 
-    df = pd.read_csv(csv_path, sep=';', encoding='utf-8-sig')
+    return _lotes_from_frame(pd.read_csv(csv_path, sep=';', encoding='utf-8-sig'))
+
+
+# Colunas do relatório de lotes usadas na exportação (projeção no Parquet)
+COLUNAS_LOTES_SHEETS = [
+    'batch_id', 'data', 'empresa', 'fornecedor', 'numero_nota', 'valor_compra',
+    'valor_boleto', 'vencimento', 'status_conciliacao', 'divergencia',
+    'email_subject', 'email_sender',
+]
+
+
+def load_lotes_from_dataset(dataset_dir: Path, **filters) -> List[DocumentData]:
+    """
+    Carrega lotes do dataset Parquet (`run_ingestion.py --parquet`).
+
+    Lê só as colunas usadas na planilha; os valores já vêm como float.
+
+    Args:
+        dataset_dir: Diretório do dataset de lotes (datasets/lotes)
+        **filters: Filtros de partição (ex.: data_processamento='2025-01-15')
+    """
+    from core.exporters import read_parquet_dataset
+
+    if not dataset_dir.exists():
+        logger.warning(f"⚠️ Dataset não encontrado: {dataset_dir}")
+        return []
+
+    df = read_parquet_dataset(
+        dataset_dir, columns=COLUNAS_LOTES_SHEETS, partition_by=('data_processamento',), **filters
+    )
+    return _lotes_from_frame(df)
+
+
+def _lotes_from_frame(df: pd.DataFrame) -> List[DocumentData]:
+    """Converte as linhas do relatório de lotes (CSV ou Parquet) em documentos."""
+    from datetime import datetime
+
     documents = []
 
     for _, row in df.iterrows():
@@ -624,7 +725,34 @@ def load_avisos_from_csv(csv_path: Path) -> List[EmailAvisoData]:
         logger.warning(f"⚠️ Arquivo não encontrado: {csv_path}")
         return []
 
-    df = pd.read_csv(csv_path, sep=';', encoding='utf-8-sig')
+    return _avisos_from_frame(pd.read_csv(csv_path, sep=';', encoding='utf-8-sig'))
+
+
+def load_avisos_from_dataset(dataset_dir: Path, **filters) -> List[EmailAvisoData]:
+    """
+    Carrega avisos do dataset Parquet (`run_ingestion.py --parquet`).
+
+    Args:
+        dataset_dir: Diretório do dataset de avisos (datasets/avisos)
+        **filters: Filtros de partição (ex.: data_processamento='2025-01-15')
+    """
+    from core.exporters import read_parquet_dataset
+
+    if not dataset_dir.exists():
+        logger.warning(f"⚠️ Dataset não encontrado: {dataset_dir}")
+        return []
+
+    columns = [
+        'arquivo_origem', 'data_processamento', 'email_date', 'empresa',
+        'fornecedor_nome', 'numero_nota', 'link_nfe', 'codigo_verificacao',
+        'dominio_portal', 'email_subject', 'vencimento', 'observacoes',
+        'status_conciliacao',
+    ]
+    return _avisos_from_frame(read_parquet_dataset(dataset_dir, columns=columns, **filters))
+
+
+def _avisos_from_frame(df: pd.DataFrame) -> List[EmailAvisoData]:
+    """Converte linhas de avisos (CSV ou Parquet) em EmailAvisoData."""
     avisos = []
 
     for _, row in df.iterrows():
@@ -697,12 +825,27 @@ def main():
         type=str,
         help='Caminho para o CSV de avisos (default: data/output/avisos_emails_sem_anexo_latest.csv)'
     )
+    parser.add_argument(
+        '--dataset',
+        type=str,
+        help='Lê lotes e avisos dos datasets Parquet (ex.: data/output/datasets) ao invés dos CSVs'
+    )
+    parser.add_argument(
+        '--data-processamento',
+        type=str,
+        help='Com --dataset: só a partição dessa data (YYYY-MM-DD)'
+    )
     parser.add_argument(
         '--batch-size',
         type=int,
         default=100,
         help='Quantidade de linhas por batch (default: 100)'
     )
+    parser.add_argument(
+        '--append',
+        action='store_true',
+        help='Só acrescenta as linhas, sem sincronizar pela coluna ID (pode duplicar)'
+    )
 
     args = parser.parse_args()
 
@@ -719,7 +862,16 @@ def main():
     # Carrega documentos
     documents = []
 
-    if args.use_consolidado:
+    dataset_dir = Path(args.dataset) if args.dataset else None
+    filters = {'data_processamento': args.data_processamento} if args.data_processamento else {}
+
+    if dataset_dir:
+        # Modo Parquet: lê só as colunas necessárias das partições pedidas
+        logger.info(f"📂 Carregando lotes e avisos do dataset: {dataset_dir}")
+        docs_lotes = load_lotes_from_dataset(dataset_dir / 'lotes', **filters)
+        documents.extend(docs_lotes)
+        logger.info(f"  ✅ {len(docs_lotes)} lotes carregados")
+    elif args.use_consolidado:
         # Modo detalhado: usa relatorio_consolidado.csv
         if csv_consolidado.exists():
             logger.info(f"📂 Carregando documentos de: {csv_consolidado}")
@@ -740,7 +892,11 @@ def main():
         else:
             logger.warning(f"⚠️ CSV de lotes não encontrado: {csv_lotes}")
 
-    if csv_avisos.exists():
+    if dataset_dir:
+        avisos = load_avisos_from_dataset(dataset_dir / 'avisos', **filters)
+        documents.extend(avisos)
+        logger.info(f"  ✅ {len(avisos)} avisos carregados")
+    elif csv_avisos.exists():
         logger.info(f"📂 Carregando avisos de: {csv_avisos}")
         avisos = load_avisos_from_csv(csv_avisos)
         documents.extend(avisos)
@@ -759,7 +915,8 @@ def main():
         exporter = GoogleSheetsExporterDualTab(
             credentials_path=args.credentials,
             spreadsheet_id=args.spreadsheet_id,
-            dry_run=args.dry_run
+            dry_run=args.dry_run,
+            sync=not args.append
         )
     except ValueError as e:
         logger.error(f"❌ Erro de configuração: {e}")
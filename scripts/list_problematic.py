@@ -10,6 +10,7 @@ Identifica casos onde:
 Este script gera uma lista formatada para reprocessamento manual ou automático.
 """
 
+import argparse
 import csv
 import sys
 from pathlib import Path
@@ -98,6 +99,60 @@ def load_problematic_cases(csv_path: Path) -> List[Dict]:
         print(f"Erro ao processar CSV: {e}")
         sys.exit(1)
 
+def load_problematic_cases_from_dataset(dataset_dir: Path) -> List[Dict]:
+    """
+    Carrega casos problemáticos do dataset Parquet de lotes.
+
+    Mesmo critério de `load_problematic_cases`, mas lendo só as colunas
+    necessárias do dataset gerado por `run_ingestion.py --parquet` (valores
+    já numéricos, sem conversão do formato brasileiro).
+
+    Args:
+        dataset_dir: Diretório do dataset (data/output/datasets/lotes)
+
+    Returns:
+        Lista de dicionários com informações dos casos problemáticos
+    """
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from core.exporters import read_parquet_dataset
+
+    columns = [
+        "outros", "nfses", "valor_compra", "source_folder", "status_conciliacao",
+        "divergencia", "fornecedor", "email_subject", "email_sender", "empresa",
+    ]
+    try:
+        df = read_parquet_dataset(
+            dataset_dir, columns=columns, partition_by=("data_processamento",)
+        )
+    except Exception as e:
+        print(f"Erro ao ler dataset: {e}")
+        sys.exit(1)
+
+    df = df.fillna({"outros": 0, "nfses": 0, "valor_compra": 0.0}).fillna("")
+    cases = []
+    for i, row in enumerate(df.itertuples(index=False), 1):
+        if not (row.outros > 0 and row.valor_compra == 0):
+            continue
+        source = row.source_folder
+        parts = source.replace("\\", "/").split("/") if source else []
+        cases.append(
+            {
+                "row_number": i,
+                "batch_id": parts[-1] if parts else "DESCONHECIDO",
+                "source_folder": source,
+                "outros": int(row.outros),
+                "nfses": int(row.nfses),
+                "valor_compra": float(row.valor_compra),
+                "status_conciliacao": row.status_conciliacao,
+                "divergencia": row.divergencia,
+                "fornecedor": row.fornecedor,
+                "email_subject": row.email_subject,
+                "email_sender": row.email_sender,
+                "empresa": row.empresa,
+            }
+        )
+    return cases
+
 
 def classify_problem_type(case: Dict) -> str:
     """
@@ -175,17 +230,29 @@ def main():
     print("LISTA DE LOTES PROBLEMÁTICOS PARA REPROCESSAR")
     print("=" * 80)
 
+    parser = argparse.ArgumentParser(description="Lista lotes problemáticos")
+    parser.add_argument(
+        "--dataset",
+        type=str,
+        help="Lê o dataset Parquet de lotes (ex.: data/output/datasets/lotes) ao invés do CSV",
+    )
+    args = parser.parse_args()
+
     # Configurar caminhos
     base_dir = Path(__file__).parent
     csv_path = base_dir.parent / "data" / "output" / "relatorio_lotes.csv"
 
-    print(f"Lendo arquivo: {csv_path}")
-    if not csv_path.exists():
-        print(f"Erro: Arquivo não encontrado: {csv_path}")
-        sys.exit(1)
+    if args.dataset:
+        print(f"Lendo dataset: {args.dataset}")
+        cases = load_problematic_cases_from_dataset(Path(args.dataset))
+    else:
+        print(f"Lendo arquivo: {csv_path}")
+        if not csv_path.exists():
+            print(f"Erro: Arquivo não encontrado: {csv_path}")
+            sys.exit(1)
 
-    # Carregar casos problemáticos
-    cases = load_problematic_cases(csv_path)
+        # Carregar casos problemáticos
+        cases = load_problematic_cases(csv_path)
     if not cases:
         print("✅ Nenhum caso problemático encontrado!")
         sys.exit(0)
@@ -30,6 +30,7 @@ Princípios SOLID aplicados:
 import argparse
 
 import sys
+from dataclasses import asdict
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Set, Tuple
 
@@ -183,7 +184,7 @@ def classify_boleto(
 
     result_dict = {
         'arquivo_relativo': relpath,
-        **result.__dict__,
+        **asdict(result),
     }
 
     if not eh_sucesso:
@@ -212,7 +213,7 @@ def classify_nfse(
 
     result_dict = {
         'arquivo_relativo': relpath,
-        **result.__dict__,
+        **asdict(result),
     }
 
     if not eh_sucesso:
@@ -243,7 +244,7 @@ def classify_danfe(
 
     result_dict = {
         'arquivo_relativo': relpath,
-        **result.__dict__,
+        **asdict(result),
     }
 
     if not eh_sucesso:
@@ -271,7 +272,7 @@ def classify_outros(
 
     result_dict = {
         'arquivo_relativo': relpath,
-        **result.__dict__,
+        **asdict(result),
     }
 
     if not eh_sucesso:
@@ -0,0 +1,259 @@
+"""
+Armazenamento transacional do checkpoint de ingestão (SQLite).
+
+O checkpoint era um JSON (`_checkpoint.json`) reescrito por inteiro a cada
+lote, com `indent=2`, incluindo as listas que só crescem
+(`processed_email_ids`, `created_batches`, `created_avisos`): o custo de
+cada gravação crescia com a execução e o volume total escrito era
+quadrático no número de e-mails.
+
+O `CheckpointStore` guarda o mesmo conteúdo em SQLite (WAL):
+    - checkpoint_meta: campos escalares (status, contadores, filtro...)
+    - processed_emails: e-mails processados (chave primária = índice para
+      a verificação de "já processado" no resume)
+    - created_batches / created_avisos: listas em ordem de criação
+
+`save()` grava só o que mudou desde a última gravação (ids, lotes e avisos
+novos, mais a linha de campos escalares) em UMA transação: custo por lote
+constante e, em caso de queda, o banco fica no estado anterior ou no novo,
+nunca pela metade.
+
+`CheckpointData.from_dict`/`to_dict` continuam sendo o formato de troca:
+`load()` devolve o dicionário e o JSON antigo é migrado pelo orquestrador
+na primeira leitura.
+
+Example:
+    >>> store = CheckpointStore(Path("temp_email/_checkpoint.sqlite"))
+    >>> store.save(checkpoint)          # incremental
+    >>> data = store.load()             # dict no formato CheckpointData.to_dict
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Arquivos auxiliares do modo WAL (removidos junto com o banco)
+_WAL_SUFFIXES = ("-wal", "-shm")
+
+
+class CheckpointStore:
+    """
+    Checkpoint de ingestão em SQLite com gravação incremental.
+
+    Trabalha com objetos no formato de `CheckpointData` (duck typing):
+    `header()`, `processed_email_ids`, `created_batches`, `created_avisos`
+    e, opcionalmente, `drain_new_ids()` com os ids adicionados desde a
+    última gravação.
+
+    Args:
+        path: Caminho do arquivo SQLite.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        # Quanto de cada coleção já está no banco (base da gravação incremental);
+        # só vale depois de um load/replace desta instância
+        self._synced = False
+        self._saved_ids = 0
+        self._saved_batches = 0
+        self._saved_avisos = 0
+
+    # ------------------------------------------------------------------
+    # Conexão
+    # ------------------------------------------------------------------
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS checkpoint_meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS processed_emails (
+                    email_id TEXT PRIMARY KEY
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS created_batches (
+                    seq INTEGER PRIMARY KEY,
+                    folder TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS created_avisos (
+                    seq INTEGER PRIMARY KEY,
+                    data TEXT NOT NULL
+                );
+                """
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        """Fecha a conexão (reaberta sob demanda)."""
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+        self._conn = None
+
+    def exists(self) -> bool:
+        """True se o arquivo do banco existe."""
+        return self.path.exists()
+
+    # ------------------------------------------------------------------
+    # Leitura
+    # ------------------------------------------------------------------
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        Checkpoint salvo, no formato de `CheckpointData.to_dict`.
+
+        Returns:
+            None se o banco não existe ou ainda não tem checkpoint.
+        """
+        if not self.exists():
+            return None
+
+        with self._lock:
+            conn = self._connection()
+            meta = conn.execute("SELECT key, value FROM checkpoint_meta").fetchall()
+            if not meta:
+                return None
+            data: Dict[str, Any] = {key: json.loads(value) for key, value in meta}
+            data["processed_email_ids"] = [
+                row[0] for row in conn.execute("SELECT email_id FROM processed_emails")
+            ]
+            data["created_batches"] = [
+                row[0] for row in conn.execute("SELECT folder FROM created_batches ORDER BY seq")
+            ]
+            data["created_avisos"] = [
+                json.loads(row[0])
+                for row in conn.execute("SELECT data FROM created_avisos ORDER BY seq")
+            ]
+
+        self._synced = True
+        self._saved_ids = len(data["processed_email_ids"])
+        self._saved_batches = len(data["created_batches"])
+        self._saved_avisos = len(data["created_avisos"])
+        return data
+
+    # ------------------------------------------------------------------
+    # Escrita
+    # ------------------------------------------------------------------
+
+    def save(self, checkpoint: Any) -> None:
+        """
+        Grava o checkpoint de forma incremental (uma transação).
+
+        Ids adicionados via `mark_processed` vêm do diário do checkpoint; se o
+        conjunto foi alterado diretamente, todos os ids são regravados
+        (INSERT OR IGNORE). A primeira gravação sem `load()` anterior e listas
+        menores que o já gravado (checkpoint trocado por outro) levam à
+        regravação completa.
+        """
+        if not self._synced:
+            self.replace(checkpoint)
+            return
+
+        ids = checkpoint.processed_email_ids
+        drain = getattr(checkpoint, "drain_new_ids", None)
+        new_ids: List[str] = drain() if drain is not None else []
+        if len(ids) != self._saved_ids + len(new_ids):
+            new_ids = list(ids)
+
+        batches = checkpoint.created_batches
+        avisos = checkpoint.created_avisos
+        if len(batches) < self._saved_batches or len(avisos) < self._saved_avisos:
+            self.replace(checkpoint)
+            return
+
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                self._write_header(conn, checkpoint.header())
+                conn.executemany(
+                    "INSERT OR IGNORE INTO processed_emails (email_id) VALUES (?)",
+                    ((email_id,) for email_id in new_ids),
+                )
+                conn.executemany(
+                    "INSERT INTO created_batches (folder) VALUES (?)",
+                    ((folder,) for folder in batches[self._saved_batches:]),
+                )
+                conn.executemany(
+                    "INSERT INTO created_avisos (data) VALUES (?)",
+                    (
+                        (json.dumps(aviso, ensure_ascii=False),)
+                        for aviso in avisos[self._saved_avisos:]
+                    ),
+                )
+
+        self._saved_ids = len(ids)
+        self._saved_batches = len(batches)
+        self._saved_avisos = len(avisos)
+
+    def replace(self, checkpoint: Any) -> None:
+        """Substitui todo o conteúdo do banco pelo checkpoint (uma transação)."""
+        drain = getattr(checkpoint, "drain_new_ids", None)
+        if drain is not None:
+            drain()
+
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                for table in (
+                    "checkpoint_meta", "processed_emails", "created_batches", "created_avisos"
+                ):
+                    conn.execute(f"DELETE FROM {table}")
+                self._write_header(conn, checkpoint.header())
+                conn.executemany(
+                    "INSERT OR IGNORE INTO processed_emails (email_id) VALUES (?)",
+                    ((email_id,) for email_id in checkpoint.processed_email_ids),
+                )
+                conn.executemany(
+                    "INSERT INTO created_batches (folder) VALUES (?)",
+                    ((folder,) for folder in checkpoint.created_batches),
+                )
+                conn.executemany(
+                    "INSERT INTO created_avisos (data) VALUES (?)",
+                    (
+                        (json.dumps(aviso, ensure_ascii=False),)
+                        for aviso in checkpoint.created_avisos
+                    ),
+                )
+
+        self._synced = True
+        self._saved_ids = len(checkpoint.processed_email_ids)
+        self._saved_batches = len(checkpoint.created_batches)
+        self._saved_avisos = len(checkpoint.created_avisos)
+
+    @staticmethod
+    def _write_header(conn: sqlite3.Connection, header: Dict[str, Any]) -> None:
+        conn.executemany(
+            "INSERT OR REPLACE INTO checkpoint_meta (key, value) VALUES (?, ?)",
+            ((key, json.dumps(value, ensure_ascii=False)) for key, value in header.items()),
+        )
+
+    def delete(self) -> None:
+        """Fecha a conexão e remove o banco (e os arquivos do WAL)."""
+        with self._lock:
+            self.close()
+            for path in [self.path] + [
+                self.path.with_name(self.path.name + suffix) for suffix in _WAL_SUFFIXES
+            ]:
+                if path.exists():
+                    path.unlink()
+        self._synced = False
+        self._saved_ids = 0
+        self._saved_batches = 0
+        self._saved_avisos = 0
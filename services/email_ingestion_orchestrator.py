@@ -10,7 +10,8 @@ Este módulo implementa um serviço robusto de ingestão que:
 
 Estrutura de checkpoint:
     temp_email/
-    ├── _checkpoint.json           # Estado atual da ingestão
+    ├── _checkpoint.sqlite         # Estado atual da ingestão (SQLite/WAL, gravação incremental)
+    ├── _sync_state.json           # UIDVALIDITY/último UID por pasta (modo incremental)
     ├── _partial_batches.jsonl     # Resultados parciais de lotes
     └── _partial_avisos.jsonl      # Resultados parciais de avisos
 
@@ -22,22 +23,29 @@ import atexit
 import json
 import logging
 import signal
-
+import threading
 import time
-from concurrent.futures import ThreadPoolExecutor
 from concurrent.futures import TimeoutError as FuturesTimeoutError
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
 
 from core.batch_processor import BatchProcessor
 from core.batch_result import BatchResult
+from core.duplicate_index import DuplicateIndex
+from core.exporters import CsvStreamWriter, all_document_columns
 from core.filters import EmailFilter, get_default_filter
 from core.interfaces import EmailIngestorStrategy
+from core.metadata import EmailMetadata
 from core.metrics import IngestionMetrics
 from core.models import EmailAvisoData
+from core.pipeline import Stage, StagedPipeline
+from core.supervised_executor import SupervisedProcessExecutor, run_with_timeout
+from core.tracing import collect_spans, export_chrome_trace, export_jsonl, load_jsonl
+from ingestors.sync_state import MailboxSyncState
+from services.checkpoint_store import CheckpointStore
 from services.ingestion_service import IngestionService
 
 logger = logging.getLogger(__name__)
@@ -49,6 +57,20 @@ logger = logging.getLogger(__name__)
 PARTIAL_BATCHES_FILE = "_partial_batches.jsonl"
 PARTIAL_AVISOS_FILE = "_partial_avisos.jsonl"
 
+# Colunas dos CSVs de exportação parcial (esquema fixo, escrita em fluxo)
+PARTIAL_AVISO_COLUMNS = [  # chaves gravadas por _save_partial_aviso
+    "email_id", "subject", "sender_name", "sender_address", "link_nfe",
+    "codigo_verificacao", "empresa", "saved_at", "data_processamento",
+    "email_date", "numero_nota", "dominio_portal", "vencimento", "observacoes",
+    "email_subject_full", "source_email_subject", "status_conciliacao",
+]
+PARTIAL_AVISO_SHEETS_COLUMNS = [  # formato lido por load_avisos_from_csv
+    "tipo_documento", "arquivo_origem", "data_processamento", "email_date",
+    "empresa", "fornecedor_nome", "numero_nota", "link_nfe", "codigo_verificacao",
+    "dominio_portal", "email_subject", "vencimento", "observacoes",
+    "status_conciliacao",
+]
+
 
 class IngestionStatus(Enum):
     """Status da ingestão."""
@@ -87,6 +109,34 @@ class CheckpointData:
     # Filtro de assunto usado
     subject_filter: str = ""
 
+    # Ids adicionados por mark_processed desde a última gravação (CheckpointStore)
+    _new_ids: List[str] = field(default_factory=list, repr=False, compare=False)
+
+    def mark_processed(self, email_id: str) -> None:
+        """Marca o e-mail como processado (gravado no próximo checkpoint)."""
+        if email_id not in self.processed_email_ids:
+            self.processed_email_ids.add(email_id)
+            self._new_ids.append(email_id)
+
+    def drain_new_ids(self) -> List[str]:
+        """Ids marcados desde a última chamada (esvazia o diário)."""
+        new_ids, self._new_ids = self._new_ids, []
+        return new_ids
+
+    def header(self) -> Dict[str, Any]:
+        """Campos escalares (sem as coleções que crescem com a execução)."""
+        return {
+            "status": self.status.value,
+            "started_at": self.started_at,
+            "last_updated": self.last_updated,
+            "total_emails_found": self.total_emails_found,
+            "total_processed": self.total_processed,
+            "total_skipped": self.total_skipped,
+            "total_errors": self.total_errors,
+            "current_batch_idx": self.current_batch_idx,
+            "subject_filter": self.subject_filter,
+        }
+
     def to_dict(self) -> Dict[str, Any]:
         """Converte para dicionário serializável."""
         return {
@@ -145,15 +195,39 @@ class IngestionResult:
     # Status final
     status: IngestionStatus = IngestionStatus.COMPLETED
 
+    # Resultados de execuções anteriores (JSONL parcial), fora das listas
+    # acima: contados na mesclagem e lidos sob demanda pelos iteradores
+    history_batches: int = 0
+    history_documents: int = 0
+    history_avisos: int = 0
+    history_batch_source: Optional[Callable[[], Iterator[BatchResult]]] = field(
+        default=None, repr=False
+    )
+    history_aviso_source: Optional[Callable[[], Iterator[EmailAvisoData]]] = field(
+        default=None, repr=False
+    )
+
     @property
     def total_documents(self) -> int:
-        """Total de documentos extraídos dos lotes."""
-        return sum(br.total_documents for br in self.batch_results)
+        """Total de documentos extraídos dos lotes (inclui histórico)."""
+        return sum(br.total_documents for br in self.batch_results) + self.history_documents
 
     @property
     def total_avisos(self) -> int:
-        """Total de avisos de email sem anexo."""
-        return len(self.avisos)
+        """Total de avisos de email sem anexo (inclui histórico)."""
+        return len(self.avisos) + self.history_avisos
+
+    def iter_batch_results(self) -> Iterator[BatchResult]:
+        """Lotes desta execução seguidos dos lotes do histórico (lazy)."""
+        yield from self.batch_results
+        if self.history_batch_source is not None:
+            yield from self.history_batch_source()
+
+    def iter_avisos(self) -> Iterator[EmailAvisoData]:
+        """Avisos desta execução seguidos dos avisos do histórico (lazy)."""
+        yield from self.avisos
+        if self.history_aviso_source is not None:
+            yield from self.history_aviso_source()
 
     def summary(self) -> str:
         """Retorna resumo textual do resultado."""
@@ -194,7 +268,10 @@ class EmailIngestionOrchestrator:
         - Na próxima execução, os dados parciais são carregados automaticamente
     """
 
-    CHECKPOINT_FILENAME = "_checkpoint.json"
+    CHECKPOINT_FILENAME = "_checkpoint.sqlite"
+    # Formato anterior (JSON reescrito a cada lote), migrado na primeira leitura
+    LEGACY_CHECKPOINT_FILENAME = "_checkpoint.json"
+    SYNC_STATE_FILENAME = "_sync_state.json"
 
     def __init__(
         self,
@@ -204,6 +281,9 @@ class EmailIngestionOrchestrator:
         batch_timeout_seconds: int = 300,
         enable_checkpoint: bool = True,
         metrics: Optional[IngestionMetrics] = None,
+        incremental_sync: bool = False,
+        duplicate_index: Optional[DuplicateIndex] = None,
+        trace_dir: Optional[Path] = None,
     ):
         """
         Inicializa o orquestrador.
@@ -215,12 +295,20 @@ class EmailIngestionOrchestrator:
             batch_timeout_seconds: Timeout por lote em segundos
             enable_checkpoint: Se True, salva checkpoints para resume
             metrics: Coletor de métricas (opcional, cria novo se não fornecido)
+            incremental_sync: Se True, busca só e-mails com UID acima da
+                última execução completa e ignora Message-IDs já ingeridos
+                (requer ingestor com suporte a streaming)
+            duplicate_index: Índice de duplicatas entre lotes; anexos já
+                processados em outro lote são marcados como duplicatas
+            trace_dir: Pasta onde os spans de cada lote são acrescentados
+                (trace_<sessão>.jsonl); None não grava traces
         """
         self.ingestor = ingestor
         self.temp_dir = Path(temp_dir)
         self.email_filter = email_filter or get_default_filter()
         self.batch_timeout_seconds = batch_timeout_seconds
         self.enable_checkpoint = enable_checkpoint
+        self.trace_dir = Path(trace_dir) if trace_dir is not None else None
 
         # Métricas de telemetria
         self._metrics = metrics or IngestionMetrics()
@@ -231,10 +319,14 @@ class EmailIngestionOrchestrator:
             temp_dir=temp_dir,
             email_filter=self.email_filter,
         )
-        self._batch_processor = BatchProcessor()
+        self._batch_processor = BatchProcessor(duplicate_index=duplicate_index)
+        # Um worker supervisionado por thread de extração do pipeline
+        self._batch_executors: Dict[str, SupervisedProcessExecutor] = {}
+        self._batch_executors_lock = threading.Lock()
 
         # Estado de execução
         self._checkpoint: CheckpointData = CheckpointData()
+        self._checkpoint_store = CheckpointStore(self.checkpoint_path)
         self._interrupted = False
         self._original_sigint_handler = None
         self._original_sigterm_handler = None
@@ -249,11 +341,34 @@ class EmailIngestionOrchestrator:
         # Garante que diretório existe
         self.temp_dir.mkdir(parents=True, exist_ok=True)
 
+        # Sincronização incremental (marca d'água de UID por pasta)
+        self._sync_state: Optional[MailboxSyncState] = None
+        self._fetch_failed = False
+        if incremental_sync:
+            if getattr(ingestor, "supports_streaming", False) is True:
+                self._sync_state = MailboxSyncState(self.sync_state_path)
+                ingestor.sync_state = self._sync_state  # type: ignore[attr-defined]
+            else:
+                logger.warning(
+                    "⚠️ Sincronização incremental requer ingestor IMAP em streaming "
+                    "(IMAP_STREAMING=1). Buscando a pasta inteira."
+                )
+
     @property
     def checkpoint_path(self) -> Path:
         """Caminho do arquivo de checkpoint."""
         return self.temp_dir / self.CHECKPOINT_FILENAME
 
+    @property
+    def legacy_checkpoint_path(self) -> Path:
+        """Caminho do checkpoint JSON de versões anteriores."""
+        return self.temp_dir / self.LEGACY_CHECKPOINT_FILENAME
+
+    @property
+    def sync_state_path(self) -> Path:
+        """Caminho do estado de sincronização incremental."""
+        return self.temp_dir / self.SYNC_STATE_FILENAME
+
     @property
     def partial_batches_path(self) -> Path:
         """Caminho do arquivo de lotes parciais."""
@@ -264,6 +379,13 @@ class EmailIngestionOrchestrator:
         """Caminho do arquivo de avisos parciais."""
         return self.temp_dir / PARTIAL_AVISOS_FILE
 
+    @property
+    def trace_path(self) -> Optional[Path]:
+        """Arquivo JSONL com os spans dos lotes desta sessão."""
+        if self.trace_dir is None:
+            return None
+        return self.trace_dir / f"trace_{self._metrics.session_id}.jsonl"
+
     def set_progress_callback(
         self,
         callback: Callable[[str, int, int], None]
@@ -330,11 +452,12 @@ class EmailIngestionOrchestrator:
         if not self.enable_checkpoint:
             return False
 
-        if not self.checkpoint_path.exists():
-            return False
-
         try:
-            data = json.loads(self.checkpoint_path.read_text(encoding='utf-8'))
+            data = self._checkpoint_store.load()
+            if data is None:
+                data = self._migrate_legacy_checkpoint()
+            if data is None:
+                return False
             self._checkpoint = CheckpointData.from_dict(data)
 
             logger.info(
@@ -348,25 +471,46 @@ class EmailIngestionOrchestrator:
             logger.warning(f"⚠️ Erro ao carregar checkpoint: {e}. Iniciando do zero.")
             return False
 
+    def _migrate_legacy_checkpoint(self) -> Optional[Dict[str, Any]]:
+        """
+        Importa o `_checkpoint.json` de versões anteriores para o SQLite.
+
+        O JSON é renomeado para `.migrated` depois da importação (não é lido
+        de novo).
+
+        Returns:
+            Dados do checkpoint migrado ou None se não havia JSON.
+        """
+        legacy_path = self.legacy_checkpoint_path
+        if not legacy_path.exists():
+            return None
+
+        data = json.loads(legacy_path.read_text(encoding='utf-8'))
+        self._checkpoint_store.replace(CheckpointData.from_dict(data))
+        legacy_path.replace(legacy_path.with_name(legacy_path.name + ".migrated"))
+        logger.info(f"📁 Checkpoint {legacy_path.name} migrado para {self.checkpoint_path.name}")
+        return data
+
     def _save_checkpoint(self) -> None:
-        """Salva checkpoint atual para disco."""
+        """Salva checkpoint atual para disco (só o que mudou, em uma transação)."""
         if not self.enable_checkpoint:
             return
 
         try:
             self._checkpoint.last_updated = datetime.now().isoformat()
-
-            self.checkpoint_path.write_text(
-                json.dumps(self._checkpoint.to_dict(), indent=2, ensure_ascii=False),
-                encoding='utf-8'
-            )
+            self._checkpoint_store.save(self._checkpoint)
         except Exception as e:
             logger.error(f"❌ Erro ao salvar checkpoint: {e}")
 
     def clear_checkpoint(self) -> None:
         """Remove checkpoint e arquivos parciais para forçar nova ingestão."""
+        try:
+            self._checkpoint_store.delete()
+        except Exception as e:
+            logger.warning(f"⚠️ Erro ao remover {self.checkpoint_path.name}: {e}")
+
         files_to_remove = [
-            self.checkpoint_path,
+            self.legacy_checkpoint_path,
             self.partial_batches_path,
             self.partial_avisos_path,
         ]
@@ -428,6 +572,16 @@ class EmailIngestionOrchestrator:
         except Exception as e:
             logger.warning(f"⚠️ Erro ao salvar lote parcial: {e}")
 
+    def _save_batch_trace(self, batch_result: BatchResult) -> None:
+        """Acrescenta os spans do lote ao trace da sessão (se habilitado)."""
+        trace_path = self.trace_path
+        if trace_path is None or not batch_result.spans:
+            return
+        try:
+            export_jsonl(batch_result.spans, trace_path, batch_id=batch_result.batch_id)
+        except Exception as e:
+            logger.warning(f"⚠️ Erro ao salvar trace do lote: {e}")
+
     def _save_partial_aviso(self, aviso: EmailAvisoData) -> None:
         """
         Salva um EmailAvisoData parcial em arquivo JSONL (append).
@@ -466,10 +620,32 @@ class EmailIngestionOrchestrator:
         except Exception as e:
             logger.warning(f"⚠️ Erro ao salvar aviso parcial: {e}")
 
+    def _iter_partial_records(self, path: Path) -> Iterator[Dict[str, Any]]:
+        """
+        Percorre um arquivo JSONL de resultados parciais, uma linha por vez.
+
+        Linhas inválidas (ex.: última linha truncada por uma queda) são
+        ignoradas com aviso, sem descartar o restante do arquivo.
+        """
+        if not path.exists():
+            return
+        with open(path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    logger.warning(f"⚠️ Linha {line_number} inválida em {path.name}: {e}")
+
     def _load_partial_results(self) -> Tuple[List[Dict], List[Dict]]:
         """
         Carrega resultados parciais de execuções anteriores.
 
+        Materializa tudo em memória; para percorrer históricos grandes use
+        `iter_partial_batches`/`iter_partial_avisos`.
+
         Returns:
             Tupla (lista de batches dict, lista de avisos dict)
         """
@@ -479,11 +655,7 @@ class EmailIngestionOrchestrator:
         # Carrega lotes parciais
         if self.partial_batches_path.exists():
             try:
-                with open(self.partial_batches_path, "r", encoding="utf-8") as f:
-                    for line in f:
-                        line = line.strip()
-                        if line:
-                            batches.append(json.loads(line))
+                batches = list(self._iter_partial_records(self.partial_batches_path))
                 logger.info(f"📂 Carregados {len(batches)} lotes parciais anteriores")
             except Exception as e:
                 logger.warning(f"⚠️ Erro ao carregar lotes parciais: {e}")
@@ -491,17 +663,74 @@ class EmailIngestionOrchestrator:
         # Carrega avisos parciais
         if self.partial_avisos_path.exists():
             try:
-                with open(self.partial_avisos_path, "r", encoding="utf-8") as f:
-                    for line in f:
-                        line = line.strip()
-                        if line:
-                            avisos.append(json.loads(line))
+                avisos = list(self._iter_partial_records(self.partial_avisos_path))
                 logger.info(f"📂 Carregados {len(avisos)} avisos parciais anteriores")
             except Exception as e:
                 logger.warning(f"⚠️ Erro ao carregar avisos parciais: {e}")
 
         return batches, avisos
 
+    def iter_partial_batches(self, skip_ids: Set[str] = frozenset()) -> Iterator[BatchResult]:
+        """
+        Reconstrói, um a um, os lotes salvos no JSONL parcial.
+
+        Só o lote corrente fica em memória. Lotes sem batch_id, com id em
+        `skip_ids` ou repetidos no arquivo são pulados.
+
+        Args:
+            skip_ids: batch_ids já presentes em memória (execução atual)
+        """
+        seen: Set[str] = set()
+        for batch_dict in self._iter_partial_records(self.partial_batches_path):
+            batch_id = batch_dict.get("batch_id")
+            if not batch_id or batch_id in skip_ids or batch_id in seen:
+                continue
+            seen.add(batch_id)
+            try:
+                yield BatchResult.from_dict(batch_dict)
+            except Exception as e:
+                logger.warning(f"Erro ao reconstruir batch {batch_id}: {e}")
+
+    def iter_partial_avisos(self, skip_ids: Set[str] = frozenset()) -> Iterator[EmailAvisoData]:
+        """
+        Reconstrói, um a um, os avisos salvos no JSONL parcial.
+
+        Args:
+            skip_ids: email_ids já presentes em memória (execução atual)
+        """
+        seen: Set[str] = set()
+        for aviso_dict in self._iter_partial_records(self.partial_avisos_path):
+            email_id = aviso_dict.get("email_id")
+            if not email_id or email_id in skip_ids or email_id in seen:
+                continue
+            seen.add(email_id)
+            try:
+                yield self._aviso_from_partial(aviso_dict)
+            except Exception as e:
+                logger.warning(f"Erro ao reconstruir aviso {email_id}: {e}")
+
+    @staticmethod
+    def _aviso_from_partial(aviso_dict: Dict[str, Any]) -> EmailAvisoData:
+        """Reconstrói um EmailAvisoData a partir de uma linha do JSONL parcial."""
+        return EmailAvisoData(
+            arquivo_origem=aviso_dict.get("email_id"),
+            email_subject_full=aviso_dict.get("email_subject_full") or aviso_dict.get("subject"),
+            link_nfe=aviso_dict.get("link_nfe"),
+            codigo_verificacao=aviso_dict.get("codigo_verificacao"),
+            empresa=aviso_dict.get("empresa"),
+            fornecedor_nome=aviso_dict.get("sender_name"),
+            source_email_sender=aviso_dict.get("sender_address"),
+            # Campos adicionais para compatibilidade Google Sheets
+            data_processamento=aviso_dict.get("data_processamento"),
+            email_date=aviso_dict.get("email_date"),  # Data do email (não do processamento)
+            numero_nota=aviso_dict.get("numero_nota"),
+            dominio_portal=aviso_dict.get("dominio_portal"),
+            vencimento=aviso_dict.get("vencimento"),
+            observacoes=aviso_dict.get("observacoes"),
+            source_email_subject=aviso_dict.get("source_email_subject") or aviso_dict.get("subject"),
+            status_conciliacao=aviso_dict.get("status_conciliacao"),
+        )
+
     def get_partial_results_count(self) -> Tuple[int, int]:
         """
         Retorna contagem de resultados parciais salvos.
@@ -605,16 +834,17 @@ class EmailIngestionOrchestrator:
 
             # Carrega resultados parciais se estiver resumindo
             if resume and self.has_pending_work():
-                partial_batches, partial_avisos = self._load_partial_results()
+                partial_batches, partial_avisos = self.get_partial_results_count()
                 # Os parciais já estão salvos, apenas contabilizamos
                 logger.info(
-                    f"   📊 Resultados parciais: {len(partial_batches)} lotes, "
-                    f"{len(partial_avisos)} avisos já salvos"
+                    f"   📊 Resultados parciais: {partial_batches} lotes, "
+                    f"{partial_avisos} avisos já salvos"
                 )
 
             # Conecta ao servidor
             logger.info("📧 Conectando ao servidor de e-mail...")
             self.ingestor.connect()
+            self._fetch_failed = False
 
             # Define ordem de processamento
             if links_first:
@@ -698,7 +928,19 @@ class EmailIngestionOrchestrator:
 
             self._save_checkpoint()
 
+            # A marca d'água só avança se a pasta foi varrida por inteiro
+            self._finish_sync(
+                complete=(
+                    not self._interrupted
+                    and not self._fetch_failed
+                    and process_with_attachments
+                    and process_without_attachments
+                    and not limit_emails
+                )
+            )
+
         except Exception as e:
+            self._finish_sync(complete=False)
             logger.error(f"❌ Erro na ingestão: {e}")
             result.status = IngestionStatus.FAILED
             self._checkpoint.status = IngestionStatus.FAILED
@@ -721,6 +963,19 @@ class EmailIngestionOrchestrator:
 
         return result
 
+    def _finish_sync(self, complete: bool) -> None:
+        """Confirma (ou descarta) o progresso da sincronização incremental."""
+        if self._sync_state is None:
+            return
+        if complete:
+            try:
+                self._sync_state.commit()
+            except Exception as e:
+                logger.error(f"❌ Erro ao salvar estado de sincronização: {e}")
+        else:
+            logger.info("   ℹ️ Execução parcial: marca d'água de UID mantida")
+            self._sync_state.rollback()
+
     def _process_emails_with_attachments(
         self,
         subject_filter: str,
@@ -730,6 +985,12 @@ class EmailIngestionOrchestrator:
         """
         Processa e-mails COM anexos.
 
+        Os lotes atravessam um pipeline (`core.pipeline`): download e gravação
+        da pasta → extração (PIPELINE_EXTRACT_WORKERS) → correlação
+        (PIPELINE_CORRELATE_WORKERS) → gravação do parcial/checkpoint, feita
+        aqui. Cada lote é salvo assim que termina, enquanto os seguintes ainda
+        estão sendo baixados ou extraídos.
+
         Args:
             subject_filter: Filtro de assunto
             apply_correlation: Se aplica correlação
@@ -738,58 +999,69 @@ class EmailIngestionOrchestrator:
         Returns:
             Tupla (lista de BatchResult, contagem de e-mails)
         """
+        from config import settings
+
         batch_results: List[BatchResult] = []
         email_count = 0
         processed_in_session = 0
         skipped_already_done = 0
-
-        try:
-            # Usa IngestionService para baixar e organizar anexos
-            with self._metrics.measure_fetch("attachments"):
-                batch_folders = self._ingestion_service.ingest_emails(
-                    subject_filter=subject_filter,
-                    create_ignored_folder=True,
-                )
-
-            if not batch_folders:
-                logger.info("   ℹ️ Nenhum e-mail com anexos encontrado.")
-                return batch_results, email_count
-
-            logger.info(f"   📦 {len(batch_folders)} lote(s) para processar...")
-            self._metrics.record_batch_created(len(batch_folders))
-
-            # Processa cada lote
-            total_batches = len(batch_folders)
-
-            for idx, folder in enumerate(batch_folders):
-                if self._interrupted:
-                    logger.warning(f"   ⚠️ Interrompido após {idx} de {total_batches} lotes")
-                    break
-
-                batch_id = folder.name
-
-                # Verifica se já foi processado (resume)
-                if batch_id in self._checkpoint.processed_email_ids:
+        received = 0
+
+        def pending_batches() -> Iterator[Path]:
+            # Roda na thread da fonte: pula lotes já processados (resume)
+            nonlocal received, skipped_already_done
+            for folder in self._ingestion_service.iter_ingest_emails(
+                subject_filter=subject_filter,
+                create_ignored_folder=True,
+            ):
+                received += 1
+                self._metrics.record_batch_created(1)
+                if folder.name in self._checkpoint.processed_email_ids:
                     skipped_already_done += 1
                     continue
+                yield folder
+
+        queue_size = getattr(settings, "PIPELINE_QUEUE_SIZE", 4)
+        stages = [
+            Stage(
+                "extract",
+                self._extract_batch,
+                workers=getattr(settings, "PIPELINE_EXTRACT_WORKERS", 1),
+                queue_size=queue_size,
+            )
+        ]
+        if apply_correlation:
+            stages.append(Stage(
+                "correlate",
+                self._correlate_batch,
+                workers=getattr(settings, "PIPELINE_CORRELATE_WORKERS", 1),
+                queue_size=queue_size,
+            ))
+        pipeline = StagedPipeline(
+            pending_batches(),
+            stages,
+            source_name="fetch",
+            output_queue_size=queue_size,
+            metrics=self._metrics,
+            should_stop=lambda: self._interrupted,
+        )
 
+        try:
+            for item in pipeline:
+                folder = item.source
+                batch_id = folder.name
                 processed_in_session += 1
-                percent = ((idx + 1) / total_batches) * 100
-                self._notify_progress("Processando lotes", idx + 1, total_batches)
+                # Total desconhecido enquanto o download não termina (0)
+                self._notify_progress("Processando lotes", processed_in_session, 0)
+                logger.info(f"   [{processed_in_session}] {batch_id}...")
 
+                save_start = time.time()
                 try:
-                    # Log de progresso detalhado
-                    logger.info(
-                        f"   [{idx + 1}/{total_batches}] ({percent:.1f}%) {batch_id}..."
-                    )
+                    if item.error is not None:
+                        raise item.error
 
-                    # Processa com timeout
-                    batch_start = time.time()
-                    batch_result = self._process_batch_with_timeout(
-                        folder,
-                        apply_correlation,
-                    )
-                    batch_duration = time.time() - batch_start
+                    batch_result = item.value
+                    batch_duration = batch_result.processing_time if batch_result else 0.0
 
                     if batch_result:
                         batch_results.append(batch_result)
@@ -805,10 +1077,11 @@ class EmailIngestionOrchestrator:
 
                         # Salva resultado parcial IMEDIATAMENTE (segurança)
                         self._save_partial_batch(batch_result)
+                        self._save_batch_trace(batch_result)
                         self._partial_batch_results.append(batch_result)
 
                         # Atualiza checkpoint
-                        self._checkpoint.processed_email_ids.add(batch_id)
+                        self._checkpoint.mark_processed(batch_id)
                         self._checkpoint.created_batches.append(str(folder))
                         self._checkpoint.total_processed += 1
 
@@ -821,6 +1094,7 @@ class EmailIngestionOrchestrator:
                         self._metrics.record_batch_processed(0, batch_duration, "empty")
 
                     self._save_checkpoint()
+                    pipeline.report_item("save", time.time() - save_start)
 
                     # Log de progresso a cada 10 lotes
                     if processed_in_session % 10 == 0:
@@ -842,9 +1116,15 @@ class EmailIngestionOrchestrator:
                     self._checkpoint.total_errors += 1
                     self._metrics.record_email_error("exception", {"error": str(e)[:50]})
 
+            if self._interrupted:
+                logger.warning(f"   ⚠️ Interrompido após {processed_in_session} lote(s)")
+            elif received == 0:
+                logger.info("   ℹ️ Nenhum e-mail com anexos encontrado.")
+
         except Exception as e:
             logger.error(f"   ❌ Erro ao processar e-mails com anexos: {e}")
             self._checkpoint.total_errors += 1
+            self._fetch_failed = True
 
         # Log final da fase
         if processed_in_session > 0 or skipped_already_done > 0:
@@ -855,6 +1135,42 @@ class EmailIngestionOrchestrator:
 
         return batch_results, email_count
 
+    def _extract_batch(self, folder: Path) -> Optional[BatchResult]:
+        """Estágio de extração: lê e extrai os documentos do lote (sem correlação)."""
+        batch_start = time.time()
+        batch_result = self._process_batch_with_timeout(folder, False)
+        if batch_result:
+            batch_result.processing_time = time.time() - batch_start
+        return batch_result
+
+    def _correlate_batch(self, batch_result: Optional[BatchResult]) -> Optional[BatchResult]:
+        """
+        Estágio de correlação entre os documentos de um lote já extraído.
+
+        Mesma regra do passo 7 de `BatchProcessor.process_batch`: lotes sem
+        documentos não são correlacionados. Os spans da correlação entram em
+        `batch_result.spans`, abaixo do span `batch.process` do lote.
+        """
+        if not batch_result or batch_result.total_documents == 0:
+            return batch_result
+        start = time.time()
+        metadata = EmailMetadata.load(Path(batch_result.source_folder))
+        with collect_spans() as trace:
+            batch_result.correlation_result = self._batch_processor.correlation_service.correlate(
+                batch_result, metadata
+            )
+        batch_result.processing_time += time.time() - start
+
+        batch_span_id = next(
+            (s["span_id"] for s in batch_result.spans if s["name"] == "batch.process"),
+            None,
+        )
+        for span_dict in trace.to_dicts():
+            if span_dict["parent_id"] is None:
+                span_dict["parent_id"] = batch_span_id
+            batch_result.spans.append(span_dict)
+        return batch_result
+
     def _process_emails_without_attachments(
         self,
         subject_filter: str,
@@ -923,7 +1239,7 @@ class EmailIngestionOrchestrator:
                 self._metrics.record_email_processed(has_attachment=False)
 
                 # Atualiza checkpoint
-                self._checkpoint.processed_email_ids.add(aviso.email_id)
+                self._checkpoint.mark_processed(aviso.email_id)
                 self._checkpoint.created_avisos.append({
                     "email_id": aviso.email_id,
                     "subject": aviso.subject,
@@ -943,6 +1259,7 @@ class EmailIngestionOrchestrator:
         except Exception as e:
             logger.error(f"   ❌ Erro ao processar e-mails sem anexos: {e}")
             self._checkpoint.total_errors += 1
+            self._fetch_failed = True
 
         return avisos, processed_count, filtered_count
 
@@ -961,15 +1278,33 @@ class EmailIngestionOrchestrator:
         Returns:
             BatchResult ou None se falhar
         """
-        with ThreadPoolExecutor(max_workers=1) as executor:
-            future = executor.submit(
+        from config import settings
+
+        if getattr(settings, "SUPERVISED_WORKERS", True):
+            # Worker encerrado no timeout: lote travado não segue consumindo CPU
+            thread_name = threading.current_thread().name
+            with self._batch_executors_lock:
+                executor = self._batch_executors.get(thread_name)
+                if executor is None:
+                    executor = SupervisedProcessExecutor(
+                        target=self._batch_processor, name="orchestrator_batch"
+                    )
+                    self._batch_executors[thread_name] = executor
+            result = executor.call(
+                "process_batch",
+                folder,
+                apply_correlation,
+                timeout=self.batch_timeout_seconds,
+            )
+        else:
+            result = run_with_timeout(
                 self._batch_processor.process_batch,
                 folder,
                 apply_correlation,
+                timeout=self.batch_timeout_seconds,
             )
 
-            result = future.result(timeout=self.batch_timeout_seconds)
-            return result if result and result.total_documents > 0 else None
+        return result if result and result.total_documents > 0 else None
 
     def _register_timeout(self, batch_id: str, folder: Path) -> None:
         """
@@ -1039,6 +1374,11 @@ class EmailIngestionOrchestrator:
         por já estarem processados), o resultado final contenha TODOS os dados
         para exportação correta dos CSVs.
 
+        Os lotes/avisos do histórico não são reconstruídos aqui: uma leitura
+        do JSONL só conta o que falta (ids e total de documentos) e o
+        resultado recebe fontes lazy (`IngestionResult.iter_batch_results`/
+        `iter_avisos`) que reconstroem um registro por vez na exportação.
+
         Args:
             result: Resultado atual da ingestão
 
@@ -1046,64 +1386,37 @@ class EmailIngestionOrchestrator:
             Resultado com dados parciais mesclados
         """
         try:
-            # Carrega resultados parciais do disco
-            partial_batches, partial_avisos = self._load_partial_results()
-
-            if not partial_batches and not partial_avisos:
-                return result
-
             # IDs já presentes no resultado atual
-            current_batch_ids = {b.batch_id for b in result.batch_results}
-            current_aviso_ids = {a.email_id for a in result.avisos}
+            current_batch_ids = frozenset(b.batch_id for b in result.batch_results)
+            current_aviso_ids = frozenset(a.email_id for a in result.avisos)
 
-            # Mescla batches parciais que não estão no resultado
-            batches_added = 0
-            for batch_dict in partial_batches:
+            # Conta batches parciais que não estão no resultado
+            batch_ids: Set[str] = set()
+            documents = 0
+            for batch_dict in self._iter_partial_records(self.partial_batches_path):
                 batch_id = batch_dict.get("batch_id")
-                if batch_id and batch_id not in current_batch_ids:
-                    # Reconstrói BatchResult a partir do dict
-                    try:
-                        batch = BatchResult.from_dict(batch_dict)
-                        result.batch_results.append(batch)
-                        current_batch_ids.add(batch_id)
-                        batches_added += 1
-                    except Exception as e:
-                        logger.warning(f"Erro ao reconstruir batch {batch_id}: {e}")
-
-            # Mescla avisos parciais que não estão no resultado
-            avisos_added = 0
-            for aviso_dict in partial_avisos:
+                if batch_id and batch_id not in current_batch_ids and batch_id not in batch_ids:
+                    batch_ids.add(batch_id)
+                    documents += len(batch_dict.get("documents") or ())
+
+            # Conta avisos parciais que não estão no resultado
+            aviso_ids: Set[str] = set()
+            for aviso_dict in self._iter_partial_records(self.partial_avisos_path):
                 email_id = aviso_dict.get("email_id")
                 if email_id and email_id not in current_aviso_ids:
-                    # Reconstrói EmailAvisoData a partir do dict
-                    try:
-                        aviso = EmailAvisoData(
-                            arquivo_origem=email_id,
-                            email_subject_full=aviso_dict.get("email_subject_full") or aviso_dict.get("subject"),
-                            link_nfe=aviso_dict.get("link_nfe"),
-                            codigo_verificacao=aviso_dict.get("codigo_verificacao"),
-                            empresa=aviso_dict.get("empresa"),
-                            fornecedor_nome=aviso_dict.get("sender_name"),
-                            source_email_sender=aviso_dict.get("sender_address"),
-                            # Campos adicionais para compatibilidade Google Sheets
-                            data_processamento=aviso_dict.get("data_processamento"),
-                            email_date=aviso_dict.get("email_date"),  # Data do email (não do processamento)
-                            numero_nota=aviso_dict.get("numero_nota"),
-                            dominio_portal=aviso_dict.get("dominio_portal"),
-                            vencimento=aviso_dict.get("vencimento"),
-                            observacoes=aviso_dict.get("observacoes"),
-                            source_email_subject=aviso_dict.get("source_email_subject") or aviso_dict.get("subject"),
-                            status_conciliacao=aviso_dict.get("status_conciliacao"),
-                        )
-                        result.avisos.append(aviso)
-                        current_aviso_ids.add(email_id)
-                        avisos_added += 1
-                    except Exception as e:
-                        logger.warning(f"Erro ao reconstruir aviso {email_id}: {e}")
+                    aviso_ids.add(email_id)
+
+            result.history_batches = len(batch_ids)
+            result.history_documents = documents
+            result.history_avisos = len(aviso_ids)
+            if batch_ids:
+                result.history_batch_source = lambda: self.iter_partial_batches(current_batch_ids)
+            if aviso_ids:
+                result.history_aviso_source = lambda: self.iter_partial_avisos(current_aviso_ids)
 
-            if batches_added > 0 or avisos_added > 0:
+            if batch_ids or aviso_ids:
                 logger.info(
-                    f"   📦 Mesclados do histórico: {batches_added} lotes, {avisos_added} avisos"
+                    f"   📦 Mesclados do histórico: {len(batch_ids)} lotes, {len(aviso_ids)} avisos"
                 )
 
         except Exception as e:
@@ -1127,6 +1440,28 @@ class EmailIngestionOrchestrator:
             logger.error(f"Erro ao exportar métricas: {e}")
             return None
 
+    def export_trace(self, output_dir: Path) -> Optional[Path]:
+        """
+        Converte o trace da sessão para o formato Chrome trace-event.
+
+        O arquivo gerado abre em chrome://tracing ou https://ui.perfetto.dev.
+
+        Args:
+            output_dir: Diretório de saída
+
+        Returns:
+            Path do arquivo gerado ou None se não houver trace
+        """
+        trace_path = self.trace_path
+        if trace_path is None or not trace_path.exists():
+            return None
+        try:
+            target = Path(output_dir) / f"{trace_path.stem}.json"
+            return export_chrome_trace(load_jsonl(trace_path), target)
+        except Exception as e:
+            logger.error(f"Erro ao exportar trace: {e}")
+            return None
+
     def log_metrics_summary(self) -> None:
         """Loga resumo das métricas da sessão."""
         self._metrics.log_session_summary()
@@ -1136,7 +1471,8 @@ class EmailIngestionOrchestrator:
         Exporta resultados parciais salvos para CSV.
 
         Útil para recuperar dados após uma interrupção sem precisar
-        reprocessar tudo.
+        reprocessar tudo. Os JSONL são lidos linha a linha e os CSVs
+        escritos em fluxo (memória constante).
 
         Args:
             output_dir: Diretório de saída para os CSVs
@@ -1144,38 +1480,30 @@ class EmailIngestionOrchestrator:
         Returns:
             Tupla (qtd lotes exportados, qtd avisos exportados)
         """
-        import pandas as pd
-
         output_dir.mkdir(parents=True, exist_ok=True)
 
         batches_exported = 0
         avisos_exported = 0
 
-        # Exporta lotes parciais
+        # Exporta lotes parciais (documentos achatados)
         if self.partial_batches_path.exists():
             try:
-                batches = []
-                with open(self.partial_batches_path, "r", encoding="utf-8") as f:
-                    for line in f:
-                        line = line.strip()
-                        if line:
-                            batches.append(json.loads(line))
-
-                if batches:
-                    # Achata documentos para CSV
-                    all_docs = []
-                    for batch in batches:
+                with CsvStreamWriter(
+                    output_dir / "parcial_documentos.csv",
+                    all_document_columns() + ["batch_id", "email_subject"],
+                    decimal=".",
+                ) as writer:
+                    batches_seen = 0
+                    for batch in self._iter_partial_records(self.partial_batches_path):
+                        batches_seen += 1
                         for doc in batch.get("documents", []):
-                            doc["batch_id"] = batch["batch_id"]
+                            doc["batch_id"] = batch.get("batch_id")
                             doc["email_subject"] = batch.get("email_subject", "")
-                            all_docs.append(doc)
+                            writer.write(doc)
 
-                    if all_docs:
-                        df = pd.DataFrame(all_docs)
-                        output_path = output_dir / "parcial_documentos.csv"
-                        df.to_csv(output_path, index=False, sep=";", encoding="utf-8-sig")
-                        batches_exported = len(batches)
-                        logger.info(f"✅ {len(all_docs)} documentos parciais -> {output_path.name}")
+                if writer.rows:
+                    batches_exported = batches_seen
+                    logger.info(f"✅ {writer.rows} documentos parciais -> {writer.path.name}")
 
             except Exception as e:
                 logger.error(f"❌ Erro ao exportar lotes parciais: {e}")
@@ -1183,18 +1511,17 @@ class EmailIngestionOrchestrator:
         # Exporta avisos parciais
         if self.partial_avisos_path.exists():
             try:
-                avisos_raw = []
-                with open(self.partial_avisos_path, "r", encoding="utf-8") as f:
-                    for line in f:
-                        line = line.strip()
-                        if line:
-                            avisos_raw.append(json.loads(line))
-
-                if avisos_raw:
-                    # Converte para formato compatível com Google Sheets (load_avisos_from_csv)
-                    avisos_sheets = []
-                    for aviso_dict in avisos_raw:
-                        avisos_sheets.append({
+                # Nome esperado pelo export_to_sheets.py + versão simplificada
+                with CsvStreamWriter(
+                    output_dir / "avisos_emails_sem_anexo_latest.csv",
+                    PARTIAL_AVISO_SHEETS_COLUMNS,
+                    decimal=".",
+                ) as sheets, CsvStreamWriter(
+                    output_dir / "parcial_avisos.csv", PARTIAL_AVISO_COLUMNS, decimal="."
+                ) as simple:
+                    for aviso_dict in self._iter_partial_records(self.partial_avisos_path):
+                        # Formato compatível com Google Sheets (load_avisos_from_csv)
+                        sheets.write({
                             'tipo_documento': 'AVISO',
                             'arquivo_origem': aviso_dict.get('email_id', ''),
                             'data_processamento': aviso_dict.get('data_processamento'),
@@ -1210,28 +1537,21 @@ class EmailIngestionOrchestrator:
                             'observacoes': aviso_dict.get('observacoes'),
                             'status_conciliacao': aviso_dict.get('status_conciliacao'),
                         })
+                        simple.write(aviso_dict)
 
-                    df = pd.DataFrame(avisos_sheets)
-                    # Exporta para o nome esperado pelo export_to_sheets.py
-                    output_path = output_dir / "avisos_emails_sem_anexo_latest.csv"
-                    df.to_csv(output_path, index=False, sep=";", encoding="utf-8-sig")
-                    avisos_exported = len(avisos_sheets)
-                    logger.info(f"✅ {len(avisos_sheets)} avisos parciais -> {output_path.name}")
-
-                    # Também exporta versão simplificada para leitura rápida
-                    output_path_simple = output_dir / "parcial_avisos.csv"
-                    df_simple = pd.DataFrame(avisos_raw)
-                    df_simple.to_csv(output_path_simple, index=False, sep=";", encoding="utf-8-sig")
+                if sheets.rows:
+                    avisos_exported = sheets.rows
+                    logger.info(f"✅ {sheets.rows} avisos parciais -> {sheets.path.name}")
 
             except Exception as e:
                 logger.error(f"❌ Erro ao exportar avisos parciais: {e}")
 
         return batches_exported, avisos_exported
 
-
 def create_orchestrator_from_config(
     temp_dir: Optional[Path] = None,
     batch_timeout_seconds: int = 300,
+    incremental_sync: Optional[bool] = None,
 ) -> EmailIngestionOrchestrator:
     """
     Factory para criar orquestrador a partir das configurações.
@@ -1239,6 +1559,8 @@ def create_orchestrator_from_config(
     Args:
         temp_dir: Diretório temporário (opcional, usa settings se None)
         batch_timeout_seconds: Timeout por lote
+        incremental_sync: Sincronização incremental por UID
+            (None = settings.IMAP_INCREMENTAL_SYNC)
 
     Returns:
         EmailIngestionOrchestrator configurado
@@ -1247,6 +1569,7 @@ def create_orchestrator_from_config(
         ValueError: Se credenciais estiverem faltando
     """
     from config import settings
+    from core.duplicate_index import get_duplicate_index
     from ingestors.imap import ImapIngestor
 
     if not settings.EMAIL_PASS:
@@ -1263,4 +1586,9 @@ def create_orchestrator_from_config(
         ingestor=ingestor,
         temp_dir=temp_dir or settings.DIR_TEMP,
         batch_timeout_seconds=batch_timeout_seconds,
+        incremental_sync=(
+            settings.IMAP_INCREMENTAL_SYNC if incremental_sync is None else incremental_sync
+        ),
+        duplicate_index=get_duplicate_index(),
+        trace_dir=settings.TRACE_DIR if settings.TRACING_ENABLED else None,
     )
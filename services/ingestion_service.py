@@ -20,13 +20,15 @@ Princípios SOLID aplicados:
 - OCP: Extensível via herança sem modificar código existente
 - DIP: Depende de abstrações (EmailIngestorStrategy), não de implementações
 """
+import logging
 import os
 import re
+import shutil
 import uuid
 from datetime import datetime
 
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Iterator, List, Optional, Set, Union
 
 from core.empresa_matcher_email import find_empresa_in_email
 from core.filters import (
@@ -39,6 +41,8 @@ from core.interfaces import EmailIngestorStrategy
 from core.metadata import EmailMetadata
 from core.models import EmailAvisoData
 
+logger = logging.getLogger(__name__)
+
 
 class IngestionService:
     """
@@ -112,30 +116,74 @@ class IngestionService:
         Returns:
             Lista de caminhos das pastas de lote criadas
         """
+        return list(self.iter_ingest_emails(subject_filter, create_ignored_folder))
+
+    def iter_ingest_emails(
+        self,
+        subject_filter: str = "Nota Fiscal",
+        create_ignored_folder: bool = False,
+    ) -> Iterator[Path]:
+        """
+        Gera as pastas de lote à medida que cada e-mail é gravado.
+
+        Com ingestor em streaming, o lote fica disponível assim que o e-mail
+        é baixado: quem consome pode processá-lo enquanto os próximos ainda
+        estão sendo baixados (em paralelo, se IMAP_POOL_SIZE > 1).
+
+        Args:
+            subject_filter: Filtro de assunto para busca
+            create_ignored_folder: Se True, cria pasta 'ignored/' para arquivos descartados
+
+        Yields:
+            Path de cada pasta de lote criada
+        """
         # Garante conexão
         self.ingestor.connect()
 
-        # Busca anexos
-        raw_attachments = self.ingestor.fetch_attachments(subject_filter)
+        if self._supports_streaming():
+            # Um e-mail por vez; anexos vão do servidor direto para a pasta do lote
+            emails = self.ingestor.iter_emails_with_attachments(  # type: ignore[attr-defined]
+                subject_filter, staging_dir=self.temp_dir
+            )
+        else:
+            # Busca anexos
+            raw_attachments = self.ingestor.fetch_attachments(subject_filter)
 
-        if not raw_attachments:
-            return []
+            if not raw_attachments:
+                return
 
-        # Agrupa anexos por e-mail de origem usando email_id
-        emails_grouped = self._group_attachments_by_email(raw_attachments)
+            # Agrupa anexos por e-mail de origem usando email_id
+            emails = iter(self._group_attachments_by_email(raw_attachments).values())
 
-        batches_created = []
+        batches_created: Set[Path] = set()
 
         # Processa cada e-mail como um lote único (com todos os seus anexos)
-        for email_data in emails_grouped.values():
-            batch_path = self.ingest_single_email(
-                email_data,
-                create_ignored_folder=create_ignored_folder
-            )
-            if batch_path and batch_path not in batches_created:
-                batches_created.append(batch_path)
-
-        return batches_created
+        try:
+            for email_data in emails:
+                batch_path = self.ingest_single_email(
+                    email_data,
+                    create_ignored_folder=create_ignored_folder
+                )
+                if batch_path and batch_path not in batches_created:
+                    batches_created.add(batch_path)
+                    yield batch_path
+        finally:
+            # Consumidor parou antes do fim: encerra downloads em andamento
+            close = getattr(emails, "close", None)
+            if callable(close):
+                close()
+
+    def _supports_streaming(self) -> bool:
+        """Se o ingestor oferece o caminho em streaming (ImapIngestor)."""
+        return getattr(self.ingestor, 'supports_streaming', False) is True
+
+    def _write_attachment(self, att: Dict[str, Any], file_path: Path) -> None:
+        """Grava um anexo: via 'save_to' (streaming) ou a partir de 'content'."""
+        save_to = att.get('save_to')
+        if callable(save_to):
+            save_to(file_path)
+        else:
+            file_path.write_bytes(att.get('content', b''))
 
     def _group_attachments_by_email(
         self,
@@ -189,6 +237,7 @@ class IngestionService:
                 - body_text: Corpo do e-mail (texto)
                 - received_date: Data de recebimento
                 - attachments: Lista de dicts com 'filename' e 'content'
+                  (ou 'save_to', que grava o anexo direto no caminho dado)
             create_ignored_folder: Se True, cria pasta 'ignored/'
 
         Returns:
@@ -231,9 +280,18 @@ class IngestionService:
             numbered_filename = f"{idx:02d}_{safe_filename}"
 
             file_path = batch_folder / numbered_filename
-            file_path.write_bytes(att.get('content', b''))
+            try:
+                self._write_attachment(att, file_path)
+            except Exception as e:
+                logger.warning(f"Falha ao baixar anexo '{filename}': {e}")
+                continue
             saved_files.append(numbered_filename)
 
+        # Nenhum anexo pôde ser gravado: descarta a pasta vazia
+        if not saved_files:
+            shutil.rmtree(batch_folder, ignore_errors=True)
+            return None
+
         # Salva anexos ignorados (se configurado)
         if create_ignored_folder and ignored_attachments:
             ignored_folder = batch_folder / "ignored"
@@ -243,7 +301,10 @@ class IngestionService:
                 filename = att.get('filename', 'unknown')
                 safe_filename = self._sanitize_filename(filename)
                 file_path = ignored_folder / safe_filename
-                file_path.write_bytes(att.get('content', b''))
+                try:
+                    self._write_attachment(att, file_path)
+                except Exception as e:
+                    logger.warning(f"Falha ao baixar anexo ignorado '{filename}': {e}")
 
         # Cria metadata.json
         metadata = EmailMetadata.create_for_batch(
@@ -411,11 +472,17 @@ class IngestionService:
                 "Ingestor não suporta fetch_emails_without_attachments"
             )
 
-        # Busca e-mails sem anexo
-        raw_emails = self.ingestor.fetch_emails_without_attachments(  # type: ignore
-            subject_filter=subject_filter,
-            limit=limit
-        )
+        # Busca e-mails sem anexo (em streaming, um e-mail por vez)
+        if self._supports_streaming():
+            raw_emails = self.ingestor.iter_emails_without_attachments(  # type: ignore[attr-defined]
+                subject_filter=subject_filter,
+                limit=limit
+            )
+        else:
+            raw_emails = self.ingestor.fetch_emails_without_attachments(  # type: ignore
+                subject_filter=subject_filter,
+                limit=limit
+            )
 
         if not raw_emails:
             return []
@@ -471,8 +538,7 @@ class IngestionService:
             avisos.append(aviso)
 
         if skipped_count > 0:
-            import logging
-            logging.getLogger(__name__).info(
+            logger.info(
                 f"Filtro ignorou {skipped_count} e-mails sem conteúdo fiscal relevante"
             )
 
@@ -638,7 +704,6 @@ class IngestionService:
         Returns:
             Número de pastas removidas
         """
-        import shutil
         from datetime import timedelta
 
         if not self.temp_dir.exists():
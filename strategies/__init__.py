@@ -1,19 +1,31 @@
 from .fallback import SmartExtractionStrategy
 from .native import NativePdfStrategy
 from .ocr import TesseractOcrStrategy
+from .pdf_password import PdfPasswordResolver, get_password_resolver
+from .pdf_session import PdfDocumentSession
 from .pdf_utils import (
     abrir_pdfplumber_com_senha,
     abrir_pypdfium_com_senha,
+    desbloquear_pdfplumber,
+    desbloquear_pypdfium,
     gerar_candidatos_senha,
 )
 from .table import TablePdfStrategy
+from .text_cache import TextExtractionCache, get_text_cache
 
 __all__ = [
     "NativePdfStrategy",
     "TablePdfStrategy",
     "TesseractOcrStrategy",
     "SmartExtractionStrategy",
+    "PdfDocumentSession",
     "gerar_candidatos_senha",
     "abrir_pdfplumber_com_senha",
     "abrir_pypdfium_com_senha",
+    "desbloquear_pdfplumber",
+    "desbloquear_pypdfium",
+    "PdfPasswordResolver",
+    "get_password_resolver",
+    "TextExtractionCache",
+    "get_text_cache",
 ]
@@ -1,8 +1,13 @@
 import re
+from typing import Optional, Tuple
+
 from core.interfaces import TextExtractionStrategy
+from core.tracing import current_span, span, traced
 from .native import NativePdfStrategy
+from .pdf_session import PagedText, PdfDocumentSession
 from .table import TablePdfStrategy
-from .ocr import TesseractOcrStrategy
+from .ocr import TesseractOcrStrategy, splice_regions
+from .text_cache import TextExtractionCache
 from config import settings
 
 class SmartExtractionStrategy(TextExtractionStrategy):
@@ -15,8 +20,29 @@ class SmartExtractionStrategy(TextExtractionStrategy):
     3. OCR via Tesseract (última opção, documentos escaneados/corrompidos)
     
     Garante resiliência máxima na extração de texto de PDFs.
+
+    Todas as estratégias compartilham uma única `PdfDocumentSession`: o arquivo
+    é aberto (e desbloqueado) uma vez, e páginas, textos, tabelas e bitmaps já
+    extraídos são reaproveitados entre os níveis do fallback.
+
+    Complemento híbrido: quando o texto nativo (ou de tabelas) parece
+    incompleto, o OCR roda só nas imagens embutidas da página
+    (`HYBRID_OCR_MODE="regions"`) e o texto reconhecido é inserido perto da
+    posição de cada imagem. PDFs sem imagens utilizáveis, ou com
+    `HYBRID_OCR_MODE="page"`, usam o OCR da página inteira.
+
+    Orçamento de páginas: com `page_budget`, PDFs longos cujo texto nativo
+    basta nas primeiras/últimas páginas voltam como `PagedText` incompleto
+    (sessão aberta, demais páginas sob demanda, fora do cache de texto).
     """
-    def __init__(self):
+    def __init__(self, text_cache: Optional[TextExtractionCache] = None):
+        """
+        Args:
+            text_cache: Cache persistente do texto extraído (opcional). Quando
+                informado, arquivos já lidos com a mesma configuração de OCR
+                não passam novamente pelo fallback.
+        """
+        self.text_cache = text_cache
         # Define a ordem de prioridade
         self.strategies = [
             NativePdfStrategy(),      # 1. Tenta ser rápido com layout
@@ -24,12 +50,16 @@ class SmartExtractionStrategy(TextExtractionStrategy):
             TesseractOcrStrategy()    # 3. Se falhar, usa força bruta (OCR)
         ]
 
-    def extract(self, file_path: str) -> str:
+    @traced("strategy.smart")
+    def extract(self, file_path: str, page_budget: Optional[Tuple[int, int]] = None) -> str:
         """
         Tenta extrair texto usando as estratégias em ordem de prioridade.
 
         Args:
             file_path (str): Caminho do arquivo PDF.
+            page_budget (Optional[Tuple[int, int]]): (primeiras, últimas) páginas
+                lidas de PDFs longos. Se o retorno for um `PagedText` incompleto,
+                o chamador deve fechá-lo (`close()`).
 
         Returns:
             str: Texto extraído pela primeira estratégia bem-sucedida.
@@ -37,6 +67,45 @@ class SmartExtractionStrategy(TextExtractionStrategy):
         Raises:
             ExtractionError: Se todas as estratégias falharem.
         """
+        cache_key = self.text_cache.key_for(file_path) if self.text_cache else None
+        if cache_key:
+            texto = self.text_cache.get(cache_key)
+            if texto is not None:
+                current_span().set(cache="hit")
+                return texto
+
+        session = PdfDocumentSession(file_path)
+        texto = None
+        try:
+            texto, complemento_falhou = self._extract_with_session(file_path, session, page_budget)
+        finally:
+            if not isinstance(texto, PagedText) or texto.complete:
+                session.close()
+
+        if isinstance(texto, PagedText) and not texto.complete:
+            current_span().set(pages_read=len(texto.pages_read), pages=texto.page_count)
+        elif complemento_falhou:
+            # Falha do OCR pode ser transitória: não grava o texto degradado
+            # no cache, para que o reprocessamento tente o OCR de novo
+            current_span().set(hybrid_ocr="failed")
+        elif cache_key:
+            self.text_cache.put(cache_key, texto)
+        return texto
+
+    def _extract_with_session(
+        self,
+        file_path: str,
+        session: PdfDocumentSession,
+        page_budget: Optional[Tuple[int, int]] = None,
+    ) -> Tuple[str, bool]:
+        """
+        Executa o fallback em 3 níveis sobre uma sessão já aberta.
+
+        Returns:
+            Tupla (texto, complemento_falhou). `complemento_falhou` é True
+            quando o complemento OCR era necessário mas lançou erro (Tesseract
+            indisponível, timeout): o texto devolvido é só o nativo/de tabelas.
+        """
         from core.exceptions import ExtractionError
 
         def looks_incomplete(text: str) -> bool:
@@ -80,44 +149,83 @@ class SmartExtractionStrategy(TextExtractionStrategy):
 
             return False
         
+        complemento_falhou = False
+
         # 1) Tenta texto nativo primeiro.
         try:
-            texto_native = self.strategies[0].extract(file_path)
+            if page_budget is not None:
+                texto_native = self.strategies[0].extract(
+                    file_path, session=session, page_budget=page_budget
+                )
+                # Texto parcial que parece incompleto: decide o OCR com o documento inteiro
+                if isinstance(texto_native, PagedText) and looks_incomplete(texto_native):
+                    texto_native = texto_native.full()
+            else:
+                texto_native = self.strategies[0].extract(file_path, session=session)
             if texto_native and len(texto_native.strip()) >= 50:
                 # Complemento híbrido com OCR (quando necessário)
                 if getattr(settings, 'HYBRID_OCR_COMPLEMENT', True) and looks_incomplete(texto_native):
                     try:
-                        texto_ocr = self.strategies[2].extract(file_path)
-                        if texto_ocr and len(texto_ocr.strip()) >= 50:
-                            return texto_native + "\n\n" + texto_ocr
+                        texto_hibrido = self._hybrid_complement(file_path, session, texto_native, "native")
+                        if texto_hibrido:
+                            return texto_hibrido, False
                     except Exception:
-                        pass
-                return texto_native
+                        complemento_falhou = True
+                return texto_native, complemento_falhou
         except Exception:
             pass
 
         # 2) Tenta extração por tabela.
         try:
-            texto_table = self.strategies[1].extract(file_path)
+            texto_table = self.strategies[1].extract(file_path, session=session)
             if texto_table and len(texto_table.strip()) >= 50:
                 if getattr(settings, 'HYBRID_OCR_COMPLEMENT', True) and looks_incomplete(texto_table):
                     try:
-                        texto_ocr = self.strategies[2].extract(file_path)
-                        if texto_ocr and len(texto_ocr.strip()) >= 50:
-                            return texto_table + "\n\n" + texto_ocr
+                        texto_hibrido = self._hybrid_complement(file_path, session, texto_table, "table")
+                        if texto_hibrido:
+                            return texto_hibrido, False
                     except Exception:
-                        pass
-                return texto_table
+                        complemento_falhou = True
+                return texto_table, complemento_falhou
         except Exception:
             pass
 
         # 3) OCR puro (último recurso)
         try:
-            texto_ocr = self.strategies[2].extract(file_path)
+            texto_ocr = self.strategies[2].extract(file_path, session=session)
             if texto_ocr and len(texto_ocr.strip()) >= 50:
-                return texto_ocr
+                return texto_ocr, False
         except Exception:
             pass
         
         # Todas falharam: agora sim é erro crítico
-        raise ExtractionError(f"Nenhuma estratégia conseguiu extrair texto de {file_path}")
\ No newline at end of file
+        raise ExtractionError(f"Nenhuma estratégia conseguiu extrair texto de {file_path}")
+
+    def _hybrid_complement(
+        self, file_path: str, session: PdfDocumentSession, base_text: str, base: str
+    ) -> Optional[str]:
+        """
+        Complementa o texto nativo/de tabelas com OCR.
+
+        Returns:
+            Texto complementado, ou None se o OCR não acrescentou nada.
+        """
+        ocr = self.strategies[2]
+        with span("strategy.hybrid_ocr", base=base) as s:
+            if getattr(settings, 'HYBRID_OCR_MODE', 'regions') == 'regions':
+                regioes = ocr.extract_regions(file_path, session=session)
+                if regioes is not None:
+                    s.set(
+                        mode="regions",
+                        regions=len(regioes),
+                        pixels=sum(r.pixels for r in regioes),
+                    )
+                    if not any(r.text.strip() for r in regioes):
+                        return None
+                    return splice_regions(base_text, session, regioes)
+
+            s.set(mode="page")
+            texto_ocr = ocr.extract(file_path, session=session)
+        if texto_ocr and len(texto_ocr.strip()) >= 50:
+            return base_text + "\n\n" + texto_ocr
+        return None
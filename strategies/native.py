@@ -14,6 +14,8 @@ Características:
 Modos de operação:
     1. Extração simples (rápida): Texto linear, suficiente para maioria
     2. Layout preservado (lenta): Mantém posicionamento, útil para tabelas
+    3. Orçamento de páginas (PDFs longos): só as primeiras/últimas páginas,
+       devolvidas como `PagedText` (demais páginas sob demanda)
 
 Example:
     >>> from strategies.native import NativePdfStrategy
@@ -23,10 +25,12 @@ Example:
     ...     print("PDF vetorial extraído com sucesso")
 """
 import logging
+from typing import Optional, Tuple
 
 from core.interfaces import TextExtractionStrategy
+from core.tracing import traced
 
-from .pdf_utils import abrir_pdfplumber_com_senha
+from .pdf_session import PagedText, PdfDocumentSession, page_window
 
 logger = logging.getLogger(__name__)
 
@@ -41,7 +45,13 @@ class NativePdfStrategy(TextExtractionStrategy):
     Inclui suporte a PDFs protegidos por senha, tentando desbloquear
     automaticamente usando CNPJs das empresas cadastradas.
     """
-    def extract(self, file_path: str) -> str:
+    @traced("strategy.native")
+    def extract(
+        self,
+        file_path: str,
+        session: Optional[PdfDocumentSession] = None,
+        page_budget: Optional[Tuple[int, int]] = None,
+    ) -> str:
         """
         Extrai texto de um PDF vetorial com múltiplas estratégias.
 
@@ -53,50 +63,62 @@ class NativePdfStrategy(TextExtractionStrategy):
 
         Args:
             file_path (str): Caminho absoluto ou relativo do arquivo PDF.
+            session (Optional[PdfDocumentSession]): Sessão já aberta do documento.
+                Se None, abre uma sessão própria (fechada ao final).
+            page_budget (Optional[Tuple[int, int]]): (primeiras, últimas) páginas
+                lidas em PDFs mais longos que o orçamento. Exige `session`: o
+                `PagedText` devolvido lê as demais páginas pela mesma sessão.
 
         Returns:
             str: Texto extraído ou string vazia se a extração falhar/for insuficiente.
+                Com orçamento, um `PagedText` incompleto quando páginas ficaram de fora.
         """
-        try:
-            # Usa função utilitária que tenta desbloquear PDFs protegidos
-            pdf = abrir_pdfplumber_com_senha(file_path)
+        if session is None:
+            with PdfDocumentSession(file_path) as own_session:
+                return self.extract(file_path, session=own_session)
 
-            if pdf is None:
+        try:
+            if session.plumber is None:
                 logger.debug(f"Não foi possível abrir PDF: {file_path}")
                 return ""
 
-            try:
-                if not pdf.pages:
-                    return ""
-
-                # Tentativa 1 (rápida): extração simples
-                text_simple = ""
-                for page in pdf.pages:
-                    page_text = page.extract_text() or ""
-                    text_simple += page_text + "\n"
+            pages = session.pages
+            if not pages:
+                return ""
 
-                # Regra de Ouro: se extraiu pouco texto, considere falha e deixe o fallback decidir.
-                if len(text_simple.strip()) < 50:
-                    return ""
+            # Orçamento: PDF longo com texto suficiente nas primeiras/últimas páginas
+            if page_budget is not None:
+                window = page_window(len(pages), *page_budget)
+                if len(window) < len(pages):
+                    parcial = PagedText(session, window)
+                    if len(parcial.strip()) >= 300:
+                        return parcial
+                    # Pouco texto nas páginas do orçamento: lê o documento inteiro
+
+            # Tentativa 1 (rápida): extração simples
+            text_simple = ""
+            for i in range(len(pages)):
+                text_simple += session.page_text(i) + "\n"
+
+            # Regra de Ouro: se extraiu pouco texto, considere falha e deixe o fallback decidir.
+            if len(text_simple.strip()) < 50:
+                return ""
 
-                # Se a extração simples já é "boa o bastante", evita layout=True (pode ser bem lento).
-                # Em muitos PDFs híbridos/gerados, o layout preservado degrada performance.
-                if len(text_simple.strip()) >= 300:
-                    return text_simple
+            # Se a extração simples já é "boa o bastante", evita layout=True (pode ser bem lento).
+            # Em muitos PDFs híbridos/gerados, o layout preservado degrada performance.
+            if len(text_simple.strip()) >= 300:
+                return text_simple
 
-                # Tentativa 2: layout preservado (melhor para documentos tabulares, porém mais lenta)
-                text_layout = ""
-                for page in pdf.pages:
-                    page_text = page.extract_text(layout=True, x_tolerance=3, y_tolerance=3) or ""
-                    text_layout += page_text + "\n"
+            # Tentativa 2: layout preservado (melhor para documentos tabulares, porém mais lenta)
+            text_layout = ""
+            for i in range(len(pages)):
+                text_layout += session.page_text(i, layout=True, x_tolerance=3, y_tolerance=3) + "\n"
 
-                # Usa o layout se ele trouxe significativamente mais conteúdo, senão fica no simples.
-                if len(text_layout.strip()) > len(text_simple.strip()) + 100:
-                    return text_layout
+            # Usa o layout se ele trouxe significativamente mais conteúdo, senão fica no simples.
+            if len(text_layout.strip()) > len(text_simple.strip()) + 100:
+                return text_layout
 
-                return text_simple
-            finally:
-                pdf.close()
+            return text_simple
 
         except Exception as e:
             logger.debug(f"Erro na extração nativa de {file_path}: {e}")
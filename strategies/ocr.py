@@ -15,6 +15,28 @@ Configuração (via config/settings.py):
     - OCR_LANG: Idioma do OCR (padrão: "por" para português)
     - OCR_CONFIG: Parâmetros adicionais do Tesseract
 
+    - OCR_MAX_PAGES: Páginas rasterizadas por documento
+    - OCR_WORKERS: Páginas processadas em paralelo
+    - OCR_DPI_LOW / OCR_DPI_HIGH: Resoluções da primeira passada e da escalada
+    - OCR_MIN_CONFIDENCE / OCR_MIN_CHARS_PER_PAGE: Critérios para escalar o DPI
+
+Motor multipágina:
+    As primeiras OCR_MAX_PAGES páginas são rasterizadas em DPI baixo e
+    enviadas ao Tesseract em paralelo. O pytesseract executa cada chamada em
+    um processo `tesseract` separado, então um pool de threads basta para
+    ocupar vários núcleos; com OMP_THREAD_LIMIT=1 (definido uma vez em
+    config.settings) cada processo usa um único núcleo, evitando disputa
+    entre páginas. Páginas com confiança média ou rendimento de caracteres
+    abaixo do mínimo são refeitas em DPI alto.
+
+OCR por regiões (complemento híbrido):
+    Em PDFs híbridos só parte da página está em imagem. `extract_regions`
+    usa as imagens embutidas informadas pelo pdfplumber (posição em pontos),
+    renderiza apenas esses recortes em DPI alto e executa o OCR em paralelo;
+    `splice_regions` insere o texto reconhecido logo após a linha nativa
+    acima de cada região. Tempo por região e pixels enviados ao Tesseract
+    são registrados no MetricsCollector.
+
 Limitações:
     - Processo lento (rasterização + OCR)
     - Qualidade depende da resolução do documento original
@@ -31,16 +53,210 @@ Example:
 import logging
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
 import pytesseract
 
 from config import settings
 from core.interfaces import TextExtractionStrategy
+from core.tracing import traced
 
-from .pdf_utils import abrir_pypdfium_com_senha
+from .pdf_session import PdfDocumentSession
 
 logger = logging.getLogger(__name__)
 
+# Histograma com o tempo de OCR de cada página (label "dpi")
+PAGE_METRIC = "ocr_page_duration_seconds"
+# Histograma com o tempo de OCR de cada região e contador de pixels OCRizados
+REGION_METRIC = "ocr_region_duration_seconds"
+REGION_PIXELS_METRIC = "ocr_region_pixels_total"
+
+# Caixas a menos de REGION_MERGE_GAP pontos uma da outra viram uma só região
+# (imagens escaneadas costumam vir fatiadas em faixas horizontais)
+REGION_MERGE_GAP = 2.0
+
+BBox = Tuple[float, float, float, float]
+
+
+@dataclass
+class OcrPageResult:
+    """Resultado do OCR de uma página."""
+
+    page: int
+    dpi: int
+    text: str
+    confidence: float
+    elapsed: float
+
+    @property
+    def useful_chars(self) -> int:
+        """Caracteres alfanuméricos reconhecidos (rendimento da página)."""
+        return sum(1 for c in self.text if c.isalnum())
+
+    def is_poor(self, min_confidence: float, min_chars: int) -> bool:
+        """True se a página deve ser refeita em resolução maior."""
+        return self.confidence < min_confidence or self.useful_chars < min_chars
+
+
+@dataclass
+class OcrRegionResult:
+    """Resultado do OCR de um recorte (imagem embutida) de uma página."""
+
+    page: int
+    bbox: BBox
+    text: str
+    confidence: float
+    pixels: int
+    elapsed: float
+
+
+def image_regions(boxes: Iterable[BBox], min_area: float, gap: float = REGION_MERGE_GAP) -> List[BBox]:
+    """
+    Une caixas de imagem sobrepostas (ou vizinhas) e descarta as pequenas.
+
+    Args:
+        boxes: Caixas (x0, top, x1, bottom) em pontos.
+        min_area: Área mínima (pontos²) de uma região após a união.
+        gap: Distância máxima entre caixas para serem unidas.
+
+    Returns:
+        Regiões em ordem de leitura (de cima para baixo, da esquerda para a direita).
+    """
+    regioes: List[BBox] = []
+    for box in boxes:
+        atual = box
+        unida = True
+        while unida:
+            unida = False
+            for i, outra in enumerate(regioes):
+                if (
+                    atual[0] <= outra[2] + gap and outra[0] <= atual[2] + gap
+                    and atual[1] <= outra[3] + gap and outra[1] <= atual[3] + gap
+                ):
+                    atual = (
+                        min(atual[0], outra[0]), min(atual[1], outra[1]),
+                        max(atual[2], outra[2]), max(atual[3], outra[3]),
+                    )
+                    del regioes[i]
+                    unida = True
+                    break
+        regioes.append(atual)
+
+    return sorted(
+        (r for r in regioes if (r[2] - r[0]) * (r[3] - r[1]) >= min_area),
+        key=lambda r: (r[1], r[0]),
+    )
+
+
+def splice_regions(base_text: str, session: PdfDocumentSession, regions: Sequence[OcrRegionResult]) -> str:
+    """
+    Insere o texto das regiões OCRizadas perto da posição delas na página.
+
+    Cada região é ancorada na última linha de texto nativo acima dela
+    (`session.page_lines`); o texto é inserido logo após a linha equivalente
+    de `base_text` (comparação com espaços normalizados, o que cobre o texto
+    com layout). Regiões no topo da página entram antes da primeira linha da
+    página; regiões sem âncora encontrada vão para o final.
+
+    Args:
+        base_text: Texto nativo (ou de tabelas) já extraído.
+        session: Sessão do documento (fornece as linhas com posição).
+        regions: Resultados de `extract_regions`.
+
+    Returns:
+        str: Texto com as regiões inseridas.
+    """
+    linhas = base_text.split("\n")
+    normalizadas = [" ".join(linha.split()) for linha in linhas]
+    # índice da linha -> textos inseridos depois dela (-1 = antes da primeira)
+    inserir: Dict[int, List[str]] = {}
+    sobras: List[str] = []
+    cursor = 0
+
+    def _procurar(ancora: str) -> int:
+        for i in range(cursor, len(normalizadas)):
+            if ancora and ancora in normalizadas[i]:
+                return i
+        return -2
+
+    for region in sorted(regions, key=lambda r: (r.page, r.bbox[1], r.bbox[0])):
+        texto = region.text.strip()
+        if not texto:
+            continue
+        try:
+            page_lines = session.page_lines(region.page)
+        except Exception:
+            page_lines = []
+
+        acima = [l for l in page_lines if l["top"] < region.bbox[1]]
+        if acima:
+            ancora = max(acima, key=lambda l: (l["top"], l["x0"]))
+            idx = _procurar(" ".join(ancora["text"].split()))
+        elif page_lines:
+            primeira = min(page_lines, key=lambda l: (l["top"], l["x0"]))
+            idx = _procurar(" ".join(primeira["text"].split()))
+            idx = idx - 1 if idx >= 0 else idx
+        else:
+            idx = -2
+
+        if idx == -2:
+            sobras.append(texto)
+            continue
+        cursor = max(cursor, idx)
+        inserir.setdefault(idx, []).append(texto)
+
+    saida: List[str] = list(inserir.get(-1, []))
+    for i, linha in enumerate(linhas):
+        saida.append(linha)
+        saida.extend(inserir.get(i, []))
+    texto = "\n".join(saida)
+    if sobras:
+        texto = texto.rstrip("\n") + "\n\n" + "\n\n".join(sobras)
+    return texto
+
+
+def ocr_image(image: Any, lang: str, config: str) -> Dict[str, Any]:
+    """
+    Executa o Tesseract em uma imagem, retornando texto e confiança média.
+
+    Usa `image_to_data` (uma única execução do Tesseract) e remonta o texto
+    linha a linha, separando blocos por linha em branco.
+
+    Args:
+        image: Imagem PIL da página.
+        lang: Idioma do OCR.
+        config: Parâmetros adicionais do Tesseract.
+
+    Returns:
+        Dict com "text" (str) e "confidence" (0-100; 0.0 sem palavras).
+    """
+    data = pytesseract.image_to_data(
+        image, lang=lang, config=config, output_type=pytesseract.Output.DICT
+    )
+
+    blocos: Dict[Any, Dict[Any, List[str]]] = {}
+    confiancas: List[float] = []
+    for i, palavra in enumerate(data.get("text", [])):
+        if not palavra or not palavra.strip():
+            continue
+        bloco = blocos.setdefault(data["block_num"][i], {})
+        bloco.setdefault((data["par_num"][i], data["line_num"][i]), []).append(palavra)
+        try:
+            conf = float(data["conf"][i])
+        except (TypeError, ValueError):
+            continue
+        if conf >= 0:
+            confiancas.append(conf)
+
+    texto = "\n\n".join(
+        "\n".join(" ".join(palavras) for palavras in linhas.values())
+        for linhas in blocos.values()
+    )
+    confianca = sum(confiancas) / len(confiancas) if confiancas else 0.0
+    return {"text": texto, "confidence": confianca}
+
 
 class TesseractOcrStrategy(TextExtractionStrategy):
     """
@@ -49,6 +265,10 @@ class TesseractOcrStrategy(TextExtractionStrategy):
     Utiliza `pypdfium2` para rasterizar o PDF em memória e `pytesseract` para extrair texto.
     Acionada quando o PDF não possui camada de texto (ex: digitalizações).
 
+    Processa até `OCR_MAX_PAGES` páginas em paralelo, começando em
+    `OCR_DPI_LOW` e escalando para `OCR_DPI_HIGH` apenas nas páginas com
+    resultado fraco.
+
     Inclui estratégia de desbloqueio por força bruta usando CNPJs das empresas
     cadastradas como candidatos a senha.
     """
@@ -61,9 +281,10 @@ class TesseractOcrStrategy(TextExtractionStrategy):
         # Se não fizer isso, vai dar erro de "tesseract not found" depois
         pytesseract.pytesseract.tesseract_cmd = settings.TESSERACT_CMD
 
-    def extract(self, file_path: str) -> str:
+    @traced("strategy.ocr")
+    def extract(self, file_path: str, session: Optional[PdfDocumentSession] = None) -> str:
         """
-        Converte PDF em imagem usando pypdfium2 e executa OCR.
+        Converte as páginas do PDF em imagem usando pypdfium2 e executa OCR.
 
         pypdfium2 rasteriza o PDF em memória (sem subprocessos),
         oferecendo performance significativamente melhor que pdf2image/Poppler.
@@ -73,51 +294,76 @@ class TesseractOcrStrategy(TextExtractionStrategy):
 
         Args:
             file_path (str): Caminho do arquivo PDF.
+            session (Optional[PdfDocumentSession]): Sessão já aberta do documento.
+                Se None, abre uma sessão própria (fechada ao final). Com sessão
+                compartilhada, os bitmaps e o texto do OCR ficam em cache, evitando
+                rodar o Tesseract duas vezes no mesmo arquivo durante o fallback.
 
         Returns:
-            str: Texto extraído da imagem. Retorna string vazia se falhar.
+            str: Texto extraído das páginas. Retorna string vazia se falhar.
 
         Raises:
             Exception: Se houver erro na conversão ou no OCR.
         """
+        if session is None:
+            with PdfDocumentSession(file_path) as own_session:
+                return self.extract(file_path, session=own_session)
+
         custom_config = settings.OCR_CONFIG
         filename = os.path.basename(file_path)
 
-        logger.info(f"🔍 [OCR] Iniciando: {filename}")
-        start_time = time.time()
-
         try:
-            # Rasterização em memória com pypdfium2 (muito mais rápido que Poppler)
-            # Usa função utilitária que tenta desbloquear PDFs protegidos
-            pdf = abrir_pypdfium_com_senha(file_path)
-
-            # Se não conseguiu abrir o PDF, retorna vazio
+            # Usa a sessão (que tenta desbloquear PDFs protegidos)
+            pdf = session.pdfium
             if pdf is None:
                 logger.warning(f"❌ [OCR] Não foi possível abrir PDF: {filename}")
                 return ""
 
-            try:
-                texto_final = ""
-                # Processa apenas a primeira página (otimização para notas fiscais)
-                page = pdf[0]
-
-                # Renderiza a página como bitmap (300 DPI é bom equilíbrio qualidade/velocidade)
-                bitmap = page.render(scale=300 / 72)  # 300 DPI
-                pil_image = bitmap.to_pil()
+            max_pages = max(1, int(getattr(settings, "OCR_MAX_PAGES", 1)))
+            pages = list(range(min(len(pdf), max_pages)))
+            if not pages:
+                return ""
 
-                # Executa OCR na imagem
-                texto_final = pytesseract.image_to_string(
-                    pil_image,
-                    lang=settings.OCR_LANG,
-                    config=custom_config
+            dpi_low = int(getattr(settings, "OCR_DPI_LOW", 300))
+            dpi_high = max(dpi_low, int(getattr(settings, "OCR_DPI_HIGH", 300)))
+
+            def _run_ocr() -> str:
+                logger.info(f"🔍 [OCR] Iniciando: {filename} ({len(pages)} página(s))")
+                start_time = time.time()
+
+                resultados = {
+                    r.page: r for r in self._ocr_pages(session, pages, dpi_low, custom_config)
+                }
+
+                min_conf = float(getattr(settings, "OCR_MIN_CONFIDENCE", 0))
+                min_chars = int(getattr(settings, "OCR_MIN_CHARS_PER_PAGE", 0))
+                fracas = [
+                    r.page for r in resultados.values() if r.is_poor(min_conf, min_chars)
+                ] if dpi_high > dpi_low else []
+                if fracas:
+                    logger.debug(
+                        f"[OCR] {filename}: escalando página(s) {fracas} para {dpi_high} DPI"
+                    )
+                    for refeita in self._ocr_pages(session, fracas, dpi_high, custom_config):
+                        anterior = resultados[refeita.page]
+                        if refeita.useful_chars >= anterior.useful_chars or (
+                            refeita.confidence > anterior.confidence
+                        ):
+                            resultados[refeita.page] = refeita
+
+                texto = "\n\n".join(
+                    resultados[p].text for p in pages if resultados[p].text.strip()
                 )
 
-            finally:
-                # Libera recursos do PDF
-                pdf.close()
+                elapsed = time.time() - start_time
+                logger.info(f"✅ [OCR] Concluído: {filename} ({len(texto)} chars em {elapsed:.1f}s)")
+                return texto
 
-            elapsed = time.time() - start_time
-            logger.info(f"✅ [OCR] Concluído: {filename} ({len(texto_final)} chars em {elapsed:.1f}s)")
+            texto_final = session.memo(
+                ("ocr", tuple(pages), dpi_low, dpi_high, settings.OCR_LANG, custom_config),
+                _run_ocr,
+                stage="ocr",
+            )
 
             # Validação: Se OCR retornou texto muito curto, considere falha
             if len(texto_final.strip()) < 50:
@@ -130,3 +376,186 @@ class TesseractOcrStrategy(TextExtractionStrategy):
             # Log do erro para rastreabilidade, mas mantém fluxo (LSP)
             logger.warning(f"Falha na estratégia OCR para {file_path}: {e}")
             return ""
+
+    @traced("strategy.ocr_regions")
+    def extract_regions(
+        self, file_path: str, session: Optional[PdfDocumentSession] = None
+    ) -> Optional[List[OcrRegionResult]]:
+        """
+        Executa OCR apenas nas imagens embutidas das primeiras páginas.
+
+        Usado pelo complemento híbrido: o texto nativo já cobre o resto da
+        página, então só os recortes com imagem (acima de
+        `HYBRID_OCR_MIN_REGION_AREA`) são renderizados, em `OCR_DPI_HIGH`.
+
+        Args:
+            file_path (str): Caminho do arquivo PDF.
+            session (Optional[PdfDocumentSession]): Sessão já aberta do documento.
+
+        Returns:
+            Optional[List[OcrRegionResult]]: Resultados por região, ou None se o
+            PDF não tem imagens utilizáveis (o chamador deve usar o OCR de página).
+        """
+        if session is None:
+            with PdfDocumentSession(file_path) as own_session:
+                return self.extract_regions(file_path, session=own_session)
+
+        custom_config = settings.OCR_CONFIG
+        try:
+            pages = session.pages
+            if not pages:
+                return None
+
+            max_pages = max(1, int(getattr(settings, "OCR_MAX_PAGES", 1)))
+            min_area = float(getattr(settings, "HYBRID_OCR_MIN_REGION_AREA", 0))
+            alvos = [
+                (p, bbox)
+                for p in range(min(len(pages), max_pages))
+                for bbox in image_regions(session.page_images(p), min_area)
+            ]
+            if not alvos:
+                return None
+
+            dpi = int(getattr(settings, "OCR_DPI_HIGH", 300))
+            return session.memo(
+                ("ocr_regions", tuple(alvos), dpi, settings.OCR_LANG, custom_config),
+                lambda: self._ocr_regions(session, alvos, dpi, custom_config),
+                stage="ocr",
+            )
+
+        except Exception as e:
+            logger.warning(f"Falha no OCR por regiões para {file_path}: {e}")
+            return None
+
+    def _ocr_regions(
+        self,
+        session: PdfDocumentSession,
+        alvos: Sequence[Tuple[int, BBox]],
+        dpi: int,
+        config: str,
+    ) -> List[OcrRegionResult]:
+        """
+        Renderiza os recortes (sequencialmente) e executa o OCR em paralelo.
+
+        Returns:
+            Lista de OcrRegionResult na mesma ordem de `alvos`.
+        """
+        start_time = time.time()
+        imagens = [session.render_region(p, bbox, scale=dpi / 72) for p, bbox in alvos]
+        lang = settings.OCR_LANG
+
+        def _ocr(item) -> OcrRegionResult:
+            (page, bbox), image = item
+            start = time.perf_counter()
+            saida = ocr_image(image, lang, config) if image is not None else {
+                "text": "", "confidence": 0.0
+            }
+            return OcrRegionResult(
+                page=page,
+                bbox=bbox,
+                text=saida["text"],
+                confidence=saida["confidence"],
+                pixels=image.width * image.height if image is not None else 0,
+                elapsed=time.perf_counter() - start,
+            )
+
+        workers = min(len(alvos), max(1, int(getattr(settings, "OCR_WORKERS", 1))))
+        itens = list(zip(alvos, imagens))
+        if workers <= 1:
+            resultados = [_ocr(item) for item in itens]
+        else:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ocr") as pool:
+                resultados = list(pool.map(_ocr, itens))
+
+        logger.info(
+            f"✅ [OCR] Regiões: {session.filename} ({len(resultados)} região(ões), "
+            f"{sum(r.pixels for r in resultados)} px em {time.time() - start_time:.1f}s)"
+        )
+        self._record_region_metrics(resultados)
+        return resultados
+
+    def _ocr_pages(
+        self,
+        session: PdfDocumentSession,
+        pages: Sequence[int],
+        dpi: int,
+        config: str,
+    ) -> List[OcrPageResult]:
+        """
+        Rasteriza as páginas no DPI informado e executa o OCR em paralelo.
+
+        A rasterização usa o handle pypdfium2 da sessão (não é thread-safe),
+        então acontece antes, sequencialmente; só o Tesseract roda em paralelo.
+
+        Returns:
+            Lista de OcrPageResult na mesma ordem de `pages`.
+        """
+        imagens = [session.render_page(i, scale=dpi / 72) for i in pages]
+        lang = settings.OCR_LANG
+
+        def _ocr(index_image) -> OcrPageResult:
+            page, image = index_image
+            start = time.perf_counter()
+            saida = ocr_image(image, lang, config) if image is not None else {
+                "text": "", "confidence": 0.0
+            }
+            return OcrPageResult(
+                page=page,
+                dpi=dpi,
+                text=saida["text"],
+                confidence=saida["confidence"],
+                elapsed=time.perf_counter() - start,
+            )
+
+        workers = min(len(pages), max(1, int(getattr(settings, "OCR_WORKERS", 1))))
+        itens = list(zip(pages, imagens))
+        if workers <= 1:
+            resultados = [_ocr(item) for item in itens]
+        else:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ocr") as pool:
+                resultados = list(pool.map(_ocr, itens))
+
+        self._record_page_timings(session.filename, resultados)
+        return resultados
+
+    @staticmethod
+    def _record_page_timings(filename: str, resultados: Sequence[OcrPageResult]) -> None:
+        """Registra o tempo de OCR por página (log em debug e histograma)."""
+        for r in resultados:
+            logger.debug(
+                f"[OCR] {filename} p{r.page + 1} @ {r.dpi} DPI: "
+                f"{r.useful_chars} chars, conf={r.confidence:.0f}, {r.elapsed:.2f}s"
+            )
+
+        try:
+            from core.metrics import MetricsCollector
+
+            collector = MetricsCollector()
+            for r in resultados:
+                collector.observe_histogram(
+                    PAGE_METRIC,
+                    r.elapsed,
+                    {"dpi": str(r.dpi)},
+                    "Tempo de OCR por página",
+                )
+        except Exception as e:
+            logger.debug(f"[OCR] Falha ao reportar métricas: {e}")
+
+    @staticmethod
+    def _record_region_metrics(resultados: Sequence[OcrRegionResult]) -> None:
+        """Registra o tempo de OCR por região e os pixels OCRizados."""
+        try:
+            from core.metrics import MetricsCollector
+
+            collector = MetricsCollector()
+            for r in resultados:
+                collector.observe_histogram(
+                    REGION_METRIC, r.elapsed, description="Tempo de OCR por região de imagem"
+                )
+            collector.increment(
+                REGION_PIXELS_METRIC,
+                float(sum(r.pixels for r in resultados)),
+                description="Pixels enviados ao Tesseract no OCR por regiões",
+            )
+        except Exception as e:
+            logger.debug(f"[OCR] Falha ao reportar métricas: {e}")
@@ -0,0 +1,397 @@
+"""
+Resolução de senhas de PDFs protegidos, com memória persistente.
+
+Antes, cada estratégia que abria um PDF protegido refazia a força bruta:
+`gerar_candidatos_senha()` reconstruía a lista a partir do cadastro e cada
+candidato custava um `pdfplumber.open` completo (parse de todas as páginas
+pelo pdfminer). Boletos do mesmo fornecedor usam quase sempre a mesma senha,
+mas essa informação se perdia entre arquivos e execuções.
+
+O `PdfPasswordResolver`:
+    1. Lê os bytes do arquivo uma vez e verifica cada candidato com o
+       pypdfium2 a partir da memória (só xref/trailer, sem parse de páginas).
+    2. Consulta primeiro a senha já conhecida para o SHA-256 do arquivo
+       (em memória e no SQLite).
+    3. Ordena os candidatos pelo histórico de acertos do remetente (domínio
+       do e-mail e CNPJ citado no corpo, lidos do `metadata.json` do lote),
+       depois pelos acertos globais, depois pela ordem original.
+    4. Grava a senha vencedora por arquivo e por remetente.
+
+`desbloquear_pdfplumber`/`desbloquear_pypdfium` consultam o resolvedor após
+detectar o erro de senha, então todas as estratégias (e todos os processos,
+via SQLite) compartilham o resultado.
+
+Estrutura do banco:
+    file_passwords(file_hash, password, resolved_at)
+    sender_passwords(sender, password, successes, last_success)
+
+Example:
+    >>> from strategies.pdf_password import get_password_resolver
+    >>> senha = get_password_resolver().resolve("temp_email/lote/boleto.pdf")
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Union
+
+import pypdfium2 as pdfium
+
+logger = logging.getLogger(__name__)
+
+# Chave de remetente que acumula os acertos de todos os arquivos
+GLOBAL_SENDER = "*"
+
+
+def sender_keys(file_path: Union[str, Path]) -> List[str]:
+    """
+    Chaves de remetente do arquivo, a partir do `metadata.json` do lote.
+
+    Returns:
+        Lista com 'domain:<domínio>' e 'cnpj:<cnpj>' (quando disponíveis).
+    """
+    from core.metadata import EmailMetadata
+
+    try:
+        metadata = EmailMetadata.load(Path(file_path).parent)
+    except Exception as e:
+        logger.debug(f"[PdfPassword] metadata.json ilegível: {e}")
+        return []
+    if metadata is None:
+        return []
+
+    keys = []
+    address = (metadata.email_sender_address or "").strip().lower()
+    if "@" in address:
+        keys.append(f"domain:{address.rsplit('@', 1)[1].strip('> ')}")
+    try:
+        cnpj = metadata.extract_cnpj_from_body()
+    except Exception:
+        cnpj = None
+    if cnpj:
+        digits = "".join(ch for ch in cnpj if ch.isdigit())
+        if digits:
+            keys.append(f"cnpj:{digits}")
+    return keys
+
+
+class PdfPasswordStore:
+    """
+    Senhas vencedoras por arquivo e contagem de acertos por remetente (SQLite).
+
+    Falhas do banco nunca interrompem a leitura do PDF: são logadas em debug
+    e tratadas como ausência de histórico.
+
+    Args:
+        path: Caminho do arquivo SQLite.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Conexões SQLite não viajam entre processos."""
+        state = self.__dict__.copy()
+        state["_conn"] = None
+        state["_lock"] = None
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is not None and self._pid != os.getpid():
+            # Conexão herdada via fork: não pode ser reutilizada no filho
+            self._conn = None
+            self._pid = os.getpid()
+
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS file_passwords (
+                    file_hash TEXT PRIMARY KEY,
+                    password TEXT NOT NULL,
+                    resolved_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS sender_passwords (
+                    sender TEXT NOT NULL,
+                    password TEXT NOT NULL,
+                    successes INTEGER NOT NULL,
+                    last_success REAL NOT NULL,
+                    PRIMARY KEY (sender, password)
+                )
+                """
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        """Fecha a conexão (reaberta sob demanda)."""
+        if self._conn is not None and self._pid == os.getpid():
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+        self._conn = None
+
+    def get_file(self, file_hash: str) -> Optional[str]:
+        """Senha que já desbloqueou o arquivo (None se desconhecida)."""
+        try:
+            with self._lock:
+                row = self._connection().execute(
+                    "SELECT password FROM file_passwords WHERE file_hash = ?", (file_hash,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.debug(f"[PdfPassword] Falha na leitura: {e}")
+            return None
+        return row[0] if row else None
+
+    def forget_file(self, file_hash: str) -> None:
+        """Descarta a senha do arquivo (ex: deixou de funcionar)."""
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute("DELETE FROM file_passwords WHERE file_hash = ?", (file_hash,))
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.debug(f"[PdfPassword] Falha na escrita: {e}")
+
+    def sender_successes(self, senders: Sequence[str]) -> Dict[str, Dict[str, int]]:
+        """Acertos por senha de cada remetente: {remetente: {senha: acertos}}."""
+        result: Dict[str, Dict[str, int]] = {sender: {} for sender in senders}
+        if not senders:
+            return result
+        placeholders = ",".join("?" for _ in senders)
+        try:
+            with self._lock:
+                rows = self._connection().execute(
+                    "SELECT sender, password, successes FROM sender_passwords "
+                    f"WHERE sender IN ({placeholders})",
+                    tuple(senders),
+                ).fetchall()
+        except sqlite3.Error as e:
+            logger.debug(f"[PdfPassword] Falha na leitura: {e}")
+            return result
+        for sender, password, successes in rows:
+            result[sender][password] = successes
+        return result
+
+    def record_success(
+        self, file_hash: str, password: str, senders: Iterable[str]
+    ) -> None:
+        """Grava a senha do arquivo e soma um acerto para cada remetente."""
+        agora = time.time()
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute(
+                    "INSERT OR REPLACE INTO file_passwords "
+                    "(file_hash, password, resolved_at) VALUES (?, ?, ?)",
+                    (file_hash, password, agora),
+                )
+                conn.executemany(
+                    "INSERT INTO sender_passwords (sender, password, successes, last_success) "
+                    "VALUES (?, ?, 1, ?) ON CONFLICT(sender, password) DO UPDATE SET "
+                    "successes = successes + 1, last_success = excluded.last_success",
+                    [(sender, password, agora) for sender in senders],
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.debug(f"[PdfPassword] Falha na escrita: {e}")
+
+    def clear(self) -> None:
+        """Remove todo o histórico."""
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM file_passwords")
+            conn.execute("DELETE FROM sender_passwords")
+            conn.commit()
+
+
+class PdfPasswordResolver:
+    """
+    Descobre a senha de um PDF protegido verificando candidatos em memória.
+
+    O resultado é memorizado por SHA-256 do arquivo no processo (inclusive
+    "nenhuma senha funciona") e, com `store`, persistido entre execuções.
+
+    Args:
+        candidates_factory: Gera os candidatos padrão (chamada uma vez).
+        store: Histórico persistente; None mantém apenas a memória do processo.
+    """
+
+    def __init__(
+        self,
+        candidates_factory: Callable[[], List[str]],
+        store: Optional[PdfPasswordStore] = None,
+    ):
+        self.store = store
+        self._candidates_factory = candidates_factory
+        self._candidates: Optional[List[str]] = None
+        self._memo: Dict[str, Optional[str]] = {}
+        self._lock = threading.Lock()
+
+    def candidates(self) -> List[str]:
+        """Candidatos padrão (gerados a partir do cadastro uma única vez)."""
+        if self._candidates is None:
+            self._candidates = list(self._candidates_factory())
+        return self._candidates
+
+    def ordered_candidates(self, senders: Sequence[str] = ()) -> List[str]:
+        """
+        Candidatos ordenados por acertos do remetente, depois acertos globais.
+
+        Senhas que já funcionaram para o remetente entram mesmo que não
+        estejam mais entre os candidatos padrão.
+        """
+        base = self.candidates()
+        if self.store is None:
+            return list(base)
+
+        keys = list(senders) + [GLOBAL_SENDER]
+        history = self.store.sender_successes(keys)
+        global_hits = history.get(GLOBAL_SENDER, {})
+        sender_hits: Dict[str, int] = {}
+        for sender in senders:
+            for password, successes in history.get(sender, {}).items():
+                sender_hits[password] = sender_hits.get(password, 0) + successes
+
+        pool = list(dict.fromkeys(list(base) + list(sender_hits)))
+        position = {password: i for i, password in enumerate(pool)}
+        return sorted(
+            pool,
+            key=lambda p: (-sender_hits.get(p, 0), -global_hits.get(p, 0), position[p]),
+        )
+
+    @staticmethod
+    def _verify(data: bytes, password: Optional[str]) -> bool:
+        """Se o pypdfium2 abre os bytes com a senha (None = sem senha)."""
+        try:
+            if password is None:
+                doc = pdfium.PdfDocument(data)
+            else:
+                doc = pdfium.PdfDocument(data, password=password)
+        except pdfium.PdfiumError:
+            return False
+        try:
+            doc.close()
+        except Exception:
+            pass
+        return True
+
+    def resolve(self, file_path: Union[str, Path]) -> Optional[str]:
+        """
+        Senha que desbloqueia o arquivo.
+
+        Returns:
+            A senha; "" se o PDF abre sem senha (o erro do chamador tem outra
+            causa); None se nenhum candidato funciona.
+
+        Raises:
+            OSError: Se o arquivo não puder ser lido (nada foi verificado).
+        """
+        data = Path(file_path).read_bytes()
+        file_hash = hashlib.sha256(data).hexdigest()
+        filename = os.path.basename(str(file_path))
+
+        with self._lock:
+            if file_hash in self._memo:
+                return self._memo[file_hash]
+
+        start = time.time()
+        if self._verify(data, None):
+            return self._remember(file_hash, "", "unprotected", 0, start)
+
+        if self.store is not None:
+            stored = self.store.get_file(file_hash)
+            if stored is not None:
+                if self._verify(data, stored):
+                    return self._remember(file_hash, stored, "file", 1, start)
+                self.store.forget_file(file_hash)
+
+        senders = sender_keys(file_path)
+        candidatos = self.ordered_candidates(senders)
+        logger.debug(f"Testando {len(candidatos)} candidatos de senha para {filename}")
+        for attempts, senha in enumerate(candidatos, start=1):
+            if self._verify(data, senha):
+                if self.store is not None:
+                    self.store.record_success(file_hash, senha, senders + [GLOBAL_SENDER])
+                logger.info(
+                    f"✅ Senha de {filename} encontrada na tentativa {attempts}"
+                    f"/{len(candidatos)}"
+                )
+                return self._remember(file_hash, senha, "search", attempts, start)
+
+        return self._remember(file_hash, None, "unknown", len(candidatos), start)
+
+    def _remember(
+        self,
+        file_hash: str,
+        senha: Optional[str],
+        source: str,
+        attempts: int,
+        start: float,
+    ) -> Optional[str]:
+        with self._lock:
+            self._memo[file_hash] = senha
+        try:
+            from core.metrics import IngestionMetrics
+
+            IngestionMetrics().record_pdf_password_resolution(
+                source, attempts, time.time() - start
+            )
+        except Exception as e:
+            logger.debug(f"[PdfPassword] Falha ao reportar métricas: {e}")
+        return senha
+
+    def clear_memo(self) -> None:
+        """Esquece os resultados memorizados no processo."""
+        with self._lock:
+            self._memo.clear()
+
+
+_default_resolver: Optional[PdfPasswordResolver] = None
+_default_resolver_lock = threading.Lock()
+
+
+def get_password_resolver() -> PdfPasswordResolver:
+    """
+    Retorna o resolvedor padrão configurado em `settings`.
+
+    Com `settings.PDF_PASSWORD_STORE_ENABLED` desligado, o histórico fica
+    apenas em memória.
+    """
+    global _default_resolver
+    from config import settings
+
+    from .pdf_utils import gerar_candidatos_senha
+
+    path = None
+    if getattr(settings, "PDF_PASSWORD_STORE_ENABLED", True):
+        path = Path(getattr(settings, "PDF_PASSWORD_STORE_PATH"))
+
+    with _default_resolver_lock:
+        current = _default_resolver
+        current_path = current.store.path if current and current.store else None
+        if current is None or current_path != path:
+            store = PdfPasswordStore(path) if path is not None else None
+            _default_resolver = PdfPasswordResolver(gerar_candidatos_senha, store)
+        return _default_resolver
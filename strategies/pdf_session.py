@@ -0,0 +1,424 @@
+"""
+Sessão de documento PDF compartilhada entre as estratégias de extração.
+
+Antes, `NativePdfStrategy`, `TablePdfStrategy` e `TesseractOcrStrategy`
+abriam o mesmo arquivo de forma independente, repetindo o parse do
+pdfminer e a força bruta de senha a cada tentativa. Em PDFs híbridos isso
+significava decriptar e parsear os mesmos bytes três ou mais vezes.
+
+A `PdfDocumentSession` abre o arquivo uma única vez (sob demanda) e mantém
+em cache:
+    - A senha que desbloqueou o PDF (reaproveitada entre pdfplumber e pypdfium2)
+    - Os handles abertos e a lista de páginas
+    - Texto simples e texto com layout por página
+    - Tabelas por página
+    - Linhas de texto e imagens embutidas por página (com posição)
+    - Bitmaps renderizados (por página e escala, ou recortes de região)
+    - Resultados arbitrários via `memo()` (ex: texto de OCR)
+
+O tempo gasto em cada estágio (abertura, texto simples, layout, tabelas,
+renderização, OCR) é acumulado em `timings` e reportado ao
+`MetricsCollector` quando a sessão é fechada, junto com as páginas cujo
+texto foi lido e as que ficaram de fora (orçamento de páginas, ver
+`PagedText`).
+
+Example:
+    >>> from strategies.pdf_session import PdfDocumentSession
+    >>> with PdfDocumentSession("documento.pdf") as session:
+    ...     texto = session.page_text(0)
+    ...     print(session.timings)
+"""
+
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from .pdf_utils import desbloquear_pdfplumber, desbloquear_pypdfium
+
+logger = logging.getLogger(__name__)
+
+# Nome do histograma registrado no MetricsCollector (label "stage")
+STAGE_METRIC = "pdf_session_stage_duration_seconds"
+# Contador de páginas por documento (label "status": parsed/skipped)
+PAGES_METRIC = "pdf_session_pages_total"
+
+
+def page_window(page_count: int, first: int, last: int) -> Tuple[int, ...]:
+    """Índices das `first` primeiras e `last` últimas páginas, em ordem."""
+    first = max(0, first)
+    last = max(0, last)
+    indices = set(range(min(first, page_count)))
+    indices.update(range(max(0, page_count - last), page_count))
+    return tuple(sorted(indices))
+
+
+class PdfDocumentSession:
+    """
+    Mantém um PDF aberto e os artefatos já extraídos durante o fallback.
+
+    Todos os handles são abertos de forma preguiçosa: uma sessão criada para
+    um arquivo inexistente não falha até que algum dado seja solicitado, e
+    mesmo assim os acessores retornam valores vazios (None/""/[]) em vez de
+    lançar exceções, mantendo o contrato das estratégias (LSP).
+
+    Args:
+        file_path: Caminho do arquivo PDF.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.filename = os.path.basename(file_path)
+        self.timings: Dict[str, float] = {}
+
+        self._senha: Optional[str] = None
+        self._plumber: Optional[Any] = None
+        self._plumber_opened = False
+        self._pdfium: Optional[Any] = None
+        self._pdfium_opened = False
+        self._cache: Dict[Hashable, Any] = {}
+        self._text_pages: Set[int] = set()
+        self._closed = False
+
+    # ------------------------------------------------------------------
+    # Contexto
+    # ------------------------------------------------------------------
+
+    def __enter__(self) -> "PdfDocumentSession":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Fecha os handles abertos e reporta os tempos por estágio."""
+        if self._closed:
+            return
+        self._closed = True
+
+        self._report_pages()
+
+        for handle in (self._plumber, self._pdfium):
+            if handle is None:
+                continue
+            try:
+                handle.close()
+            except Exception:
+                pass
+        self._plumber = None
+        self._pdfium = None
+        self._cache.clear()
+
+        self._report_timings()
+
+    # ------------------------------------------------------------------
+    # Tempos por estágio
+    # ------------------------------------------------------------------
+
+    def _record(self, stage: str, elapsed: float) -> None:
+        self.timings[stage] = self.timings.get(stage, 0.0) + elapsed
+
+    def _report_timings(self) -> None:
+        if not self.timings:
+            return
+
+        resumo = ", ".join(f"{k}={v:.3f}s" for k, v in self.timings.items())
+        logger.debug(f"[PdfSession] {self.filename}: {resumo}")
+
+        try:
+            from core.metrics import MetricsCollector
+
+            collector = MetricsCollector()
+            for stage, elapsed in self.timings.items():
+                collector.observe_histogram(
+                    STAGE_METRIC,
+                    elapsed,
+                    {"stage": stage},
+                    "Tempo gasto por estágio de leitura do PDF",
+                )
+        except Exception as e:
+            logger.debug(f"[PdfSession] Falha ao reportar métricas: {e}")
+
+    def _report_pages(self) -> None:
+        """Páginas com texto lido vs. ignoradas (só se as páginas foram carregadas)."""
+        if "pages" not in self._cache:
+            return
+        parsed = len(self._text_pages)
+        skipped = max(0, len(self._cache["pages"]) - parsed)
+        try:
+            from core.metrics import MetricsCollector
+
+            collector = MetricsCollector()
+            for status, count in (("parsed", parsed), ("skipped", skipped)):
+                if count:
+                    collector.increment(
+                        PAGES_METRIC,
+                        count,
+                        {"status": status},
+                        "Páginas de PDF com texto lido ou ignoradas pelo orçamento",
+                    )
+        except Exception as e:
+            logger.debug(f"[PdfSession] Falha ao reportar páginas: {e}")
+
+    @property
+    def text_pages(self) -> Tuple[int, ...]:
+        """Índices das páginas cujo texto já foi lido (qualquer modo)."""
+        return tuple(sorted(self._text_pages))
+
+    def memo(self, key: Hashable, factory: Callable[[], Any], stage: Optional[str] = None) -> Any:
+        """
+        Retorna o valor em cache para `key` ou o calcula com `factory`.
+
+        Args:
+            key: Chave do cache (única dentro da sessão).
+            factory: Função sem argumentos que produz o valor.
+            stage: Nome do estágio para contabilizar o tempo (opcional).
+
+        Returns:
+            Valor em cache ou recém-calculado.
+        """
+        if key in self._cache:
+            return self._cache[key]
+
+        start = time.perf_counter()
+        try:
+            value = factory()
+        finally:
+            if stage:
+                self._record(stage, time.perf_counter() - start)
+
+        self._cache[key] = value
+        return value
+
+    # ------------------------------------------------------------------
+    # Handles
+    # ------------------------------------------------------------------
+
+    @property
+    def senha(self) -> Optional[str]:
+        """Senha que desbloqueou o PDF (None se não protegido ou desconhecido)."""
+        return self._senha
+
+    @property
+    def plumber(self) -> Optional[Any]:
+        """Documento pdfplumber aberto (None se não foi possível abrir)."""
+        if not self._plumber_opened:
+            self._plumber_opened = True
+            start = time.perf_counter()
+            try:
+                self._plumber, senha = desbloquear_pdfplumber(self.file_path, self._senha)
+                if senha:
+                    self._senha = senha
+            except Exception as e:
+                logger.debug(f"[PdfSession] pdfplumber falhou em {self.filename}: {e}")
+                self._plumber = None
+            finally:
+                self._record("open_pdfplumber", time.perf_counter() - start)
+        return self._plumber
+
+    @property
+    def pdfium(self) -> Optional[Any]:
+        """Documento pypdfium2 aberto (None se não foi possível abrir)."""
+        if not self._pdfium_opened:
+            self._pdfium_opened = True
+            start = time.perf_counter()
+            try:
+                self._pdfium, senha = desbloquear_pypdfium(self.file_path, self._senha)
+                if senha:
+                    self._senha = senha
+            except Exception as e:
+                logger.debug(f"[PdfSession] pypdfium2 falhou em {self.filename}: {e}")
+                self._pdfium = None
+            finally:
+                self._record("open_pypdfium", time.perf_counter() - start)
+        return self._pdfium
+
+    @property
+    def pages(self) -> List[Any]:
+        """Páginas do documento pdfplumber (lista vazia se não abriu)."""
+        pdf = self.plumber
+        if pdf is None:
+            return []
+        return self.memo("pages", lambda: list(pdf.pages or []), stage="pages")
+
+    # ------------------------------------------------------------------
+    # Conteúdo
+    # ------------------------------------------------------------------
+
+    def page_text(self, index: int, layout: bool = False, **kwargs: Any) -> str:
+        """
+        Texto de uma página via pdfplumber (cacheado por página e parâmetros).
+
+        Args:
+            index: Índice da página (0-based).
+            layout: Se True, preserva o layout (mais lento).
+            **kwargs: Parâmetros adicionais de `extract_text` (ex: x_tolerance).
+
+        Returns:
+            str: Texto da página ou string vazia.
+        """
+        page = self.pages[index]
+        self._text_pages.add(index)
+        key: Tuple = ("text", index, layout, tuple(sorted(kwargs.items())))
+        stage = "text_layout" if layout else "text_simple"
+
+        def _extract() -> str:
+            if layout:
+                return page.extract_text(layout=True, **kwargs) or ""
+            return page.extract_text(**kwargs) or ""
+
+        return self.memo(key, _extract, stage=stage)
+
+    def page_tables(self, index: int) -> List[Any]:
+        """Tabelas detectadas em uma página (cacheadas)."""
+        page = self.pages[index]
+        return self.memo(("tables", index), lambda: page.extract_tables() or [], stage="tables")
+
+    def page_lines(self, index: int) -> List[Dict[str, Any]]:
+        """
+        Linhas de texto nativo de uma página com posição (cacheadas).
+
+        Returns:
+            Lista de dicts com "text", "x0", "top", "x1", "bottom" (pontos,
+            origem no canto superior esquerdo), em ordem de leitura.
+        """
+        page = self.pages[index]
+
+        def _lines() -> List[Dict[str, Any]]:
+            return [
+                {k: line[k] for k in ("text", "x0", "top", "x1", "bottom")}
+                for line in page.extract_text_lines(return_chars=False) or []
+            ]
+
+        return self.memo(("lines", index), _lines, stage="text_lines")
+
+    def page_images(self, index: int) -> List[Tuple[float, float, float, float]]:
+        """
+        Caixas (x0, top, x1, bottom) das imagens embutidas na página, em pontos.
+
+        Usa os objetos de imagem do pdfplumber: não rasteriza nada.
+        """
+        page = self.pages[index]
+
+        def _images() -> List[Tuple[float, float, float, float]]:
+            caixas = []
+            for image in page.images or []:
+                x0 = max(0.0, float(image["x0"]))
+                top = max(0.0, float(image["top"]))
+                x1 = min(float(page.width), float(image["x1"]))
+                bottom = min(float(page.height), float(image["bottom"]))
+                if x1 > x0 and bottom > top:
+                    caixas.append((x0, top, x1, bottom))
+            return caixas
+
+        return self.memo(("images", index), _images, stage="images")
+
+    def render_page(self, index: int, scale: float) -> Optional[Any]:
+        """
+        Renderiza uma página como imagem PIL via pypdfium2 (cacheada por escala).
+
+        Args:
+            index: Índice da página (0-based).
+            scale: Fator de escala (DPI / 72).
+
+        Returns:
+            Optional[PIL.Image.Image]: Imagem renderizada ou None se o PDF não abriu.
+        """
+        pdf = self.pdfium
+        if pdf is None:
+            return None
+
+        def _render() -> Any:
+            bitmap = pdf[index].render(scale=scale)
+            return bitmap.to_pil()
+
+        return self.memo(("render", index, scale), _render, stage="render")
+
+    def render_region(
+        self, index: int, bbox: Tuple[float, float, float, float], scale: float
+    ) -> Optional[Any]:
+        """
+        Renderiza só um recorte da página (sem rasterizar a página inteira).
+
+        Args:
+            index: Índice da página (0-based).
+            bbox: (x0, top, x1, bottom) em pontos, origem no canto superior esquerdo
+                (mesmo sistema do pdfplumber).
+            scale: Fator de escala (DPI / 72).
+
+        Returns:
+            Optional[PIL.Image.Image]: Recorte renderizado ou None se o PDF não abriu.
+        """
+        pdf = self.pdfium
+        if pdf is None:
+            return None
+
+        def _render() -> Any:
+            page = pdf[index]
+            width, height = page.get_size()
+            x0, top, x1, bottom = bbox
+            # pypdfium2 recebe o recorte como margens (esquerda, baixo, direita, cima)
+            crop = (
+                max(0.0, x0),
+                max(0.0, height - bottom),
+                max(0.0, width - x1),
+                max(0.0, top),
+            )
+            return page.render(scale=scale, crop=crop).to_pil()
+
+        return self.memo(("render_region", index, bbox, scale), _render, stage="render")
+
+
+class PagedText(str):
+    """
+    Texto nativo de parte das páginas de um PDF (orçamento de páginas).
+
+    Em faturas longas (TIM, NFCom com dezenas de páginas de detalhamento) a
+    maior parte do tempo ia para o pdfminer em páginas que nenhum extrator
+    lê. `NativePdfStrategy` com `page_budget` devolve um `PagedText`: o valor
+    é o texto das páginas já lidas, em ordem (mesmo formato da leitura
+    completa), e a sessão continua aberta para ler as demais sob demanda.
+
+    Quem recebe um `PagedText` é dono da sessão e deve chamar `close()`.
+
+    Attributes:
+        session: Sessão aberta do documento.
+        pages_read: Índices das páginas incluídas no texto.
+    """
+
+    session: PdfDocumentSession
+    pages_read: Tuple[int, ...]
+
+    def __new__(cls, session: PdfDocumentSession, pages: Iterable[int]) -> "PagedText":
+        pages_read = tuple(sorted(set(pages)))
+        text = "".join(session.page_text(i) + "\n" for i in pages_read)
+        obj = super().__new__(cls, text)
+        obj.session = session
+        obj.pages_read = pages_read
+        return obj
+
+    @property
+    def page_count(self) -> int:
+        return len(self.session.pages)
+
+    @property
+    def complete(self) -> bool:
+        """True se todas as páginas estão no texto."""
+        return len(self.pages_read) >= self.page_count
+
+    def with_pages(self, first: int, last: int) -> "PagedText":
+        """Texto acrescido das `first` primeiras e `last` últimas páginas."""
+        extra = set(page_window(self.page_count, first, last)) - set(self.pages_read)
+        if not extra:
+            return self
+        return PagedText(self.session, self.pages_read + tuple(extra))
+
+    def full(self) -> "PagedText":
+        """Texto do documento inteiro (lê as páginas que faltam)."""
+        if self.complete:
+            return self
+        return PagedText(self.session, range(self.page_count))
+
+    def close(self) -> None:
+        """Fecha a sessão (e reporta páginas lidas/ignoradas)."""
+        self.session.close()
@@ -8,11 +8,17 @@ Funcionalidades:
     - Geração de candidatos de senha baseados em CNPJs cadastrados
     - Abertura de PDFs com tentativa automática de desbloqueio
     - Suporte para pdfplumber e pypdfium2
+    - Variantes `desbloquear_*` que retornam a senha usada (reaproveitada
+      pela `PdfDocumentSession` entre pdfplumber e pypdfium2)
+    - Descoberta da senha delegada ao `PdfPasswordResolver`
+      (strategies/pdf_password.py), que verifica os candidatos em memória e
+      lembra a senha por arquivo e por remetente; a força bruta com o
+      próprio leitor fica como último recurso
 """
 
 import logging
 import os
-from typing import Any, List, Optional
+from typing import Any, List, Optional, Tuple
 
 import pdfplumber
 import pypdfium2 as pdfium
@@ -58,13 +64,37 @@ def gerar_candidatos_senha() -> List[str]:
     return sorted(list(candidatos))
 
 
+def _resolver_senha(file_path: str) -> Tuple[bool, Optional[str]]:
+    """
+    Consulta o `PdfPasswordResolver` para um PDF protegido.
+
+    Returns:
+        (verificado, senha): `verificado` é False quando o resolvedor não
+        conseguiu ler o arquivo; nesse caso o chamador recorre à força bruta
+        com o próprio leitor. Com `verificado` True, `senha` é a senha
+        encontrada, "" se o PDF abre sem senha no pypdfium2 (o erro do leitor
+        chamador tem outra causa, que a força bruta dele ainda pode contornar),
+        ou None se nenhuma funciona.
+    """
+    from .pdf_password import get_password_resolver
+
+    try:
+        return True, get_password_resolver().resolve(file_path)
+    except OSError:
+        return False, None
+    except Exception as e:
+        logger.debug(f"Resolvedor de senha indisponível para {file_path}: {e}")
+        return False, None
+
+
 def abrir_pdfplumber_com_senha(file_path: str) -> Optional[Any]:
     """
     Tenta abrir um PDF com pdfplumber, aplicando força bruta de senhas se necessário.
 
     Estratégia de desbloqueio:
         1. Tenta abrir sem senha
-        2. Se falhar com erro de senha, itera sobre candidatos de senha
+        2. Se falhar com erro de senha, pede a senha ao `PdfPasswordResolver`
+           (força bruta com pdfplumber só se o resolvedor não ler o arquivo)
         3. Retorna o documento aberto ou None se falhar
 
     Args:
@@ -76,8 +106,38 @@ def abrir_pdfplumber_com_senha(file_path: str) -> Optional[Any]:
     Note:
         O chamador é responsável por fechar o documento (usar com `with` ou chamar .close()).
     """
+    pdf, _ = desbloquear_pdfplumber(file_path)
+    return pdf
+
+
+def desbloquear_pdfplumber(
+    file_path: str, senha_conhecida: Optional[str] = None
+) -> Tuple[Optional[Any], Optional[str]]:
+    """
+    Variante de `abrir_pdfplumber_com_senha` que também retorna a senha usada.
+
+    Se `senha_conhecida` for informada (ex: já descoberta pelo pypdfium2 para o
+    mesmo arquivo), ela é testada antes da força bruta.
+
+    Args:
+        file_path (str): Caminho do arquivo PDF.
+        senha_conhecida (Optional[str]): Senha a testar primeiro.
+
+    Returns:
+        Tuple[Optional[pdfplumber.PDF], Optional[str]]: Documento aberto (ou None)
+        e a senha que o desbloqueou (None se o PDF não é protegido).
+    """
     filename = os.path.basename(file_path)
 
+    if senha_conhecida:
+        try:
+            pdf = pdfplumber.open(file_path, password=senha_conhecida)
+            if pdf.pages:
+                logger.debug(f"PDF aberto com senha conhecida (pdfplumber): {filename}")
+                return pdf, senha_conhecida
+        except Exception:
+            logger.debug(f"PDF {filename}: senha conhecida rejeitada (pdfplumber)")
+
     # 1. Tentar abrir sem senha
     try:
         pdf = pdfplumber.open(file_path)
@@ -89,10 +149,10 @@ def abrir_pdfplumber_com_senha(file_path: str) -> Optional[Any]:
             # Se o PDF for escaneado (sem texto nativo), a estratégia de extração
             # usará OCR posteriormente.
             logger.debug(f"PDF aberto sem senha (pdfplumber): {filename}")
-            return pdf
+            return pdf, None
         else:
             logger.debug(f"PDF {filename}: sem páginas")
-            return None
+            return None, None
     except Exception as e:
         error_msg = str(e).lower()
         error_type = type(e).__name__
@@ -111,13 +171,32 @@ def abrir_pdfplumber_com_senha(file_path: str) -> Optional[Any]:
             logger.debug(
                 f"PDF {filename}: pdfplumber indisponível ({error_type}: {error_msg})"
             )
-            return None
+            return None, None
 
         logger.debug(
             f"PDF {filename}: protegido por senha, tentando desbloqueio (pdfplumber)"
         )
 
-    # 2. Gerar candidatos e tentar cada um
+    # 2. Senha verificada pelo resolvedor (memória por arquivo/remetente)
+    verificado, senha = _resolver_senha(file_path)
+    if verificado and senha is None:
+        logger.info(f"PDF {filename}: senha desconhecida (pdfplumber)")
+        return None, None
+    if verificado and senha == "":
+        logger.debug(
+            f"PDF {filename}: resolvedor abre sem senha; força bruta com pdfplumber"
+        )
+    elif verificado:
+        try:
+            pdf = pdfplumber.open(file_path, password=senha)
+            if pdf.pages:
+                logger.debug(f"PDF {filename} desbloqueado (pdfplumber)")
+                return pdf, senha
+        except Exception:
+            logger.debug(f"PDF {filename}: senha do resolvedor rejeitada (pdfplumber)")
+
+    # 3. Força bruta com o próprio pdfplumber (resolvedor não leu o arquivo ou
+    #    o abre sem senha)
     candidatos = gerar_candidatos_senha()
     logger.debug(f"Testando {len(candidatos)} candidatos de senha para {filename}")
 
@@ -130,14 +209,14 @@ def abrir_pdfplumber_com_senha(file_path: str) -> Optional[Any]:
                 logger.info(
                     f"✅ PDF desbloqueado com senha '{senha}' (pdfplumber): {filename}"
                 )
-                return pdf
+                return pdf, senha
         except Exception:
             # Senha incorreta, continuar tentando
             continue
 
-    # 3. Nenhuma senha funcionou
+    # 4. Nenhuma senha funcionou
     logger.info(f"PDF {filename}: senha desconhecida (pdfplumber)")
-    return None
+    return None, None
 
 
 def abrir_pypdfium_com_senha(file_path: str) -> Optional[Any]:
@@ -146,7 +225,8 @@ def abrir_pypdfium_com_senha(file_path: str) -> Optional[Any]:
 
     Estratégia de desbloqueio:
         1. Tenta abrir sem senha
-        2. Se falhar com "Incorrect password", itera sobre candidatos de senha
+        2. Se falhar com "Incorrect password", pede a senha ao
+           `PdfPasswordResolver` (força bruta só se ele não ler o arquivo)
         3. Retorna o documento aberto ou None se falhar
 
     Args:
@@ -158,25 +238,69 @@ def abrir_pypdfium_com_senha(file_path: str) -> Optional[Any]:
     Note:
         O chamador é responsável por fechar o documento (chamar .close()).
     """
+    pdf, _ = desbloquear_pypdfium(file_path)
+    return pdf
+
+
+def desbloquear_pypdfium(
+    file_path: str, senha_conhecida: Optional[str] = None
+) -> Tuple[Optional[Any], Optional[str]]:
+    """
+    Variante de `abrir_pypdfium_com_senha` que também retorna a senha usada.
+
+    Args:
+        file_path (str): Caminho do arquivo PDF.
+        senha_conhecida (Optional[str]): Senha a testar antes da força bruta.
+
+    Returns:
+        Tuple[Optional[pdfium.PdfDocument], Optional[str]]: Documento aberto
+        (ou None) e a senha que o desbloqueou (None se não é protegido).
+    """
     filename = os.path.basename(file_path)
 
+    if senha_conhecida:
+        try:
+            pdf = pdfium.PdfDocument(file_path, password=senha_conhecida)
+            logger.debug(f"PDF aberto com senha conhecida (pypdfium2): {filename}")
+            return pdf, senha_conhecida
+        except pdfium.PdfiumError:
+            logger.debug(f"PDF {filename}: senha conhecida rejeitada (pypdfium2)")
+
     # 1. Tentar abrir sem senha
     try:
         pdf = pdfium.PdfDocument(file_path)
         logger.debug(f"PDF aberto sem senha (pypdfium2): {filename}")
-        return pdf
+        return pdf, None
     except pdfium.PdfiumError as e:
         error_msg = str(e).lower()
         if "password" not in error_msg:
             # Erro diferente de senha - logar debug e tentar outra estratégia
             logger.debug(f"PDF {filename}: pypdfium2 indisponível ({type(e).__name__})")
-            return None
+            return None, None
 
         logger.debug(
             f"PDF {filename}: protegido por senha, tentando desbloqueio (pypdfium2)"
         )
 
-    # 2. Gerar candidatos e tentar cada um
+    # 2. Senha verificada pelo resolvedor (memória por arquivo/remetente)
+    verificado, senha = _resolver_senha(file_path)
+    if verificado and senha is None:
+        logger.info(f"PDF {filename}: senha desconhecida (pypdfium2)")
+        return None, None
+    if verificado and senha == "":
+        logger.debug(
+            f"PDF {filename}: resolvedor abre sem senha; força bruta com pypdfium2"
+        )
+    elif verificado:
+        try:
+            pdf = pdfium.PdfDocument(file_path, password=senha)
+            logger.debug(f"PDF {filename} desbloqueado (pypdfium2)")
+            return pdf, senha
+        except pdfium.PdfiumError:
+            logger.debug(f"PDF {filename}: senha do resolvedor rejeitada (pypdfium2)")
+
+    # 3. Força bruta com o próprio pypdfium2 (resolvedor não leu o arquivo ou
+    #    o abre sem senha)
     candidatos = gerar_candidatos_senha()
     logger.debug(f"Testando {len(candidatos)} candidatos de senha para {filename}")
 
@@ -186,11 +310,11 @@ def abrir_pypdfium_com_senha(file_path: str) -> Optional[Any]:
             logger.info(
                 f"✅ PDF desbloqueado com senha '{senha}' (pypdfium2): {filename}"
             )
-            return pdf
+            return pdf, senha
         except pdfium.PdfiumError:
             # Senha incorreta, continuar tentando
             continue
 
-    # 3. Nenhuma senha funcionou
+    # 4. Nenhuma senha funcionou
     logger.info(f"PDF {filename}: senha desconhecida (pypdfium2)")
-    return None
+    return None, None
@@ -33,10 +33,12 @@ Example:
     ...     print("Tabelas detectadas e convertidas")
 """
 import logging
+from typing import Optional
 
 from core.interfaces import TextExtractionStrategy
+from core.tracing import traced
 
-from .pdf_utils import abrir_pdfplumber_com_senha
+from .pdf_session import PdfDocumentSession
 
 logger = logging.getLogger(__name__)
 
@@ -55,7 +57,8 @@ class TablePdfStrategy(TextExtractionStrategy):
     automaticamente usando CNPJs das empresas cadastradas.
     """
 
-    def extract(self, file_path: str) -> str:
+    @traced("strategy.table")
+    def extract(self, file_path: str, session: Optional[PdfDocumentSession] = None) -> str:
         """
         Extrai texto + tabelas estruturadas de um PDF.
 
@@ -64,69 +67,69 @@ class TablePdfStrategy(TextExtractionStrategy):
 
         Args:
             file_path (str): Caminho do arquivo PDF.
+            session (Optional[PdfDocumentSession]): Sessão já aberta do documento.
+                Se None, abre uma sessão própria (fechada ao final).
 
         Returns:
             str: Texto com tabelas convertidas para formato "chave: valor".
         """
-        try:
-            # Usa função utilitária que tenta desbloquear PDFs protegidos
-            pdf = abrir_pdfplumber_com_senha(file_path)
+        if session is None:
+            with PdfDocumentSession(file_path) as own_session:
+                return self.extract(file_path, session=own_session)
 
-            if pdf is None:
+        try:
+            if session.plumber is None:
                 logger.debug(f"Não foi possível abrir PDF: {file_path}")
                 return ""
 
-            try:
-                if not pdf.pages:
-                    return ""
+            pages = session.pages
+            if not pages:
+                return ""
 
-                full_text = ""
-                has_tables = False
+            full_text = ""
+            has_tables = False
 
-                for page in pdf.pages:
-                    # Extrai texto normal primeiro (com layout preservado)
-                    page_text = page.extract_text(layout=True) or ""
-                    full_text += page_text + "\n"
+            for i in range(len(pages)):
+                # Extrai texto normal primeiro (com layout preservado)
+                page_text = session.page_text(i, layout=True)
+                full_text += page_text + "\n"
 
-                    # Tenta detectar e extrair tabelas
-                    tables = page.extract_tables()
+                # Tenta detectar e extrair tabelas
+                tables = session.page_tables(i)
 
-                    if tables:
-                        has_tables = True
-                        full_text += "\n=== DADOS ESTRUTURADOS ===\n"
+                if tables:
+                    has_tables = True
+                    full_text += "\n=== DADOS ESTRUTURADOS ===\n"
 
-                        for table in tables:
-                            if not table or len(table) < 2:
-                                continue
+                    for table in tables:
+                        if not table or len(table) < 2:
+                            continue
 
-                            # Assume primeira linha como cabeçalho
-                            headers = table[0]
+                        # Assume primeira linha como cabeçalho
+                        headers = table[0]
 
-                            # Processa linhas de dados
-                            for row in table[1:]:
-                                if not row:
-                                    continue
-
-                                # Converte para formato "Chave: Valor"
-                                for header, value in zip(headers, row):
-                                    if header and value:
-                                        # Remove espaços extras
-                                        header_clean = str(header).strip()
-                                        value_clean = str(value).strip()
+                        # Processa linhas de dados
+                        for row in table[1:]:
+                            if not row:
+                                continue
 
-                                        if header_clean and value_clean:
-                                            full_text += f"{header_clean}: {value_clean}\n"
+                            # Converte para formato "Chave: Valor"
+                            for header, value in zip(headers, row):
+                                if header and value:
+                                    # Remove espaços extras
+                                    header_clean = str(header).strip()
+                                    value_clean = str(value).strip()
 
-                                full_text += "\n"  # Separa registros
+                                    if header_clean and value_clean:
+                                        full_text += f"{header_clean}: {value_clean}\n"
 
-                # Validação: só retorna se encontrou tabelas e tem conteúdo suficiente
-                if not has_tables or len(full_text.strip()) < 50:
-                    return ""
+                            full_text += "\n"  # Separa registros
 
-                return full_text
+            # Validação: só retorna se encontrou tabelas e tem conteúdo suficiente
+            if not has_tables or len(full_text.strip()) < 50:
+                return ""
 
-            finally:
-                pdf.close()
+            return full_text
 
         except Exception as e:
             logger.debug(f"Erro na extração de tabelas de {file_path}: {e}")
@@ -0,0 +1,275 @@
+"""
+Cache persistente do texto extraído dos PDFs (endereçado por conteúdo).
+
+O reprocessamento (`run_ingestion.py --reprocess`) repetia a extração de texto
+completa — inclusive OCR — para cada arquivo em `temp_email`, mesmo quando só
+uma regex de extrator havia mudado. Como o texto bruto depende apenas dos
+bytes do arquivo e da configuração das estratégias de leitura, ele pode ser
+reaproveitado entre execuções.
+
+Chave do cache:
+    SHA-256 do arquivo + impressão da configuração de leitura
+    (OCR_CONFIG, OCR_LANG, páginas/DPI do OCR, HYBRID_OCR_COMPLEMENT,
+    HYBRID_OCR_MODE e TEXT_CACHE_VERSION).
+
+A escolha do extrator acontece depois da leitura, então mudanças nos
+extratores NÃO invalidam o cache. Mudanças nas estratégias de leitura devem
+incrementar `TEXT_CACHE_VERSION`.
+
+Armazenamento em SQLite (WAL, seguro para vários processos), com limite de
+tamanho e despejo LRU pelo último acesso. Acertos e faltas são reportados
+em `IngestionMetrics`. Desligado por padrão; o `run_ingestion.py` o ativa
+(`settings.TEXT_CACHE_ENABLED`).
+
+Example:
+    >>> from strategies.text_cache import get_text_cache
+    >>> cache = get_text_cache()
+    >>> key = cache.key_for("nota.pdf")
+    >>> texto = cache.get(key)
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Incrementar quando a saída das estratégias de leitura mudar
+TEXT_CACHE_VERSION = 3
+
+# Ao despejar, reduz o cache até esta fração do limite (evita despejo a cada put)
+EVICTION_TARGET_RATIO = 0.9
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def config_fingerprint() -> str:
+    """Impressão da configuração de leitura que influencia o texto extraído."""
+    from config import settings
+
+    partes = [
+        f"v={TEXT_CACHE_VERSION}",
+        f"ocr_config={getattr(settings, 'OCR_CONFIG', '')}",
+        f"ocr_lang={getattr(settings, 'OCR_LANG', '')}",
+        f"hybrid={bool(getattr(settings, 'HYBRID_OCR_COMPLEMENT', True))}",
+        f"hybrid_mode={getattr(settings, 'HYBRID_OCR_MODE', '')}/"
+        f"{getattr(settings, 'HYBRID_OCR_MIN_REGION_AREA', '')}",
+        f"ocr_pages={getattr(settings, 'OCR_MAX_PAGES', '')}",
+        f"ocr_dpi={getattr(settings, 'OCR_DPI_LOW', '')}-{getattr(settings, 'OCR_DPI_HIGH', '')}",
+        f"ocr_min={getattr(settings, 'OCR_MIN_CONFIDENCE', '')}/"
+        f"{getattr(settings, 'OCR_MIN_CHARS_PER_PAGE', '')}",
+    ]
+    return hashlib.sha256("|".join(partes).encode("utf-8")).hexdigest()[:16]
+
+
+def file_sha256(file_path: Union[str, Path]) -> Optional[str]:
+    """SHA-256 do conteúdo do arquivo (None se não puder ser lido)."""
+    digest = hashlib.sha256()
+    try:
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+class TextExtractionCache:
+    """
+    Cache SQLite de texto extraído, com limite de tamanho e despejo LRU.
+
+    Falhas do cache (banco bloqueado, disco cheio, arquivo corrompido) nunca
+    interrompem a extração: são logadas em debug e tratadas como falta.
+
+    Args:
+        path: Caminho do arquivo SQLite.
+        max_bytes: Tamanho máximo do texto armazenado (soma dos textos em UTF-8).
+    """
+
+    def __init__(self, path: Union[str, Path], max_bytes: int):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self._fingerprint = config_fingerprint()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Conexão
+    # ------------------------------------------------------------------
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Conexões SQLite não viajam entre processos."""
+        state = self.__dict__.copy()
+        state["_conn"] = None
+        state["_lock"] = None
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is not None and self._pid != os.getpid():
+            # Conexão herdada via fork: não pode ser reutilizada no filho
+            self._conn = None
+            self._pid = os.getpid()
+
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS text_cache (
+                    key TEXT PRIMARY KEY,
+                    text TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_text_cache_access ON text_cache(last_access)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        """Fecha a conexão (reaberta sob demanda)."""
+        if self._conn is not None and self._pid == os.getpid():
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+        self._conn = None
+
+    # ------------------------------------------------------------------
+    # Operações
+    # ------------------------------------------------------------------
+
+    def key_for(self, file_path: Union[str, Path]) -> Optional[str]:
+        """Chave do arquivo (None se não puder ser lido)."""
+        digest = file_sha256(file_path)
+        if digest is None:
+            return None
+        return f"{digest}:{self._fingerprint}"
+
+    def get(self, key: str) -> Optional[str]:
+        """Retorna o texto em cache (atualizando o último acesso) ou None."""
+        texto: Optional[str] = None
+        try:
+            with self._lock:
+                conn = self._connection()
+                row = conn.execute(
+                    "SELECT text FROM text_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    texto = row[0]
+                    conn.execute(
+                        "UPDATE text_cache SET last_access = ? WHERE key = ?",
+                        (time.time(), key),
+                    )
+                    conn.commit()
+        except sqlite3.Error as e:
+            logger.debug(f"[TextCache] Falha na leitura: {e}")
+
+        self._record_lookup(texto is not None)
+        return texto
+
+    def put(self, key: str, text: str) -> None:
+        """Armazena o texto e despeja entradas antigas se exceder o limite."""
+        size = len(text.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+
+        agora = time.time()
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute(
+                    "INSERT OR REPLACE INTO text_cache "
+                    "(key, text, size, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                    (key, text, size, agora, agora),
+                )
+                conn.commit()
+                self._evict(conn)
+        except sqlite3.Error as e:
+            logger.debug(f"[TextCache] Falha na escrita: {e}")
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Remove as entradas menos usadas recentemente até caber no limite."""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM text_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        alvo = int(self.max_bytes * EVICTION_TARGET_RATIO)
+        removidas = []
+        for key, size in conn.execute(
+            "SELECT key, size FROM text_cache ORDER BY last_access ASC"
+        ):
+            if total <= alvo:
+                break
+            removidas.append((key,))
+            total -= size
+
+        conn.executemany("DELETE FROM text_cache WHERE key = ?", removidas)
+        conn.commit()
+        logger.debug(f"[TextCache] {len(removidas)} entrada(s) despejada(s) (LRU)")
+
+    def stats(self) -> Dict[str, int]:
+        """Quantidade de entradas e bytes armazenados."""
+        with self._lock:
+            conn = self._connection()
+            entries, total = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM text_cache"
+            ).fetchone()
+        return {"entries": entries, "bytes": total}
+
+    def clear(self) -> None:
+        """Remove todas as entradas."""
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM text_cache")
+            conn.commit()
+
+    def _record_lookup(self, hit: bool) -> None:
+        try:
+            from core.metrics import IngestionMetrics
+
+            IngestionMetrics().record_text_cache_lookup(hit)
+        except Exception as e:
+            logger.debug(f"[TextCache] Falha ao reportar métricas: {e}")
+
+
+_default_cache: Optional[TextExtractionCache] = None
+
+
+def get_text_cache() -> Optional[TextExtractionCache]:
+    """
+    Retorna o cache padrão configurado em `settings`.
+
+    Returns:
+        None se `settings.TEXT_CACHE_ENABLED` estiver desligado (padrão fora
+        do `run_ingestion.py`, ou com `--no-text-cache`).
+    """
+    global _default_cache
+    from config import settings
+
+    if not getattr(settings, "TEXT_CACHE_ENABLED", False):
+        return None
+
+    path = Path(getattr(settings, "TEXT_CACHE_PATH"))
+    if _default_cache is None or _default_cache.path != path:
+        max_bytes = int(getattr(settings, "TEXT_CACHE_MAX_MB", 512)) * 1024 * 1024
+        _default_cache = TextExtractionCache(path, max_bytes)
+    return _default_cache
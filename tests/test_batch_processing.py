@@ -1233,6 +1233,121 @@ class TestBatchProcessor(unittest.TestCase):
 
         self.assertEqual(len(results), 3)
 
+    def test_process_multiple_batches_parallel_igual_sequencial(self):
+        """Modo paralelo (--workers) retorna o mesmo resultado e ordem do sequencial."""
+        root_folder = Path(self.temp_dir)
+
+        for i in range(5):
+            batch_folder = root_folder / f"batch_{i}"
+            batch_folder.mkdir()
+            EmailMetadata.create_for_batch(
+                batch_id=f"batch_{i}",
+                subject=f"Assunto {i}",
+                sender_name=f"Remetente {i}",
+            ).save(batch_folder)
+
+        processor = BatchProcessor()
+        serial = processor.process_multiple_batches(root_folder, workers=1)
+        parallel = processor.process_multiple_batches(root_folder, workers=3)
+
+        self.assertEqual(
+            [(r.batch_id, r.status, r.email_subject) for r in serial],
+            [(r.batch_id, r.status, r.email_subject) for r in parallel],
+        )
+
+    def test_iter_batches_parallel_timeout(self):
+        """Lote lento vira TIMEOUT sem bloquear os demais e é registrado no log."""
+        import json
+        import time
+
+        root_folder = Path(self.temp_dir)
+        for name in ("a_lento", "b_rapido", "c_rapido"):
+            (root_folder / name).mkdir()
+
+        original = BatchProcessor.process_batch
+
+        def process_batch(self, folder_path, apply_correlation=True):
+            if Path(folder_path).name == "a_lento":
+                time.sleep(3)
+            return original(self, folder_path, apply_correlation)
+
+        with patch.object(BatchProcessor, "process_batch", process_batch):
+            processor = BatchProcessor()
+            start = time.time()
+            results = processor.process_multiple_batches(
+                root_folder, timeout_seconds=1, workers=2
+            )
+            elapsed = time.time() - start
+
+        self.assertLess(elapsed, 3)
+        self.assertEqual(
+            [(r.batch_id, r.status) for r in results],
+            [("a_lento", "TIMEOUT"), ("b_rapido", "OK"), ("c_rapido", "OK")],
+        )
+        timeouts = json.loads((root_folder / "_timeouts.json").read_text(encoding="utf-8"))
+        self.assertEqual([t["batch_id"] for t in timeouts], ["a_lento"])
+
+    def test_iter_batches_parallel_encerra_lote_travado(self):
+        """Com workers>1, o processo do lote travado é encerrado no timeout e libera o slot."""
+        import os
+        import time
+
+        root_folder = Path(self.temp_dir)
+        for name in ("a_travado", "b_rapido", "c_rapido", "d_rapido"):
+            (root_folder / name).mkdir()
+        pid_file = root_folder / "pid_travado.txt"
+
+        original = BatchProcessor.process_batch
+
+        def process_batch(self, folder_path, apply_correlation=True):
+            if Path(folder_path).name == "a_travado":
+                pid_file.write_text(str(os.getpid()))
+                time.sleep(60)
+            return original(self, folder_path, apply_correlation)
+
+        with patch.object(BatchProcessor, "process_batch", process_batch):
+            start = time.time()
+            results = BatchProcessor().process_multiple_batches(
+                root_folder, timeout_seconds=1, workers=2
+            )
+            elapsed = time.time() - start
+
+        self.assertLess(elapsed, 15)
+        self.assertEqual(
+            [(r.batch_id, r.status) for r in results],
+            [("a_travado", "TIMEOUT"), ("b_rapido", "OK"), ("c_rapido", "OK"), ("d_rapido", "OK")],
+        )
+        # O worker travado não continua vivo ocupando o slot
+        with self.assertRaises(ProcessLookupError):
+            os.kill(int(pid_file.read_text()), 0)
+
+    def test_iter_batches_parallel_consumidor_para_sem_esperar_timeout(self):
+        """Fechar o iterador mata o lote em andamento em vez de esperar o timeout dele."""
+        import time
+
+        root_folder = Path(self.temp_dir)
+        for name in ("a_travado", "b_rapido"):
+            (root_folder / name).mkdir()
+
+        original = BatchProcessor.process_batch
+
+        def process_batch(self, folder_path, apply_correlation=True):
+            if Path(folder_path).name == "a_travado":
+                time.sleep(60)
+            return original(self, folder_path, apply_correlation)
+
+        with patch.object(BatchProcessor, "process_batch", process_batch):
+            batches = BatchProcessor().iter_batches_parallel(
+                [root_folder / "a_travado", root_folder / "b_rapido"],
+                timeout_seconds=50,
+                workers=2,
+            )
+            self.assertEqual(next(batches).batch_id, "b_rapido")
+            start = time.time()
+            batches.close()
+
+        self.assertLess(time.time() - start, 10)
+
     @patch.object(BatchProcessor, '_process_single_file')
     def test_process_legacy_files(self, mock_process):
         """Testa processamento de arquivos legados."""
@@ -1644,6 +1759,173 @@ class TestDuplicateDetection(unittest.TestCase):
         self.assertIn("ENCAMINHAMENTO DUPLICADO", result.divergencia or "")
 
 
+class TestCrossBatchDuplicateIndex(unittest.TestCase):
+    """Testes para o índice de duplicatas entre lotes."""
+
+    CHAVE = "35250112345678000190550010000123451000012345"
+
+    def setUp(self):
+        from core.duplicate_index import DuplicateIndex
+
+        self.temp_dir = tempfile.mkdtemp()
+        self.index = DuplicateIndex(Path(self.temp_dir) / "duplicates.sqlite")
+        self.addCleanup(self.index.close)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _batch_folder(self, name, content=b"%PDF-1.4 nota 12345"):
+        folder = Path(self.temp_dir) / name
+        folder.mkdir()
+        (folder / "nota.pdf").write_bytes(content)
+        return folder
+
+    def test_document_keys(self):
+        """Chaves normalizadas: chave de acesso, linha digitável e CNPJ+nota+valor."""
+        from core.duplicate_index import document_keys
+
+        danfe = DanfeData(
+            arquivo_origem="d.pdf",
+            chave_acesso=self.CHAVE,
+            cnpj_emitente="12.345.678/0001-90",
+            numero_nota="000123",
+            valor_total=1500.0,
+        )
+        boleto = BoletoData(
+            arquivo_origem="b.pdf",
+            linha_digitavel="23790.12345 60000.000003 00000.000000 1 99990000150000",
+        )
+
+        self.assertEqual(
+            document_keys(danfe),
+            [
+                ("chave_acesso", self.CHAVE),
+                ("cnpj_nota_valor", "12345678000190|123|1500.00"),
+            ],
+        )
+        self.assertEqual(document_keys(boleto)[0][0], "linha_digitavel")
+        self.assertEqual(document_keys(DanfeData(arquivo_origem="x.pdf")), [])
+
+    def test_mesmo_lote_nao_e_duplicata_de_si_mesmo(self):
+        """Reprocessar a mesma pasta não descarta os próprios anexos."""
+        self.index.register([("chave_acesso", self.CHAVE)], "email_1", "d.pdf")
+
+        self.assertIsNone(self.index.find("chave_acesso", self.CHAVE, exclude_batch="email_1"))
+        match = self.index.find("chave_acesso", self.CHAVE, exclude_batch="email_2")
+        self.assertEqual((match.batch_id, match.file_name), ("email_1", "d.pdf"))
+
+    @patch.object(BatchProcessor, "_process_single_file")
+    def test_anexo_identico_e_extraido_e_sinalizado(self, mock_process):
+        """Anexo já processado em outro lote é extraído e só marcado como duplicata."""
+        mock_process.return_value = DanfeData(
+            arquivo_origem="nota.pdf", numero_nota="12345", valor_total=100.0
+        )
+        processor = BatchProcessor(duplicate_index=self.index)
+
+        primeiro = processor.process_batch(self._batch_folder("email_1"))
+        reprocessado = processor.process_batch(Path(self.temp_dir) / "email_1")
+        segundo = processor.process_batch(self._batch_folder("email_2"))
+
+        self.assertEqual(primeiro.total_documents, 1)
+        self.assertEqual(reprocessado.total_documents, 1)
+        self.assertEqual(reprocessado.duplicate_files, [])
+        self.assertEqual(mock_process.call_count, 3)
+        self.assertEqual(segundo.total_documents, 1)
+        self.assertEqual(segundo.duplicate_files[0]["batch_id"], "email_1")
+        self.assertEqual(segundo.correlation_result.duplicado_de, ["email_1"])
+
+        restaurado = BatchResult.from_dict(segundo.to_dict())
+        self.assertEqual(restaurado.duplicate_files, segundo.duplicate_files)
+
+    @patch.object(BatchProcessor, "_process_single_file")
+    def test_anexo_identico_continua_no_pareamento(self, mock_process):
+        """Boleto repetido de outro lote ainda é pareado com a NF nova do lote."""
+        def extrair(path):
+            if path.name == "boleto.pdf":
+                return BoletoData(
+                    arquivo_origem=path.name, valor_documento=100.0, numero_documento="12345"
+                )
+            return DanfeData(arquivo_origem=path.name, numero_nota="12345", valor_total=100.0)
+
+        mock_process.side_effect = extrair
+        processor = BatchProcessor(duplicate_index=self.index)
+
+        folder = Path(self.temp_dir) / "email_1"
+        folder.mkdir()
+        (folder / "boleto.pdf").write_bytes(b"%PDF-1.4 boleto 12345")
+        processor.process_batch(folder)
+
+        folder = self._batch_folder("email_2")
+        (folder / "boleto.pdf").write_bytes(b"%PDF-1.4 boleto 12345")
+        segundo = processor.process_batch(folder)
+
+        self.assertEqual(
+            sorted(d.arquivo_origem for d in segundo.documents), ["boleto.pdf", "nota.pdf"]
+        )
+        self.assertEqual([d["file"] for d in segundo.duplicate_files], [str(folder / "boleto.pdf")])
+        self.assertEqual(segundo.correlation_result.status, "CONCILIADO")
+
+    @patch.object(BatchProcessor, "_process_single_file")
+    def test_mesma_nota_em_arquivo_diferente_e_sinalizada(self, mock_process):
+        """Mesma chave de acesso com bytes diferentes: extrai e marca na correlação."""
+        mock_process.side_effect = lambda path: DanfeData(
+            arquivo_origem=path.name, chave_acesso=self.CHAVE, valor_total=100.0
+        )
+        processor = BatchProcessor(duplicate_index=self.index)
+
+        processor.process_batch(self._batch_folder("email_1"))
+        segundo = processor.process_batch(
+            self._batch_folder("email_2", b"%PDF-1.4 reenvio da nota 12345")
+        )
+
+        self.assertEqual(segundo.total_documents, 1)
+        self.assertEqual(segundo.correlation_result.duplicado_de, ["email_1"])
+        self.assertIn("JÁ PROCESSADO EM OUTRO LOTE", segundo.correlation_result.divergencia)
+
+    def test_consulta_nao_cresce_com_historico(self):
+        """Consulta pontual pela chave primária (sem varredura da tabela)."""
+        self.index.register(
+            [("file_sha256", f"{i:064x}") for i in range(20000)], "email_antigo"
+        )
+        plan = self.index._connection().execute(
+            "EXPLAIN QUERY PLAN SELECT batch_id, file_name FROM document_keys "
+            "WHERE kind = ? AND key = ?",
+            ("file_sha256", "0" * 64),
+        ).fetchall()
+
+        self.assertIn("PRIMARY KEY", " ".join(str(row[-1]) for row in plan))
+        self.assertIsNotNone(self.index.find("file_sha256", f"{19999:064x}"))
+
+
+class TestBatchSpans(unittest.TestCase):
+    """Testes para os spans por estágio anexados ao BatchResult."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir, True)
+
+    @patch.object(BatchProcessor, "_process_single_file")
+    def test_spans_anexados_ao_lote(self, mock_process):
+        """process_batch registra lote, arquivos e correlação em BatchResult.spans."""
+        mock_process.return_value = DanfeData(
+            arquivo_origem="nota.pdf", numero_nota="12345", valor_total=100.0
+        )
+        folder = Path(self.temp_dir) / "email_1"
+        folder.mkdir()
+        (folder / "nota.pdf").write_bytes(b"%PDF-1.4 nota")
+
+        result = BatchProcessor().process_batch(folder)
+
+        spans = {s["name"]: s for s in result.spans}
+        self.assertEqual(spans["batch.process"]["attrs"]["batch_id"], "email_1")
+        self.assertEqual(spans["file.pdf"]["attrs"]["file"], "nota.pdf")
+        self.assertEqual(spans["file.pdf"]["parent_id"], spans["batch.process"]["span_id"])
+        self.assertIn("correlation.correlate", spans)
+
+        restored = BatchResult.from_dict(result.to_dict())
+        self.assertEqual(len(restored.spans), len(result.spans))
+
+
 class TestXmlPriority(unittest.TestCase):
     """Testes para lógica de XML como fonte prioritária quando completo."""
 
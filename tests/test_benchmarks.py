@@ -0,0 +1,131 @@
+"""
+Testes da suíte de benchmarks (benchmarks/).
+
+Testa:
+- PDFs sintéticos legíveis (texto vetorial e imagem)
+- Manifesto do corpus
+- Estatísticas (percentis) e comparação com baseline
+- Memória por documento dos modelos (--model-memory)
+"""
+# pyright: ignore
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import core  # noqa: F401  (core antes de strategies: evita import circular)
+from benchmarks.corpus import build_corpus, build_template_pdf
+from benchmarks.run import compare_reports, percentile, run_model_memory, summarize
+
+
+def _report(p50: float, p95: float, rss: float = 100.0, errors: int = 0, routing=None):
+    return {
+        "stages": {"route": {"p50_ms": p50, "p95_ms": p95, "errors": errors}},
+        "peak_rss_mb": rss,
+        "routing": routing or {},
+    }
+
+
+class TestBenchmarkCorpus(unittest.TestCase):
+    """Testa a geração do corpus sintético."""
+
+    def test_vector_pdf_has_native_text(self):
+        """Variante vetorial é lida pelo pdfplumber sem OCR."""
+        import pdfplumber
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "boleto.pdf"
+            path.write_bytes(build_template_pdf("boleto", "vector"))
+            with pdfplumber.open(path) as pdf:
+                text = pdf.pages[0].extract_text()
+                images = pdf.pages[0].images
+
+        self.assertIn("Valor do Documento", text)
+        self.assertIn("23793.38128", text)
+        self.assertEqual(images, [])
+
+    def test_hybrid_pdf_keeps_only_header_as_text(self):
+        """Variante híbrida: cabeçalho vetorial e corpo em imagem."""
+        import pdfplumber
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "danfe.pdf"
+            path.write_bytes(build_template_pdf("danfe", "hybrid"))
+            with pdfplumber.open(path) as pdf:
+                text = pdf.pages[0].extract_text()
+                images = pdf.pages[0].images
+
+        self.assertIn("DANFE", text)
+        self.assertNotIn("VALOR TOTAL DA NOTA", text)
+        self.assertEqual(len(images), 1)
+
+    def test_manifest_lists_every_file(self):
+        """Manifesto descreve todos os arquivos gerados."""
+        with tempfile.TemporaryDirectory() as tmp:
+            files = build_corpus(tmp)
+            manifest = json.loads((Path(tmp) / "manifest.json").read_text(encoding="utf-8"))
+            for entry in manifest:
+                self.assertTrue((Path(tmp) / entry["name"]).exists())
+
+        self.assertEqual(len(manifest), len(files))
+        kinds = {entry["kind"] for entry in manifest}
+        self.assertEqual(kinds, {"vector", "hybrid", "image", "xml"})
+
+
+class TestBenchmarkComparison(unittest.TestCase):
+    """Testa estatísticas e detecção de regressões."""
+
+    def test_percentile_interpolates(self):
+        self.assertEqual(percentile([], 95), 0.0)
+        self.assertAlmostEqual(percentile([1.0, 2.0, 3.0, 4.0], 50), 2.5)
+        self.assertAlmostEqual(percentile([1.0, 2.0, 3.0, 4.0], 100), 4.0)
+
+    def test_summarize_reports_throughput(self):
+        stats = summarize([0.01, 0.01, 0.02, 0.02])
+        self.assertEqual(stats["n"], 4)
+        self.assertAlmostEqual(stats["throughput_per_s"], 66.67, places=2)
+
+    def test_slower_stage_is_regression(self):
+        regressions = compare_reports(_report(20.0, 40.0), _report(10.0, 20.0))
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(regressions[0].startswith("route p50_ms"))
+
+    def test_small_absolute_delta_is_noise(self):
+        """+100% em um estágio de 0,5ms não é regressão."""
+        self.assertEqual(compare_reports(_report(1.0, 1.0), _report(0.5, 0.5)), [])
+
+    def test_rss_errors_and_routing_are_checked(self):
+        routing = {"boleto_vector.pdf": {"expected": "BoletoExtractor", "actual": None, "ok": False}}
+        regressions = compare_reports(
+            _report(10.0, 20.0, rss=300.0, errors=1, routing=routing),
+            _report(10.0, 20.0, rss=100.0),
+        )
+        self.assertEqual(len(regressions), 3)
+        self.assertTrue(any("peak_rss_mb" in r for r in regressions))
+        self.assertTrue(any("roteamento" in r for r in regressions))
+
+    def test_missing_stage_is_ignored(self):
+        """Estágio ausente no relatório atual (ex: sem OCR) não falha."""
+        current = {"stages": {}, "peak_rss_mb": 100.0, "routing": {}}
+        self.assertEqual(compare_reports(current, _report(10.0, 20.0)), [])
+
+
+class TestModelMemory(unittest.TestCase):
+    """Testa a medição de memória dos modelos."""
+
+    def test_reports_every_model(self):
+        report = run_model_memory(50)
+
+        self.assertEqual(report["documents"], 50)
+        self.assertEqual(
+            set(report["models"]),
+            {"InvoiceData", "DanfeData", "BoletoData", "OtherDocumentData", "EmailAvisoData"},
+        )
+        for stats in report["models"].values():
+            self.assertGreater(stats["bytes_per_document"], 0)
+            self.assertGreater(stats["export_us_per_document"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
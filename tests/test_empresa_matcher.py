@@ -1,5 +1,13 @@
+import sys
 
-from core.empresa_matcher import find_empresa_no_texto, infer_fornecedor_from_text
+from core.empresa_matcher import (
+    EmpresaIndex,
+    find_empresa_no_texto,
+    get_empresa_index,
+    infer_fornecedor_from_text,
+    is_cnpj_nosso,
+    is_nome_nosso,
+)
 
 
 def test_find_empresa_no_texto_by_cnpj_digits_or_spaced():
@@ -43,3 +51,101 @@ def test_infer_fornecedor_does_not_pick_linha_digitavel_as_name():
 
     fornecedor = infer_fornecedor_from_text(txt, "38323227000140")
     assert fornecedor is None
+
+
+def _cadastro_sintetico(n):
+    # Códigos "EMPxxxxx" distintos; 2 filiais por raiz de CNPJ
+    return {
+        f"{i // 2:08d}{i % 2 + 1:04d}{i % 100:02d}": {"razao_social": f"EMP{i:05d} COMERCIO LTDA"}
+        for i in range(n)
+    }
+
+
+def test_empresa_index_is_built_once():
+    assert get_empresa_index() is get_empresa_index()
+    assert is_cnpj_nosso("38.323.227/0001-40")
+    assert not is_cnpj_nosso("00.000.000/0000-00")
+
+
+def test_empresa_index_cnpj_and_root_lookup():
+    index = EmpresaIndex({
+        "11.111.111/0001-11": {"razao_social": "AAA MATRIZ LTDA"},
+        "11111111000292": {"razao_social": "AAA FILIAL LTDA"},
+        "22222222000133": {"razao_social": "BBB SA"},
+    })
+
+    assert "11111111000111" in index
+    assert index.empresa("22222222000133") == ("BBB SA", "BBB")
+    assert index.cnpjs_da_raiz("11.111.111/0099-00") == ("11111111000111", "11111111000292")
+    assert index.cnpjs_da_raiz("33333333000100") == ()
+
+
+def test_empresa_index_name_match_keeps_cadastro_order():
+    index = EmpresaIndex({
+        "11111111000111": {"razao_social": "ZETA SERVICOS LTDA"},
+        "22222222000122": {"razao_social": "ALFA SERVICOS LTDA"},
+    })
+
+    # ALFA aparece antes no texto, mas ZETA vem antes no cadastro
+    match = index.match_nome("FATURA ALFA E ZETA")
+    assert match.codigo == "ZETA"
+    assert match.method == "nome"
+    # Palavra inteira: ZETAS não é ZETA
+    assert index.match_nome("ZETAS ALFAS") is None
+
+
+def test_empresa_index_domain_match_prefers_longer_code():
+    index = EmpresaIndex({
+        "11111111000111": {"razao_social": "AB TELECOM LTDA"},
+        "22222222000122": {"razao_social": "ABCD TELECOM LTDA"},
+    })
+
+    match = index.match_domains(["abcd.com.br"])
+    # AB e ABCD são prefixo do domínio; código mais longo pontua mais
+    assert match.codigo == "ABCD"
+    assert match.score == 10
+    assert index.match_domains(["mail.ab.net"]).codigo == "AB"
+    assert index.match_domains(["xab.com"]) is None
+
+
+def test_is_nome_nosso_uses_short_distinctive_codes():
+    assert is_nome_nosso("CSC GESTAO INTEGRADA S/A")
+    assert not is_nome_nosso("EMPRESA DESCONHECIDA LTDA")
+    assert not is_nome_nosso("AUTO POSTO PORTAL DE MINAS")
+
+
+def _chamadas(func):
+    """Chamadas de função (Python e C, ex: regex) feitas por `func`: custo sem relógio."""
+    contador = 0
+
+    def perfil(frame, event, arg):
+        nonlocal contador
+        if event in ("call", "c_call"):
+            contador += 1
+
+    sys.setprofile(perfil)
+    try:
+        func()
+    finally:
+        sys.setprofile(None)
+    return contador
+
+
+def test_empresa_index_matching_cost_does_not_grow_with_cadastro():
+    """Trabalho por documento igual com cadastro 100x maior (contagem de chamadas)."""
+    texto = ("NOTA FISCAL DE SERVICOS ELETRONICA PRESTADOR TOMADOR VALOR TOTAL " * 40).upper()
+    dominios = ["fornecedor.com.br", "nfe.prefeitura.sp.gov.br"]
+
+    def documento(index):
+        return lambda: (
+            index.match_nome(texto),
+            index.match_domains(dominios),
+            index.is_nome_nosso("FORNECEDOR EXEMPLO LTDA"),
+        )
+
+    pequeno = EmpresaIndex(_cadastro_sintetico(50))
+    grande = EmpresaIndex(_cadastro_sintetico(5000))
+    assert grande.match_nome("PAGAMENTO EMP04999 COMERCIO").codigo == "EMP04999"
+
+    # Varredura linear faria uma busca por código; o índice não depende do cadastro
+    assert _chamadas(documento(grande)) == _chamadas(documento(pequeno))
@@ -406,6 +406,29 @@ class TestNormalizeEntityName(unittest.TestCase):
         self.assertIn("INTERFOCUS", result)
         self.assertIn("TECNOLOGIA", result)
 
+    def test_segmentacao_cobre_o_maximo_de_palavras(self):
+        """Palavra conhecida não engole a letra inicial da seguinte."""
+        self.assertEqual(
+            normalize_entity_name("ESCRITORIOSISTEMASLTDA"), "ESCRITORIO SISTEMAS LTDA"
+        )
+        self.assertEqual(
+            normalize_entity_name("ADVOGADOSOFTWAREEIRELI"), "ADVOGADO SOFTWARE EIRELI"
+        )
+
+    def test_sufixo_empresarial_fica_inteiro(self):
+        """'S/A' colado não é quebrado pela última palavra."""
+        self.assertEqual(
+            normalize_entity_name("CARTEIRAESCRITORIOS/A"), "CARTEIRA ESCRITORIO S/A"
+        )
+
+    def test_resultado_memorizado(self):
+        """Chamadas repetidas com o mesmo nome vêm do cache."""
+        normalize_entity_name.cache_clear()
+        normalize_entity_name("INTERFOCUSTECNOLOGIALTDA")
+        normalize_entity_name("INTERFOCUSTECNOLOGIALTDA")
+        info = normalize_entity_name.cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 1))
+
     def test_nao_altera_nomes_com_espacos(self):
         """Não altera nomes que já têm espaços."""
         original = "RSM BRASIL AUDITORIA E CONSULTORIA LTDA"
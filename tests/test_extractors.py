@@ -502,6 +502,104 @@ class TestEdgeCases(unittest.TestCase):
         self.assertIsInstance(result, (int, float))
 
 
+class TestExtractorRouter(unittest.TestCase):
+    """Testes para o roteador compilado de extratores."""
+
+    def _fake_registry(self):
+        chamadas = []
+
+        def make(nome, keywords, aceita):
+            def can_handle(cls, text):
+                chamadas.append(nome)
+                return aceita(text)
+
+            return type(nome, (), {
+                "ROUTING_KEYWORDS": keywords,
+                "can_handle": classmethod(can_handle),
+            })
+
+        registry = [
+            make("Gox", ("GOX",), lambda t: "GOXINTERNET" in t.upper()),
+            make("GoxInternet", ("GOXINTERNET",), lambda t: True),
+            make("Generico", (), lambda t: True),
+        ]
+        return registry, chamadas
+
+    def test_pula_extrator_sem_palavra_chave(self):
+        """can_handle só é chamado quando alguma palavra-chave aparece."""
+        from core.extractor_router import ExtractorRouter
+
+        registry, chamadas = self._fake_registry()
+        router = ExtractorRouter(registry)
+
+        self.assertIs(router.route("Boleto qualquer"), registry[2])
+        self.assertEqual(chamadas, ["Generico"])
+
+        profile = router.profile()
+        self.assertEqual(profile["Gox"]["skipped"], 1)
+        self.assertEqual(profile["Generico"]["selected"], 1)
+
+    def test_preserva_ordem_e_prefixos(self):
+        """Palavras-chave com prefixo comum são detectadas; vence a ordem do registro."""
+        from core.extractor_router import ExtractorRouter
+
+        registry, chamadas = self._fake_registry()
+        router = ExtractorRouter(registry)
+
+        self.assertEqual(router.keyword_hits("contato@goxinternet.com.br"), {"GOX", "GOXINTERNET"})
+        self.assertIs(router.route("contato@goxinternet.com.br"), registry[0])
+        self.assertEqual(chamadas, ["Gox"])
+
+    def test_recompila_quando_registro_muda(self):
+        """Extratores registrados depois da criação do roteador são considerados."""
+        from core.extractor_router import ExtractorRouter
+
+        registry, _ = self._fake_registry()
+        generico = registry.pop()
+        router = ExtractorRouter(registry)
+        self.assertIsNone(router.route("Texto sem palavras-chave"))
+
+        registry.append(generico)
+        self.assertIs(router.route("Texto sem palavras-chave"), generico)
+
+    def test_mesmo_resultado_da_varredura_linear(self):
+        """O roteador escolhe o mesmo extrator que a varredura linear do registro."""
+        from core.extractor_router import ExtractorRouter
+        from core.extractors import EXTRACTOR_REGISTRY
+
+        textos = [
+            "PREFEITURA MUNICIPAL NOTA FISCAL ELETRÔNICA Número: 12345",
+            "BANCO BRADESCO LINHA DIGITÁVEL CÓDIGO DE BARRAS BENEFICIÁRIO",
+            "DANFE DOCUMENTO AUXILIAR DA NOTA FISCAL ELETRÔNICA CHAVE DE ACESSO",
+            "DEMONSTRATIVO DE LOCAÇÃO DE EQUIPAMENTOS Valor total R$ 1.200,00",
+            "FATURA MUGO TELECOM vencimento 10/03/2025",
+            "NOTA DÉBITO / RECIBO FATURA CSC GESTAO INTEGRADA 38.323.227/0001-40",
+            "Documento sem nenhum indicador conhecido",
+        ]
+
+        def linear(texto):
+            for extractor_cls in EXTRACTOR_REGISTRY:
+                if extractor_cls.can_handle(texto):
+                    return extractor_cls
+            return None
+
+        router = ExtractorRouter()
+        for texto in textos:
+            with self.subTest(texto=texto[:30]):
+                self.assertIs(router.route(texto), linear(texto))
+
+    def test_text_views_compartilhadas(self):
+        """text_views normaliza uma vez e reaproveita para o mesmo texto."""
+        from core.extractors import text_views
+
+        texto = "Código de Verificação: 12.345"
+        views = text_views(texto)
+
+        self.assertIs(text_views(texto), views)
+        self.assertEqual(views.normalized, "CODIGO DE VERIFICACAO: 12.345")
+        self.assertEqual(views.compact, "CODIGODEVERIFICACAO12345")
+
+
 if __name__ == '__main__':
     # Configura o runner para mostrar resultados detalhados
     unittest.main(verbosity=2)
@@ -1,4 +1,6 @@
+import imaplib
 import os
+import re
 import shutil
 import unittest
 import uuid
@@ -7,6 +9,13 @@ from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 from ingestors.imap import ImapIngestor
+from ingestors.imap_pool import ReconnectingConnection, partition
+from ingestors.sync_state import MailboxSyncState
+from ingestors.imap_structure import (
+    StreamDecoder,
+    parse_bodystructure,
+    parse_fetch_response,
+)
 from services.ingestion_service import IngestionService
 
 
@@ -313,5 +322,519 @@ class TestIngestionIntegration(unittest.TestCase):
         # Garante que os nomes são diferentes apesar do filename original ser igual
         self.assertNotEqual(saved_files[0].name, saved_files[1].name)
 
+
+class FakeImapServer:
+    """
+    Stand-in local de um servidor IMAP para o caminho em streaming.
+
+    Responde UID SEARCH e UID FETCH (BODYSTRUCTURE, HEADER.FIELDS e
+    BODY.PEEK[seção]<offset.tamanho>) no formato devolvido pelo imaplib,
+    a partir de objetos EmailMessage.
+    """
+
+    def __init__(self, messages, uidvalidity=1):
+        self.messages = {str(uid): msg for uid, msg in messages.items()}
+        self.uidvalidity = uidvalidity
+        self.fetch_commands = []
+        self.search_queries = []
+
+    # --- Montagem do BODYSTRUCTURE -----------------------------------
+
+    @staticmethod
+    def _quote(value):
+        return '"' + str(value).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+    def _params(self, header_value):
+        pairs = re.findall(r';\s*([\w*\-]+)="?([^";]*)"?', header_value or '')
+        if not pairs:
+            return 'NIL'
+        return '(' + ' '.join(f'{self._quote(k)} {self._quote(v)}' for k, v in pairs) + ')'
+
+    def _structure(self, part):
+        if part.is_multipart():
+            children = ''.join(self._structure(p) for p in part.get_payload())
+            return f'({children} {self._quote(part.get_content_subtype())})'
+
+        body = self._raw_body(part)
+        maintype = part.get_content_maintype()
+        fields = [
+            self._quote(maintype),
+            self._quote(part.get_content_subtype()),
+            self._params(part.get('Content-Type')),
+            'NIL',
+            'NIL',
+            self._quote(part.get('Content-Transfer-Encoding', '7bit')),
+            str(len(body)),
+        ]
+        if maintype == 'text':
+            fields.append(str(body.count(b'\n')))
+        fields.append('NIL')  # MD5
+
+        disposition = part.get('Content-Disposition')
+        if disposition:
+            kind = disposition.split(';', 1)[0].strip()
+            fields.append(f'({self._quote(kind)} {self._params(disposition)})')
+        else:
+            fields.append('NIL')
+        fields.append('NIL')  # Idioma
+        return '(' + ' '.join(fields) + ')'
+
+    @staticmethod
+    def _raw_body(part):
+        payload = part.get_payload()
+        return payload.encode('utf-8') if isinstance(payload, str) else bytes(payload)
+
+    def _section(self, msg, section):
+        if not msg.is_multipart():
+            return self._raw_body(msg)
+        part = msg
+        for index in section.split('.'):
+            part = part.get_payload()[int(index) - 1]
+        return self._raw_body(part)
+
+    # --- Comandos ------------------------------------------------------
+
+    def _uids(self, uid_set):
+        uids = []
+        for item in uid_set.split(','):
+            if ':' in item:
+                start, end = item.split(':')
+                uids.extend(str(n) for n in range(int(start), int(end) + 1))
+            else:
+                uids.append(item)
+        return [uid for uid in uids if uid in self.messages]
+
+    def uid(self, command, *args):
+        command = command.upper()
+        if command == 'SEARCH':
+            query = args[-1]
+            self.search_queries.append(query)
+            uids = sorted(self.messages, key=int)
+            match = re.search(r'UID (\d+):\*', query)
+            if match:
+                # Como nos servidores reais, "n:*" inclui sempre a última mensagem
+                start = int(match.group(1))
+                uids = [u for u in uids if int(u) >= start] or uids[-1:]
+            return 'OK', [' '.join(uids).encode()]
+        if command == 'FETCH':
+            uid_set, items = args
+            self.fetch_commands.append(items)
+            return 'OK', self._fetch(uid_set, items)
+        raise AssertionError(f'Comando não suportado: {command}')
+
+    def fetch(self, *args):
+        raise AssertionError('RFC822 completo não deveria ser baixado')
+
+    def response(self, code):
+        return code, [str(self.uidvalidity).encode()]
+
+    def _fetch(self, uid_set, items):
+        data = []
+        for seq, uid in enumerate(self._uids(uid_set), start=1):
+            msg = self.messages[uid]
+            prefix = f'{seq} (UID {uid}'
+            literals = []
+            if 'BODYSTRUCTURE' in items:
+                prefix += ' BODYSTRUCTURE ' + self._structure(msg)
+            if 'HEADER.FIELDS' in items:
+                fields = re.search(r'HEADER\.FIELDS \(([^)]*)\)', items).group(1)
+                wanted = set(fields.split())
+                headers = ''.join(
+                    f'{k}: {v}\r\n' for k, v in msg.items() if k.upper() in wanted
+                ) + '\r\n'
+                literals.append((f'BODY[HEADER.FIELDS ({fields})]', headers.encode()))
+            for section, origin, size in re.findall(
+                r'BODY\.PEEK\[([\d.]+)\](?:<(\d+)\.(\d+)>)?', items
+            ):
+                body = self._section(msg, section)
+                if origin:
+                    body = body[int(origin):int(origin) + int(size)]
+                    literals.append((f'BODY[{section}]<{origin}>', body))
+                else:
+                    literals.append((f'BODY[{section}]', body))
+
+            for name, literal in literals:
+                data.append((f'{prefix} {name} {{{len(literal)}}}'.encode(), literal))
+                prefix = ''
+            data.append(f'{prefix})'.encode())
+        return data
+
+
+def _email_com_anexos():
+    msg = EmailMessage()
+    msg['Subject'] = 'Fatura Completa'
+    msg['Message-ID'] = '<msg123@test.com>'
+    msg['From'] = 'Fornecedor <fornecedor@empresa.com>'
+    msg['Date'] = 'Mon, 15 Jun 2025 10:30:00 -0300'
+    msg.set_content('Segue NFS-e, boleto e XML.')
+    msg.add_alternative('<p>Acesse https://nfse.exemplo.gov.br</p>', subtype='html')
+    msg.add_attachment(bytes(range(256)) * 40, maintype='application', subtype='pdf',
+                       filename='relatório nfse.pdf')
+    msg.add_attachment(b'<?xml version="1.0"?><NFSe/>', maintype='application',
+                       subtype='xml', filename='nfse.xml')
+    msg.add_attachment(b'PNG', maintype='image', subtype='png', filename='image001.png')
+    return msg
+
+
+def _email_sem_anexos():
+    msg = EmailMessage()
+    msg['Subject'] = 'Sua NFS-e está disponível'
+    msg['From'] = 'portal@prefeitura.gov.br'
+    msg['Date'] = 'Tue, 16 Jun 2025 09:00:00 -0300'
+    msg.set_content('Código de verificação: ABCD1234\nhttps://nfse.prefeitura.gov.br/abc')
+    return msg
+
+
+class TestImapStructureParser(unittest.TestCase):
+    """Testa o parser de FETCH/BODYSTRUCTURE."""
+
+    def test_parse_fetch_response_with_literals(self):
+        data = [
+            (b'1 (UID 42 BODY[HEADER.FIELDS (SUBJECT)] {16}', b'Subject: Teste\r\n'),
+            b')',
+        ]
+        messages = parse_fetch_response(data)
+
+        self.assertEqual(len(messages), 1)
+        self.assertEqual(messages[0]['UID'], '42')
+        self.assertEqual(messages[0]['BODY[HEADER.FIELDS (SUBJECT)]'], b'Subject: Teste\r\n')
+
+    def test_bodystructure_sections_and_filenames(self):
+        server = FakeImapServer({1: _email_com_anexos()})
+        structure = parse_fetch_response(server._fetch('1', '(UID BODYSTRUCTURE)'))[0]
+        parts = parse_bodystructure(structure['BODYSTRUCTURE'])
+
+        by_section = {p.section: p for p in parts}
+        self.assertEqual(by_section['1.1'].content_type, 'text/plain')
+        self.assertEqual(by_section['1.2'].content_type, 'text/html')
+        self.assertEqual(by_section['2'].filename, 'relatório nfse.pdf')
+        self.assertEqual(by_section['2'].encoding, 'base64')
+        self.assertEqual(by_section['2'].disposition, 'attachment')
+        self.assertEqual(by_section['3'].filename, 'nfse.xml')
+
+    def test_single_part_message_is_section_1(self):
+        server = FakeImapServer({1: _email_sem_anexos()})
+        structure = parse_fetch_response(server._fetch('1', '(UID BODYSTRUCTURE)'))[0]
+        parts = parse_bodystructure(structure['BODYSTRUCTURE'])
+
+        self.assertEqual([p.section for p in parts], ['1'])
+        self.assertIsNone(parts[0].disposition)
+
+    def test_stream_decoder_base64_in_uneven_chunks(self):
+        import base64
+        payload = bytes(range(256)) * 3
+        encoded = base64.encodebytes(payload)
+
+        decoder = StreamDecoder('base64')
+        out = b''.join(decoder.feed(encoded[i:i + 7]) for i in range(0, len(encoded), 7))
+        out += decoder.flush()
+
+        self.assertEqual(out, payload)
+
+
+class TestImapStreaming(unittest.TestCase):
+    """Testa o caminho em streaming contra o servidor IMAP local (FakeImapServer)."""
+
+    def setUp(self):
+        self.test_dir = Path("tests/temp_streaming_test")
+        os.makedirs(self.test_dir, exist_ok=True)
+        self.server = FakeImapServer({7: _email_com_anexos(), 9: _email_sem_anexos()})
+        self.ingestor = ImapIngestor(
+            "imap.test.com", "user@test.com", "pass", streaming=True, pool_size=1
+        )
+        self.ingestor.connection = self.server
+        self.ingestor.connect = MagicMock()
+
+    def tearDown(self):
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def test_uid_set_compacts_ranges(self):
+        self.assertEqual(ImapIngestor._uid_set(['1', '2', '3', '7', '9', '10']), '1:3,7,9:10')
+
+    def test_iter_emails_with_attachments_is_lazy(self):
+        emails = list(self.ingestor.iter_emails_with_attachments("*"))
+
+        self.assertEqual(len(emails), 1)
+        email_data = emails[0]
+        self.assertEqual(email_data['email_id'], 'msg123_test_com')
+        self.assertEqual(email_data['sender_address'], 'fornecedor@empresa.com')
+        self.assertIn('Segue NFS-e', email_data['body_text'])
+        self.assertIn('--- HTML CONTENT ---', email_data['body_text'])
+        self.assertEqual(
+            [a['filename'] for a in email_data['attachments']],
+            ['relatório nfse.pdf', 'nfse.xml'],
+        )
+        # Nenhum anexo é baixado antes de save_to
+        self.assertFalse(any('<' in cmd for cmd in self.server.fetch_commands))
+
+    @patch('config.settings.IMAP_PART_CHUNK_BYTES', 101)
+    def test_save_to_streams_part_in_chunks(self):
+        email_data = next(self.ingestor.iter_emails_with_attachments("*"))
+        target = self.test_dir / 'nota.pdf'
+
+        written = email_data['attachments'][0]['save_to'](target)
+
+        self.assertEqual(target.read_bytes(), bytes(range(256)) * 40)
+        self.assertEqual(written, 256 * 40)
+        self.assertFalse((self.test_dir / 'nota.pdf.part').exists())
+        partial = [c for c in self.server.fetch_commands if '<' in c]
+        self.assertGreater(len(partial), 1)
+
+    def test_without_attachments_skips_by_structure(self):
+        emails = self.ingestor.fetch_emails_without_attachments("*")
+
+        self.assertEqual(len(emails), 1)
+        self.assertEqual(emails[0]['email_id'], 'email_9')
+        self.assertFalse(emails[0]['has_attachments'])
+        self.assertIn('ABCD1234', emails[0]['body_text'])
+
+    def test_service_streams_attachments_to_batch_folder(self):
+        service = IngestionService(self.ingestor, self.test_dir)
+
+        batches = service.ingest_emails(subject_filter="*")
+
+        self.assertEqual(len(batches), 1)
+        pdfs = list(batches[0].glob('*.pdf'))
+        self.assertEqual(len(pdfs), 1)
+        self.assertEqual(pdfs[0].read_bytes(), bytes(range(256)) * 40)
+        self.assertEqual(len(list(batches[0].glob('*.xml'))), 1)
+        self.assertTrue((batches[0] / 'metadata.json').exists())
+
+    def test_service_drops_batch_when_all_downloads_fail(self):
+        service = IngestionService(MagicMock(), self.test_dir)
+
+        def falha(_path):
+            raise OSError("conexão perdida")
+
+        batch = service.ingest_single_email({
+            'subject': 'Teste',
+            'attachments': [{'filename': 'nota.pdf', 'save_to': falha}],
+        })
+
+        self.assertIsNone(batch)
+        self.assertEqual(list(self.test_dir.iterdir()), [])
+
+
+
+class TestIncrementalSync(unittest.TestCase):
+    """Testa a sincronização incremental por UID (marca d'água + Message-ID)."""
+
+    def setUp(self):
+        self.test_dir = Path("tests/temp_sync_test")
+        os.makedirs(self.test_dir, exist_ok=True)
+        self.state_path = self.test_dir / "_sync_state.json"
+        self.server = FakeImapServer({7: _email_com_anexos(), 9: _email_sem_anexos()})
+
+    def tearDown(self):
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def _ingestor(self, state):
+        ingestor = ImapIngestor(
+            "imap.test.com", "user@test.com", "pass", streaming=True, pool_size=1
+        )
+        ingestor.connection = self.server
+        ingestor.connect = MagicMock()
+        ingestor.sync_state = state
+        return ingestor
+
+    def test_commit_advances_high_water_mark(self):
+        state = MailboxSyncState(self.state_path)
+        ingestor = self._ingestor(state)
+
+        self.assertEqual(len(list(ingestor.iter_emails_with_attachments("*"))), 1)
+        self.assertEqual(len(list(ingestor.iter_emails_without_attachments("*"))), 1)
+        state.commit()
+
+        reloaded = MailboxSyncState(self.state_path)
+        self.assertEqual(reloaded.last_uid("INBOX"), 9)
+        self.assertTrue(reloaded.is_known("<msg123@test.com>"))
+
+        # Próxima execução: só UIDs novos
+        novo = _email_sem_anexos()
+        novo.replace_header('Subject', 'Nova NFS-e')
+        self.server.messages['12'] = novo
+        emails = list(self._ingestor(reloaded).iter_emails_without_attachments("*"))
+
+        self.assertEqual([e['email_id'] for e in emails], ['email_12'])
+        self.assertIn('UID 10:*', self.server.search_queries[-1])
+
+    def test_no_new_mail_returns_nothing(self):
+        state = MailboxSyncState(self.state_path)
+        list(self._ingestor(state).iter_emails_with_attachments("*"))
+        state.commit()
+
+        emails = list(self._ingestor(MailboxSyncState(self.state_path)).iter_emails_with_attachments("*"))
+
+        self.assertEqual(emails, [])
+
+    def test_rollback_keeps_high_water_mark(self):
+        state = MailboxSyncState(self.state_path)
+        list(self._ingestor(state).iter_emails_with_attachments("*"))
+        state.rollback()
+
+        self.assertEqual(state.last_uid("INBOX"), 0)
+        self.assertFalse(state.is_known("<msg123@test.com>"))
+
+    def test_uidvalidity_change_resyncs_but_dedupes_message_id(self):
+        state = MailboxSyncState(self.state_path)
+        list(self._ingestor(state).iter_emails_with_attachments("*"))
+        state.commit()
+
+        # Pasta recriada: UIDs renumerados
+        self.server = FakeImapServer({1: _email_com_anexos()}, uidvalidity=2)
+        emails = list(self._ingestor(MailboxSyncState(self.state_path)).iter_emails_with_attachments("*"))
+
+        self.assertEqual(emails, [])
+        self.assertEqual(self.server.search_queries[-1], 'ALL')
+
+    def test_failed_uid_holds_high_water_mark(self):
+        state = MailboxSyncState(self.state_path)
+        state.begin("INBOX", "1")
+        state.observe("INBOX", 5)
+        state.observe("INBOX", 7, ok=False)
+        state.observe("INBOX", 9)
+        state.commit()
+
+        self.assertEqual(state.last_uid("INBOX"), 6)
+
+    @patch(
+        'services.email_ingestion_orchestrator.EmailIngestionOrchestrator._process_batch_with_timeout',
+        return_value=None,
+    )
+    def test_orchestrator_commits_only_complete_runs(self, _mock_process):
+        from services.email_ingestion_orchestrator import EmailIngestionOrchestrator
+
+        ingestor = self._ingestor(None)
+        orchestrator = EmailIngestionOrchestrator(
+            ingestor=ingestor, temp_dir=self.test_dir, incremental_sync=True,
+        )
+        self.assertIsNotNone(ingestor.sync_state)
+
+        orchestrator.run(subject_filter="*", process_without_attachments=False, resume=False)
+        self.assertFalse(self.state_path.exists())
+
+        orchestrator.run(subject_filter="*", resume=False)
+        self.assertEqual(MailboxSyncState(self.state_path).last_uid("INBOX"), 9)
+
+
+
+class FlakyImapServer(FakeImapServer):
+    """FakeImapServer cuja conexão cai no primeiro FETCH."""
+
+    def __init__(self, messages, drops):
+        super().__init__(messages)
+        self.drops = drops
+
+    def uid(self, command, *args):
+        if command.upper() == 'FETCH' and self.drops:
+            self.drops.pop()
+            raise imaplib.IMAP4.abort('socket error: EOF')
+        return super().uid(command, *args)
+
+    def shutdown(self):
+        pass
+
+    def logout(self):
+        pass
+
+
+class TestParallelImapDownload(unittest.TestCase):
+    """Testa o download com várias conexões IMAP (ParallelImapDownloader)."""
+
+    def setUp(self):
+        self.test_dir = Path("tests/temp_pool_test")
+        os.makedirs(self.test_dir, exist_ok=True)
+
+        self.messages = {}
+        for uid in range(1, 13):
+            msg = _email_com_anexos()
+            msg.replace_header('Message-ID', f'<msg{uid}@test.com>')
+            self.messages[uid] = msg
+        self.messages[20] = _email_sem_anexos()
+
+        self.connections = []
+        self.drops = []
+
+        self.ingestor = ImapIngestor(
+            "imap.test.com", "user@test.com", "pass", streaming=True, pool_size=3
+        )
+        self.ingestor.connection = FakeImapServer(self.messages)
+        self.ingestor.connect = MagicMock()
+        self.ingestor._open_connection = self._open_connection
+
+    def tearDown(self):
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def _open_connection(self):
+        server = FlakyImapServer(self.messages, self.drops)
+        self.connections.append(server)
+        return server
+
+    def test_partition_contiguous_ranges(self):
+        uids = [str(n) for n in range(1, 11)]
+        chunks = partition(uids, 3)
+
+        self.assertEqual([len(c) for c in chunks], [4, 3, 3])
+        self.assertEqual(sum(chunks, []), uids)
+        self.assertEqual(partition(['1'], 4), [['1']])
+
+    def test_service_consumes_pooled_downloads(self):
+        service = IngestionService(self.ingestor, self.test_dir)
+
+        batches = service.ingest_emails(subject_filter="*")
+
+        self.assertEqual(len(batches), 12)
+        self.assertEqual(len(self.connections), 3)
+        for batch in batches:
+            pdf = next(batch.glob('*.pdf'))
+            self.assertEqual(pdf.read_bytes(), bytes(range(256)) * 40)
+        # Pasta de staging removida ao fim
+        self.assertEqual([p for p in self.test_dir.iterdir() if p.name.startswith('.')], [])
+
+    def test_one_fetch_per_small_email(self):
+        emails = []
+        for email_data in self.ingestor.iter_emails_with_attachments("*"):
+            emails.append(email_data)
+            for att in email_data['attachments']:
+                att['save_to'](self.test_dir / f"{uuid.uuid4().hex}.bin")
+
+        fetches = sum(len(c.fetch_commands) for c in self.connections)
+        structure_fetches = sum(
+            1 for c in self.connections for cmd in c.fetch_commands if 'BODYSTRUCTURE' in cmd
+        )
+        self.assertEqual(len(emails), 12)
+        self.assertEqual(fetches - structure_fetches, 12)
+
+    @patch('ingestors.imap_pool.time.sleep')
+    def test_reconnects_when_connection_drops(self, _sleep):
+        self.drops.extend([True, True])
+
+        emails = list(self.ingestor.iter_emails_with_attachments("*"))
+
+        self.assertEqual(len(emails), 12)
+        self.assertEqual(len(self.connections), 5)
+
+    @patch('ingestors.imap_pool.time.sleep')
+    def test_reconnecting_connection_gives_up(self, _sleep):
+        def factory():
+            raise OSError("connection refused")
+
+        conn = ReconnectingConnection(factory, attempts=2)
+
+        with self.assertRaises(OSError):
+            conn.uid('SEARCH', None, 'ALL')
+        self.assertEqual(conn.reconnects, 2)
+
+    def test_consumer_stop_cleans_staging(self):
+        iterator = self.ingestor.iter_emails_with_attachments("*", staging_dir=self.test_dir)
+        next(iterator)
+        iterator.close()
+
+        self.assertEqual([p for p in self.test_dir.iterdir() if p.name.startswith('.')], [])
+
+
 if __name__ == '__main__':
     unittest.main()
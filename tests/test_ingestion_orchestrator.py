@@ -11,13 +11,16 @@ Testa:
 import json
 import shutil
 import tempfile
+import threading
+import time
 from pathlib import Path
 from typing import Any, Dict, List
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 import pytest
 
 from core.interfaces import EmailIngestorStrategy
+from core.pipeline import Stage, StagedPipeline
 from services.email_ingestion_orchestrator import (
     CheckpointData,
     EmailIngestionOrchestrator,
@@ -126,6 +129,93 @@ class TestCheckpointData:
         assert checkpoint.total_processed == 2
 
 
+class TestCheckpointStore:
+    """Testes do checkpoint em SQLite (gravação incremental e migração do JSON)."""
+
+    def _checkpoint(self, n: int) -> CheckpointData:
+        checkpoint = CheckpointData(status=IngestionStatus.IN_PROGRESS, subject_filter="ENC")
+        for i in range(n):
+            checkpoint.mark_processed(f"email_{i:04d}")
+            checkpoint.created_batches.append(f"temp/email_{i:04d}")
+        return checkpoint
+
+    def test_save_writes_only_new_rows(self, temp_dir):
+        """Cada gravação escreve só o que mudou: custo não cresce com a execução."""
+        from services.checkpoint_store import CheckpointStore
+
+        store = CheckpointStore(temp_dir / "_checkpoint.sqlite")
+        checkpoint = self._checkpoint(500)
+        store.save(checkpoint)
+
+        conn = store._connection()
+        changes_before = conn.total_changes
+        checkpoint.mark_processed("email_novo")
+        checkpoint.created_batches.append("temp/email_novo")
+        checkpoint.total_processed += 1
+        store.save(checkpoint)
+        changes = conn.total_changes - changes_before
+
+        # 1 id + 1 lote + linhas de campos escalares
+        assert changes == 2 + len(checkpoint.header())
+
+        data = CheckpointStore(temp_dir / "_checkpoint.sqlite").load()
+        assert len(data["processed_email_ids"]) == 501
+        assert data["created_batches"][-1] == "temp/email_novo"
+        assert data["total_processed"] == 1
+
+    def test_set_changed_directly_is_saved(self, temp_dir):
+        """Ids adicionados direto no conjunto (sem mark_processed) também são gravados."""
+        from services.checkpoint_store import CheckpointStore
+
+        store = CheckpointStore(temp_dir / "_checkpoint.sqlite")
+        checkpoint = self._checkpoint(3)
+        store.save(checkpoint)
+        checkpoint.processed_email_ids.add("email_direto")
+        store.save(checkpoint)
+
+        data = CheckpointStore(temp_dir / "_checkpoint.sqlite").load()
+        assert "email_direto" in data["processed_email_ids"]
+        assert len(data["processed_email_ids"]) == 4
+
+    def test_new_instance_replaces_instead_of_appending(self, temp_dir):
+        """Primeira gravação sem load regrava tudo (não duplica lotes)."""
+        from services.checkpoint_store import CheckpointStore
+
+        path = temp_dir / "_checkpoint.sqlite"
+        CheckpointStore(path).save(self._checkpoint(3))
+        CheckpointStore(path).save(self._checkpoint(2))
+
+        data = CheckpointStore(path).load()
+        assert len(data["created_batches"]) == 2
+        assert len(data["processed_email_ids"]) == 2
+
+    def test_legacy_json_is_migrated(self, mock_ingestor, temp_dir):
+        """O _checkpoint.json antigo é importado uma vez e renomeado."""
+        legacy = temp_dir / "_checkpoint.json"
+        legacy.write_text(json.dumps({
+            "status": "INTERRUPTED",
+            "processed_email_ids": ["email_001", "email_002"],
+            "created_batches": ["temp/email_001"],
+            "created_avisos": [{"email_id": "email_002", "link_nfe": "https://x"}],
+            "total_processed": 2,
+            "subject_filter": "ENC",
+        }), encoding="utf-8")
+
+        orchestrator = EmailIngestionOrchestrator(ingestor=mock_ingestor, temp_dir=temp_dir)
+        assert orchestrator._load_checkpoint() is True
+
+        assert not legacy.exists()
+        assert (temp_dir / "_checkpoint.json.migrated").exists()
+        assert orchestrator.checkpoint_path.exists()
+
+        orchestrator2 = EmailIngestionOrchestrator(ingestor=mock_ingestor, temp_dir=temp_dir)
+        assert orchestrator2._load_checkpoint() is True
+        checkpoint = orchestrator2._checkpoint
+        assert checkpoint.status == IngestionStatus.INTERRUPTED
+        assert checkpoint.processed_email_ids == {"email_001", "email_002"}
+        assert checkpoint.created_avisos[0]["link_nfe"] == "https://x"
+
+
 class TestIngestionResult:
     """Testes para IngestionResult."""
 
@@ -170,7 +260,8 @@ class TestEmailIngestionOrchestrator:
             temp_dir=temp_dir,
         )
 
-        assert orchestrator.checkpoint_path == temp_dir / "_checkpoint.json"
+        assert orchestrator.checkpoint_path == temp_dir / "_checkpoint.sqlite"
+        assert orchestrator.legacy_checkpoint_path == temp_dir / "_checkpoint.json"
 
     def test_save_and_load_checkpoint(self, mock_ingestor, temp_dir):
         """Testa salvamento e carregamento de checkpoint."""
@@ -580,6 +671,406 @@ class TestPartialResults:
         assert status["partial_batches_saved"] == 2
         assert status["partial_avisos_saved"] == 0
 
+    def test_batch_trace_saved_and_exported(self, mock_ingestor, temp_dir):
+        """Spans dos lotes vão para o JSONL da sessão e viram Chrome trace."""
+        import json
+
+        from core.batch_result import BatchResult
+
+        orchestrator = EmailIngestionOrchestrator(
+            ingestor=mock_ingestor,
+            temp_dir=temp_dir,
+            trace_dir=temp_dir / "traces",
+        )
+        batch_result = BatchResult(batch_id="batch_001")
+        batch_result.spans = [{
+            "name": "batch.process", "start": 1.0, "duration": 0.5,
+            "span_id": "1-1", "parent_id": None, "pid": 1, "tid": 1, "attrs": {},
+        }]
+
+        orchestrator._save_batch_trace(batch_result)
+        orchestrator._save_batch_trace(BatchResult(batch_id="sem_spans"))
+        chrome_path = orchestrator.export_trace(temp_dir / "saida")
+
+        lines = orchestrator.trace_path.read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 1
+        assert json.loads(lines[0])["batch_id"] == "batch_001"
+        events = json.loads(chrome_path.read_text(encoding="utf-8"))["traceEvents"]
+        assert events[0]["name"] == "batch.process"
+        assert events[0]["dur"] == 500000
+
+    def test_trace_disabled_without_trace_dir(self, mock_ingestor, temp_dir):
+        """Sem trace_dir nada é gravado."""
+        orchestrator = EmailIngestionOrchestrator(
+            ingestor=mock_ingestor,
+            temp_dir=temp_dir,
+        )
+        assert orchestrator.trace_path is None
+        assert orchestrator.export_trace(temp_dir) is None
+
+
+    def test_merge_partial_results_is_lazy(self, mock_ingestor, temp_dir):
+        """Histórico é só contado na mesclagem e reconstruído sob demanda."""
+        from core.batch_result import BatchResult
+        from core.models import InvoiceData
+
+        orchestrator = EmailIngestionOrchestrator(
+            ingestor=mock_ingestor,
+            temp_dir=temp_dir,
+        )
+        for i in range(3):
+            batch = BatchResult(batch_id=f"batch_{i}")
+            batch.add_document(InvoiceData(arquivo_origem=f"nf_{i}.pdf", valor_total=10.0))
+            orchestrator._save_partial_batch(batch)
+        # Linha truncada (queda no meio da gravação) e lote repetido
+        with open(orchestrator.partial_batches_path, "a", encoding="utf-8") as f:
+            f.write('{"batch_id": "batch_0", "documents": []}\n{"batch_id": "bat')
+        orchestrator.partial_avisos_path.write_text(
+            '{"email_id": "e1", "subject": "Link"}\n{"email_id": "e2"}\n',
+            encoding="utf-8",
+        )
+
+        current = BatchResult(batch_id="batch_2")
+        result = orchestrator._merge_partial_results_into_result(
+            IngestionResult(batch_results=[current])
+        )
+
+        assert result.batch_results == [current]
+        assert result.history_batches == 2
+        assert result.history_documents == 2
+        assert result.total_avisos == 2
+
+        batches = list(result.iter_batch_results())
+        assert [b.batch_id for b in batches] == ["batch_2", "batch_0", "batch_1"]
+        assert batches[1].documents[0].valor_total == 10.0
+        avisos = list(result.iter_avisos())
+        assert [a.email_id for a in avisos] == ["e1", "e2"]
+        assert avisos[0].subject == "Link"
+
+    def test_export_partial_results_to_csv_streams(self, mock_ingestor, temp_dir):
+        """Exportação parcial escreve documentos e avisos com esquema fixo."""
+        import csv
+
+        from core.batch_result import BatchResult
+        from core.models import BoletoData, EmailAvisoData, InvoiceData
+
+        orchestrator = EmailIngestionOrchestrator(
+            ingestor=mock_ingestor,
+            temp_dir=temp_dir,
+        )
+        batch = BatchResult(batch_id="batch_001", email_subject="NF; janeiro")
+        batch.add_document(InvoiceData(arquivo_origem="nf.pdf", valor_total=1.5))
+        batch.add_document(BoletoData(arquivo_origem="bol.pdf", valor_documento=1.5))
+        orchestrator._save_partial_batch(batch)
+        orchestrator._save_partial_aviso(
+            EmailAvisoData(arquivo_origem="email_9", link_nfe="https://nf")
+        )
+
+        out = temp_dir / "saida"
+        assert orchestrator.export_partial_results_to_csv(out) == (1, 1)
+
+        with open(out / "parcial_documentos.csv", encoding="utf-8-sig") as f:
+            rows = list(csv.DictReader(f, delimiter=";"))
+        assert [r["tipo_documento"] for r in rows] == ["NFSE", "BOLETO"]
+        assert rows[0]["email_subject"] == "NF; janeiro"
+        assert rows[0]["valor_total"] == "1.5"
+        assert rows[1]["valor_total"] == ""
+        assert rows[1]["valor_documento"] == "1.5"
+
+        with open(out / "avisos_emails_sem_anexo_latest.csv", encoding="utf-8-sig") as f:
+            avisos = list(csv.DictReader(f, delimiter=";"))
+        assert avisos[0]["arquivo_origem"] == "email_9"
+        assert avisos[0]["link_nfe"] == "https://nf"
+        assert (out / "parcial_avisos.csv").exists()
+
+
+
+class TestStreamingExport:
+    """Testes da exportação em fluxo de run_ingestion."""
+
+    def test_export_batch_results_from_generator(self, temp_dir):
+        """Lotes vindos de um gerador geram os CSVs e os totais do resumo."""
+        import csv
+
+        from core.batch_result import BatchResult
+        from core.models import BoletoData, InvoiceData
+        from run_ingestion import export_batch_results
+
+        def lotes():
+            for i in range(3):
+                batch = BatchResult(batch_id=f"batch_{i}", email_subject=f"Fatura\n{i}; ok")
+                batch.add_document(
+                    InvoiceData(arquivo_origem=f"nf_{i}.pdf", valor_total=100.5, numero_nota=str(i))
+                )
+                if i == 0:
+                    batch.add_document(BoletoData(arquivo_origem="bol.pdf", valor_documento=100.5))
+                yield batch
+
+        summary = export_batch_results(lotes(), temp_dir)
+
+        assert summary.lotes == 3
+        assert summary.documentos == 4
+        assert summary.valor_total == pytest.approx(301.5)
+        assert summary.status == {"OK": 3}
+        assert not (temp_dir / "relatorio_danfe.csv").exists()
+
+        def ler(nome):
+            with open(temp_dir / nome, encoding="utf-8-sig") as f:
+                return list(csv.DictReader(f, delimiter=";"))
+
+        nfse = ler("relatorio_nfse.csv")
+        assert len(nfse) == 3
+        assert nfse[0]["valor_total"] == "100,5"
+        assert nfse[0]["batch_id"] == "batch_0"
+        consolidado = ler("relatorio_consolidado.csv")
+        assert len(consolidado) == 4
+        assert list(consolidado[0])[:2] == ["batch_id", "tipo_documento"]
+        lotes_csv = ler("relatorio_lotes.csv")
+        assert len(lotes_csv) == summary.pares
+        assert lotes_csv[0]["email_subject"] == "Fatura 0, ok"
+
+
+    def test_export_batch_results_parquet_dataset(self, temp_dir):
+        """Com parquet_dir, documentos e lotes vão para datasets particionados."""
+        pytest.importorskip("pyarrow")
+        from core.batch_result import BatchResult
+        from core.exporters import read_parquet_dataset
+        from core.models import BoletoData, InvoiceData
+        from run_ingestion import export_batch_results
+
+        lotes = []
+        for i, dia in enumerate(["2025-01-15", "2025-02-03"]):
+            batch = BatchResult(batch_id=f"batch_{i}")
+            batch.add_document(
+                InvoiceData(arquivo_origem="nf.pdf", valor_total=10.0 + i, data_processamento=dia)
+            )
+            batch.add_document(
+                BoletoData(arquivo_origem="bol.pdf", valor_documento=10.0 + i, data_processamento=dia)
+            )
+            lotes.append(batch)
+
+        export_batch_results(lotes, temp_dir, temp_dir / "datasets")
+        # Reexportar substitui as partições em vez de duplicar linhas
+        export_batch_results(lotes, temp_dir, temp_dir / "datasets")
+
+        docs = temp_dir / "datasets" / "documentos"
+        assert (docs / "tipo_documento=NFSE" / "data_processamento=2025-01-15").is_dir()
+        nfse = read_parquet_dataset(
+            docs, columns=["batch_id", "valor_total"], tipo_documento="NFSE"
+        )
+        assert list(nfse.columns) == ["batch_id", "valor_total"]
+        assert sorted(nfse["valor_total"]) == [10.0, 11.0]
+        assert str(nfse["valor_total"].dtype) == "float64"
+
+        resumo = read_parquet_dataset(
+            temp_dir / "datasets" / "lotes",
+            columns=["batch_id", "boletos"],
+            partition_by=("data_processamento",),
+            data_processamento="2025-02-03",
+        )
+        assert resumo.to_dict("records") == [{"batch_id": "batch_1", "boletos": 1}]
+
+    def test_parquet_exporter_schema_from_dataclasses(self, temp_dir):
+        """ParquetExporter usa os tipos dos dataclasses (Optional[float] -> float64)."""
+        pytest.importorskip("pyarrow")
+        from core.exporters import ParquetExporter, document_column_types, read_parquet_dataset
+        from core.models import InvoiceData
+
+        tipos = document_column_types()
+        assert tipos["valor_total"] is float
+        assert tipos["valor_iss"] is float
+        assert tipos["numero_nota"] is str
+
+        ParquetExporter().export(
+            [InvoiceData(arquivo_origem="nf.pdf", numero_nota=123, valor_iss=None)],
+            str(temp_dir / "ds"),
+        )
+        df = read_parquet_dataset(temp_dir / "ds", columns=["numero_nota", "valor_iss"])
+        assert df["numero_nota"].tolist() == ["123"]
+        assert df["valor_iss"].isna().all()
+
+
+class TestStagedPipeline:
+    """Testes do pipeline em estágios (download → extração → correlação)."""
+
+    def test_items_pass_through_all_stages(self):
+        """Todos os itens atravessam os estágios, com várias threads por estágio."""
+        pipeline = StagedPipeline(
+            range(20),
+            [
+                Stage("double", lambda x: x * 2, workers=3, queue_size=2),
+                Stage("inc", lambda x: x + 1, workers=2, queue_size=2),
+            ],
+        )
+
+        values = sorted(item.value for item in pipeline)
+
+        assert values == [x * 2 + 1 for x in range(20)]
+        stats = pipeline.stats()
+        assert stats["source"]["items"] == 20
+        assert stats["double"]["items"] == 20
+        assert stats["inc"]["items"] == 20
+
+    def test_stage_error_skips_later_stages(self):
+        """Falha em um estágio chega ao consumidor sem passar pelos seguintes."""
+        later = []
+
+        def fail_on_three(x):
+            if x == 3:
+                raise ValueError("falhou")
+            return x
+
+        pipeline = StagedPipeline(
+            range(5),
+            [Stage("first", fail_on_three), Stage("second", lambda x: later.append(x) or x)],
+        )
+
+        items = {item.source: item for item in pipeline}
+
+        assert not items[3].ok
+        assert items[3].failed_stage == "first"
+        assert isinstance(items[3].error, ValueError)
+        assert sorted(later) == [0, 1, 2, 4]
+
+    def test_source_error_is_raised_after_draining(self):
+        """Erro na fonte é relançado depois dos itens já produzidos."""
+        def source():
+            yield 1
+            yield 2
+            raise ConnectionError("IMAP caiu")
+
+        received = []
+        with pytest.raises(ConnectionError):
+            for item in StagedPipeline(source(), [Stage("id", lambda x: x)]):
+                received.append(item.value)
+
+        assert sorted(received) == [1, 2]
+
+    def test_backpressure_limits_source(self):
+        """Fila cheia segura a fonte: ela não se adianta indefinidamente."""
+        produced = []
+        release = threading.Event()
+
+        def source():
+            for i in range(50):
+                produced.append(i)
+                yield i
+
+        def slow(x):
+            release.wait(timeout=5)
+            return x
+
+        pipeline = StagedPipeline(
+            source(), [Stage("slow", slow, queue_size=2)], output_queue_size=1
+        )
+        iterator = iter(pipeline)
+        time.sleep(0.5)
+        # 1 em execução + 2 na fila + 1 aguardando put (+1 lido pelo iterador)
+        assert len(produced) <= 6
+
+        release.set()
+        next(iterator)
+        iterator.close()
+        assert len(produced) < 50
+
+    def test_consumer_stop_closes_source(self):
+        """Parar a iteração fecha o gerador da fonte (encerra downloads)."""
+        closed = threading.Event()
+
+        def source():
+            try:
+                i = 0
+                while True:
+                    yield i
+                    i += 1
+            finally:
+                closed.set()
+
+        for item in StagedPipeline(source(), [Stage("id", lambda x: x)]):
+            if item.value >= 3:
+                break
+
+        assert closed.wait(timeout=5)
+
+    def test_metrics_record_stages(self):
+        """Profundidade de fila e vazão por estágio vão para IngestionMetrics."""
+        metrics = MagicMock()
+        list(StagedPipeline(range(3), [Stage("extract", lambda x: x)], metrics=metrics))
+
+        stages = {c.args[0] for c in metrics.record_stage_item.call_args_list}
+        assert stages == {"source", "extract"}
+        assert metrics.set_stage_queue_depth.called
+        assert metrics.set_stage_throughput.called
+
+    @patch(
+        "services.email_ingestion_orchestrator.EmailIngestionOrchestrator._process_batch_with_timeout"
+    )
+    def test_orchestrator_saves_batches_through_pipeline(
+        self, mock_process, mock_ingestor, temp_dir
+    ):
+        """Fase de anexos: extração sem correlação no worker, correlação e gravação depois."""
+        from core.batch_result import BatchResult
+        from core.models import InvoiceData
+
+        def fake_process(folder, apply_correlation):
+            result = BatchResult(batch_id=folder.name, source_folder=str(folder))
+            result.add_document(InvoiceData(arquivo_origem="nf_001.pdf", valor_total=10.0))
+            return result
+
+        mock_process.side_effect = fake_process
+        orchestrator = EmailIngestionOrchestrator(
+            ingestor=mock_ingestor,
+            temp_dir=temp_dir,
+        )
+
+        results, count = orchestrator._process_emails_with_attachments(subject_filter="ENC")
+
+        assert count == 1
+        assert mock_process.call_args.args[1] is False
+        assert results[0].correlation_result is not None
+        assert orchestrator.partial_batches_path.exists()
+        assert results[0].batch_id in orchestrator._checkpoint.processed_email_ids
+
+        summary = orchestrator._metrics.get_stage_summary()
+        for stage in ("fetch", "extract", "correlate"):
+            assert summary[stage]["items"] >= 1
+
+    def test_correlate_stage_skips_empty_batch(self, mock_ingestor, temp_dir):
+        """Lote sem documentos passa pelo estágio sem correlação (como no BatchProcessor)."""
+        from core.batch_result import BatchResult
+
+        folder = Path(temp_dir) / "email_vazio"
+        folder.mkdir()
+        orchestrator = EmailIngestionOrchestrator(ingestor=mock_ingestor, temp_dir=temp_dir)
+
+        result = orchestrator._correlate_batch(
+            BatchResult(batch_id=folder.name, source_folder=str(folder))
+        )
+
+        assert result.correlation_result is None
+
+    def test_correlate_stage_records_spans(self, mock_ingestor, temp_dir):
+        """Spans da correlação entram em BatchResult.spans, abaixo de batch.process."""
+        from core.batch_result import BatchResult
+        from core.models import InvoiceData
+        from core.tracing import collect_spans, span
+
+        folder = Path(temp_dir) / "email_1"
+        folder.mkdir()
+        with collect_spans() as trace:
+            with span("batch.process", batch_id=folder.name):
+                pass
+        batch = BatchResult(batch_id=folder.name, source_folder=str(folder))
+        batch.add_document(InvoiceData(arquivo_origem="nf_001.pdf", valor_total=10.0))
+        batch.spans = trace.to_dicts()
+        orchestrator = EmailIngestionOrchestrator(ingestor=mock_ingestor, temp_dir=temp_dir)
+
+        result = orchestrator._correlate_batch(batch)
+
+        spans = {s["name"]: s for s in result.spans}
+        assert "correlation.correlate" in spans
+        assert spans["correlation.correlate"]["parent_id"] == spans["batch.process"]["span_id"]
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -8,6 +8,7 @@ Testa a funcionalidade de métricas e observabilidade incluindo:
 - Medição de latência
 - Exportação para JSON e Prometheus
 - IngestionMetrics
+- Spans por estágio (core/tracing.py)
 
 Autor: Sistema de Ingestão
 Versão: 1.0.0
@@ -30,6 +31,17 @@ from core.metrics import (
     get_global_metrics,
     reset_global_metrics,
 )
+from core.tracing import (
+    adopt_spans,
+    collect_spans,
+    current_span,
+    export_chrome_trace,
+    export_jsonl,
+    load_jsonl,
+    span,
+    summarize_spans,
+    traced,
+)
 
 
 class TestMetricValue:
@@ -217,6 +229,24 @@ class TestMetricsCollector:
         assert "latency" in metrics["histograms"]
         assert metrics["histograms"]["latency"]["count"] == 2
 
+    def test_histogram_deltas_merge(self):
+        """Observações desde o snapshot são somadas em outro coletor (worker -> pai)."""
+        collector = MetricsCollector()
+        collector.observe_histogram("ocr_page_seconds", 0.2, {"dpi": "300"})
+        antes = collector.snapshot_histograms()
+        collector.observe_histogram("ocr_page_seconds", 0.4, {"dpi": "300"})
+        collector.observe_histogram("ocr_page_seconds", 3.0, {"dpi": "300"})
+
+        deltas = collector.histogram_deltas(antes)
+        collector.reset()
+        collector.merge_histogram_deltas(deltas)
+
+        stats = collector.get_all_metrics()["histograms"]["ocr_page_seconds{dpi=300}"]
+        assert stats["count"] == 2
+        assert stats["sum"] == pytest.approx(3.4)
+        assert stats["buckets"]["le_0.5"] == 1
+        assert collector.histogram_deltas(collector.snapshot_histograms()) == {}
+
     def test_measure_context_manager(self):
         """Testa context manager para medição de latência."""
         collector = MetricsCollector()
@@ -501,6 +531,22 @@ class TestIngestionMetrics:
             assert "session" in data
             assert "metrics" in data
 
+    def test_stage_metrics(self):
+        """Testa itens, vazão e profundidade de fila por estágio do pipeline."""
+        metrics = IngestionMetrics()
+
+        metrics.record_stage_item("extract", 0.5)
+        metrics.record_stage_item("extract", 0.7, ok=False)
+        metrics.set_stage_queue_depth("extract", 3)
+        metrics.set_stage_throughput("extract", 1.5)
+
+        summary = metrics.get_stage_summary()
+        assert summary["extract"] == {"items": 2, "throughput": 1.5, "queue_depth": 3}
+
+        counters = metrics.collector.get_all_metrics()["counters"]
+        key = f"{IngestionMetrics.STAGE_ITEMS}{{stage=extract,status=error}}"
+        assert counters[key] == 1
+
     def test_session_id_format(self):
         """Testa formato do session_id."""
         metrics = IngestionMetrics()
@@ -593,3 +639,128 @@ class TestMetricsIntegration:
 
         summary = metrics.get_session_summary()
         assert summary["emails_scanned"] == 250
+
+
+class TestTracing:
+    """Testes para os spans de core/tracing.py."""
+
+    def test_span_without_collection_is_noop(self):
+        """Fora de collect_spans nada é medido."""
+        with span("strategy.native") as s:
+            s.set(chars=10)
+        assert current_span().name == ""
+
+    def test_nested_spans_have_parent(self):
+        """Spans aninhados apontam para o span pai."""
+        with collect_spans() as trace:
+            with span("processor.process", file="nota.pdf"):
+                with span("processor.read") as read:
+                    read.set(chars=42)
+
+        spans = {s["name"]: s for s in trace.to_dicts()}
+        assert spans["processor.process"]["parent_id"] is None
+        assert spans["processor.read"]["parent_id"] == spans["processor.process"]["span_id"]
+        assert spans["processor.read"]["attrs"] == {"chars": 42}
+        assert spans["processor.process"]["duration"] >= spans["processor.read"]["duration"]
+
+    def test_exception_is_recorded(self):
+        """Exceções marcam o span e são relançadas."""
+        with collect_spans() as trace:
+            with pytest.raises(ValueError):
+                with span("extractor.extract"):
+                    raise ValueError("falhou")
+
+        assert trace.to_dicts()[0]["attrs"]["error"] == "ValueError"
+
+    def test_traced_skips_recursive_calls(self):
+        """Recursão do mesmo método fica em um único span."""
+
+        @traced("strategy.native")
+        def extract(depth):
+            return extract(depth - 1) if depth else "ok"
+
+        with collect_spans() as trace:
+            assert extract(2) == "ok"
+
+        assert [s["name"] for s in trace.to_dicts()] == ["strategy.native"]
+
+    def test_context_follows_run_with_timeout(self):
+        """Spans em thread de run_with_timeout ficam sob o span do chamador."""
+        from core.supervised_executor import run_with_timeout
+
+        def tarefa():
+            with span("strategy.ocr"):
+                return 1
+
+        with collect_spans() as trace:
+            with span("processor.read"):
+                run_with_timeout(tarefa, timeout=5)
+
+        spans = {s["name"]: s for s in trace.to_dicts()}
+        assert spans["strategy.ocr"]["parent_id"] == spans["processor.read"]["span_id"]
+
+    def test_adopt_spans_reparents_roots(self):
+        """Spans vindos de worker entram sob o span aberto."""
+        worker_spans = [
+            {"name": "processor.process", "start": 1.0, "duration": 0.5,
+             "span_id": "99-1", "parent_id": None, "pid": 99, "tid": 1, "attrs": {}},
+            {"name": "processor.read", "start": 1.1, "duration": 0.2,
+             "span_id": "99-2", "parent_id": "99-1", "pid": 99, "tid": 1, "attrs": {}},
+        ]
+        with collect_spans() as trace:
+            with span("file.pdf") as file_span:
+                adopt_spans(worker_spans)
+
+        spans = {s["name"]: s for s in trace.to_dicts()}
+        assert spans["processor.process"]["parent_id"] == file_span.span_id
+        assert spans["processor.read"]["parent_id"] == "99-1"
+
+    def test_disabled_by_settings(self, monkeypatch):
+        """TRACING_ENABLED=0 desativa a coleta."""
+        from config import settings
+
+        monkeypatch.setattr(settings, "TRACING_ENABLED", False)
+        with collect_spans() as trace:
+            with span("batch.process"):
+                pass
+        assert trace.to_dicts() == []
+
+    def test_max_spans(self):
+        """Spans além do limite são descartados e contados."""
+        with collect_spans(max_spans=2) as trace:
+            for _ in range(3):
+                with span("processor.route"):
+                    pass
+        assert len(trace.to_dicts()) == 2
+        assert trace.dropped == 1
+
+    def test_export_jsonl_and_chrome(self):
+        """Exportação JSONL (com campos extras) e Chrome trace-event."""
+        with collect_spans() as trace:
+            with span("correlation.correlate"):
+                with span("correlation.duplicates"):
+                    pass
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            jsonl = export_jsonl(trace.to_dicts(), Path(tmpdir) / "trace.jsonl", batch_id="lote1")
+            loaded = load_jsonl(jsonl)
+            chrome = export_chrome_trace(loaded, Path(tmpdir) / "trace.json")
+            data = json.loads(chrome.read_text(encoding="utf-8"))
+
+        assert [s["batch_id"] for s in loaded] == ["lote1", "lote1"]
+        events = data["traceEvents"]
+        assert {e["ph"] for e in events} == {"X"}
+        assert events[0]["cat"] == "correlation"
+        assert events[0]["args"]["batch_id"] == "lote1"
+        assert events[0]["dur"] >= events[1]["dur"]
+
+    def test_summarize_spans(self):
+        """Resumo ordenado pelo tempo total."""
+        spans = [
+            {"name": "strategy.ocr", "duration": 2.0},
+            {"name": "processor.route", "duration": 0.1},
+            {"name": "strategy.ocr", "duration": 1.0},
+        ]
+        summary = summarize_spans(spans)
+        assert list(summary) == ["strategy.ocr", "processor.route"]
+        assert summary["strategy.ocr"] == {"count": 2, "seconds": 3.0}
@@ -9,7 +9,7 @@ import pytest
 from config.bancos import NOMES_BANCOS
 from config.feriados_sp import SPBusinessCalendar
 from core.diagnostics import ExtractionDiagnostics
-from core.models import BoletoData, InvoiceData
+from core.models import BoletoData, EmailAvisoData, InvoiceData, texto_snippet
 
 
 class TestSPBusinessCalendar:
@@ -308,5 +308,61 @@ class TestModelsToSheetsRow:
         assert invoice.total_retencoes == 50.00
 
 
+class TestModelsCompactos:
+    """Testes dos modelos com slots, textos compartilhados e snippet do texto"""
+
+    def test_texto_snippet_equivale_a_normalizar_o_texto_inteiro(self):
+        """texto_snippet lê só o início, com o mesmo resultado de ' '.join(split())"""
+        textos = [
+            "",
+            "   ",
+            "NOTA  FISCAL\n\tServiço\u00a0prestado",
+            "palavra " * 200,
+            "x" * 600 + " fim",
+            ("Linha\r\n" * 150) + "   Total R$ 1.234,56",
+        ]
+        for texto in textos:
+            for limite in (0, 7, 500):
+                assert texto_snippet(texto, limite) == " ".join(texto.split())[:limite]
+        assert texto_snippet(None) == ""
+
+    def test_modelos_sem_dict_por_instancia(self):
+        """__slots__: só os campos declarados podem ser atribuídos"""
+        boleto = BoletoData(arquivo_origem="b.pdf", data_vencimento="2025-03-10")
+
+        assert not hasattr(boleto, "__dict__")
+        assert boleto.vencimento == "2025-03-10"
+        with pytest.raises(AttributeError):
+            boleto.campo_inexistente = "x"
+
+    def test_modelos_continuam_serializaveis(self):
+        """pickle (multiprocessing) e cópias seguem funcionando com slots"""
+        import copy
+        import pickle
+
+        aviso = EmailAvisoData(arquivo_origem="email_1", empresa="CSC", link_nfe="https://x")
+
+        assert pickle.loads(pickle.dumps(aviso)) == aviso
+        assert copy.deepcopy(aviso) == aviso
+
+    def test_textos_repetidos_sao_compartilhados(self):
+        """empresa/fornecedor/banco iguais apontam para o mesmo objeto"""
+        empresa = "".join(["CS", "C"])
+        banco = "".join(["BANCO ", "ITAU"])
+        a = BoletoData(arquivo_origem="a.pdf", empresa=empresa, banco_nome=banco)
+        b = BoletoData(arquivo_origem="b.pdf", empresa="".join(["C", "SC"]), banco_nome="".join(["BANCO", " ITAU"]))
+
+        assert a.empresa is b.empresa
+        assert a.banco_nome is b.banco_nome
+
+    def test_formatadores_de_data(self):
+        """Datas inválidas continuam virando string vazia nas linhas"""
+        invoice = InvoiceData(arquivo_origem="n.pdf", data_processamento="2025-01-15", vencimento="15/01/2025")
+        row = invoice.to_sheets_row()
+
+        assert row[0] == "15/01/2025"
+        assert row[8] == ""
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v", "--tb=short"])
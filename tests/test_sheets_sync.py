@@ -0,0 +1,392 @@
+"""
+Testes para o módulo core/sheets_sync.py
+
+Testa a sincronização incremental com o Google Sheets contra uma aba falsa
+em memória (mesma interface do gspread.Worksheet):
+- Inserção, atualização e linhas sem alteração (diferença por chave)
+- Número de requisições (leitura única, envio em lote)
+- Retomada após falha no meio do envio
+- Adoção de linhas antigas sem ID
+- TokenBucket e retry em 429
+- Integração com GoogleSheetsExporterDualTab e GoogleSheetsExporter.sync
+"""
+
+import re
+import tempfile
+import unittest
+from pathlib import Path
+
+from core.models import EmailAvisoData, OtherDocumentData
+from core.sheets_sync import (
+    KEY_HEADER,
+    SheetSync,
+    SheetSyncState,
+    TokenBucket,
+    column_letter,
+    sheet_row_key,
+)
+
+HEADERS = ["DATA", "ASSUNTO", "VALOR"]
+
+
+def _column_index(letters: str) -> int:
+    index = 0
+    for char in letters:
+        index = index * 26 + ord(char) - ord("A") + 1
+    return index
+
+
+class FakeAPIError(Exception):
+    """Erro com `code`, como o gspread.exceptions.APIError."""
+
+    def __init__(self, code: int):
+        super().__init__(f"HTTP {code}")
+        self.code = code
+
+
+class FakeWorksheet:
+    """Aba do Google Sheets em memória (subconjunto usado pelo SheetSync)."""
+
+    def __init__(self, values=None, title="anexos", col_count=None):
+        self.title = title
+        self.spreadsheet_id = "planilha"
+        self.values = [list(row) for row in (values or [])]
+        self.col_count = col_count or max([len(row) for row in self.values] + [1])
+        self.calls = []
+        self.fail_on = {}  # método -> lista de erros a lançar nas próximas chamadas
+
+    def _maybe_fail(self, method):
+        self.calls.append(method)
+        errors = self.fail_on.get(method)
+        if errors:
+            raise errors.pop(0)
+
+    def _set(self, row, col, value):
+        while len(self.values) < row:
+            self.values.append([])
+        line = self.values[row - 1]
+        while len(line) < col:
+            line.append("")
+        line[col - 1] = value
+
+    def get_all_values(self):
+        self._maybe_fail("get_all_values")
+        width = max([len(row) for row in self.values] + [0])
+        return [[str(cell) for cell in row] + [""] * (width - len(row)) for row in self.values]
+
+    def batch_update(self, data, value_input_option=None):
+        self._maybe_fail("batch_update")
+        for item in data:
+            match = re.fullmatch(r"([A-Z]+)(\d+):([A-Z]+)(\d+)", item["range"])
+            first_col, first_row = _column_index(match.group(1)), int(match.group(2))
+            last_col = _column_index(match.group(3))
+            if last_col > self.col_count:
+                raise AssertionError(f"Fora da grade: {item['range']}")
+            for r, row in enumerate(item["values"]):
+                for c, value in enumerate(row):
+                    self._set(first_row + r, first_col + c, value)
+
+    def append_rows(self, values, value_input_option=None):
+        self._maybe_fail("append_rows")
+        for row in values:
+            self.values.append(list(row))
+        self.col_count = max([self.col_count] + [len(row) for row in values])
+
+    def add_cols(self, cols):
+        self._maybe_fail("add_cols")
+        self.col_count += cols
+
+
+def _bucket():
+    # Sem espera real nos testes
+    return TokenBucket(6000, sleep=lambda seconds: None)
+
+
+class TestSheetSync(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.state = SheetSyncState(Path(self._tmp.name) / "sync.sqlite")
+
+    def tearDown(self):
+        self.state.close()
+        self._tmp.cleanup()
+
+    def _sync(self, worksheet, **kwargs):
+        kwargs.setdefault("state", self.state)
+        kwargs.setdefault("bucket", _bucket())
+        return SheetSync(worksheet, HEADERS, sleep=lambda seconds: None, **kwargs)
+
+    def test_aba_vazia_recebe_cabecalho_e_linhas(self):
+        ws = FakeWorksheet()
+        result = self._sync(ws).sync([("b1", ["01/01/2025", "A", 10.0]), ("b2", ["02/01/2025", "B", 20.0])])
+
+        self.assertEqual(result.inserted, 2)
+        self.assertEqual(ws.values[0], HEADERS + [KEY_HEADER])
+        self.assertEqual(ws.values[1], ["01/01/2025", "A", 10.0, "b1"])
+        self.assertEqual(ws.values[2][-1], "b2")
+
+    def test_reexportacao_nao_duplica(self):
+        ws = FakeWorksheet([HEADERS + [KEY_HEADER]])
+        rows = [(f"b{i}", ["01/01/2025", f"assunto {i}", float(i)]) for i in range(250)]
+        self._sync(ws, chunk_rows=100).sync(rows)
+        self.assertEqual(len(ws.values), 251)
+
+        ws.calls.clear()
+        result = self._sync(ws, chunk_rows=100).sync(rows)
+
+        self.assertEqual((result.inserted, result.updated, result.unchanged), (0, 0, 250))
+        self.assertEqual(len(ws.values), 251)
+        # Só a leitura da aba
+        self.assertEqual(ws.calls, ["get_all_values"])
+
+    def test_envio_em_lote(self):
+        ws = FakeWorksheet([HEADERS + [KEY_HEADER]])
+        rows = [(f"b{i}", ["01/01/2025", f"assunto {i}", float(i)]) for i in range(250)]
+        result = self._sync(ws, chunk_rows=100).sync(rows)
+
+        # 1 leitura + 3 append_rows (100 + 100 + 50)
+        self.assertEqual(result.requests, 4)
+        self.assertEqual(ws.calls.count("append_rows"), 3)
+
+    def test_linha_alterada_e_atualizada_no_lugar(self):
+        ws = FakeWorksheet([HEADERS + [KEY_HEADER]])
+        rows = [(f"b{i}", ["01/01/2025", f"assunto {i}", float(i)]) for i in range(5)]
+        self._sync(ws).sync(rows)
+
+        rows[2] = ("b2", ["01/01/2025", "assunto 2", 99.0])
+        rows[3] = ("b3", ["01/01/2025", "assunto 3", 98.0])
+        ws.calls.clear()
+        result = self._sync(ws).sync(rows + [("b9", ["03/01/2025", "novo", 1.0])])
+
+        self.assertEqual((result.inserted, result.updated, result.unchanged), (1, 2, 3))
+        self.assertEqual(ws.values[3], ["01/01/2025", "assunto 2", 99.0, "b2"])
+        self.assertEqual(ws.values[4], ["01/01/2025", "assunto 3", 98.0, "b3"])
+        self.assertEqual(ws.values[-1][-1], "b9")
+        # Linhas 4 e 5 consecutivas: um batch_update com um intervalo
+        self.assertEqual(ws.calls, ["get_all_values", "batch_update", "append_rows"])
+
+    def test_sem_estado_linhas_existentes_sao_reenviadas_sem_duplicar(self):
+        ws = FakeWorksheet([HEADERS + [KEY_HEADER], ["01/01/2025", "A", "10", "b1"]])
+        result = self._sync(ws, state=None).sync([("b1", ["01/01/2025", "A", 10.0])])
+
+        self.assertEqual((result.inserted, result.updated), (0, 1))
+        self.assertEqual(len(ws.values), 2)
+
+    def test_retomada_apos_falha(self):
+        ws = FakeWorksheet([HEADERS + [KEY_HEADER]])
+        rows = [(f"b{i}", ["01/01/2025", f"assunto {i}", float(i)]) for i in range(30)]
+        original = ws.append_rows
+        calls = []
+
+        def append_rows(values, value_input_option=None):
+            # Segunda requisição de inserção falha (queda no meio da exportação)
+            calls.append(len(values))
+            if len(calls) == 2:
+                raise ValueError("conexão perdida")
+            return original(values, value_input_option=value_input_option)
+
+        ws.append_rows = append_rows
+        with self.assertRaises(ValueError):
+            self._sync(ws, chunk_rows=10).sync(rows)
+        self.assertEqual(len(ws.values), 11)
+
+        ws.append_rows = original
+        result = self._sync(ws, chunk_rows=10).sync(rows)
+
+        self.assertEqual((result.inserted, result.unchanged), (20, 10))
+        keys = [row[-1] for row in ws.values[1:]]
+        self.assertEqual(sorted(keys), sorted(key for key, _ in rows))
+
+    def test_adota_linhas_antigas_sem_id(self):
+        ws = FakeWorksheet([HEADERS, ["01/01/2025", "Fatura 1", "10"], ["01/01/2025", "Fatura 2", "20"]])
+        result = self._sync(ws, legacy_columns=["DATA", "ASSUNTO"]).sync([
+            ("b2", ["01/01/2025", "Fatura 2", 20.0]),
+            ("b3", ["02/01/2025", "Fatura 3", 30.0]),
+        ])
+
+        self.assertEqual((result.adopted, result.inserted), (1, 1))
+        self.assertEqual(ws.values[0], HEADERS + [KEY_HEADER])
+        self.assertEqual(ws.values[1][3:], [])          # linha sem correspondência intacta
+        self.assertEqual(ws.values[2], ["01/01/2025", "Fatura 2", 20.0, "b2"])
+        self.assertEqual(ws.values[3][-1], "b3")
+        self.assertIn("add_cols", ws.calls)
+
+    def test_nf_com_zeros_a_esquerda_e_reconhecida(self):
+        ws = FakeWorksheet([["NF", "VALOR"], ["123", "10"]])
+        sync = SheetSync(
+            ws, ["NF", "VALOR"], state=self.state, bucket=_bucket(), legacy_columns=["NF"],
+        )
+        result = sync.sync([("b1", ["000123", 10.0])])
+
+        self.assertEqual((result.adopted, result.inserted), (1, 0))
+
+    def test_chaves_repetidas_ficam_com_a_ultima_linha(self):
+        ws = FakeWorksheet([HEADERS + [KEY_HEADER]])
+        result = self._sync(ws).sync([("b1", ["x", "A", 1.0]), ("b1", ["x", "B", 2.0])])
+
+        self.assertEqual(result.inserted, 1)
+        self.assertEqual(ws.values[1], ["x", "B", 2.0, "b1"])
+
+    def test_retry_em_429(self):
+        from core import sheets_sync
+
+        if sheets_sync.APIError is None:
+            self.skipTest("gspread não instalado")
+
+        class RateLimited(sheets_sync.APIError):
+            def __init__(self):
+                Exception.__init__(self, "429")
+                self.code = 429
+
+        ws = FakeWorksheet([HEADERS + [KEY_HEADER]])
+        ws.fail_on["append_rows"] = [RateLimited(), RateLimited()]
+        waits = []
+        sync = SheetSync(ws, HEADERS, state=self.state, bucket=_bucket(), sleep=waits.append)
+        result = sync.sync([("b1", ["x", "A", 1.0])])
+
+        self.assertEqual(result.inserted, 1)
+        self.assertEqual(waits, [1, 2])
+
+    def test_erro_nao_recuperavel_propaga(self):
+        ws = FakeWorksheet([HEADERS + [KEY_HEADER]])
+        ws.fail_on["append_rows"] = [FakeAPIError(400)]
+        with self.assertRaises(FakeAPIError):
+            self._sync(ws).sync([("b1", ["x", "A", 1.0])])
+        self.assertEqual(ws.calls.count("append_rows"), 1)
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def test_rajada_e_taxa_sustentada(self):
+        now = [0.0]
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            now[0] += seconds
+
+        bucket = TokenBucket(60, capacity=2, clock=lambda: now[0], sleep=sleep)
+        for _ in range(5):
+            bucket.acquire()
+
+        # 2 imediatas, depois 1 por segundo
+        self.assertEqual(len(sleeps), 3)
+        self.assertAlmostEqual(now[0], 3.0)
+
+    def test_drain_forca_espera(self):
+        now = [0.0]
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            now[0] += seconds
+
+        bucket = TokenBucket(120, clock=lambda: now[0], sleep=sleep)
+        bucket.drain()
+        waited = bucket.acquire()
+
+        self.assertAlmostEqual(waited, 0.5)
+
+    def test_taxa_invalida(self):
+        with self.assertRaises(ValueError):
+            TokenBucket(0)
+
+
+class TestHelpers(unittest.TestCase):
+
+    def test_sheet_row_key(self):
+        lote = OtherDocumentData(arquivo_origem="email_1", batch_id="email_1")
+        aviso = EmailAvisoData(arquivo_origem="email_2")
+        documento = OtherDocumentData(arquivo_origem="nota.pdf", batch_id="email_3")
+
+        self.assertEqual(sheet_row_key(lote), "email_1")
+        self.assertEqual(sheet_row_key(aviso), "email_2")
+        self.assertEqual(sheet_row_key(documento), "email_3/nota.pdf")
+
+    def test_column_letter(self):
+        self.assertEqual(column_letter(1), "A")
+        self.assertEqual(column_letter(12), "L")
+        self.assertEqual(column_letter(27), "AA")
+
+    def test_state_por_aba(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            state = SheetSyncState(Path(tmp) / "sync.sqlite")
+            state.record("p/anexos", [("b1", "h1")])
+            state.record("p/sem_anexos", [("b1", "h2")])
+            state.clear("p/sem_anexos")
+
+            self.assertEqual(state.hashes("p/anexos"), {"b1": "h1"})
+            self.assertEqual(state.hashes("p/sem_anexos"), {})
+            state.delete()
+            self.assertFalse(state.path.exists())
+
+
+class TestExportersSync(unittest.TestCase):
+
+    def test_export_duas_vezes_nao_duplica(self):
+        from scripts.export_to_sheets import (
+            ANEXOS_HEADERS,
+            ANEXOS_SHEET_NAME,
+            SEM_ANEXOS_SHEET_NAME,
+            GoogleSheetsExporterDualTab,
+        )
+
+        tabs = {}
+
+        class FakeSpreadsheet:
+            def worksheet(self, title):
+                return tabs[title]
+
+            def add_worksheet(self, title, rows, cols):
+                tabs[title] = FakeWorksheet(title=title, col_count=cols)
+                tabs[title].append_row = lambda row, value_input_option=None: tabs[title].values.append(list(row))
+                return tabs[title]
+
+        documents = [
+            OtherDocumentData(arquivo_origem="email_20250101_1", batch_id="email_20250101_1",
+                              data_processamento="2025-01-01", valor_total=10.0),
+            EmailAvisoData(arquivo_origem="email_20250101_2", data_processamento="2025-01-01"),
+        ]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            exporter = GoogleSheetsExporterDualTab(
+                spreadsheet_id="planilha", sync_state_path=Path(tmp) / "sync.sqlite"
+            )
+            exporter._client = object()
+            exporter._spreadsheet = FakeSpreadsheet()
+
+            exporter.export(documents)
+            exporter.export(documents)
+            exporter._sync_state.close()
+
+        anexos = tabs[ANEXOS_SHEET_NAME].values
+        self.assertEqual(anexos[0], ANEXOS_HEADERS + [KEY_HEADER])
+        self.assertEqual(len(anexos), 2)
+        self.assertEqual(anexos[1][-1], "email_20250101_1")
+        self.assertEqual(len(tabs[SEM_ANEXOS_SHEET_NAME].values), 2)
+
+    def test_google_sheets_exporter_sync(self):
+        from core import exporters
+
+        if not exporters.GSPREAD_AVAILABLE:
+            self.skipTest("gspread não instalado")
+
+        ws = FakeWorksheet(title="PAF")
+        exporter = exporters.GoogleSheetsExporter(spreadsheet_id="planilha")
+        exporter._worksheet = ws
+        doc = OtherDocumentData(arquivo_origem="nota.pdf", batch_id="email_1", valor_total=10.0)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            state = SheetSyncState(Path(tmp) / "sync.sqlite")
+            first = exporter.sync([doc], "PAF", state=state)
+            second = exporter.sync([doc], "PAF", state=state)
+            state.close()
+
+        self.assertEqual((first.inserted, second.unchanged), (1, 1))
+        self.assertEqual(ws.values[0], exporters.PAF_HEADERS + [KEY_HEADER])
+        self.assertEqual(ws.values[1][-1], "email_1/nota.pdf")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,6 +6,12 @@ Testa:
     - TablePdfStrategy: extração de tabelas
     - TesseractOcrStrategy: extração via OCR
     - Funções utilitárias de tratamento de senha
+    - PdfDocumentSession: abertura única compartilhada entre estratégias
+    - TextExtractionCache: cache persistente do texto extraído
+    - PdfPasswordResolver: senha lembrada por arquivo e por remetente
+    - Motor de OCR multipágina com ajuste automático de DPI
+    - OCR por regiões (imagens embutidas) no complemento híbrido
+    - Orçamento de páginas na leitura nativa (PDFs longos)
 """
 
 import unittest
@@ -346,5 +352,782 @@ class TestSmartExtractionStrategy(unittest.TestCase):
         mock_ocr.assert_called_once()
 
 
+class TestPdfDocumentSession(unittest.TestCase):
+    """Testes para a sessão de documento compartilhada entre estratégias."""
+
+    def _mock_pdf(self, text="Texto curto", tables=None):
+        mock_pdf = MagicMock()
+        mock_page = MagicMock()
+        mock_page.extract_text.return_value = text
+        mock_page.extract_tables.return_value = tables or []
+        mock_pdf.pages = [mock_page]
+        return mock_pdf, mock_page
+
+    @patch("strategies.pdf_utils.pdfplumber.open")
+    def test_native_e_table_abrem_pdf_uma_vez(self, mock_open):
+        """Native e Table devem reaproveitar o mesmo handle pdfplumber."""
+        from strategies.native import NativePdfStrategy
+        from strategies.pdf_session import PdfDocumentSession
+        from strategies.table import TablePdfStrategy
+
+        mock_pdf, mock_page = self._mock_pdf(
+            "Texto base " * 10, [[["CNPJ", "Valor"], ["12.345.678/0001-90", "100,00"]]]
+        )
+        mock_open.return_value = mock_pdf
+
+        with PdfDocumentSession("hibrido.pdf") as session:
+            NativePdfStrategy().extract("hibrido.pdf", session=session)
+            texto_table = TablePdfStrategy().extract("hibrido.pdf", session=session)
+            # Segunda leitura do layout vem do cache
+            TablePdfStrategy().extract("hibrido.pdf", session=session)
+
+        self.assertIn("DADOS ESTRUTURADOS", texto_table)
+        mock_open.assert_called_once_with("hibrido.pdf")
+        mock_page.extract_tables.assert_called_once()
+        mock_pdf.close.assert_called_once()
+
+    @patch("strategies.pdf_utils.gerar_candidatos_senha")
+    @patch("strategies.pdf_utils.pdfium")
+    @patch("strategies.pdf_utils.pdfplumber.open")
+    def test_senha_compartilhada_com_pypdfium(self, mock_open, mock_pdfium, mock_candidatos):
+        """A senha descoberta pelo pdfplumber é usada direto no pypdfium2."""
+        from strategies.pdf_session import PdfDocumentSession
+
+        mock_candidatos.return_value = ["1111", "2222", "senha_certa"]
+        mock_pdf, _ = self._mock_pdf()
+
+        def open_side_effect(path, password=None):
+            if password == "senha_certa":
+                return mock_pdf
+            raise Exception("password required")
+
+        mock_open.side_effect = open_side_effect
+        mock_pdfium.PdfiumError = Exception
+
+        with PdfDocumentSession("protegido.pdf") as session:
+            self.assertIs(session.plumber, mock_pdf)
+            self.assertEqual(session.senha, "senha_certa")
+            self.assertIsNotNone(session.pdfium)
+
+        # pypdfium2 abriu na primeira tentativa, sem força bruta
+        mock_pdfium.PdfDocument.assert_called_once_with(
+            "protegido.pdf", password="senha_certa"
+        )
+
+    @patch("strategies.pdf_utils.pdfplumber.open")
+    def test_timings_por_estagio(self, mock_open):
+        """A sessão registra tempo por estágio de leitura."""
+        from strategies.pdf_session import PdfDocumentSession
+
+        mock_pdf, _ = self._mock_pdf()
+        mock_open.return_value = mock_pdf
+
+        with PdfDocumentSession("doc.pdf") as session:
+            session.page_text(0)
+            session.page_text(0, layout=True)
+            session.page_tables(0)
+
+        for stage in ("open_pdfplumber", "text_simple", "text_layout", "tables"):
+            self.assertIn(stage, session.timings)
+
+    def test_arquivo_inexistente_nao_lanca(self):
+        """Sessão sobre arquivo inválido retorna vazio (mantém LSP)."""
+        from strategies.pdf_session import PdfDocumentSession
+
+        with PdfDocumentSession("nao_existe_xyz.pdf") as session:
+            self.assertIsNone(session.plumber)
+            self.assertEqual(session.pages, [])
+            self.assertIsNone(session.render_page(0, scale=1.0))
+
+    @patch("strategies.fallback.TesseractOcrStrategy.extract")
+    @patch("strategies.fallback.TablePdfStrategy.extract")
+    @patch("strategies.fallback.NativePdfStrategy.extract")
+    def test_fallback_compartilha_sessao(self, mock_native, mock_table, mock_ocr):
+        """SmartExtractionStrategy passa a mesma sessão para todas as estratégias."""
+        from strategies.fallback import SmartExtractionStrategy
+
+        mock_native.return_value = ""
+        mock_table.return_value = ""
+        mock_ocr.return_value = "Texto extraído via OCR - valor de 200,00 em 15/02/2025"
+
+        SmartExtractionStrategy().extract("escaneado.pdf")
+
+        sessions = {
+            id(m.call_args.kwargs["session"]) for m in (mock_native, mock_table, mock_ocr)
+        }
+        self.assertEqual(len(sessions), 1)
+
+
+class TestOrcamentoDePaginas(unittest.TestCase):
+    """Testes do orçamento de páginas (PagedText) na leitura nativa e no processador."""
+
+    FATURA_TIM = (
+        "TIM S.A. CNPJ 02.421.421/0001-11\n"
+        "FATURA DE PAGAMENTO: 123456789\n"
+        "VENCIMENTO\n15/03/2025\n"
+        "Total a pagar R$ 221,62\n"
+    )
+
+    def _mock_pdf(self, textos):
+        mock_pdf = MagicMock()
+        paginas = []
+        for texto in textos:
+            page = MagicMock()
+            page.extract_text.return_value = texto
+            paginas.append(page)
+        mock_pdf.pages = paginas
+        return mock_pdf, paginas
+
+    def _detalhamento(self, n):
+        return [f"Detalhamento de chamadas pagina {i} " + "ligacao local 0,10 " * 20 for i in range(n)]
+
+    def _lidas(self, paginas):
+        return [i for i, page in enumerate(paginas) if page.extract_text.called]
+
+    @patch("strategies.pdf_utils.pdfplumber.open")
+    def test_native_le_so_paginas_do_orcamento(self, mock_open):
+        """PDF longo: só as primeiras/últimas páginas são lidas; o resto sob demanda."""
+        from strategies.native import NativePdfStrategy
+        from strategies.pdf_session import PagedText, PdfDocumentSession
+
+        textos = self._detalhamento(10)
+        mock_pdf, paginas = self._mock_pdf(textos)
+        mock_open.return_value = mock_pdf
+
+        with PdfDocumentSession("longo.pdf") as session:
+            texto = NativePdfStrategy().extract("longo.pdf", session=session, page_budget=(2, 1))
+
+            self.assertIsInstance(texto, PagedText)
+            self.assertFalse(texto.complete)
+            self.assertEqual(texto.pages_read, (0, 1, 9))
+            self.assertEqual(self._lidas(paginas), [0, 1, 9])
+
+            completo = texto.full()
+            self.assertTrue(completo.complete)
+            self.assertEqual(completo, "".join(t + "\n" for t in textos))
+
+    @patch("strategies.pdf_utils.pdfplumber.open")
+    def test_native_documento_curto_ignora_orcamento(self, mock_open):
+        """PDF dentro do orçamento é lido inteiro e volta como str comum."""
+        from strategies.native import NativePdfStrategy
+        from strategies.pdf_session import PagedText, PdfDocumentSession
+
+        mock_open.return_value = self._mock_pdf(self._detalhamento(3))[0]
+
+        with PdfDocumentSession("curto.pdf") as session:
+            texto = NativePdfStrategy().extract("curto.pdf", session=session, page_budget=(2, 1))
+
+        self.assertNotIsInstance(texto, PagedText)
+
+    @patch("strategies.pdf_utils.pdfplumber.open")
+    def test_sessao_reporta_paginas_lidas_e_ignoradas(self, mock_open):
+        """Ao fechar, a sessão conta páginas lidas vs. ignoradas no MetricsCollector."""
+        from core.metrics import MetricsCollector
+        from strategies.pdf_session import PAGES_METRIC, PagedText, PdfDocumentSession
+
+        mock_open.return_value = self._mock_pdf(self._detalhamento(10))[0]
+        antes = MetricsCollector().snapshot_counters()
+
+        PagedText(PdfDocumentSession("longo.pdf"), (0, 1, 9)).close()
+
+        depois = MetricsCollector().snapshot_counters()
+        for status, esperado in (("parsed", 3), ("skipped", 7)):
+            chave = f"{PAGES_METRIC}{{status={status}}}"
+            self.assertEqual(depois.get(chave, 0) - antes.get(chave, 0), esperado)
+
+    @patch("strategies.pdf_utils.pdfplumber.open")
+    def test_processador_com_page_scope_nao_le_o_meio(self, mock_open):
+        """Extrator com PAGE_SCOPE e campos obrigatórios achados: o meio não é lido."""
+        from core.models import OtherDocumentData
+        from core.processor import BaseInvoiceProcessor
+        from strategies.fallback import SmartExtractionStrategy
+
+        textos = [self.FATURA_TIM + "ligacao local 0,10 " * 20] + self._detalhamento(29)
+        mock_pdf, paginas = self._mock_pdf(textos)
+        mock_open.return_value = mock_pdf
+
+        with patch("config.settings.PDF_PAGE_BUDGET_ENABLED", True):
+            doc = BaseInvoiceProcessor(reader=SmartExtractionStrategy()).process("tim.pdf")
+
+        self.assertIsInstance(doc, OtherDocumentData)
+        self.assertEqual(doc.valor_total, 221.62)
+        self.assertEqual(doc.vencimento, "2025-03-15")
+        self.assertEqual(self._lidas(paginas), [0, 1, 29])
+        mock_pdf.close.assert_called_once()
+
+    @patch("strategies.pdf_utils.pdfplumber.open")
+    def test_processador_le_tudo_quando_falta_campo_obrigatorio(self, mock_open):
+        """Campo obrigatório ausente nas páginas do orçamento: lê o documento inteiro."""
+        from core.processor import BaseInvoiceProcessor
+        from strategies.fallback import SmartExtractionStrategy
+
+        sem_vencimento = self.FATURA_TIM.replace("VENCIMENTO\n15/03/2025\n", "")
+        textos = [sem_vencimento + "ligacao local 0,10 " * 20] + self._detalhamento(9)
+        textos[5] += "\nVENCIMENTO\n15/03/2025"
+        mock_pdf, paginas = self._mock_pdf(textos)
+        mock_open.return_value = mock_pdf
+
+        with patch("config.settings.PDF_PAGE_BUDGET_ENABLED", True):
+            doc = BaseInvoiceProcessor(reader=SmartExtractionStrategy()).process("tim.pdf")
+
+        self.assertEqual(doc.vencimento, "2025-03-15")
+        self.assertEqual(self._lidas(paginas), list(range(10)))
+
+    @patch("strategies.pdf_utils.pdfplumber.open")
+    def test_processador_sem_page_scope_le_documento_inteiro(self, mock_open):
+        """Extrator sem PAGE_SCOPE recebe o texto completo (mesmo resultado de antes)."""
+        from core.processor import BaseInvoiceProcessor
+        from strategies.fallback import SmartExtractionStrategy
+
+        mock_pdf, paginas = self._mock_pdf(self._detalhamento(10))
+        mock_open.return_value = mock_pdf
+        processor = BaseInvoiceProcessor(reader=SmartExtractionStrategy())
+
+        with patch("config.settings.PDF_PAGE_BUDGET_ENABLED", True):
+            processor.process("outro.pdf")
+
+        self.assertEqual(self._lidas(paginas), list(range(10)))
+        mock_pdf.close.assert_called_once()
+
+    @patch("strategies.pdf_utils.pdfplumber.open")
+    def test_padrao_le_todas_paginas_para_detectar_empresa(self, mock_open):
+        """Sem opt-in do orçamento, o CNPJ nosso em qualquer página define a EMPRESA."""
+        from config import settings
+        from core.processor import BaseInvoiceProcessor
+        from strategies.fallback import SmartExtractionStrategy
+
+        self.assertFalse(settings.PDF_PAGE_BUDGET_ENABLED)
+        cnpj_csc = "\nTomador: CSC GESTAO INTEGRADA S/A CNPJ 38.323.227/0001-40"
+
+        for pagina in (15, 29):
+            with self.subTest(pagina=pagina):
+                textos = [self.FATURA_TIM + "ligacao local 0,10 " * 20] + self._detalhamento(29)
+                textos[pagina] += cnpj_csc
+                mock_pdf, paginas = self._mock_pdf(textos)
+                mock_open.return_value = mock_pdf
+
+                doc = BaseInvoiceProcessor(reader=SmartExtractionStrategy()).process("tim.pdf")
+
+                self.assertEqual(doc.empresa, "CSC")
+                self.assertEqual(doc.valor_total, 221.62)
+                self.assertEqual(self._lidas(paginas), list(range(30)))
+
+
+class TestTextExtractionCache(unittest.TestCase):
+    """Testes para o cache persistente de texto extraído."""
+
+    def setUp(self):
+        import tempfile
+        from pathlib import Path
+
+        from core.metrics import MetricsCollector
+
+        MetricsCollector().reset()
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.pdf_path = self.temp_dir / "nota.pdf"
+        self.pdf_path.write_bytes(b"%PDF-1.4 conteudo de teste")
+
+    def tearDown(self):
+        import shutil
+
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _cache(self, max_bytes=1024 * 1024):
+        from strategies.text_cache import TextExtractionCache
+
+        cache = TextExtractionCache(self.temp_dir / "cache.sqlite", max_bytes)
+        self.addCleanup(cache.close)
+        return cache
+
+    @patch("strategies.fallback.NativePdfStrategy.extract")
+    def test_segunda_leitura_vem_do_cache(self, mock_native):
+        """Arquivo já lido não passa novamente pelas estratégias."""
+        from core.metrics import IngestionMetrics
+        from strategies.fallback import SmartExtractionStrategy
+
+        texto = "NOTA FISCAL 15/02/2025 R$ 200,00 " * 30
+        mock_native.return_value = texto
+        strategy = SmartExtractionStrategy(text_cache=self._cache())
+
+        self.assertEqual(strategy.extract(str(self.pdf_path)), texto)
+        self.assertEqual(strategy.extract(str(self.pdf_path)), texto)
+
+        mock_native.assert_called_once()
+        summary = IngestionMetrics().get_session_summary()
+        self.assertEqual(summary["text_cache_hits"], 1)
+        self.assertEqual(summary["text_cache_misses"], 1)
+
+    @patch("strategies.fallback.SmartExtractionStrategy._hybrid_complement")
+    @patch("strategies.fallback.NativePdfStrategy.extract")
+    def test_falha_no_complemento_ocr_nao_grava_cache(self, mock_native, mock_hybrid):
+        """Texto só nativo após erro do OCR não fica no cache: a próxima leitura tenta o OCR."""
+        from strategies.fallback import SmartExtractionStrategy
+
+        texto = "CNPJ 12.345.678/0001-90 " * 10  # sem datas/valores: pede complemento OCR
+        mock_native.return_value = texto
+        mock_hybrid.side_effect = [RuntimeError("tesseract timeout"), texto + "\n\nR$ 10,00"]
+        strategy = SmartExtractionStrategy(text_cache=self._cache())
+
+        self.assertEqual(strategy.extract(str(self.pdf_path)), texto)
+        self.assertEqual(strategy.extract(str(self.pdf_path)), texto + "\n\nR$ 10,00")
+        self.assertEqual(strategy.extract(str(self.pdf_path)), texto + "\n\nR$ 10,00")
+
+        self.assertEqual(mock_hybrid.call_count, 2)
+
+    def test_chave_muda_com_configuracao_de_ocr(self):
+        """Alterar OCR_LANG invalida as entradas anteriores."""
+        cache = self._cache()
+        key = cache.key_for(self.pdf_path)
+
+        with patch("config.settings.OCR_LANG", "eng"):
+            outra = self._cache().key_for(self.pdf_path)
+
+        self.assertNotEqual(key, outra)
+        self.assertEqual(key.split(":")[0], outra.split(":")[0])
+
+    def test_despejo_lru(self):
+        """Acima do limite, as entradas menos acessadas são removidas."""
+        cache = self._cache(max_bytes=250)
+        cache.put("a", "a" * 100)
+        cache.put("b", "b" * 100)
+        cache.get("a")  # "a" passa a ser a mais recente
+        cache.put("c", "c" * 100)
+
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("c"))
+        self.assertEqual(cache.stats()["entries"], 2)
+
+    def test_desativado_por_configuracao(self):
+        """TEXT_CACHE_ENABLED=False (--no-text-cache) desliga o cache padrão."""
+        from strategies.text_cache import get_text_cache
+
+        with patch("config.settings.TEXT_CACHE_ENABLED", False):
+            self.assertIsNone(get_text_cache())
+
+    def test_processador_avulso_nao_grava_cache_por_padrao(self):
+        """Sem TEXT_CACHE_ENABLED no ambiente, BaseInvoiceProcessor() não usa cache."""
+        import os
+        import subprocess
+        import sys
+        from pathlib import Path
+
+        env = {k: v for k, v in os.environ.items() if k != "TEXT_CACHE_ENABLED"}
+        codigo = (
+            "from core.processor import BaseInvoiceProcessor\n"
+            "print(BaseInvoiceProcessor().reader.text_cache is None)\n"
+        )
+        saida = subprocess.run(
+            [sys.executable, "-c", codigo],
+            cwd=Path(__file__).resolve().parent.parent,
+            env=env,
+            capture_output=True,
+            text=True,
+            timeout=60,
+        )
+
+        self.assertEqual(saida.stdout.strip().splitlines()[-1], "True", saida.stderr)
+
+
+class TestPdfPasswordResolver(unittest.TestCase):
+    """Testes para a resolução de senhas com histórico por arquivo e remetente."""
+
+    SENHA = "senha_certa"
+
+    def setUp(self):
+        import tempfile
+        from pathlib import Path
+
+        from core.metadata import EmailMetadata
+
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.lote = self.temp_dir / "lote_1"
+        EmailMetadata(
+            batch_id="lote_1", email_sender_address="cobranca@fornecedor.com.br"
+        ).save(self.lote)
+        self.pdf_path = self.lote / "boleto.pdf"
+        self.pdf_path.write_bytes(b"%PDF-1.4 boleto protegido")
+
+        patcher = patch("strategies.pdf_password.pdfium")
+        self.mock_pdfium = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.mock_pdfium.PdfiumError = Exception
+
+        def open_side_effect(data, password=None):
+            if password == self.SENHA:
+                return MagicMock()
+            raise Exception("Incorrect password error")
+
+        self.mock_pdfium.PdfDocument.side_effect = open_side_effect
+
+    def tearDown(self):
+        import shutil
+
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _store(self):
+        from strategies.pdf_password import PdfPasswordStore
+
+        store = PdfPasswordStore(self.temp_dir / "senhas.sqlite")
+        self.addCleanup(store.close)
+        return store
+
+    def _resolver(self, store=None, candidatos=("1111", "2222", SENHA)):
+        from strategies.pdf_password import PdfPasswordResolver
+
+        return PdfPasswordResolver(lambda: list(candidatos), store)
+
+    def _senhas_testadas(self):
+        return [c.kwargs.get("password") for c in self.mock_pdfium.PdfDocument.call_args_list]
+
+    def test_verifica_candidatos_em_memoria(self):
+        """O arquivo é lido uma vez e os candidatos testados sobre os bytes."""
+        senha = self._resolver().resolve(self.pdf_path)
+
+        self.assertEqual(senha, self.SENHA)
+        self.assertEqual(self._senhas_testadas(), [None, "1111", "2222", self.SENHA])
+        for c in self.mock_pdfium.PdfDocument.call_args_list:
+            self.assertEqual(c.args[0], b"%PDF-1.4 boleto protegido")
+
+    def test_resultado_memorizado_no_processo(self):
+        """Segunda consulta do mesmo arquivo não verifica nada."""
+        resolver = self._resolver()
+        resolver.resolve(self.pdf_path)
+        self.mock_pdfium.PdfDocument.reset_mock()
+
+        self.assertEqual(resolver.resolve(self.pdf_path), self.SENHA)
+        self.mock_pdfium.PdfDocument.assert_not_called()
+
+    def test_senha_lembrada_por_arquivo_entre_execucoes(self):
+        """Um novo resolvedor reaproveita a senha gravada para o hash do arquivo."""
+        self._resolver(self._store()).resolve(self.pdf_path)
+        self.mock_pdfium.PdfDocument.reset_mock()
+
+        senha = self._resolver(self._store()).resolve(self.pdf_path)
+
+        self.assertEqual(senha, self.SENHA)
+        self.assertEqual(self._senhas_testadas(), [None, self.SENHA])
+
+    def test_remetente_prioriza_senha_que_ja_funcionou(self):
+        """Outro arquivo do mesmo domínio testa primeiro a senha vencedora."""
+        store = self._store()
+        self._resolver(store).resolve(self.pdf_path)
+
+        outro = self.lote / "boleto_2.pdf"
+        outro.write_bytes(b"%PDF-1.4 outro boleto")
+        self.mock_pdfium.PdfDocument.reset_mock()
+
+        senha = self._resolver(store).resolve(outro)
+
+        self.assertEqual(senha, self.SENHA)
+        self.assertEqual(self._senhas_testadas(), [None, self.SENHA])
+        historico = store.sender_successes(["domain:fornecedor.com.br"])
+        self.assertEqual(historico["domain:fornecedor.com.br"], {self.SENHA: 2})
+
+    def test_nenhuma_senha_funciona(self):
+        """Sem senha válida retorna None e não repete a busca."""
+        resolver = self._resolver(candidatos=("1111", "2222"))
+
+        self.assertIsNone(resolver.resolve(self.pdf_path))
+        self.mock_pdfium.PdfDocument.reset_mock()
+        self.assertIsNone(resolver.resolve(self.pdf_path))
+        self.mock_pdfium.PdfDocument.assert_not_called()
+
+    def test_arquivo_ilegivel_lanca_oserror(self):
+        """Sem bytes para verificar, o chamador decide o fallback."""
+        with self.assertRaises(OSError):
+            self._resolver().resolve(self.temp_dir / "nao_existe.pdf")
+
+    @patch("strategies.pdf_utils.pdfplumber.open")
+    def test_pdfplumber_abre_uma_vez_com_senha_resolvida(self, mock_open):
+        """desbloquear_pdfplumber não faz força bruta quando o resolvedor responde."""
+        from strategies.pdf_utils import desbloquear_pdfplumber
+
+        mock_pdf = MagicMock()
+        mock_pdf.pages = [MagicMock()]
+
+        def open_side_effect(path, password=None):
+            if password == self.SENHA:
+                return mock_pdf
+            raise Exception("password required")
+
+        mock_open.side_effect = open_side_effect
+
+        with patch(
+            "strategies.pdf_password.get_password_resolver", return_value=self._resolver()
+        ):
+            pdf, senha = desbloquear_pdfplumber(str(self.pdf_path))
+
+        self.assertIs(pdf, mock_pdf)
+        self.assertEqual(senha, self.SENHA)
+        self.assertEqual(mock_open.call_count, 2)
+
+    @patch("strategies.pdf_utils.pdfplumber.open")
+    @patch("strategies.pdf_utils.gerar_candidatos_senha", return_value=["1111", "2222"])
+    def test_pdf_sem_senha_no_resolvedor_mantem_forca_bruta(self, _mock_cands, mock_open):
+        """"" do resolvedor (abre sem senha) é distinto de None e não encerra a busca."""
+        from strategies.pdf_utils import _resolver_senha, desbloquear_pdfplumber
+
+        self.mock_pdfium.PdfDocument.side_effect = None
+        mock_pdf = MagicMock()
+        mock_pdf.pages = [MagicMock()]
+
+        def open_side_effect(path, password=None):
+            if password == "2222":
+                return mock_pdf
+            raise Exception("password required")
+
+        mock_open.side_effect = open_side_effect
+
+        with patch(
+            "strategies.pdf_password.get_password_resolver", return_value=self._resolver()
+        ):
+            self.assertEqual(_resolver_senha(str(self.pdf_path)), (True, ""))
+            pdf, senha = desbloquear_pdfplumber(str(self.pdf_path))
+
+        self.assertIs(pdf, mock_pdf)
+        self.assertEqual(senha, "2222")
+
+    def test_resolver_senha_distingue_senha_desconhecida(self):
+        """Nenhum candidato válido: (True, None), sem confundir com ""."""
+        from strategies.pdf_utils import _resolver_senha
+
+        with patch(
+            "strategies.pdf_password.get_password_resolver",
+            return_value=self._resolver(candidatos=("1111",)),
+        ):
+            self.assertEqual(_resolver_senha(str(self.pdf_path)), (True, None))
+
+
+class TestOcrMultipagina(unittest.TestCase):
+    """Testes para o OCR multipágina com escalada de DPI."""
+
+    PAGINA_BOA = "NOTA FISCAL ELETRONICA VALOR TOTAL R$ 1.234,56 VENCIMENTO 10/03/2025 " * 4
+
+    def _tesseract_data(self, texto, conf):
+        palavras = texto.split()
+        return {
+            "text": palavras,
+            "conf": [conf] * len(palavras),
+            "block_num": [1] * len(palavras),
+            "par_num": [1] * len(palavras),
+            "line_num": [1] * len(palavras),
+        }
+
+    def _mock_pdfium(self, mock_pdfium, paginas):
+        mock_doc = MagicMock()
+        mock_doc.__len__.return_value = paginas
+
+        def get_page(index):
+            page = MagicMock()
+            page.render.side_effect = lambda scale: MagicMock(
+                to_pil=MagicMock(return_value=("img", index, round(scale * 72)))
+            )
+            return page
+
+        mock_doc.__getitem__.side_effect = get_page
+        mock_pdfium.PdfDocument.return_value = mock_doc
+
+    @patch("strategies.ocr.pytesseract.image_to_data")
+    @patch("strategies.pdf_utils.pdfium")
+    def test_todas_paginas_e_escalada_so_na_fraca(self, mock_pdfium, mock_data):
+        """Processa várias páginas e só refaz em 300 DPI a página com baixa confiança."""
+        from strategies.ocr import TesseractOcrStrategy
+
+        self._mock_pdfium(mock_pdfium, paginas=5)
+
+        def data_side_effect(image, **kwargs):
+            _, page, dpi = image
+            if page == 1 and dpi == 200:
+                return self._tesseract_data("ilegivel", 20)
+            return self._tesseract_data(f"PAGINA{page} {self.PAGINA_BOA}", 92)
+
+        mock_data.side_effect = data_side_effect
+
+        with patch.multiple(
+            "config.settings", OCR_MAX_PAGES=3, OCR_WORKERS=1, OCR_DPI_LOW=200, OCR_DPI_HIGH=300
+        ):
+            texto = TesseractOcrStrategy().extract("escaneado.pdf")
+
+        chamadas = [call.args[0][1:] for call in mock_data.call_args_list]
+        self.assertEqual(chamadas, [(0, 200), (1, 200), (2, 200), (1, 300)])
+        for page in range(3):
+            self.assertIn(f"PAGINA{page}", texto)
+        self.assertNotIn("ilegivel", texto)
+
+    @patch("strategies.ocr.pytesseract.image_to_data")
+    @patch("strategies.pdf_utils.pdfium")
+    def test_paginas_em_paralelo_mantem_ordem(self, mock_pdfium, mock_data):
+        """Com vários workers, o texto final segue a ordem das páginas."""
+        from strategies.ocr import TesseractOcrStrategy
+
+        self._mock_pdfium(mock_pdfium, paginas=3)
+        mock_data.side_effect = lambda image, **kwargs: self._tesseract_data(
+            f"PAGINA{image[1]} {self.PAGINA_BOA}", 95
+        )
+
+        with patch.multiple("config.settings", OCR_MAX_PAGES=3, OCR_WORKERS=3):
+            texto = TesseractOcrStrategy().extract("escaneado.pdf")
+
+        posicoes = [texto.index(f"PAGINA{page}") for page in range(3)]
+        self.assertEqual(posicoes, sorted(posicoes))
+        self.assertEqual(mock_data.call_count, 3)
+
+    @patch("strategies.ocr.pytesseract.image_to_data")
+    def test_ocr_image_remonta_linhas_e_confianca(self, mock_data):
+        """ocr_image remonta linhas/blocos e ignora confiança -1 (não-palavras)."""
+        from strategies.ocr import ocr_image
+
+        mock_data.return_value = {
+            "text": ["", "CNPJ", "12.345.678/0001-90", "Total", ""],
+            "conf": ["-1", "90", "80", "70", "-1"],
+            "block_num": [1, 1, 1, 2, 2],
+            "par_num": [1, 1, 1, 1, 1],
+            "line_num": [0, 1, 1, 1, 1],
+        }
+
+        saida = ocr_image("img", "por", "")
+
+        self.assertEqual(saida["text"], "CNPJ 12.345.678/0001-90\n\nTotal")
+        self.assertAlmostEqual(saida["confidence"], 80.0)
+
+
+class TestOcrPorRegioes(unittest.TestCase):
+    """Testes para o OCR só das imagens embutidas (complemento híbrido)."""
+
+    def _region(self, page, bbox, text, pixels=100):
+        from strategies.ocr import OcrRegionResult
+
+        return OcrRegionResult(
+            page=page, bbox=bbox, text=text, confidence=90.0, pixels=pixels, elapsed=0.01
+        )
+
+    def _session(self, linhas_por_pagina):
+        session = MagicMock()
+        session.page_lines.side_effect = lambda page: linhas_por_pagina.get(page, [])
+        return session
+
+    def _linha(self, text, top):
+        return {"text": text, "x0": 40.0, "top": top, "x1": 300.0, "bottom": top + 9}
+
+    def test_image_regions_une_faixas_e_descarta_pequenas(self):
+        """Faixas vizinhas viram uma região; logotipos pequenos são ignorados."""
+        from strategies.ocr import image_regions
+
+        caixas = [
+            (40.0, 300.0, 555.0, 400.0),
+            (40.0, 100.0, 555.0, 200.0),
+            (40.0, 200.0, 555.0, 300.0),
+            (500.0, 20.0, 530.0, 50.0),  # logotipo 30x30
+        ]
+
+        regioes = image_regions(caixas, min_area=4000)
+
+        self.assertEqual(regioes, [(40.0, 100.0, 555.0, 400.0)])
+
+    def test_splice_insere_apos_linha_acima_da_regiao(self):
+        """Texto OCR entra logo após a linha nativa acima da imagem (texto com layout)."""
+        from strategies.ocr import splice_regions
+
+        base = "   CABECALHO    DANFE\n   DESTINATARIO   FULANO\n   RODAPE\n"
+        session = self._session({0: [
+            self._linha("CABECALHO DANFE", 40),
+            self._linha("DESTINATARIO FULANO", 60),
+            self._linha("RODAPE", 700),
+        ]})
+        regioes = [
+            self._region(0, (40.0, 400.0, 555.0, 600.0), "TOTAL 2"),
+            self._region(0, (40.0, 80.0, 555.0, 300.0), "TOTAL 1"),
+        ]
+
+        texto = splice_regions(base, session, regioes)
+
+        self.assertEqual(
+            texto.split("\n"),
+            ["   CABECALHO    DANFE", "   DESTINATARIO   FULANO", "TOTAL 1", "TOTAL 2",
+             "   RODAPE", ""],
+        )
+
+    def test_splice_topo_e_sem_ancora(self):
+        """Região no topo entra antes da página; página sem texto nativo vai ao final."""
+        from strategies.ocr import splice_regions
+
+        base = "PAGINA UM\n"
+        session = self._session({0: [self._linha("PAGINA UM", 500)]})
+        regioes = [
+            self._region(1, (0.0, 0.0, 500.0, 500.0), "PAGINA DOIS OCR"),
+            self._region(0, (0.0, 10.0, 500.0, 300.0), "TOPO OCR"),
+            self._region(0, (0.0, 600.0, 500.0, 700.0), "   "),
+        ]
+
+        texto = splice_regions(base, session, regioes)
+
+        self.assertEqual(texto, "TOPO OCR\nPAGINA UM\n\nPAGINA DOIS OCR")
+
+    def test_extract_regions_ocr_so_do_recorte(self):
+        """Em PDF híbrido real, só a imagem é renderizada (menos pixels que a página)."""
+        import tempfile
+        from pathlib import Path
+
+        import core  # noqa: F401
+        from benchmarks.corpus import build_template_pdf
+        from core.metrics import MetricsCollector
+        from strategies.ocr import REGION_PIXELS_METRIC, TesseractOcrStrategy
+        from strategies.pdf_session import PdfDocumentSession
+
+        MetricsCollector().reset()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "danfe.pdf"
+            path.write_bytes(build_template_pdf("danfe", "hybrid"))
+            with patch(
+                "strategies.ocr.ocr_image",
+                return_value={"text": "VALOR TOTAL DA NOTA 1.234,56", "confidence": 90.0},
+            ) as mock_ocr, PdfDocumentSession(str(path)) as session:
+                regioes = TesseractOcrStrategy().extract_regions(str(path), session=session)
+                pagina = session.render_page(0, scale=300 / 72)
+
+        self.assertEqual(len(regioes), 1)
+        self.assertEqual(mock_ocr.call_count, 1)
+        self.assertLess(regioes[0].pixels, pagina.width * pagina.height)
+        self.assertEqual(
+            MetricsCollector().snapshot_counters()[REGION_PIXELS_METRIC], float(regioes[0].pixels)
+        )
+
+    @patch("strategies.fallback.TesseractOcrStrategy.extract")
+    @patch("strategies.fallback.TesseractOcrStrategy.extract_regions")
+    @patch("strategies.fallback.NativePdfStrategy.extract")
+    def test_fallback_usa_regioes_antes_da_pagina(self, mock_native, mock_regions, mock_ocr):
+        """Complemento híbrido usa as regiões e não roda o OCR de página."""
+        from strategies.fallback import SmartExtractionStrategy
+
+        mock_native.return_value = "CNPJ 12.345.678/0001-90 " * 10
+        mock_regions.return_value = [self._region(0, (0.0, 0.0, 500.0, 500.0), "VALOR 1.234,56")]
+
+        with patch("config.settings.HYBRID_OCR_MODE", "regions"), patch(
+            "strategies.fallback.PdfDocumentSession.page_lines", return_value=[]
+        ):
+            texto = SmartExtractionStrategy().extract("hibrido.pdf")
+
+        self.assertIn("VALOR 1.234,56", texto)
+        self.assertTrue(texto.startswith("CNPJ"))
+        mock_ocr.assert_not_called()
+
+    @patch("strategies.fallback.TesseractOcrStrategy.extract")
+    @patch("strategies.fallback.TesseractOcrStrategy.extract_regions")
+    @patch("strategies.fallback.NativePdfStrategy.extract")
+    def test_fallback_sem_imagens_usa_ocr_de_pagina(self, mock_native, mock_regions, mock_ocr):
+        """Sem imagens utilizáveis (None), o complemento cai no OCR da página."""
+        from strategies.fallback import SmartExtractionStrategy
+
+        mock_native.return_value = "CNPJ 12.345.678/0001-90 " * 10
+        mock_regions.return_value = None
+        mock_ocr.return_value = "TEXTO OCR DA PAGINA INTEIRA " * 3
+
+        texto = SmartExtractionStrategy().extract("hibrido.pdf")
+
+        self.assertIn("TEXTO OCR DA PAGINA INTEIRA", texto)
+        mock_ocr.assert_called_once()
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -74,5 +74,90 @@ class TestGranularTimeout(unittest.TestCase):
         self.assertEqual(result, "Success")
 
 
+def _sleep_and_return(seconds, value):
+    time.sleep(seconds)
+    return value
+
+
+def _raise_value_error(msg):
+    raise ValueError(msg)
+
+
+def _get_pid():
+    import os
+
+    return os.getpid()
+
+
+def _observe_histogram(value):
+    from core.metrics import MetricsCollector
+
+    MetricsCollector().observe_histogram("ocr_page_seconds", value)
+    return value
+
+
+class TestSupervisedProcessExecutor(unittest.TestCase):
+    def setUp(self):
+        from core.metrics import MetricsCollector
+        from core.supervised_executor import SupervisedProcessExecutor
+
+        MetricsCollector().reset()
+        self.executor = SupervisedProcessExecutor(name="teste", max_tasks_per_worker=3)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_timeout_encerra_worker(self):
+        import os
+        from concurrent.futures import TimeoutError as FuturesTimeoutError
+
+        from core.metrics import IngestionMetrics
+
+        self.executor.call(_get_pid, timeout=5)
+        pid = self.executor.worker_pid
+
+        start = time.time()
+        with self.assertRaises(FuturesTimeoutError):
+            self.executor.call(_sleep_and_return, 30, "nunca", timeout=0.5)
+        self.assertLess(time.time() - start, 5)
+
+        # Processo travado foi realmente encerrado
+        with self.assertRaises(ProcessLookupError):
+            os.kill(pid, 0)
+        self.assertEqual(self.executor.kills, 1)
+        self.assertEqual(IngestionMetrics().get_session_summary()["workers_killed"], 1)
+
+        # Executor continua utilizável com um novo worker
+        self.assertEqual(self.executor.call(_sleep_and_return, 0, "ok", timeout=5), "ok")
+        self.assertNotEqual(self.executor.worker_pid, pid)
+
+    def test_excecao_propagada(self):
+        with self.assertRaises(ValueError) as ctx:
+            self.executor.call(_raise_value_error, "falhou", timeout=5)
+        self.assertIn("falhou", str(ctx.exception))
+
+    def test_worker_reciclado_apos_limite(self):
+        pids = [self.executor.call(_get_pid, timeout=5) for _ in range(4)]
+        self.assertEqual(len(set(pids[:3])), 1)
+        self.assertNotEqual(pids[3], pids[0])
+        self.assertEqual(self.executor.recycles, 1)
+
+    def test_histogramas_do_worker_chegam_ao_pai(self):
+        from core.metrics import MetricsCollector
+
+        self.executor.call(_observe_histogram, 0.2, timeout=5)
+        self.executor.call(_observe_histogram, 0.4, timeout=5)
+
+        stats = MetricsCollector().get_all_metrics()["histograms"]["ocr_page_seconds"]
+        self.assertEqual(stats["count"], 2)
+        self.assertAlmostEqual(stats["sum"], 0.6)
+
+    def test_metodo_do_target(self):
+        from core.supervised_executor import SupervisedProcessExecutor
+
+        with SupervisedProcessExecutor(target="abc", name="target") as executor:
+            self.assertEqual(executor.call("upper", timeout=5), "ABC")
+
+
 if __name__ == "__main__":
     unittest.main()
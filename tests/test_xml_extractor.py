@@ -15,7 +15,7 @@ import unittest
 from pathlib import Path
 
 from core.models import DanfeData, InvoiceData
-from extractors.xml_extractor import XmlExtractor, extract_xml
+from extractors.xml_extractor import XmlExtractor, extract_xml, extract_xml_directory
 
 
 class TestXmlExtractorDetection(unittest.TestCase):
@@ -213,6 +213,48 @@ class TestXmlExtractorNFe(unittest.TestCase):
         finally:
             Path(temp_path).unlink()
 
+    def test_extract_nfe_with_signature_and_schema_location(self):
+        """Assinatura (outro namespace) e xsi:schemaLocation não atrapalham a extração."""
+        xml_content = self._create_nfe_xml().replace(
+            '<nfeProc xmlns="http://www.portalfiscal.inf.br/nfe">',
+            '<nfeProc xmlns="http://www.portalfiscal.inf.br/nfe" '
+            'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+            'xsi:schemaLocation="http://www.portalfiscal.inf.br/nfe procNFe_v4.00.xsd">',
+        ).replace(
+            '</NFe>',
+            '<Signature xmlns="http://www.w3.org/2000/09/xmldsig#">'
+            '<SignedInfo><Reference URI="#NFe1"/></SignedInfo></Signature></NFe>',
+        )
+
+        result = self.extractor.extract_bytes(xml_content.encode('utf-8'), 'nota.xml')
+
+        self.assertTrue(result.success, result.error)
+        self.assertEqual(result.doc_type, 'NFE')
+        self.assertEqual(result.document.numero_nota, '123')
+        self.assertEqual(result.document.valor_total, 1500.0)
+
+    def test_extract_nfe_utf8_bytes_with_latin1_declaration(self):
+        """Bytes UTF-8 com declaração ISO-8859-1 mantêm os acentos (como a leitura em texto)."""
+        xml_content = self._create_nfe_xml(razao_social='Comércio São João LTDA').replace(
+            'encoding="UTF-8"', 'encoding="ISO-8859-1"'
+        )
+
+        result = self.extractor.extract_bytes(xml_content.encode('utf-8'), 'nota.xml')
+
+        self.assertTrue(result.success, result.error)
+        self.assertEqual(result.document.fornecedor_nome, 'Comércio São João LTDA')
+
+    def test_extract_nfe_latin1_bytes(self):
+        """Bytes Latin-1 (UTF-8 inválido) caem na leitura em texto."""
+        xml_content = self._create_nfe_xml(razao_social='Comércio LTDA').replace(
+            'encoding="UTF-8"', 'encoding="ISO-8859-1"'
+        )
+
+        result = self.extractor.extract_bytes(xml_content.encode('latin-1'), 'nota.xml')
+
+        self.assertTrue(result.success, result.error)
+        self.assertEqual(result.document.fornecedor_nome, 'Comércio LTDA')
+
     def test_extract_nfe_chave_acesso(self):
         """Extrai chave de acesso de 44 dígitos."""
         xml_content = self._create_nfe_xml(chave='35250112345678000195550010000001231234567890')
@@ -811,5 +853,43 @@ class TestExtractXmlFunction(unittest.TestCase):
             Path(temp_path).unlink()
 
 
+class TestExtractXmlDirectory(unittest.TestCase):
+    """Testa extração de pastas de XML."""
+
+    def _write_folder(self, tmp: str) -> None:
+        nfe = TestXmlExtractorNFe()._create_nfe_xml
+        for i in range(4):
+            (Path(tmp) / f"nota_{i}.xml").write_text(nfe(numero=str(100 + i)), encoding='utf-8')
+        (Path(tmp) / "quebrado.xml").write_text('<root><unclosed>', encoding='utf-8')
+        (Path(tmp) / "leiame.txt").write_text('não é XML', encoding='utf-8')
+
+    def test_sequential(self):
+        """Extrai todos os .xml da pasta, indexados pelo caminho."""
+        with tempfile.TemporaryDirectory() as tmp:
+            self._write_folder(tmp)
+            results = extract_xml_directory(tmp, workers=1)
+
+        self.assertEqual(len(results), 5)
+        numeros = sorted(
+            r.document.numero_nota for r in results.values() if r.success
+        )
+        self.assertEqual(numeros, ['100', '101', '102', '103'])
+        self.assertFalse(results[str(Path(tmp) / "quebrado.xml")].success)
+
+    def test_process_pool_matches_sequential(self):
+        """Com vários processos o resultado é o mesmo da execução sequencial."""
+        with tempfile.TemporaryDirectory() as tmp:
+            self._write_folder(tmp)
+            sequential = extract_xml_directory(tmp, workers=1)
+            parallel = extract_xml_directory(tmp, workers=2)
+
+        self.assertEqual(list(parallel), list(sequential))
+        for path, result in sequential.items():
+            self.assertEqual(parallel[path].success, result.success)
+            self.assertEqual(parallel[path].error, result.error)
+            if result.success:
+                self.assertEqual(parallel[path].document.numero_nota, result.document.numero_nota)
+
+
 if __name__ == '__main__':
     unittest.main()